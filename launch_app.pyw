@@ -20,5 +20,8 @@ warnings.filterwarnings('ignore', message='.*FigureCanvasQTAgg.*')
 
 # Lancer l'application
 if __name__ == '__main__':
+    # Processus de rendu PDF (pdf_batch) dans l'exécutable Windows
+    import multiprocessing
+    multiprocessing.freeze_support()
     from src.main_gui import main
     main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Migration: Ajouter les index composites des requêtes fréquentes
+- sessions: (ressource, début, fin, statut) pour la détection de conflits
+- payments: (is_cancelled, payment_date) pour le CA par période
+- exams: (result, scheduled_date) pour les taux de réussite
+Vérifie ensuite avec EXPLAIN QUERY PLAN que SQLite les utilise.
+"""
+
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import inspect, select
+from src.models import get_engine, Session, SessionStatus, Payment, Exam, ExamResult
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+COMPOSITE_INDEXES = {
+    'sessions': ['ix_sessions_instructor_period', 'ix_sessions_vehicle_period', 'ix_sessions_student_period'],
+    'payments': ['ix_payments_cancelled_date'],
+    'exams': ['ix_exams_result_date'],
+}
+
+
+def create_composite_indexes(engine) -> list:
+    """
+    Créer les index composites manquants
+    
+    Returns:
+        Liste des index créés
+    """
+    created = []
+    inspector = inspect(engine)
+    tables = {'sessions': Session, 'payments': Payment, 'exams': Exam}
+    
+    for table_name, index_names in COMPOSITE_INDEXES.items():
+        existing = {idx['name'] for idx in inspector.get_indexes(table_name)}
+        for index in tables[table_name].__table__.indexes:
+            if index.name in index_names and index.name not in existing:
+                index.create(engine)
+                created.append(index.name)
+    
+    return created
+
+
+def check_query_plans(engine) -> dict:
+    """
+    Vérifier que le planificateur utilise les index composites
+    
+    Returns:
+        Dict index -> True si le plan de la requête correspondante l'utilise
+    """
+    start, end = datetime(2024, 1, 1, 8), datetime(2024, 1, 1, 10)
+    queries = {
+        'ix_sessions_instructor_period': select(Session.id).where(
+            Session.instructor_id == 1, Session.status != SessionStatus.CANCELLED,
+            Session.start_datetime < end, Session.end_datetime > start
+        ),
+        'ix_sessions_vehicle_period': select(Session.id).where(
+            Session.vehicle_id == 1, Session.status != SessionStatus.CANCELLED,
+            Session.start_datetime < end, Session.end_datetime > start
+        ),
+        'ix_sessions_student_period': select(Session.id).where(
+            Session.student_id == 1, Session.status != SessionStatus.CANCELLED,
+            Session.start_datetime < end, Session.end_datetime > start
+        ),
+        'ix_payments_cancelled_date': select(Payment.amount).where(
+            Payment.is_cancelled == False,
+            Payment.payment_date >= date(2024, 1, 1), Payment.payment_date <= date(2024, 1, 31)
+        ),
+        'ix_exams_result_date': select(Exam.id).where(
+            Exam.result.in_([ExamResult.PASSED, ExamResult.FAILED]),
+            Exam.scheduled_date >= date(2024, 1, 1)
+        ),
+    }
+    
+    results = {}
+    with engine.connect() as connection:
+        # Statistiques à jour pour que le planificateur départage les index
+        connection.exec_driver_sql("ANALYZE")
+        for index_name, query in queries.items():
+            compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+            details = " | ".join(str(row[-1]) for row in plan)
+            results[index_name] = index_name in details
+            logger.debug(f"Plan {index_name} : {details}")
+    
+    return results
+
+
+def run_migration():
+    """Exécuter la migration"""
+    try:
+        engine = get_engine()
+        
+        print("🔄 Création des index composites...")
+        created = create_composite_indexes(engine)
+        if created:
+            for name in created:
+                print(f"  ✓ Index '{name}' créé")
+        else:
+            print("✓ Les index composites existent déjà.")
+        
+        print("\n🔍 Vérification des plans d'exécution (EXPLAIN QUERY PLAN)...")
+        all_used = True
+        for name, used in check_query_plans(engine).items():
+            print(f"  {'✓' if used else '⚠️'} {name} {'utilisé' if used else 'non utilisé'}")
+            all_used = all_used and used
+        
+        if not all_used:
+            print("\n❌ Migration des index incomplète : au moins une requête n'utilise pas son index.")
+            return False
+        
+        print("\n✅ Migration des index terminée avec succès!")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Erreur lors de la migration des index : {e}", exc_info=True)
+        print(f"\n❌ Erreur lors de la migration : {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
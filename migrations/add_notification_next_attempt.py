@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Migration: Ajouter la colonne notifications.next_attempt_at et son index
+Échéance du planificateur de notifications :
+- en attente : date planifiée (ou date de création si envoi immédiat)
+- échouée avec des tentatives restantes : immédiatement
+- terminée (envoyée, livrée, lue, tentatives épuisées) : NULL
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import func, inspect, text
+from src.models import get_engine, Notification, NotificationStatus
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def add_next_attempt_column(engine) -> bool:
+    """
+    Ajouter la colonne, remplir les échéances et créer l'index
+    
+    Returns:
+        True si la colonne a été ajoutée, False si elle existait déjà
+    """
+    inspector = inspect(engine)
+    columns = [col['name'] for col in inspector.get_columns('notifications')]
+    table = Notification.__table__
+    
+    added = 'next_attempt_at' not in columns
+    if added:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE notifications ADD COLUMN next_attempt_at DATETIME"))
+            connection.execute(
+                table.update().where(table.c.status == NotificationStatus.PENDING)
+                .values(next_attempt_at=func.coalesce(table.c.scheduled_at, table.c.created_at))
+            )
+            connection.execute(
+                table.update().where(
+                    table.c.status == NotificationStatus.FAILED,
+                    table.c.retry_count < table.c.max_retries
+                ).values(next_attempt_at=datetime.now())
+            )
+    
+    existing = {idx['name'] for idx in inspector.get_indexes('notifications')}
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(engine)
+    return added
+
+
+def run_migration():
+    """Exécuter la migration"""
+    try:
+        engine = get_engine()
+        
+        print("🔄 Ajout de la colonne 'next_attempt_at' à la table 'notifications'...")
+        if add_next_attempt_column(engine):
+            print("✅ Colonne 'next_attempt_at' ajoutée et échéances initialisées!")
+        else:
+            print("✓ La colonne 'next_attempt_at' existe déjà dans la table 'notifications'")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Erreur lors de la migration : {e}", exc_info=True)
+        print(f"\n❌ Erreur lors de la migration : {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_migration()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark des sauvegardes : archive ZIP complète vs sauvegarde incrémentale
+
+Remplit une base temporaire de N paiements, puis mesure pour chaque mode
+la durée et les octets écrits dans le répertoire de sauvegarde :
+    - première sauvegarde
+    - sauvegarde suivante après quelques modifications (cas des sauvegardes
+      automatiques fréquentes)
+La dernière sauvegarde incrémentale est ensuite vérifiée et restaurée.
+
+Usage:
+    python scripts/benchmark_backup.py [paiements] [modifications]   (défaut: 200000 50)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Permettre l'import de src depuis la racine du projet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+CHANGES = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+
+def directory_size(path: str) -> int:
+    return sum(f.stat().st_size for f in Path(path).rglob('*') if f.is_file())
+
+
+def populate(engine, rows: int):
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO students (full_name, cin, date_of_birth, phone, registration_date, status, "
+            "license_type, theoretical_exam_passed, practical_exam_passed, theoretical_exam_attempts, "
+            "practical_exam_attempts, total_paid, total_due, balance, hours_completed, hours_planned, "
+            "created_at, updated_at) "
+            "VALUES ('Élève', 'STU00001', '2000-01-01', '0600000000', '2024-01-01', 'ACTIVE', 'B', 0, 0, 0, 0, "
+            "0, 0, 0, 0, 20, '2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO payments (student_id, amount, payment_method, payment_date, receipt_number, "
+            "is_validated, is_cancelled, description, created_at, updated_at) "
+            "VALUES (1, ?, 'CASH', '2025-03-01', ?, 1, 0, ?, '2025-03-01 00:00:00', '2025-03-01 00:00:00')",
+            [(random.randrange(100, 300000) / 100, f"REC-{i}", f"Paiement {i}") for i in range(rows)]
+        )
+
+
+def modify(engine, changes: int):
+    with engine.begin() as connection:
+        for _ in range(changes):
+            connection.exec_driver_sql(
+                "UPDATE payments SET notes = 'modifié' WHERE id = ?", (random.randrange(1, ROWS + 1),)
+            )
+
+
+def measure(manager, backup_dir: str, **options):
+    before = directory_size(backup_dir)
+    start = time.perf_counter()
+    success, path = manager.create_backup(**options)
+    elapsed = time.perf_counter() - start
+    if not success:
+        raise RuntimeError(path)
+    return path, elapsed, directory_size(backup_dir) - before
+
+
+if __name__ == "__main__":
+    from src.models import init_db, get_engine
+    from src.models.base import close_db
+    from src.utils.backup import BackupManager
+    
+    print("=" * 80)
+    print("⏱️  BENCHMARK SAUVEGARDES : ZIP COMPLET VS INCRÉMENTAL (BLOCS DE PAGES)")
+    print("=" * 80)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        init_db(db_path)
+        engine = get_engine()
+        populate(engine, ROWS)
+        print(f"\n   Base : {ROWS} paiements, {os.path.getsize(db_path) / 1e6:.1f} Mo")
+        
+        zip_manager = BackupManager(db_path, os.path.join(tmp, "zip"))
+        page_manager = BackupManager(db_path, os.path.join(tmp, "pages"))
+        
+        print(f"   {'Sauvegarde':<36}{'ZIP complet':>20}{'Incrémental':>20}")
+        for label in ("Première", f"Après {CHANGES} modifications"):
+            if label != "Première":
+                modify(engine, CHANGES)
+            _zip_path, zip_time, zip_bytes = measure(zip_manager, zip_manager.backup_dir)
+            page_path, page_time, page_bytes = measure(page_manager, page_manager.backup_dir, incremental=True)
+            print(f"   {label:<36}{zip_time:>8.2f}s {zip_bytes / 1e6:>8.2f} Mo"
+                  f"{page_time:>8.2f}s {page_bytes / 1e6:>8.2f} Mo")
+        
+        start = time.perf_counter()
+        success, message = page_manager.verify_backup(page_path)
+        print(f"\n   Vérification : {message} ({time.perf_counter() - start:.2f}s)")
+        start = time.perf_counter()
+        success, message = page_manager.restore_backup(page_path, create_backup_before=False)
+        print(f"   Restauration : {message} ({time.perf_counter() - start:.2f}s)")
+        close_db()
+    
+    print("=" * 80)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark du fil de notifications in-app et du badge « non lues »
+
+Remplit une base temporaire de N notifications in-app réparties entre
+USERS utilisateurs, puis compare :
+    - badge : len(get_in_app_notifications_for_user()) (chargement de
+      toutes les non lues) vs get_unread_count() (compteur maintenu par
+      triggers)
+    - pages profondes : OFFSET vs curseur (created_at, id)
+    - « tout marquer comme lu » : une notification à la fois vs un UPDATE
+Les compteurs sont ensuite comparés à un recalcul complet.
+
+Usage:
+    python scripts/benchmark_notification_feed.py [notifications]   (défaut: 500000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Permettre l'import de src depuis la racine du projet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+USERS = 20
+PAGE = 20
+REPEAT = 20
+
+
+def populate(engine, rows: int):
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO notifications (notification_type, category, priority, message, status, "
+            "recipient_type, recipient_id, retry_count, max_retries, created_at, updated_at) "
+            "VALUES ('IN_APP', 'GENERAL', 'NORMAL', ?, ?, 'user', ?, 0, 3, ?, ?)",
+            [
+                (f"Notification {i}", 'READ' if i % 3 else 'SENT', i % USERS + 1,
+                 (start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S.%f'), '2024-01-01 00:00:00.000000')
+                for i in range(rows)
+            ]
+        )
+
+
+def timed(function, repeat: int = REPEAT):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return result, (time.perf_counter() - start) / repeat
+
+
+if __name__ == "__main__":
+    from sqlalchemy import select
+    from src.models import (
+        init_db, get_engine, get_session, Notification, NotificationStatus, NotificationType,
+        notification_unread_counts, rebuild_unread_counters
+    )
+    from src.models.base import close_db
+    from src.controllers.notification_controller import NotificationController
+    
+    print("=" * 80)
+    print("⏱️  BENCHMARK FIL DE NOTIFICATIONS : LISTES COMPLÈTES VS COMPTEUR ET CURSEUR")
+    print("=" * 80)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        init_db(os.path.join(tmp, "bench.db"))
+        populate(get_engine(), ROWS)
+        print(f"\n   {ROWS} notifications in-app, {USERS} utilisateurs (1 sur 3 non lue)")
+        
+        # Badge
+        legacy_count, legacy_time = timed(
+            lambda: len(NotificationController.get_in_app_notifications_for_user('user', 1)), 3
+        )
+        count, count_time = timed(lambda: NotificationController.get_unread_count('user', 1))
+        print(f"   Badge : liste complète {legacy_time * 1000:.1f} ms, compteur {count_time * 1000:.3f} ms "
+              f"({legacy_count} = {count} : {'identiques' if legacy_count == count else '❌ DIFFÉRENTS'})")
+        
+        # Page profonde
+        depth = ROWS // USERS - PAGE
+        session = get_session()
+        offset_query = select(Notification).where(
+            Notification.recipient_id == 1, Notification.recipient_type == 'user',
+            Notification.notification_type == NotificationType.IN_APP
+        ).order_by(Notification.created_at.desc(), Notification.id.desc())
+        offset_rows, offset_time = timed(
+            lambda: session.execute(offset_query.offset(depth).limit(PAGE)).scalars().all()
+        )
+        # Curseur de la page : dernière ligne de la page précédente
+        previous = session.execute(offset_query.offset(depth - 1).limit(1)).scalar_one()
+        cursor = (previous.created_at, previous.id)
+        session.close()
+        page, cursor_time = timed(lambda: NotificationController.get_in_app_feed('user', 1, cursor, PAGE))
+        same = [n.id for n in page.items] == [n.id for n in offset_rows]
+        print(f"   Page {depth // PAGE + 1} : OFFSET {offset_time * 1000:.2f} ms, curseur {cursor_time * 1000:.3f} ms "
+              f"({'identiques' if same else '❌ DIFFÉRENTES'})")
+        
+        # Tout marquer comme lu
+        session = get_session()
+        ids = session.execute(
+            select(Notification.id).where(
+                Notification.recipient_id == 2, Notification.status != NotificationStatus.READ
+            )
+        ).scalars().all()
+        session.close()
+        start = time.perf_counter()
+        for notification_id in ids[:len(ids) // 2]:
+            NotificationController.mark_notification_as_read(notification_id)
+        one_by_one = time.perf_counter() - start
+        start = time.perf_counter()
+        marked = NotificationController.mark_all_as_read('user', 2)
+        bulk = time.perf_counter() - start
+        print(f"   Tout marquer comme lu : une par une {one_by_one / max(len(ids) // 2, 1) * len(ids):.2f}s "
+              f"(estimé pour {len(ids)}), UPDATE unique {bulk:.3f}s ({marked} restantes)")
+        
+        # Cohérence des compteurs
+        session = get_session()
+        # Un compteur revenu à zéro reste en table, le recalcul ne le crée pas
+        maintained = session.execute(
+            select(notification_unread_counts).where(notification_unread_counts.c.unread != 0)
+        ).all()
+        session.close()
+        rebuild_unread_counters(get_engine())
+        session = get_session()
+        rebuilt = session.execute(select(notification_unread_counts)).all()
+        session.close()
+        print(f"   Compteurs maintenus = recalcul : {'oui' if sorted(maintained) == sorted(rebuilt) else '❌ NON'}")
+        close_db()
+    
+    print("=" * 80)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la rétention des notifications (archivage par lots)
+
+Remplit une base temporaire de N notifications étalées sur deux ans
+(en majorité déjà traitées, une petite file en attente), puis mesure avant
+et après NotificationController.apply_retention() :
+    - search_notifications() (recherche texte, parcours de la table)
+    - get_notification_statistics()
+    - get_pending_notifications()
+Les statistiques avec include_archived=True sont comparées à celles
+d'avant l'archivage.
+
+Usage:
+    python scripts/benchmark_notification_retention.py [notifications]   (défaut: 300000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Permettre l'import de src depuis la racine du projet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+REPEAT = 3
+CATEGORIES = ['SESSION_REMINDER', 'EXAM_CONVOCATION', 'PAYMENT_RECEIPT', 'PAYMENT_REMINDER', 'GENERAL']
+
+
+def populate(engine, rows: int):
+    now = datetime.now()
+    data = []
+    for i in range(rows):
+        created = now - timedelta(minutes=i * 730 * 24 * 60 // rows)
+        if i % 100 == 0:
+            status, next_attempt, notif_type = 'PENDING', created, 'EMAIL'
+        elif i % 3 == 0:
+            status, next_attempt, notif_type = 'READ', None, 'IN_APP'
+        else:
+            status, next_attempt, notif_type = 'DELIVERED', None, 'EMAIL'
+        stamp = created.strftime('%Y-%m-%d %H:%M:%S.%f')
+        data.append((notif_type, CATEGORIES[i % len(CATEGORIES)], f"Rappel élève {i}", status, stamp, stamp,
+                     next_attempt.strftime('%Y-%m-%d %H:%M:%S.%f') if next_attempt else None))
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO notifications (notification_type, category, priority, message, status, "
+            "retry_count, max_retries, created_at, updated_at, next_attempt_at) "
+            "VALUES (?, ?, 'NORMAL', ?, ?, 0, 3, ?, ?, ?)",
+            data
+        )
+
+
+def measure(controller) -> dict:
+    timings = {}
+    for label, function in (
+        ("Recherche texte", lambda: controller.search_notifications("élève 12")),
+        ("Statistiques", controller.get_notification_statistics),
+        ("File d'attente", controller.get_pending_notifications),
+    ):
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            function()
+        timings[label] = (time.perf_counter() - start) / REPEAT
+    return timings
+
+
+if __name__ == "__main__":
+    from src.models import init_db, get_engine
+    from src.models.base import close_db
+    from src.controllers.notification_controller import NotificationController
+    
+    print("=" * 80)
+    print("⏱️  BENCHMARK RÉTENTION DES NOTIFICATIONS : TABLE COMPLÈTE VS ARCHIVÉE")
+    print("=" * 80)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        init_db(os.path.join(tmp, "bench.db"))
+        populate(get_engine(), ROWS)
+        controller = NotificationController()
+        print(f"\n   {ROWS} notifications sur deux ans (1 % en attente)")
+        
+        before_stats = controller.get_notification_statistics()
+        before = measure(controller)
+        
+        start = time.perf_counter()
+        archived = controller.apply_retention()
+        elapsed = time.perf_counter() - start
+        print(f"   Archivage : {sum(archived.values())} notifications en {elapsed:.1f}s {archived}")
+        
+        after = measure(controller)
+        print(f"\n   {'Requête':<20}{'Avant':>12}{'Après':>12}{'Gain':>8}")
+        for label in before:
+            print(f"   {label:<20}{before[label] * 1000:>10.1f}ms{after[label] * 1000:>10.1f}ms"
+                  f"{before[label] / after[label]:>7.1f}x")
+        
+        merged = controller.get_notification_statistics(include_archived=True)
+        archived_total = merged.pop('archived')
+        print(f"\n   Statistiques avec archive = avant archivage : {'oui' if merged == before_stats else '❌ NON'} "
+              f"({archived_total} archivées, {controller.get_notification_statistics()['total']} en table)")
+        close_db()
+    
+    print("=" * 80)
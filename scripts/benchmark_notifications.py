@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'envoi des notifications email : un message par connexion vs lot
+
+Démarre un serveur SMTP local (aiosmtpd) qui simule la latence d'un vrai
+serveur : coût d'ouverture de session (EHLO, à la place de TLS + login) et
+coût par message. Une base temporaire reçoit N rappels email en attente,
+puis sont comparés :
+    - l'envoi historique : send_notification() par id (une connexion SMTP
+      ouverte / authentifiée / fermée et un commit par message), mesuré sur
+      un échantillon et extrapolé
+    - process_pending_notifications() avec NotificationDispatcher
+      (connexions réutilisées, pool de threads, statuts enregistrés par lots)
+Le nombre de messages reçus par le serveur est vérifié.
+
+Prérequis : pip install aiosmtpd
+
+Usage:
+    python scripts/benchmark_notifications.py [rappels] [échantillon]   (défaut: 2000 100)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Permettre l'import de src depuis la racine du projet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+REMINDERS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+SAMPLE = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+SESSION_LATENCY = 0.05  # Ouverture de session (TLS + authentification d'un vrai serveur)
+MESSAGE_LATENCY = 0.01  # Traitement d'un message
+PORT = 8025
+
+
+class SlowHandler:
+    """Serveur SMTP de test : compte les messages, simule la latence"""
+    
+    def __init__(self):
+        self.received = 0
+        self.lock = threading.Lock()
+    
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(SESSION_LATENCY)
+        session.host_name = hostname
+        return responses
+    
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(MESSAGE_LATENCY)
+        with self.lock:
+            self.received += 1
+        return '250 Message accepted for delivery'
+
+
+def write_config(directory: str) -> str:
+    path = os.path.join(directory, "config.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"notifications": {
+            "email": {
+                "enabled": True, "smtp_host": "127.0.0.1", "smtp_port": PORT,
+                "smtp_user": "", "use_tls": False, "from_email": "ecole@example.com"
+            },
+            "dispatch": {"email_workers": 8, "email_per_second": 0}
+        }}, f)
+    return path
+
+
+def create_reminders(count: int):
+    from src.models import Notification, NotificationCategory, NotificationType, get_session
+    
+    session = get_session()
+    session.add_all([
+        Notification(
+            notification_type=NotificationType.EMAIL,
+            category=NotificationCategory.SESSION_REMINDER,
+            recipient_email=f"eleve{i}@example.com",
+            recipient_name=f"Élève {i}",
+            subject="Rappel de Session de Conduite",
+            message=f"Rappel : Vous avez une session de conduite demain (rappel {i})."
+        )
+        for i in range(count)
+    ])
+    session.commit()
+    session.close()
+
+
+if __name__ == "__main__":
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        print("❌ aiosmtpd n'est pas installé (pip install aiosmtpd)")
+        sys.exit(1)
+    
+    from src.models import init_db, Notification, NotificationStatus, get_session
+    from src.models.base import close_db
+    from src.controllers.notification_controller import NotificationController
+    from src.utils.notifications import NotificationManager
+    
+    print("=" * 80)
+    print("⏱️  BENCHMARK NOTIFICATIONS : UNE CONNEXION PAR MESSAGE VS ENVOI GROUPÉ")
+    print("=" * 80)
+    
+    handler = SlowHandler()
+    smtp_server = Controller(handler, hostname="127.0.0.1", port=PORT)
+    smtp_server.start()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        init_db(os.path.join(tmp, "bench.db"))
+        controller = NotificationController()
+        controller.notification_manager = NotificationManager(write_config(tmp))
+        
+        # Envoi historique, sur un échantillon
+        create_reminders(SAMPLE)
+        session = get_session()
+        ids = [row[0] for row in session.query(Notification.id).all()]
+        session.close()
+        start = time.perf_counter()
+        for notification_id in ids:
+            controller.send_notification(notification_id)
+        legacy_time = time.perf_counter() - start
+        legacy_estimate = legacy_time / SAMPLE * REMINDERS
+        print(f"\n   Un message par connexion : {SAMPLE} envoyés en {legacy_time:.2f}s "
+              f"→ {legacy_estimate:.1f}s estimées pour {REMINDERS}")
+        
+        # Envoi groupé
+        create_reminders(REMINDERS)
+        received_before = handler.received
+        start = time.perf_counter()
+        results = controller.process_pending_notifications()
+        batch_time = time.perf_counter() - start
+        
+        session = get_session()
+        delivered = session.query(Notification).filter(
+            Notification.status == NotificationStatus.DELIVERED
+        ).count() - SAMPLE
+        session.close()
+        print(f"   Envoi groupé             : {results['success']}/{results['total']} envoyés en {batch_time:.2f}s "
+              f"({legacy_estimate / batch_time:.0f}x)")
+        print(f"   Reçus par le serveur : {handler.received - received_before}, "
+              f"statut délivré en base : {delivered}")
+        close_db()
+    
+    smtp_server.stop()
+    print(f"\n   Latence simulée : {SESSION_LATENCY * 1000:.0f} ms par session, "
+          f"{MESSAGE_LATENCY * 1000:.0f} ms par message")
+    print("=" * 80)
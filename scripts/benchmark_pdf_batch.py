@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la génération de convocations par lots
+
+Remplit une base temporaire de N examens (un élève par examen), puis
+compare generate_documents('summons') :
+    - rendu séquentiel (un processus, comme les appels unitaires)
+    - rendu sur le pool de processus (un processus par cœur)
+    - pool + fusion en un seul PDF à imprimer
+Le dossier personnel est redirigé vers un dossier temporaire : les PDF
+ne sont pas écrits sur le Bureau.
+
+Usage:
+    python scripts/benchmark_pdf_batch.py [examens]   (défaut: 300)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Permettre l'import de src depuis la racine du projet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+EXAMS = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+
+
+def populate(session, count: int):
+    from src.models import Exam, ExamType, Student
+    
+    students = [
+        Student(f"Élève {i}", f"BK{i:06d}", date(2000, 1, 1) + timedelta(days=i), f"06{i:08d}",
+                address=f"{i} rue de la Gare")
+        for i in range(count)
+    ]
+    session.add_all(students)
+    session.flush()
+    exam_day = date.today() + timedelta(days=7)
+    session.add_all([
+        Exam(student.id, ExamType.THEORETICAL if i % 2 else ExamType.PRACTICAL, exam_day,
+             scheduled_time=f"{8 + i % 8:02d}:00", location="Centre d'examen")
+        for i, student in enumerate(students)
+    ])
+    session.commit()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        # Dossiers d'export (Bureau) dans le dossier temporaire, processus de rendu compris
+        os.environ['HOME'] = os.environ['USERPROFILE'] = tmp
+        
+        from sqlalchemy import func, select
+        from src.models import init_db, get_session, Exam
+        from src.models.base import close_db
+        from src.controllers.document_batch import generate_documents
+        
+        print("=" * 80)
+        print("⏱️  BENCHMARK CONVOCATIONS PAR LOTS : SÉQUENTIEL VS POOL DE PROCESSUS")
+        print("=" * 80)
+        
+        init_db(os.path.join(tmp, "bench.db"))
+        session = get_session()
+        populate(session, EXAMS)
+        ids = session.execute(select(Exam.id).order_by(Exam.id)).scalars().all()
+        session.close()
+        cores = os.cpu_count() or 1
+        print(f"\n   {EXAMS} examens, {cores} cœur(s)")
+        
+        runs = [
+            ("Séquentiel", dict(max_workers=1)),
+            (f"Pool ({cores} processus)", dict(max_workers=cores)),
+            ("Pool (4 processus)", dict(max_workers=4)),
+            (f"Pool ({cores} processus) + fusion", dict(max_workers=cores, merge=True)),
+        ]
+        generate_documents('summons', ids[:1])  # Imports et générateurs du processus principal
+        timings = {}
+        for label, options in runs:
+            start = time.perf_counter()
+            result = generate_documents('summons', ids, **options)
+            timings[label] = time.perf_counter() - start
+            print(f"   {label:<32}{timings[label]:>8.2f}s  {result.message}")
+            if result.merged_path:
+                from pypdf import PdfReader
+                pages = len(PdfReader(result.merged_path).pages)
+                print(f"   {'':<32}PDF fusionné : {pages} pages, "
+                      f"{os.path.getsize(result.merged_path) / 1024:.0f} Ko")
+        
+        sequential = timings["Séquentiel"]
+        for label in list(timings)[1:]:
+            print(f"   Gain {label} : {sequential / timings[label]:.1f}x")
+        
+        session = get_session()
+        generated = session.execute(select(func.count()).where(Exam.summons_generated.is_(True))).scalar()
+        session.close()
+        print(f"\n   Convocations marquées générées : {generated}/{EXAMS}")
+        close_db()
+    
+    print("=" * 80)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmark du planificateur de notifications
+
+Remplit une base temporaire de N notifications déjà traitées, puis mesure :
+    - le coût d'une interrogation « qu'y a-t-il à envoyer ? » : ancienne
+      requête (statut + scheduled_at, parcours de la table) vs index de
+      next_attempt_at
+    - la précision des réveils : des notifications in-app planifiées dans
+      les secondes qui suivent sont envoyées par NotificationScheduler ;
+      retard = envoi réel - date planifiée
+    - l'ordre de priorité d'un lot dû au même instant (tri par rang et non
+      par nom de priorité)
+    - les nouvelles tentatives : un email vers un serveur SMTP injoignable
+      est réessayé avec un délai exponentiel (base 1 s pour la mesure)
+
+Usage:
+    python scripts/benchmark_scheduler.py [notifications]   (défaut: 200000)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Permettre l'import de src depuis la racine du projet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+SCHEDULED = 20
+QUERIES = 50
+
+
+def populate(engine, rows: int):
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO notifications (notification_type, category, priority, message, status, "
+            "sent_at, delivered_at, retry_count, max_retries, created_at, updated_at) "
+            "VALUES ('EMAIL', 'SESSION_REMINDER', 'NORMAL', ?, 'DELIVERED', "
+            "'2025-01-01 08:00:00', '2025-01-01 08:00:00', 0, 3, '2025-01-01 08:00:00', '2025-01-01 08:00:00')",
+            [(f"Rappel {i}",) for i in range(rows)]
+        )
+
+
+def write_config(directory: str) -> str:
+    path = os.path.join(directory, "config.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"notifications": {
+            # Port fermé : chaque envoi échoue
+            "email": {"enabled": True, "smtp_host": "127.0.0.1", "smtp_port": 9, "use_tls": False, "timeout": 1},
+            "scheduler": {"retry_base_delay": 1, "retry_max_delay": 60, "resync_interval": 30}
+        }}, f)
+    return path
+
+
+def timed_query(statement) -> float:
+    from src.models import get_session
+    
+    session = get_session()
+    start = time.perf_counter()
+    for _ in range(QUERIES):
+        session.execute(statement).all()
+    elapsed = (time.perf_counter() - start) / QUERIES
+    session.close()
+    return elapsed
+
+
+def wait_for(condition, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not condition():
+        time.sleep(0.05)
+
+
+if __name__ == "__main__":
+    from sqlalchemy import or_, select
+    from src.models import (
+        init_db, get_engine, get_session, Notification, NotificationCategory, NotificationPriority,
+        NotificationStatus, NotificationType
+    )
+    from src.models.base import close_db
+    from src.controllers.notification_controller import NotificationController
+    from src.controllers.notification_scheduler import NotificationScheduler
+    from src.utils.notifications import NotificationManager
+    
+    print("=" * 80)
+    print("⏱️  BENCHMARK PLANIFICATEUR DE NOTIFICATIONS")
+    print("=" * 80)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        init_db(os.path.join(tmp, "bench.db"))
+        populate(get_engine(), ROWS)
+        print(f"\n   Base : {ROWS} notifications déjà livrées")
+        
+        # 1. Coût d'une interrogation
+        now = datetime.now()
+        legacy = select(Notification.id).where(
+            Notification.status == NotificationStatus.PENDING,
+            or_(Notification.scheduled_at.is_(None), Notification.scheduled_at <= now)
+        ).order_by(Notification.priority.desc(), Notification.scheduled_at)
+        indexed = select(Notification.id).where(Notification.next_attempt_at <= now).order_by(
+            Notification.priority_order().desc(), Notification.next_attempt_at
+        )
+        legacy_time, indexed_time = timed_query(legacy), timed_query(indexed)
+        print(f"   Interrogation : parcours {legacy_time * 1000:.2f} ms, index {indexed_time * 1000:.3f} ms "
+              f"({legacy_time / indexed_time:.0f}x)")
+        
+        controller = NotificationController()
+        controller.notification_manager = NotificationManager(write_config(tmp))
+        
+        # 2. Ordre de priorité d'un lot dû au même instant (réservation d'un lot)
+        for priority in (NotificationPriority.LOW, NotificationPriority.URGENT,
+                         NotificationPriority.NORMAL, NotificationPriority.HIGH):
+            controller.create_notification({
+                'notification_type': NotificationType.IN_APP,
+                'category': NotificationCategory.GENERAL,
+                'priority': priority,
+                'message': f"Priorité {priority.name}"
+            })
+        session = get_session()
+        claimed = NotificationController._claim(session, [Notification.next_attempt_at <= datetime.now()], 10, 60)
+        session.close()
+        print(f"   Ordre de réservation : {' > '.join(row.priority.name for row in claimed)}")
+        
+        scheduler = NotificationScheduler(controller)
+        scheduler.start()
+        
+        # 3. Précision des réveils
+        start = datetime.now()
+        for i in range(SCHEDULED):
+            controller.create_notification({
+                'notification_type': NotificationType.IN_APP,
+                'category': NotificationCategory.GENERAL,
+                'message': f"Planifiée {i}",
+                'scheduled_at': start + timedelta(seconds=0.5 + i * 0.15)
+            })
+        # Réveil par notify_scheduled : le planificateur de test n'est pas le global
+        for i in range(SCHEDULED):
+            scheduler.notify(start + timedelta(seconds=0.5 + i * 0.15))
+        
+        def scheduled_sent():
+            session = get_session()
+            count = session.query(Notification).filter(
+                Notification.message.like("Planifiée %"), Notification.status == NotificationStatus.SENT
+            ).count()
+            session.close()
+            return count == SCHEDULED
+        
+        wait_for(scheduled_sent, 10)
+        session = get_session()
+        delays = [
+            (n.sent_at - n.scheduled_at).total_seconds() * 1000
+            for n in session.query(Notification).filter(Notification.message.like("Planifiée %"))
+            if n.sent_at
+        ]
+        session.close()
+        print(f"   Réveils : {len(delays)}/{SCHEDULED} envoyées, retard moyen {sum(delays) / max(len(delays), 1):.1f} ms, "
+              f"max {max(delays, default=0):.1f} ms")
+        
+        # 4. Nouvelles tentatives avec délai exponentiel
+        notification = controller.create_notification({
+            'notification_type': NotificationType.EMAIL,
+            'category': NotificationCategory.GENERAL,
+            'recipient_email': "eleve@example.com",
+            'message': "Injoignable"
+        })
+        scheduler.notify()
+        attempts = []
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            session = get_session()
+            row = session.get(Notification, notification.id)
+            if row.retry_count > len(attempts):
+                attempts.append((row.retry_count, row.updated_at, row.next_attempt_at))
+            session.close()
+            if row.next_attempt_at is None:
+                break
+            time.sleep(0.05)
+        for retry_count, updated_at, next_attempt in attempts:
+            wait = f"{(next_attempt - updated_at).total_seconds():.2f}s" if next_attempt else "abandon"
+            print(f"   Échec {retry_count} : prochaine tentative dans {wait}")
+        
+        scheduler.stop(5)
+        close_db()
+    
+    print("=" * 80)
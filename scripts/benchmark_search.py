@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la recherche globale : index FTS5 vs LIKE '%...%'
+
+Remplit une base temporaire (élèves + paiements), puis mesure la latence de
+SearchController.global_search avec l'index plein texte et celle de la
+recherche LIKE de repli.
+
+Usage:
+    python scripts/benchmark_search.py [nombre_eleves]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+# Permettre l'import de src depuis la racine du projet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+QUERIES = ["hél", "dupont", "moha", "BK0001", "0612", "jean mar"]
+
+FIRST_NAMES = ["Hélène", "Jean", "Mohamed", "Fatima", "Youssef", "Zineb", "Marc", "Amina", "Éric", "Salma"]
+LAST_NAMES = ["Dupont", "Benali", "El Amrani", "Martin", "Chraïbi", "Lefèvre", "Idrissi", "Moreau", "Tazi", "Bernard"]
+
+
+def populate(rows: int, seed: int = 1):
+    """Insérer élèves et paiements en masse (triggers FTS actifs)"""
+    from src.models import get_engine
+    
+    rng = random.Random(seed)
+    students = [
+        (
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}",
+            f"{rng.choice(['BK', 'AB', 'EE'])}{i:06d}",
+            date(2000, 1, 1).isoformat(),
+            f"06{rng.randrange(10**8):08d}",
+        )
+        for i in range(rows)
+    ]
+    with get_engine().begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO students (full_name, cin, date_of_birth, phone, registration_date, status, "
+            "license_type, theoretical_exam_passed, practical_exam_passed, theoretical_exam_attempts, "
+            "practical_exam_attempts, total_paid, total_due, balance, hours_completed, hours_planned, "
+            "created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, '2024-01-01', 'ACTIVE', 'B', 0, 0, 0, 0, 0, 0, 0, 0, 20, "
+            "'2024-01-01 00:00:00', '2024-01-01 00:00:00')",
+            students
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO payments (student_id, amount, payment_method, payment_date, receipt_number, "
+            "is_validated, is_cancelled, created_at, updated_at) "
+            "SELECT id, 500, 'CASH', '2024-01-01', 'REC-' || id, 1, 0, "
+            "'2024-01-01 00:00:00', '2024-01-01 00:00:00' FROM students WHERE id % 4 = 0"
+        )
+
+
+def measure(search, query: str, repeat: int = 5) -> float:
+    """Latence médiane en millisecondes"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("⏱️  BENCHMARK RECHERCHE GLOBALE : FTS5 VS LIKE")
+    print("=" * 80)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        from src.models import init_db, get_session, search_documents
+        from src.models.base import close_db
+        from src.controllers import SearchController
+        
+        init_db(os.path.join(tmp, "bench.db"))
+        start = time.perf_counter()
+        populate(ROWS)
+        print(f"\n   {ROWS} élèves insérés (+ paiements) en {time.perf_counter() - start:.1f}s\n")
+        
+        session = get_session()
+        print(f"   {'Requête':<12}{'Résultats':>10}{'Index seul':>14}{'FTS5':>12}{'LIKE':>12}")
+        for query in QUERIES:
+            hits = len(search_documents(session, query))
+            index_ms = measure(lambda q: search_documents(session, q, limit=50), query)
+            fts_ms = measure(SearchController.global_search, query, repeat=3)
+            like_ms = measure(SearchController._like_search, query, repeat=1)
+            print(f"   {query:<12}{hits:>10}{index_ms:>12.1f}ms{fts_ms:>10.1f}ms{like_ms:>10.1f}ms")
+        session.close()
+        close_db()
+    
+    print("\n   Index seul = 50 meilleurs résultats ; FTS5/LIKE = global_search complet")
+    print("=" * 80)
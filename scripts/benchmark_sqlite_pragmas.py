@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark des écritures SQLite : réglages par défaut vs PRAGMA optimisés
+
+Compare, sur des bases temporaires, les chemins d'insertion de l'application :
+- un commit par enregistrement (formulaires élèves / paiements)
+- un lot d'enregistrements en une transaction (imports)
+
+Usage:
+    python scripts/benchmark_sqlite_pragmas.py [nombre_de_lignes]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+# Permettre l'import de src depuis la racine du projet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models import Base, Student, Payment, PaymentMethod
+from src.models.base import get_sqlite_pragmas, _apply_sqlite_pragmas
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+
+def make_session_factory(db_path: str, pragmas: dict):
+    """Créer un engine dédié avec les PRAGMA donnés (vide = défauts SQLite)"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_sqlite_pragmas(dbapi_connection, pragmas)
+    
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine)
+
+
+def insert_one_by_one(Session, rows: int, offset: int = 0):
+    """Un commit par élève + paiement (chemin des formulaires)"""
+    for i in range(offset, offset + rows):
+        session = Session()
+        student = Student(
+            full_name=f"Élève {i}", cin=f"BENCH{i:06d}",
+            date_of_birth=date(2000, 1, 1), phone="0600000000"
+        )
+        session.add(student)
+        session.commit()
+        session.add(Payment(
+            student_id=student.id, amount=100,
+            payment_method=PaymentMethod.CASH, payment_date=date.today()
+        ))
+        session.commit()
+        session.close()
+
+
+def insert_batch(Session, rows: int, offset: int = 0):
+    """Tous les élèves en une transaction (chemin des imports)"""
+    session = Session()
+    session.add_all([
+        Student(
+            full_name=f"Élève {i}", cin=f"BENCH{i:06d}",
+            date_of_birth=date(2000, 1, 1), phone="0600000000"
+        )
+        for i in range(offset, offset + rows)
+    ])
+    session.commit()
+    session.close()
+
+
+def run(label: str, pragmas: dict) -> dict:
+    """Mesurer les deux chemins d'insertion sur une base neuve"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, Session = make_session_factory(os.path.join(tmp, "bench.db"), pragmas)
+        timings = {}
+        
+        start = time.perf_counter()
+        insert_one_by_one(Session, ROWS)
+        timings['unitaire'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        insert_batch(Session, ROWS * 10, offset=ROWS)
+        timings['lot'] = time.perf_counter() - start
+        
+        engine.dispose()
+    
+    print(f"   {label:<12} unitaire: {timings['unitaire']:8.3f}s   lot: {timings['lot']:8.3f}s")
+    return timings
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("⏱️  BENCHMARK SQLITE : PRAGMA PAR DÉFAUT VS OPTIMISÉS")
+    print("=" * 80)
+    print(f"\n   {ROWS} insertions unitaires (élève + paiement), {ROWS * 10} élèves en lot\n")
+    
+    tuned_pragmas = get_sqlite_pragmas()
+    before = run("Défaut", {})
+    after = run("Optimisé", tuned_pragmas)
+    
+    print("\n   Réglages : " + ", ".join(f"{k}={v}" for k, v in tuned_pragmas.items()))
+    for key in ('unitaire', 'lot'):
+        if after[key] > 0:
+            print(f"   Gain {key:<9}: x{before[key] / after[key]:.1f}")
+    print("=" * 80)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Benchmark des statistiques : boucles sur objets ORM vs analyse vectorisée
+
+Remplit une base temporaire de N paiements et N séances terminées, puis
+compare, pour chaque taille, l'ancienne implémentation (listes d'objets ORM,
+clés strftime par ligne, defaultdict) et la couche pandas/NumPy de
+StatisticsController :
+    - séries jour / semaine / mois des revenus avec moyenne mobile
+    - ventilation par véhicule et par moniteur
+Les résultats des deux versions sont comparés.
+
+L'ancienne version charge un objet ORM par ligne : au-delà de
+LEGACY_LIMIT lignes elle n'est pas mesurée (mémoire).
+
+Usage:
+    python scripts/benchmark_statistics.py [taille ...]   (défaut: 10000 100000 1000000)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Permettre l'import de src depuis la racine du projet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SIZES = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+LEGACY_LIMIT = 200000
+INSTRUCTORS = 40
+VEHICLES = 30
+YEAR_START = date(2025, 1, 1)
+YEAR_END = date(2025, 12, 31)
+WINDOW = 7
+
+
+def populate(rows: int, seed: int = 3):
+    """Insérer moniteurs, véhicules, élèves, paiements et séances en masse"""
+    from src.models import Instructor, Vehicle, get_engine, get_session
+    
+    rng = random.Random(seed)
+    students = max(rows // 20, 100)
+    
+    session = get_session()
+    for i in range(INSTRUCTORS):
+        session.add(Instructor(f"Moniteur {i}", f"INS{i:04d}", "0600000000", f"LIC{i:04d}"))
+    for i in range(VEHICLES):
+        session.add(Vehicle(f"B-{i:03d}", "Dacia", "Logan"))
+    session.commit()
+    session.close()
+    
+    with get_engine().begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO students (full_name, cin, date_of_birth, phone, registration_date, status, "
+            "license_type, theoretical_exam_passed, practical_exam_passed, theoretical_exam_attempts, "
+            "practical_exam_attempts, total_paid, total_due, balance, hours_completed, hours_planned, "
+            "created_at, updated_at) "
+            "VALUES (?, ?, '2000-01-01', '0600000000', '2024-01-01', 'ACTIVE', 'B', 0, 0, 0, 0, "
+            "0, 0, 0, 0, 20, '2024-01-01 00:00:00', '2024-01-01 00:00:00')",
+            [(f"Élève {i}", f"STU{i:07d}") for i in range(students)]
+        )
+        methods = ['CASH', 'CARD', 'CHECK', 'TRANSFER', 'MOBILE_MONEY']
+        connection.exec_driver_sql(
+            "INSERT INTO payments (student_id, amount, payment_method, payment_date, receipt_number, "
+            "is_validated, is_cancelled, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, 1, ?, '2025-01-01 00:00:00', '2025-01-01 00:00:00')",
+            [
+                (rng.randrange(1, students + 1), rng.randrange(100, 300000) / 100, rng.choice(methods),
+                 (YEAR_START + timedelta(days=rng.randrange(365))).isoformat(), f"REC-{i}",
+                 int(rng.random() < 0.05))
+                for i in range(rows)
+            ]
+        )
+        sessions = []
+        for _ in range(rows):
+            start = datetime.combine(YEAR_START + timedelta(days=rng.randrange(365)), datetime.min.time())
+            start = start.replace(hour=rng.randrange(8, 19))
+            duration = rng.choice([60, 90, 120])
+            sessions.append((
+                rng.randrange(1, students + 1), rng.randrange(1, INSTRUCTORS + 1), rng.randrange(1, VEHICLES + 1),
+                start.isoformat(' '), (start + timedelta(minutes=duration)).isoformat(' '), duration,
+                rng.randrange(5, 40)
+            ))
+        connection.exec_driver_sql(
+            "INSERT INTO sessions (student_id, instructor_id, vehicle_id, session_type, status, "
+            "start_datetime, end_datetime, duration_minutes, distance_km, fuel_consumed, is_paid, price, "
+            "created_at, updated_at) "
+            "VALUES (?, ?, ?, 'PRACTICAL_DRIVING', 'COMPLETED', ?, ?, ?, ?, 0, 0, 0, "
+            "'2025-01-01 00:00:00', '2025-01-01 00:00:00')",
+            sessions
+        )
+
+
+# ---------- Ancienne implémentation (objets ORM + boucles) ----------
+
+def legacy_time_series(bucket: str):
+    from src.models import Payment, get_session
+    
+    session = get_session()
+    payments = session.query(Payment).filter(
+        Payment.payment_date >= YEAR_START, Payment.payment_date <= YEAR_END,
+        Payment.is_cancelled == False
+    ).all()
+    totals = defaultdict(float)
+    for payment in payments:
+        day = payment.payment_date
+        if bucket == 'day':
+            key = day.strftime('%Y-%m-%d')
+        elif bucket == 'week':
+            key = (day - timedelta(days=day.weekday())).strftime('%Y-%m-%d')
+        else:
+            key = day.strftime('%Y-%m-01')
+        totals[key] += float(payment.amount)
+    keys = sorted(totals)
+    values = [totals[key] for key in keys]
+    averages = []
+    for i in range(len(values)):
+        window = values[max(0, i - WINDOW + 1):i + 1]
+        averages.append(sum(window) / len(window))
+    session.close()
+    return dict(zip(keys, values)), averages
+
+
+def legacy_by_vehicle():
+    from src.models import Session, SessionStatus, get_session
+    
+    session = get_session()
+    sessions = session.query(Session).filter(
+        Session.start_datetime >= datetime.combine(YEAR_START, datetime.min.time()),
+        Session.start_datetime <= datetime.combine(YEAR_END, datetime.max.time()),
+        Session.status == SessionStatus.COMPLETED,
+        Session.vehicle_id.isnot(None)
+    ).all()
+    by_vehicle = {}
+    for session_obj in sessions:
+        stats = by_vehicle.setdefault(session_obj.vehicle_id, {
+            'vehicle_plate': session_obj.vehicle.plate_number if session_obj.vehicle else 'N/A',
+            'total_sessions': 0, 'total_hours': 0.0, 'total_km': 0.0
+        })
+        stats['total_sessions'] += 1
+        stats['total_hours'] += session_obj.duration_hours or 0
+        stats['total_km'] += session_obj.distance_km or 0
+    session.close()
+    return by_vehicle
+
+
+def legacy_by_instructor():
+    from src.models import Session, SessionStatus, get_session
+    
+    session = get_session()
+    sessions = session.query(Session).filter(
+        Session.start_datetime >= datetime.combine(YEAR_START, datetime.min.time()),
+        Session.start_datetime <= datetime.combine(YEAR_END, datetime.max.time()),
+        Session.status == SessionStatus.COMPLETED,
+        Session.instructor_id.isnot(None)
+    ).all()
+    by_instructor = {}
+    for session_obj in sessions:
+        stats = by_instructor.setdefault(session_obj.instructor_id, {
+            'instructor_name': session_obj.instructor.full_name if session_obj.instructor else 'N/A',
+            'total_sessions': 0, 'total_hours': 0.0, 'unique_students': set()
+        })
+        stats['total_sessions'] += 1
+        stats['total_hours'] += session_obj.duration_hours or 0
+        stats['unique_students'].add(session_obj.student_id)
+    for stats in by_instructor.values():
+        stats['unique_students'] = len(stats['unique_students'])
+    session.close()
+    return by_instructor
+
+
+# ---------- Mesures ----------
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def same_breakdown(legacy: dict, vectorized: dict) -> bool:
+    if set(legacy) != set(vectorized):
+        return False
+    for key, stats in legacy.items():
+        for name, value in stats.items():
+            other = vectorized[key][name]
+            if isinstance(value, float) and abs(value - other) > 1e-6 * max(1.0, abs(value)):
+                return False
+            if not isinstance(value, float) and value != other:
+                return False
+    return True
+
+
+def same_series(legacy, vectorized: dict) -> bool:
+    totals, _averages = legacy
+    series = dict(zip(vectorized['buckets'], vectorized['revenue']))
+    return all(abs(series.get(key, 0.0) - round(value, 2)) < 0.011 for key, value in totals.items())
+
+
+def run(rows: int):
+    from src.models import init_db
+    from src.models.base import close_db
+    from src.controllers import StatisticsController
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        init_db(os.path.join(tmp, "bench.db"))
+        start = time.perf_counter()
+        populate(rows)
+        print(f"\n   {rows} paiements + {rows} séances insérés en {time.perf_counter() - start:.1f}s")
+        print(f"   {'Calcul':<24}{'Boucles ORM':>14}{'Vectorisé':>12}{'Gain':>8}  Résultats")
+        
+        cases = [
+            (f"Série {bucket}", lambda b=bucket: legacy_time_series(b),
+             lambda b=bucket: StatisticsController.get_time_series(YEAR_START, YEAR_END, b, WINDOW),
+             same_series)
+            for bucket in ('day', 'week', 'month')
+        ]
+        cases.append((
+            "Par véhicule", legacy_by_vehicle,
+            lambda: StatisticsController.get_vehicle_utilization_statistics(YEAR_START, YEAR_END)['by_vehicle'],
+            same_breakdown
+        ))
+        cases.append((
+            "Par moniteur", legacy_by_instructor,
+            lambda: StatisticsController.get_instructor_performance_statistics(YEAR_START, YEAR_END)['by_instructor'],
+            same_breakdown
+        ))
+        
+        for label, legacy, vectorized, compare in cases:
+            new_result, new_time = timed(vectorized)
+            if rows > LEGACY_LIMIT:
+                print(f"   {label:<24}{'—':>14}{new_time * 1000:>10.0f}ms{'':>8}  (ancienne version non mesurée)")
+                continue
+            old_result, old_time = timed(legacy)
+            status = "identiques" if compare(old_result, new_result) else "❌ DIFFÉRENTS"
+            print(f"   {label:<24}{old_time * 1000:>12.0f}ms{new_time * 1000:>10.0f}ms"
+                  f"{old_time / new_time:>7.1f}x  {status}")
+        close_db()
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("⏱️  BENCHMARK STATISTIQUES : BOUCLES ORM VS PANDAS/NUMPY")
+    print("=" * 80)
+    
+    for size in SIZES:
+        run(size)
+    
+    print("\n   Séries : revenus des paiements non annulés, moyenne mobile sur 7 regroupements")
+    print("=" * 80)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la planification automatique (TimetablePlanner)
+
+Génère une base temporaire (élèves, moniteurs, véhicules et sessions déjà
+planifiées), calcule l'emploi du temps d'une semaine puis vérifie qu'il
+est sans conflit et respecte les contraintes.
+
+Usage:
+    python scripts/benchmark_timetable.py [nb_eleves] [nb_moniteurs]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Permettre l'import de src depuis la racine du projet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+STUDENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 220
+INSTRUCTORS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+VEHICLES_PER_LICENSE = {'B': 14, 'A': 3, 'C': 2}
+
+
+def populate(seed: int = 42):
+    """Remplir la base temporaire avec un jeu de données réaliste"""
+    from src.models import Student, Instructor, Vehicle, get_session
+    
+    rng = random.Random(seed)
+    session = get_session()
+    
+    for i in range(INSTRUCTORS):
+        license_types = rng.choice(['B', 'B', 'B', 'A,B', 'B,C'])
+        session.add(Instructor(
+            f"Moniteur {i}", f"INS{i:04d}", "0600000000", f"LIC{i:04d}",
+            license_types=license_types, max_students_per_day=rng.choice([6, 8, 8, 10])
+        ))
+    for license_type, count in VEHICLES_PER_LICENSE.items():
+        for i in range(count):
+            session.add(Vehicle(f"{license_type}-{i:03d}", "Dacia", "Logan", license_type=license_type))
+    for i in range(STUDENTS):
+        session.add(Student(
+            f"Élève {i}", f"STU{i:05d}", date(2000, 1, 1), "0600000000",
+            license_type=rng.choices(['B', 'A', 'C'], weights=[85, 10, 5])[0],
+            hours_planned=20, hours_completed=rng.randint(0, 18)
+        ))
+    session.commit()
+    session.close()
+
+
+def add_existing_sessions(week_start: date, count: int = 60, seed: int = 7):
+    """Quelques sessions déjà planifiées à respecter"""
+    from src.models import Student, Instructor, SessionType, get_session
+    from src.controllers import SessionController
+    
+    rng = random.Random(seed)
+    session = get_session()
+    student_ids = [s.id for s in session.query(Student.id)]
+    instructor_ids = [i.id for i in session.query(Instructor.id)]
+    session.close()
+    
+    for _ in range(count):
+        start = datetime.combine(week_start + timedelta(days=rng.randrange(6)), datetime.min.time())
+        start = start.replace(hour=rng.randrange(8, 19))
+        SessionController.create_session({
+            'student_id': rng.choice(student_ids),
+            'instructor_id': rng.choice(instructor_ids),
+            'session_type': SessionType.PRACTICAL_DRIVING,
+            'start_datetime': start,
+            'end_datetime': start + timedelta(hours=1),
+        })
+
+
+def check(result, planner) -> list:
+    """Vérifier l'absence de conflits et le respect des contraintes"""
+    from src.controllers import SessionController
+    from src.models import Student, Instructor, Vehicle, get_session
+    
+    errors = []
+    checks = SessionController.validate_sessions(result.proposals)
+    invalid = [c for c in checks if not c['valid']]
+    if invalid:
+        errors.append(f"{len(invalid)} sessions en conflit")
+    
+    session = get_session()
+    students = {s.id: s for s in session.query(Student)}
+    instructors = {i.id: i for i in session.query(Instructor)}
+    vehicles = {v.id: v for v in session.query(Vehicle)}
+    per_student_day = {}
+    for proposal in result.proposals:
+        student = students[proposal['student_id']]
+        instructor = instructors[proposal['instructor_id']]
+        vehicle = vehicles[proposal['vehicle_id']]
+        if student.license_type not in instructor.license_types.split(','):
+            errors.append(f"Moniteur non habilité pour l'élève {student.id}")
+        if vehicle.license_type != student.license_type:
+            errors.append(f"Véhicule {vehicle.plate_number} inadapté pour l'élève {student.id}")
+        key = (student.id, proposal['start_datetime'].date())
+        per_student_day[key] = per_student_day.get(key, 0) + 1
+    session.close()
+    
+    if any(hours > planner.max_hours_per_day for hours in per_student_day.values()):
+        errors.append("Dépassement du maximum d'heures par jour")
+    return errors
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("⏱️  BENCHMARK PLANIFICATION AUTOMATIQUE")
+    print("=" * 80)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        from src.models import init_db
+        from src.models.base import close_db
+        from src.controllers import TimetablePlanner
+        
+        init_db(os.path.join(tmp, "bench.db"))
+        populate()
+        
+        week_start = date.today() + timedelta(days=7 - date.today().weekday())
+        add_existing_sessions(week_start)
+        
+        planner = TimetablePlanner(week_start)
+        start = time.perf_counter()
+        result = planner.plan()
+        elapsed = time.perf_counter() - start
+        
+        requested = result.planned_hours + sum(result.unplaced_hours.values())
+        print(f"\n   {STUDENTS} élèves, {INSTRUCTORS} moniteurs, semaine du {result.week_start}")
+        print(f"   Heures demandées : {requested}")
+        print(f"   Heures planifiées: {result.planned_hours}")
+        print(f"   Non placées      : {sum(result.unplaced_hours.values())} ({len(result.unplaced_hours)} élèves)")
+        print(f"   Temps de calcul  : {elapsed:.2f}s")
+        
+        errors = check(result, planner)
+        print(f"\n   {'✅ Emploi du temps valide' if not errors else '❌ ' + '; '.join(sorted(set(errors)))}")
+        close_db()
+    
+    print("=" * 80)
+    sys.exit(0 if not errors else 1)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Reconstruction des agrégats journaliers (table daily_rollups)
+
+Les triggers tiennent la table à jour à chaque écriture ; la reconstruction
+sert après une restauration, une modification manuelle de la base ou pour
+vérifier les totaux. Sans argument, tous les jours sont recalculés.
+
+Usage:
+    python scripts/rebuild_daily_rollups.py [date_debut] [date_fin]
+    (dates au format AAAA-MM-JJ, bornes incluses)
+"""
+
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# Permettre l'import de src depuis la racine du projet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        print(f"❌ Date invalide : {value} (format attendu AAAA-MM-JJ)")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    start_date = parse_date(sys.argv[1]) if len(sys.argv) > 1 else None
+    end_date = parse_date(sys.argv[2]) if len(sys.argv) > 2 else None
+    
+    from sqlalchemy import func, select
+    from src.models import init_db, get_engine, daily_rollups, rebuild_daily_rollups
+    from src.models.base import close_db
+    
+    init_db()
+    engine = get_engine()
+    
+    period = f"du {start_date or 'début'} au {end_date or 'dernier jour'}"
+    print(f"🔄 Reconstruction des agrégats journaliers {period}...")
+    started = time.perf_counter()
+    rebuild_daily_rollups(engine, start_date, end_date)
+    
+    with engine.connect() as connection:
+        days = connection.execute(select(func.count()).select_from(daily_rollups)).scalar()
+    print(f"✅ {days} jours agrégés ({time.perf_counter() - started:.2f}s)")
+    close_db()
@@ -9,10 +9,18 @@ from .session_controller import SessionController
 from .payment_controller import PaymentController
 from .exam_controller import ExamController
 from .maintenance_controller import MaintenanceController
-from .notification_controller import NotificationController
+from .notification_controller import NotificationController, FeedPage, STAFF_RECIPIENT_TYPE
+from .notification_scheduler import (
+    NotificationScheduler, start_notification_scheduler, stop_notification_scheduler
+)
 from .statistics_controller import StatisticsController
 from .document_controller import DocumentController
-from .search_controller import SearchController
+from .search_controller import SearchController, SearchHit, SearchResults
+from .dashboard_controller import DashboardController, DashboardSnapshot
+from .schedule_index import ScheduleIndex, get_schedule_index
+from .timetable_planner import TimetablePlanner, TimetableResult
+from .student_import import ImportResult, import_students
+from .document_batch import generate_documents
 
 __all__ = [
     'StudentController',
@@ -23,7 +31,23 @@ __all__ = [
     'ExamController',
     'MaintenanceController',
     'NotificationController',
+    'FeedPage',
+    'STAFF_RECIPIENT_TYPE',
+    'NotificationScheduler',
+    'start_notification_scheduler',
+    'stop_notification_scheduler',
     'StatisticsController',
     'DocumentController',
     'SearchController',
+    'SearchHit',
+    'SearchResults',
+    'DashboardController',
+    'DashboardSnapshot',
+    'ScheduleIndex',
+    'get_schedule_index',
+    'TimetablePlanner',
+    'TimetableResult',
+    'ImportResult',
+    'import_students',
+    'generate_documents',
 ]
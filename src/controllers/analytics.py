@@ -0,0 +1,141 @@
+"""
+Couche d'analyse vectorisée (pandas / NumPy) des statistiques
+
+Les colonnes utiles sont lues une seule fois par une requête select(...)
+dans un DataFrame (tableaux par colonne), puis regroupées par jour, semaine
+ou mois, lissées (moyenne mobile), comparées d'une période à l'autre et
+ventilées par moniteur ou véhicule par des opérations vectorisées, sans
+boucle Python sur des objets ORM.
+
+Les dates sont sélectionnées sous forme de texte ISO (date(...) SQLite) et
+converties en bloc par pandas plutôt que ligne par ligne par SQLAlchemy.
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Regroupement -> fréquence pandas (semaines commençant le lundi)
+BUCKETS = {
+    'day': 'D',
+    'week': 'W-MON',
+    'month': 'MS',
+}
+DEFAULT_WINDOW = 7
+
+
+def load_frame(session, statement, date_columns: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    Exécuter une requête et charger le résultat en colonnes
+    
+    Args:
+        session: Session SQLAlchemy
+        statement: Requête select(...) (colonnes étiquetées)
+        date_columns: Colonnes texte 'AAAA-MM-JJ' à convertir en dates
+    
+    Returns:
+        DataFrame (vide, avec les colonnes, si aucune ligne)
+    """
+    # Exécution Core (sans la couche de chargement ORM), tuples bruts
+    result = session.connection().execute(statement)
+    columns = list(result.keys())
+    frame = pd.DataFrame.from_records(result.tuples().all(), columns=columns)
+    for name in date_columns:
+        frame[name] = pd.to_datetime(frame[name], format='%Y-%m-%d')
+    return frame
+
+
+def bucket_start(dates: pd.Series, bucket: str) -> pd.Series:
+    """Début du jour / de la semaine (lundi) / du mois de chaque date"""
+    if bucket not in BUCKETS:
+        raise ValueError(f"Regroupement inconnu : {bucket}")
+    if bucket == 'day':
+        return dates.dt.normalize()
+    if bucket == 'week':
+        return (dates - pd.to_timedelta(dates.dt.weekday, unit='D')).dt.normalize()
+    return dates.dt.to_period('M').dt.start_time
+
+
+def bucket_index(start_date: date, end_date: date, bucket: str) -> pd.DatetimeIndex:
+    """Tous les regroupements d'une période, y compris ceux sans activité"""
+    first = bucket_start(pd.Series([pd.Timestamp(start_date)]), bucket).iloc[0]
+    return pd.date_range(first, pd.Timestamp(end_date), freq=BUCKETS[bucket])
+
+
+def time_series(frame: pd.DataFrame, date_column: str, values: Dict[str, Any],
+                start_date: date, end_date: date, bucket: str = 'day') -> pd.DataFrame:
+    """
+    Agréger un DataFrame par regroupement temporel
+    
+    Args:
+        frame: Lignes sources
+        date_column: Colonne de date (datetime64)
+        values: Nom de sortie -> (colonne, agrégat) ; agrégat 'count', 'sum', 'mean'...
+        start_date: Début de la période (les regroupements vides valent 0)
+        end_date: Fin de la période
+        bucket: 'day', 'week' ou 'month'
+    
+    Returns:
+        DataFrame indexé par début de regroupement, une colonne par valeur
+    """
+    index = bucket_index(start_date, end_date, bucket)
+    if frame.empty:
+        return pd.DataFrame(0.0, index=index, columns=list(values))
+    keys = bucket_start(frame[date_column], bucket)
+    grouped = frame.groupby(keys).agg(**{name: spec for name, spec in values.items()})
+    return grouped.reindex(index, fill_value=0)
+
+
+def moving_average(series: pd.Series, window: int = DEFAULT_WINDOW) -> pd.Series:
+    """Moyenne mobile (fenêtre glissante, partielle en début de série)"""
+    return series.rolling(window, min_periods=1).mean()
+
+
+def period_delta(series: pd.Series) -> pd.DataFrame:
+    """
+    Évolution d'un regroupement au précédent
+    
+    Returns:
+        DataFrame (delta, pourcentage), pourcentage NaN si la valeur précédente est nulle
+    """
+    previous = series.shift(1)
+    percent = (series - previous) / previous.where(previous != 0) * 100
+    return pd.DataFrame({'delta': series - previous, 'percent': percent})
+
+
+def breakdown(frame: pd.DataFrame, key: str, values: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Ventilation par clé (moniteur, véhicule...) : groupby vectorisé
+    
+    Args:
+        frame: Lignes sources
+        key: Colonne de regroupement
+        values: Nom de sortie -> (colonne, agrégat)
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=list(values))
+    return frame.groupby(key, sort=False).agg(**values)
+
+
+def series_to_list(series: pd.Series, digits: int = 2) -> List[Optional[float]]:
+    """Série -> liste de float Python arrondis (None pour NaN)"""
+    values = np.round(series.to_numpy(dtype=float), digits)
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+def index_to_list(index: pd.DatetimeIndex) -> List[str]:
+    """Index de dates -> liste 'AAAA-MM-JJ'"""
+    return list(index.strftime('%Y-%m-%d'))
+
+
+def records(frame: pd.DataFrame) -> Dict[Any, Dict[str, Any]]:
+    """DataFrame indexé -> {clé: {colonne: valeur}} en types Python natifs"""
+    return {
+        key.item() if hasattr(key, 'item') else key: {
+            name: value.item() if hasattr(value, 'item') else value
+            for name, value in row.items()
+        }
+        for key, row in zip(frame.index, frame.to_dict('records'))
+    }
@@ -0,0 +1,298 @@
+"""
+Contrôleur du tableau de bord principal
+
+Calcule en une seule passe, avec quelques requêtes d'agrégation, toutes les
+données affichées par le dashboard (KPI, séries des graphiques, activités
+récentes et alertes) sous la forme d'un instantané immuable.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Tuple, Optional
+
+from sqlalchemy import func, case, and_
+
+from src.models import (
+    Student, StudentStatus,
+    Session, SessionStatus,
+    Payment,
+    Exam,
+    Vehicle, VehicleStatus,
+    session_scope
+)
+from src.utils import get_logger
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Instantané des indicateurs du dashboard, calculé en une passe"""
+    
+    generated_at: datetime
+    
+    # KPI élèves
+    total_students: int = 0
+    active_students: int = 0
+    students_with_debt: int = 0
+    total_debt: float = 0.0
+    students_by_status: Dict[str, int] = field(default_factory=dict)
+    
+    # KPI financiers
+    monthly_revenue: float = 0.0
+    last_month_revenue: float = 0.0
+    revenue_last_7_days: List[float] = field(default_factory=list)  # J-6 ... aujourd'hui
+    revenue_by_method: Dict[str, float] = field(default_factory=dict)
+    
+    # Sessions
+    sessions_today: int = 0
+    planned_sessions_today: int = 0
+    sessions_this_week: List[int] = field(default_factory=list)  # Lundi ... dimanche
+    upcoming_sessions: List[Tuple[datetime, str]] = field(default_factory=list)  # (début, élève)
+    
+    # Examens et véhicules
+    upcoming_exams: int = 0
+    insurance_expiring: List[Tuple[str, int]] = field(default_factory=list)  # (plaque, jours)
+    inspection_expiring: List[Tuple[str, int]] = field(default_factory=list)  # (plaque, jours)
+    vehicles_in_maintenance: int = 0
+    
+    # Activités récentes: (date, type, description), plus récentes en premier
+    recent_activities: List[Tuple[date, str, str]] = field(default_factory=list)
+    
+    @property
+    def revenue_trend_percent(self) -> Optional[float]:
+        """Évolution du CA par rapport au mois précédent (None si pas de référence)"""
+        if self.last_month_revenue > 0:
+            return (self.monthly_revenue - self.last_month_revenue) / self.last_month_revenue * 100
+        return None
+
+
+class DashboardController:
+    """Contrôleur pour les données agrégées du tableau de bord"""
+    
+    RECENT_PAYMENTS = 3
+    RECENT_SESSIONS = 2
+    RECENT_STUDENTS = 2
+    MAX_ACTIVITIES = 7
+    MAX_VEHICLE_ALERTS = 2
+    UPCOMING_SESSIONS_HOURS = 2
+    UPCOMING_EXAMS_DAYS = 3
+    VEHICLE_ALERT_DAYS = 30
+    
+    @staticmethod
+    def get_snapshot(now: Optional[datetime] = None) -> DashboardSnapshot:
+        """
+        Calculer l'instantané complet du dashboard
+        
+        Args:
+            now: Date/heure de référence (par défaut: maintenant)
+        
+        Returns:
+            DashboardSnapshot (vide en cas d'erreur)
+        """
+        now = now or datetime.now()
+        try:
+            today = now.date()
+            values = {'generated_at': now}
+            
+            # Session courte: seules des valeurs simples sortent du bloc
+            with session_scope() as session:
+                values.update(DashboardController._student_kpis(session))
+                values.update(DashboardController._revenue_kpis(session, today))
+                values.update(DashboardController._session_kpis(session, now))
+                values.update(DashboardController._exam_and_vehicle_alerts(session, today))
+                values['recent_activities'] = DashboardController._recent_activities(session)
+            
+            return DashboardSnapshot(**values)
+        
+        except Exception as e:
+            logger.error(f"Erreur lors du calcul de l'instantané du dashboard : {e}")
+            return DashboardSnapshot(generated_at=now)
+    
+    @staticmethod
+    def _student_kpis(session) -> dict:
+        """Compteurs élèves et impayés (une requête GROUP BY statut)"""
+        rows = session.query(
+            Student.status,
+            func.count(Student.id),
+            func.sum(case((Student.balance < 0, 1), else_=0)),
+            func.coalesce(func.sum(case((Student.balance < 0, -Student.balance), else_=0)), 0)
+        ).group_by(Student.status).all()
+        
+        by_status = {status.value: 0 for status in StudentStatus}
+        students_with_debt = 0
+        total_debt = 0.0
+        for status, count, debtors, debt in rows:
+            by_status[status.value] = count
+            students_with_debt += int(debtors or 0)
+            total_debt += float(debt or 0)
+        
+        return {
+            'total_students': sum(by_status.values()),
+            'active_students': by_status[StudentStatus.ACTIVE.value],
+            'students_with_debt': students_with_debt,
+            'total_debt': total_debt,
+            'students_by_status': by_status,
+        }
+    
+    @staticmethod
+    def _revenue_kpis(session, today: date) -> dict:
+        """CA du mois, du mois précédent, des 7 derniers jours et par méthode"""
+        start_of_month = today.replace(day=1)
+        start_last_month = (start_of_month - timedelta(days=1)).replace(day=1)
+        week_start = today - timedelta(days=6)
+        validated = and_(Payment.is_validated == True, Payment.is_cancelled == False)
+        
+        # Les deux mois en une requête avec agrégats conditionnels
+        monthly, last_month = session.query(
+            func.coalesce(func.sum(case(
+                (Payment.payment_date >= start_of_month, Payment.amount), else_=0
+            )), 0),
+            func.coalesce(func.sum(case(
+                (Payment.payment_date < start_of_month, Payment.amount), else_=0
+            )), 0)
+        ).filter(
+            validated,
+            Payment.payment_date >= start_last_month
+        ).one()
+        
+        # CA journalier des 7 derniers jours
+        daily_rows = session.query(
+            Payment.payment_date,
+            func.sum(Payment.amount)
+        ).filter(
+            validated,
+            Payment.payment_date >= week_start,
+            Payment.payment_date <= today
+        ).group_by(Payment.payment_date).all()
+        
+        daily = {day: float(total or 0) for day, total in daily_rows}
+        revenue_last_7_days = [
+            daily.get(week_start + timedelta(days=i), 0.0) for i in range(7)
+        ]
+        
+        # Répartition par méthode de paiement
+        method_rows = session.query(
+            Payment.payment_method,
+            func.sum(Payment.amount)
+        ).filter(Payment.is_cancelled == False).group_by(Payment.payment_method).all()
+        
+        revenue_by_method = {
+            method.value: float(total or 0) for method, total in method_rows if method
+        }
+        
+        return {
+            'monthly_revenue': float(monthly),
+            'last_month_revenue': float(last_month),
+            'revenue_last_7_days': revenue_last_7_days,
+            'revenue_by_method': revenue_by_method,
+        }
+    
+    @staticmethod
+    def _session_kpis(session, now: datetime) -> dict:
+        """Sessions du jour, de la semaine et prochaines sessions"""
+        today = now.date()
+        start_today = datetime.combine(today, datetime.min.time())
+        end_today = datetime.combine(today, datetime.max.time())
+        start_week = datetime.combine(today - timedelta(days=today.weekday()), datetime.min.time())
+        end_week = start_week + timedelta(days=7)
+        
+        sessions_today, planned_today = session.query(
+            func.count(Session.id),
+            func.coalesce(func.sum(case((Session.status == SessionStatus.SCHEDULED, 1), else_=0)), 0)
+        ).filter(
+            Session.start_datetime >= start_today,
+            Session.start_datetime <= end_today
+        ).one()
+        
+        # Sessions par jour de la semaine en cours
+        day_key = func.date(Session.start_datetime)
+        week_rows = session.query(day_key, func.count(Session.id)).filter(
+            Session.start_datetime >= start_week,
+            Session.start_datetime < end_week
+        ).group_by(day_key).all()
+        
+        sessions_this_week = [0] * 7
+        for day_str, count in week_rows:
+            day_index = (date.fromisoformat(day_str) - start_week.date()).days
+            if 0 <= day_index < 7:
+                sessions_this_week[day_index] = count
+        
+        # Sessions planifiées dans les prochaines heures
+        upcoming_rows = session.query(Session.start_datetime, Student.full_name).outerjoin(
+            Student, Student.id == Session.student_id
+        ).filter(
+            Session.status == SessionStatus.SCHEDULED,
+            Session.start_datetime > now,
+            Session.start_datetime < now + timedelta(hours=DashboardController.UPCOMING_SESSIONS_HOURS),
+            Session.start_datetime <= end_today
+        ).order_by(Session.start_datetime).limit(2).all()
+        
+        return {
+            'sessions_today': sessions_today,
+            'planned_sessions_today': int(planned_today),
+            'sessions_this_week': sessions_this_week,
+            'upcoming_sessions': [(start, name or "N/A") for start, name in upcoming_rows],
+        }
+    
+    @staticmethod
+    def _exam_and_vehicle_alerts(session, today: date) -> dict:
+        """Examens proches, échéances véhicules et véhicules en maintenance"""
+        upcoming_exams = session.query(func.count(Exam.id)).filter(
+            Exam.scheduled_date >= today,
+            Exam.scheduled_date <= today + timedelta(days=DashboardController.UPCOMING_EXAMS_DAYS)
+        ).scalar()
+        
+        limit_date = today + timedelta(days=DashboardController.VEHICLE_ALERT_DAYS)
+        
+        def expiring(column) -> List[Tuple[str, int]]:
+            rows = session.query(Vehicle.plate_number, column).filter(
+                column >= today,
+                column <= limit_date
+            ).order_by(column).limit(DashboardController.MAX_VEHICLE_ALERTS).all()
+            return [(plate, (expiry - today).days) for plate, expiry in rows]
+        
+        vehicles_in_maintenance = session.query(func.count(Vehicle.id)).filter(
+            Vehicle.status == VehicleStatus.MAINTENANCE
+        ).scalar()
+        
+        return {
+            'upcoming_exams': upcoming_exams or 0,
+            'insurance_expiring': expiring(Vehicle.insurance_expiry_date),
+            'inspection_expiring': expiring(Vehicle.technical_inspection_date),
+            'vehicles_in_maintenance': vehicles_in_maintenance or 0,
+        }
+    
+    @staticmethod
+    def _recent_activities(session) -> List[Tuple[date, str, str]]:
+        """Derniers paiements, sessions et inscriptions (requêtes LIMIT)"""
+        activities = []
+        
+        payment_rows = session.query(
+            Payment.payment_date, Payment.amount, Student.full_name
+        ).outerjoin(Student, Student.id == Payment.student_id).order_by(
+            Payment.payment_date.desc(), Payment.id.desc()
+        ).limit(DashboardController.RECENT_PAYMENTS).all()
+        
+        for payment_date, amount, name in payment_rows:
+            activities.append((payment_date, '💰 Paiement', f"{amount:.0f} DH - {name or 'N/A'}"))
+        
+        session_rows = session.query(
+            Session.start_datetime, Session.session_type, Student.full_name
+        ).outerjoin(Student, Student.id == Session.student_id).order_by(
+            Session.start_datetime.desc()
+        ).limit(DashboardController.RECENT_SESSIONS).all()
+        
+        for start, session_type, name in session_rows:
+            type_label = session_type.value if session_type else 'N/A'
+            activities.append((start.date(), '🚗 Session', f"{name or 'N/A'} - {type_label}"))
+        
+        student_rows = session.query(
+            Student.created_at, Student.full_name, Student.license_type
+        ).order_by(Student.created_at.desc()).limit(DashboardController.RECENT_STUDENTS).all()
+        
+        for created_at, name, license_type in student_rows:
+            activities.append((created_at.date(), '👤 Nouvel Élève', f"{name} - {license_type}"))
+        
+        activities.sort(key=lambda activity: activity[0], reverse=True)
+        return activities[:DashboardController.MAX_ACTIVITIES]
@@ -0,0 +1,169 @@
+"""
+Génération par lots des reçus, contrats et convocations
+
+Les enregistrements demandés sont chargés par blocs d'identifiants (élève
+chargé dans la même requête), les données de chaque document sont
+préparées ici, puis le rendu est confié à src.utils.pdf_batch.render_batch
+(pool de processus, fusion optionnelle en un seul PDF).
+
+generate_documents est bloquante : l'interface l'appelle depuis un QThread
+(DocumentBatchWorker) et suit la progression par ses signaux.
+"""
+
+import os
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import selectinload
+
+from src.models import Exam, Payment, Student, get_session
+from src.utils import get_logger
+from src.utils.pdf_batch import BatchResult, ProgressCallback, render_batch
+from .exam_controller import ExamController
+from .payment_controller import PaymentController
+from .student_controller import StudentController
+
+logger = get_logger()
+
+ID_CHUNK_SIZE = 500
+
+# Type de document -> (modèle, dossier de sortie dans src.config, préfixe du PDF fusionné)
+BATCH_SOURCES = {
+    'receipt': (Payment, 'EXPORTS_DIR', 'recus'),  # Reçu professionnel (comme le reçu unitaire)
+    'contract': (Student, 'CONTRACTS_DIR', 'contrats'),
+    'registration_contract': (Student, 'CONTRACTS_DIR', 'contrats_inscription'),
+    'summons': (Exam, 'CONVOCATIONS_DIR', 'convocations'),
+}
+
+
+def _output_dir(kind: str) -> str:
+    """Dossier des documents du type (celui qu'utilise le générateur)"""
+    import src.config as config
+    
+    config.init_export_folders()
+    directory = getattr(config, BATCH_SOURCES[kind][1]) or config.EXPORTS_DIR
+    if directory is None:
+        from src.utils.config_manager import get_config_manager
+        directory = get_config_manager().get_export_path()
+    os.makedirs(directory, exist_ok=True)
+    return str(directory)
+
+
+def _load(session, model, ids: Sequence[int]) -> list:
+    """Enregistrements par blocs d'IDs, dans l'ordre demandé (IDs introuvables ignorés)"""
+    options = [] if model is Student else [selectinload(model.student)]
+    found = {}
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        chunk = ids[start:start + ID_CHUNK_SIZE]
+        for record in session.execute(select(model).where(model.id.in_(chunk)).options(*options)).scalars():
+            found[record.id] = record
+    return [found[record_id] for record_id in ids if record_id in found]
+
+
+def _registration_contract_data(student: Student, output_dir: str) -> Dict[str, Any]:
+    """Données de DocumentGenerator.generate_registration_contract"""
+    student_data = StudentController.contract_data(student)
+    student_data['email'] = student.email or 'N/A'
+    return {
+        'output_path': os.path.join(output_dir, f"contrat_inscription_{student.cin}.pdf"),
+        'student': student_data,
+        'contract': {
+            'contract_number': f"CTR-{student.registration_date or date.today():%Y}-{student.id:05d}",
+            'date': student.registration_date or date.today(),
+            'license_type': student_data['license_type'],
+            'hours_planned': student_data['hours_planned'],
+            'total_price': float(student.total_due or 0),
+            'deposit': float(student.total_paid or 0),
+        },
+    }
+
+
+def _assign_numbers(session, records: list, attribute: str, generate: Callable[[Any], str]):
+    """Attribuer les numéros manquants avant le rendu (ils nomment les fichiers)"""
+    missing = [record for record in records if not getattr(record, attribute)]
+    for record in missing:
+        setattr(record, attribute, generate(record))
+    if missing:
+        session.commit()
+
+
+def _prepare(session, kind: str, records: list, output_dir: str) -> List[Tuple[int, Dict[str, Any]]]:
+    if kind == 'receipt':
+        # Paiements non validés : numéro définitif (REC-date-id), conservé à la validation
+        _assign_numbers(session, records, 'receipt_number', Payment.generate_receipt_number)
+        return [(payment.id, PaymentController.receipt_data(payment)) for payment in records]
+    if kind == 'contract':
+        return [(student.id, StudentController.contract_data(student)) for student in records]
+    if kind == 'registration_contract':
+        return [(student.id, _registration_contract_data(student, output_dir)) for student in records]
+    
+    _assign_numbers(session, records, 'summons_number', Exam.generate_summons_number)
+    return [(exam.id, ExamController.summons_data(exam)) for exam in records]
+
+
+def generate_documents(kind: str, ids: Sequence[int], merge: bool = False,
+                       max_workers: Optional[int] = None, progress: Optional[ProgressCallback] = None,
+                       should_stop: Optional[Callable[[], bool]] = None) -> BatchResult:
+    """
+    Générer les documents d'une liste d'enregistrements
+    
+    Args:
+        kind: 'receipt' (paiements), 'contract' ou 'registration_contract' (élèves),
+              'summons' (examens)
+        ids: IDs des enregistrements, dans l'ordre d'impression
+        merge: Fusionner les documents en un seul PDF prêt à imprimer
+        max_workers: Nombre de processus de rendu (défaut : nombre de cœurs)
+        progress: Rappel (documents traités, total, message) après chaque document
+        should_stop: Rappel d'interruption, consulté après chaque document
+    
+    Returns:
+        BatchResult (fichiers générés, erreurs par ID, PDF fusionné)
+    """
+    if kind not in BATCH_SOURCES:
+        raise ValueError(f"Type de document inconnu : {kind}")
+    
+    model = BATCH_SOURCES[kind][0]
+    ids = list(dict.fromkeys(ids))
+    session = get_session()
+    try:
+        output_dir = _output_dir(kind)
+        items = _prepare(session, kind, _load(session, model, ids), output_dir)
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Erreur lors de la préparation des documents ({kind}) : {e}")
+        return BatchResult(total=len(ids), errors=[(None, str(e))])
+    finally:
+        session.close()
+    
+    merge_to = None
+    if merge:
+        merge_to = os.path.join(
+            output_dir, f"{BATCH_SOURCES[kind][2]}_lot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        )
+    result = render_batch(kind, items, merge_to=merge_to, max_workers=max_workers,
+                          progress=progress, should_stop=should_stop)
+    
+    loaded = {record_id for record_id, _ in items}
+    result.total = len(ids)
+    result.errors.extend((record_id, "Enregistrement introuvable") for record_id in ids if record_id not in loaded)
+    
+    if kind == 'summons' and result.keys:
+        _mark_summons_generated(result.keys)
+    return result
+
+
+def _mark_summons_generated(exam_ids: List[int]):
+    """Marquer les convocations générées (une requête par bloc d'IDs)"""
+    session = get_session()
+    try:
+        for start in range(0, len(exam_ids), ID_CHUNK_SIZE):
+            session.execute(
+                update(Exam).where(Exam.id.in_(exam_ids[start:start + ID_CHUNK_SIZE])).values(summons_generated=True)
+            )
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Erreur lors du marquage des convocations générées : {e}")
+    finally:
+        session.close()
@@ -5,12 +5,45 @@ Contrôleur pour la gestion des examens
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import date, datetime, timedelta
 
-from sqlalchemy import or_, and_, extract
-from src.models import Exam, ExamType, ExamResult, Student, get_session
-from src.utils import get_logger, get_export_manager
+from sqlalchemy import or_, and_, extract, select
+from sqlalchemy.orm import joinedload
+from src.models import Exam, ExamType, ExamResult, Student, get_session, session_scope
+from src.utils import get_logger, get_export_manager, stream_query
+from .paging import DEFAULT_PAGE_SIZE, ListSpec, Page, empty_page, list_page
 
 logger = get_logger()
 
+# Relation lue par les vues après fermeture de la session
+_LOAD_STUDENT = joinedload(Exam.student)
+
+# Liste paginée des examens (voir paging.list_page)
+_LIST_SPEC = ListSpec(
+    columns=(
+        Exam.id, Exam.scheduled_date, Student.full_name.label('student_name'), Exam.exam_type, Exam.result,
+        Exam.theory_score, Exam.theory_max_score, Exam.practical_score, Exam.attempt_number,
+        Exam.exam_center, Exam.is_paid, Exam.summons_number, Exam.student_id,
+    ),
+    date_column=Exam.scheduled_date,
+    joins=((Student, Student.id == Exam.student_id),),
+    filters={
+        'student_id': Exam.student_id,
+        'exam_type': Exam.exam_type,
+        'result': Exam.result,
+        'paid': Exam.is_paid,
+    },
+    sorts={
+        'student': Student.full_name,
+        'exam_type': Exam.exam_type,
+        'result': Exam.result,
+        'attempt': Exam.attempt_number,
+        'center': Exam.exam_center,
+        'paid': Exam.is_paid,
+        'summons': Exam.summons_number,
+    },
+    search_entity='exams',
+    search_columns=(Student.full_name, Exam.summons_number),
+)
+
 
 class ExamController:
     """Contrôleur pour gérer les opérations sur les examens"""
@@ -28,9 +61,9 @@ class ExamController:
         Returns:
             Liste des examens
         """
+        session = get_session()
         try:
-            session = get_session()
-            query = session.query(Exam)
+            query = session.query(Exam).options(_LOAD_STUDENT)
             
             if exam_type:
                 query = query.filter(Exam.exam_type == exam_type)
@@ -42,6 +75,35 @@ class ExamController:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des examens : {e}")
             return []
+        finally:
+            session.close()
+    
+    @staticmethod
+    def list_page(filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None,
+                  offset: int = 0, limit: Optional[int] = DEFAULT_PAGE_SIZE,
+                  after: Optional[tuple] = None, with_total: bool = True) -> Page:
+        """
+        Page de examens filtrée, triée et paginée par la base
+        
+        Args:
+            filters: search, date_from, date_to, student_id, exam_type, result, paid
+            sort: date (défaut '-date'), id, student, exam_type, result, attempt, center, paid, summons
+            offset: Nombre de lignes à sauter
+            limit: Taille de la page (None: tout, 0: total seul)
+            after: Curseur page.next_cursor de la page précédente (tri par date ou id)
+            with_total: Compter les lignes correspondant aux filtres (sinon total = -1)
+        
+        Returns:
+            Page de lignes (id, scheduled_date, student_name, exam_type, result,
+            theory_score, theory_max_score, practical_score, attempt_number,
+            exam_center, is_paid, summons_number, student_id)
+        """
+        try:
+            with session_scope() as session:
+                return list_page(session, _LIST_SPEC, filters, sort, offset, limit, after, with_total)
+        except Exception as e:
+            logger.error(f"Erreur lors de la pagination des examens : {e}")
+            return empty_page(limit)
     
     @staticmethod
     def get_exam_by_id(exam_id: int) -> Optional[Exam]:
@@ -54,12 +116,28 @@ class ExamController:
         Returns:
             Examen ou None
         """
+        session = get_session()
         try:
-            session = get_session()
-            return session.query(Exam).filter(Exam.id == exam_id).first()
+            return session.query(Exam).options(_LOAD_STUDENT).filter(Exam.id == exam_id).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de l'examen {exam_id} : {e}")
             return None
+        finally:
+            session.close()
+    
+    @staticmethod
+    def summons_data(exam: Exam) -> Dict[str, Any]:
+        """Données de la convocation d'un examen (PDFGenerator.generate_summons, élève chargé)"""
+        student = exam.student
+        return {
+            'summons_number': exam.summons_number,
+            'student_name': student.full_name if student else 'N/A',
+            'student_cin': student.cin if student else 'N/A',
+            'exam_type': 'Théorique' if exam.exam_type == ExamType.THEORETICAL else 'Pratique',
+            'exam_date': exam.scheduled_date.strftime('%d/%m/%Y'),
+            'exam_time': exam.scheduled_time or 'N/A',
+            'location': exam.location or exam.exam_center or 'N/A',
+        }
     
     @staticmethod
     def get_upcoming_exams(days: int = 30) -> List[Exam]:
@@ -72,29 +150,33 @@ class ExamController:
         Returns:
             Liste des examens à venir
         """
+        session = get_session()
         try:
-            session = get_session()
             today = date.today()
             future_date = today + timedelta(days=days)
             
-            return session.query(Exam).filter(
+            return session.query(Exam).options(_LOAD_STUDENT).filter(
                 Exam.scheduled_date >= today,
                 Exam.scheduled_date <= future_date
             ).order_by(Exam.scheduled_date).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des examens à venir : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_today_exams() -> List[Exam]:
         """Récupérer les examens du jour"""
+        session = get_session()
         try:
-            session = get_session()
             today = date.today()
-            return session.query(Exam).filter(Exam.scheduled_date == today).order_by(Exam.scheduled_time).all()
+            return session.query(Exam).options(_LOAD_STUDENT).filter(Exam.scheduled_date == today).order_by(Exam.scheduled_time).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des examens du jour : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_past_exams(days: int = 90) -> List[Exam]:
@@ -107,30 +189,34 @@ class ExamController:
         Returns:
             Liste des examens passés
         """
+        session = get_session()
         try:
-            session = get_session()
             today = date.today()
             past_date = today - timedelta(days=days)
             
-            return session.query(Exam).filter(
+            return session.query(Exam).options(_LOAD_STUDENT).filter(
                 Exam.scheduled_date < today,
                 Exam.scheduled_date >= past_date
             ).order_by(Exam.scheduled_date.desc()).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des examens passés : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_exams_by_student(student_id: int) -> List[Exam]:
         """Obtenir les examens d'un élève"""
+        session = get_session()
         try:
-            session = get_session()
-            return session.query(Exam).filter(
+            return session.query(Exam).options(_LOAD_STUDENT).filter(
                 Exam.student_id == student_id
             ).order_by(Exam.scheduled_date.desc()).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des examens de l'élève : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def search_exams(query: str) -> List[Exam]:
@@ -143,11 +229,11 @@ class ExamController:
         Returns:
             Liste des examens correspondants
         """
+        session = get_session()
         try:
-            session = get_session()
             search_term = f"%{query}%"
             
-            exams = session.query(Exam).join(Student).filter(
+            exams = session.query(Exam).options(_LOAD_STUDENT).join(Student).filter(
                 or_(
                     Exam.summons_number.like(search_term),
                     Exam.exam_center.like(search_term),
@@ -161,6 +247,8 @@ class ExamController:
         except Exception as e:
             logger.error(f"Erreur lors de la recherche d'examens : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def create_exam(student_id: int, exam_type: ExamType, scheduled_date: date,
@@ -177,16 +265,15 @@ class ExamController:
         Returns:
             Tuple (success, message, exam)
         """
+        session = get_session()
         try:
-            session = get_session()
-            
             # Vérifier que l'élève existe
             student = session.query(Student).filter(Student.id == student_id).first()
             if not student:
                 return False, "Élève introuvable", None
             
             # Calculer le numéro de tentative
-            previous_exams = session.query(Exam).filter(
+            previous_exams = session.query(Exam).options(_LOAD_STUDENT).filter(
                 Exam.student_id == student_id,
                 Exam.exam_type == exam_type
             ).count()
@@ -218,6 +305,8 @@ class ExamController:
             error_msg = f"Erreur lors de la création de l'examen : {str(e)}"
             logger.error(error_msg)
             return False, error_msg, None
+        finally:
+            session.close()
     
     @staticmethod
     def update_exam(exam_id: int, **kwargs) -> tuple[bool, str]:
@@ -231,8 +320,8 @@ class ExamController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             exam = session.query(Exam).filter(Exam.id == exam_id).first()
             
             if not exam:
@@ -252,6 +341,8 @@ class ExamController:
             error_msg = f"Erreur lors de la mise à jour de l'examen : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def record_exam_result(exam_id: int, result: ExamResult, score: Optional[int] = None,
@@ -269,8 +360,8 @@ class ExamController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             exam = session.query(Exam).filter(Exam.id == exam_id).first()
             
             if not exam:
@@ -301,6 +392,8 @@ class ExamController:
             error_msg = f"Erreur lors de l'enregistrement du résultat : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def delete_exam(exam_id: int) -> tuple[bool, str]:
@@ -313,8 +406,8 @@ class ExamController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             exam = session.query(Exam).filter(Exam.id == exam_id).first()
             
             if not exam:
@@ -331,6 +424,8 @@ class ExamController:
             error_msg = f"Erreur lors de la suppression de l'examen : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def generate_convocation(exam_id: int) -> tuple[bool, str]:
@@ -343,8 +438,8 @@ class ExamController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             exam = session.query(Exam).filter(Exam.id == exam_id).first()
             
             if not exam:
@@ -361,6 +456,8 @@ class ExamController:
             error_msg = f"Erreur lors de la génération de la convocation : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def mark_convocation_sent(exam_id: int) -> tuple[bool, str]:
@@ -373,8 +470,8 @@ class ExamController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             exam = session.query(Exam).filter(Exam.id == exam_id).first()
             
             if not exam:
@@ -391,6 +488,8 @@ class ExamController:
             error_msg = f"Erreur : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def get_success_rate_statistics(exam_type: Optional[ExamType] = None,
@@ -407,8 +506,8 @@ class ExamController:
         Returns:
             Dictionnaire de statistiques
         """
+        session = get_session()
         try:
-            session = get_session()
             query = session.query(Exam).filter(Exam.result != ExamResult.PENDING)
             
             if exam_type:
@@ -450,36 +549,35 @@ class ExamController:
         except Exception as e:
             logger.error(f"Erreur lors du calcul des statistiques : {e}")
             return {}
+        finally:
+            session.close()
     
     @staticmethod
-    def export_to_csv(exams: Optional[List[Exam]] = None, filename: Optional[str] = None) -> tuple[bool, str]:
+    def export_to_csv(exams: Optional[List[Exam]] = None,
+                     filename: Optional[str] = None, file_format: str = 'csv') -> tuple[bool, str]:
         """
-        Exporter les examens vers un fichier CSV
+        Exporter les examens (CSV, CSV gzip ou XLSX)
+        
+        Sans liste fournie, la table est lue par lots (stream_query) et écrite
+        au fil de l'eau : la mémoire ne dépend pas du nombre de lignes.
         
         Args:
             exams: Liste d'examens (optionnel, tous si None)
             filename: Nom du fichier (optionnel)
+            file_format: 'csv', 'csv.gz' ou 'xlsx'
         
         Returns:
             Tuple (success, filepath/message)
         """
         try:
             if exams is None:
-                exams = ExamController.get_all_exams()
-            
-            if not exams:
-                return False, "Aucun examen à exporter"
-            
-            # Préparer les données
-            data = [exam.to_dict() for exam in exams]
-            
-            # Exporter avec ExportManager
-            export_mgr = get_export_manager()
-            filepath = export_mgr.export_to_csv(data, 'exams', filename)
-            
-            logger.info(f"{len(exams)} examens exportés vers {filepath}")
-            return True, filepath
+                statement = select(Exam).order_by(Exam.scheduled_date.desc())
+                rows = stream_query(statement, Exam.to_dict)
+            else:
+                rows = (Exam.to_dict(item) for item in exams)
             
+            return get_export_manager().export_stream(rows, filename or 'exams', file_format=file_format)
+        
         except Exception as e:
             error_msg = f"Erreur lors de l'export : {str(e)}"
             logger.error(error_msg)
@@ -5,12 +5,62 @@ Contrôleur pour la gestion des moniteurs
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import date, datetime
 
-from sqlalchemy import or_, func
-from src.models import Instructor, Session, SessionStatus, get_session
-from src.utils import get_logger, get_export_manager
+from sqlalchemy import and_, or_, func, select
+from src.models import Instructor, Session, get_session, session_scope
+from src.utils import get_logger, get_export_manager, stream_query
+from .paging import DEFAULT_PAGE_SIZE, ListSpec, Page, empty_page, list_page
+from .session_controller import session_counts, session_period_conditions, session_stat_columns
 
 logger = get_logger()
 
+# Liste paginée des moniteurs (voir paging.list_page)
+_LIST_SPEC = ListSpec(
+    columns=(
+        Instructor.id, Instructor.full_name, Instructor.cin, Instructor.phone, Instructor.email,
+        Instructor.license_types, Instructor.is_available, Instructor.max_students_per_day,
+        Instructor.hire_date,
+    ),
+    date_column=Instructor.hire_date,
+    filters={
+        'available': Instructor.is_available,
+        'license_type': lambda license_type: Instructor.license_types.like(f"%{license_type}%"),
+    },
+    sorts={
+        'name': Instructor.full_name,
+        'cin': Instructor.cin,
+        'available': Instructor.is_available,
+    },
+    search_entity='instructors',
+    search_columns=(Instructor.full_name, Instructor.cin, Instructor.phone, Instructor.license_number),
+)
+
+
+def _instructor_statistics(session, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                           instructor_id: Optional[int] = None) -> Dict[int, Dict[str, Any]]:
+    """Moniteurs et agrégats de leurs sessions (jointure externe groupée)"""
+    query = session.query(
+        Instructor, *session_stat_columns(), func.count(func.distinct(Session.student_id)).label('unique_students')
+    ).outerjoin(
+        Session, and_(Session.instructor_id == Instructor.id, *session_period_conditions(start_date, end_date))
+    )
+    if instructor_id is not None:
+        query = query.filter(Instructor.id == instructor_id)
+    
+    statistics = {}
+    for row in query.group_by(Instructor.id):
+        instructor = row.Instructor
+        statistics[instructor.id] = {
+            'instructor_id': instructor.id,
+            'full_name': instructor.full_name,
+            **session_counts(row),
+            'unique_students': row.unique_students,
+            'hourly_rate': instructor.hourly_rate,
+            'monthly_salary': instructor.monthly_salary,
+            'success_rate': instructor.success_rate,
+            'is_available': instructor.is_available
+        }
+    return statistics
+
 
 class InstructorController:
     """Contrôleur pour gérer les opérations sur les moniteurs"""
@@ -26,8 +76,8 @@ class InstructorController:
         Returns:
             Liste des moniteurs
         """
+        session = get_session()
         try:
-            session = get_session()
             query = session.query(Instructor)
             
             if available_only:
@@ -38,6 +88,34 @@ class InstructorController:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des moniteurs : {e}")
             return []
+        finally:
+            session.close()
+    
+    @staticmethod
+    def list_page(filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None,
+                  offset: int = 0, limit: Optional[int] = DEFAULT_PAGE_SIZE,
+                  after: Optional[tuple] = None, with_total: bool = True) -> Page:
+        """
+        Page de moniteurs filtrée, triée et paginée par la base
+        
+        Args:
+            filters: search, date_from, date_to, available, license_type
+            sort: date (défaut '-date'), id, name, cin, available
+            offset: Nombre de lignes à sauter
+            limit: Taille de la page (None: tout, 0: total seul)
+            after: Curseur page.next_cursor de la page précédente (tri par date ou id)
+            with_total: Compter les lignes correspondant aux filtres (sinon total = -1)
+        
+        Returns:
+            Page de lignes (id, full_name, cin, phone, email, license_types,
+            is_available, max_students_per_day, hire_date)
+        """
+        try:
+            with session_scope() as session:
+                return list_page(session, _LIST_SPEC, filters, sort, offset, limit, after, with_total)
+        except Exception as e:
+            logger.error(f"Erreur lors de la pagination des moniteurs : {e}")
+            return empty_page(limit)
     
     @staticmethod
     def get_instructor_by_id(instructor_id: int) -> Optional[Instructor]:
@@ -50,12 +128,14 @@ class InstructorController:
         Returns:
             Moniteur ou None
         """
+        session = get_session()
         try:
-            session = get_session()
             return session.query(Instructor).filter(Instructor.id == instructor_id).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du moniteur {instructor_id} : {e}")
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def get_instructor_by_cin(cin: str) -> Optional[Instructor]:
@@ -68,12 +148,14 @@ class InstructorController:
         Returns:
             Moniteur ou None
         """
+        session = get_session()
         try:
-            session = get_session()
             return session.query(Instructor).filter(Instructor.cin == cin).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du moniteur CIN {cin} : {e}")
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def get_instructor_by_license(license_number: str) -> Optional[Instructor]:
@@ -86,12 +168,14 @@ class InstructorController:
         Returns:
             Moniteur ou None
         """
+        session = get_session()
         try:
-            session = get_session()
             return session.query(Instructor).filter(Instructor.license_number == license_number).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du moniteur (permis {license_number}) : {e}")
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def search_instructors(query: str) -> List[Instructor]:
@@ -104,8 +188,8 @@ class InstructorController:
         Returns:
             Liste des moniteurs correspondants
         """
+        session = get_session()
         try:
-            session = get_session()
             search_term = f"%{query}%"
             
             instructors = session.query(Instructor).filter(
@@ -122,6 +206,8 @@ class InstructorController:
         except Exception as e:
             logger.error(f"Erreur lors de la recherche de moniteurs : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def create_instructor(full_name: str, cin: str, phone: str, 
@@ -139,9 +225,8 @@ class InstructorController:
         Returns:
             Tuple (success, message, instructor)
         """
+        session = get_session()
         try:
-            session = get_session()
-            
             # Vérifier que le CIN n'existe pas déjà
             existing = session.query(Instructor).filter(Instructor.cin == cin).first()
             if existing:
@@ -173,6 +258,8 @@ class InstructorController:
             error_msg = f"Erreur lors de la création du moniteur : {str(e)}"
             logger.error(error_msg)
             return False, error_msg, None
+        finally:
+            session.close()
     
     @staticmethod
     def update_instructor(instructor_id: int, **kwargs) -> tuple[bool, str]:
@@ -186,8 +273,8 @@ class InstructorController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             instructor = session.query(Instructor).filter(Instructor.id == instructor_id).first()
             
             if not instructor:
@@ -225,6 +312,8 @@ class InstructorController:
             error_msg = f"Erreur lors de la mise à jour du moniteur : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def delete_instructor(instructor_id: int) -> tuple[bool, str]:
@@ -237,8 +326,8 @@ class InstructorController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             instructor = session.query(Instructor).filter(Instructor.id == instructor_id).first()
             
             if not instructor:
@@ -260,6 +349,8 @@ class InstructorController:
             error_msg = f"Erreur lors de la suppression du moniteur : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def set_availability(instructor_id: int, is_available: bool) -> tuple[bool, str]:
@@ -273,8 +364,8 @@ class InstructorController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             instructor = session.query(Instructor).filter(Instructor.id == instructor_id).first()
             
             if not instructor:
@@ -292,6 +383,8 @@ class InstructorController:
             error_msg = f"Erreur : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def get_instructor_statistics(instructor_id: int) -> Dict[str, Any]:
@@ -305,66 +398,32 @@ class InstructorController:
             Dictionnaire de statistiques
         """
         try:
-            session = get_session()
-            instructor = session.query(Instructor).filter(Instructor.id == instructor_id).first()
-            
-            if not instructor:
-                return {}
-            
-            # Compter les sessions
-            total_sessions = session.query(Session).filter(
-                Session.instructor_id == instructor_id
-            ).count()
-            
-            completed_sessions = session.query(Session).filter(
-                Session.instructor_id == instructor_id,
-                Session.status == SessionStatus.COMPLETED
-            ).count()
-            
-            cancelled_sessions = session.query(Session).filter(
-                Session.instructor_id == instructor_id,
-                Session.status == SessionStatus.CANCELLED
-            ).count()
-            
-            # Calculer les heures totales
-            from sqlalchemy import func
-            from datetime import timedelta
-            
-            sessions_with_duration = session.query(Session).filter(
-                Session.instructor_id == instructor_id,
-                Session.status == SessionStatus.COMPLETED
-            ).all()
-            
-            total_hours = sum([
-                (s.end_datetime - s.start_datetime).total_seconds() / 3600 
-                for s in sessions_with_duration
-                if s.start_datetime and s.end_datetime
-            ])
-            
-            # Compter les élèves uniques
-            unique_students = session.query(Session.student_id).filter(
-                Session.instructor_id == instructor_id
-            ).distinct().count()
-            
-            return {
-                'instructor_id': instructor_id,
-                'full_name': instructor.full_name,
-                'total_sessions': total_sessions,
-                'completed_sessions': completed_sessions,
-                'cancelled_sessions': cancelled_sessions,
-                'pending_sessions': total_sessions - completed_sessions - cancelled_sessions,
-                'total_hours': round(total_hours, 2),
-                'unique_students': unique_students,
-                'hourly_rate': instructor.hourly_rate,
-                'monthly_salary': instructor.monthly_salary,
-                'success_rate': instructor.success_rate,
-                'is_available': instructor.is_available
-            }
-            
+            with session_scope() as session:
+                return _instructor_statistics(session, instructor_id=instructor_id).get(instructor_id, {})
         except Exception as e:
             logger.error(f"Erreur lors du calcul des statistiques du moniteur : {e}")
             return {}
     
+    @staticmethod
+    def get_all_instructor_statistics(start_date: Optional[date] = None,
+                                      end_date: Optional[date] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Statistiques de tous les moniteurs en une seule requête groupée
+        
+        Args:
+            start_date: Début de la période des sessions (optionnel)
+            end_date: Fin de la période des sessions (optionnel)
+        
+        Returns:
+            ID du moniteur -> statistiques (mêmes clés que get_instructor_statistics)
+        """
+        try:
+            with session_scope() as session:
+                return _instructor_statistics(session, start_date, end_date)
+        except Exception as e:
+            logger.error(f"Erreur lors du calcul des statistiques des moniteurs : {e}")
+            return {}
+    
     @staticmethod
     def get_instructors_by_license_type(license_type: str, available_only: bool = False) -> List[Instructor]:
         """
@@ -377,8 +436,8 @@ class InstructorController:
         Returns:
             Liste des moniteurs
         """
+        session = get_session()
         try:
-            session = get_session()
             query = session.query(Instructor).filter(
                 Instructor.license_types.like(f"%{license_type.upper()}%")
             )
@@ -391,37 +450,35 @@ class InstructorController:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des moniteurs (permis {license_type}) : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
-    def export_to_csv(instructors: Optional[List[Instructor]] = None, 
-                     filename: Optional[str] = None) -> tuple[bool, str]:
+    def export_to_csv(instructors: Optional[List[Instructor]] = None,
+                     filename: Optional[str] = None, file_format: str = 'csv') -> tuple[bool, str]:
         """
-        Exporter les moniteurs vers un fichier CSV
+        Exporter les moniteurs (CSV, CSV gzip ou XLSX)
+        
+        Sans liste fournie, la table est lue par lots (stream_query) et écrite
+        au fil de l'eau : la mémoire ne dépend pas du nombre de lignes.
         
         Args:
             instructors: Liste de moniteurs (optionnel, tous si None)
             filename: Nom du fichier (optionnel)
+            file_format: 'csv', 'csv.gz' ou 'xlsx'
         
         Returns:
             Tuple (success, filepath/message)
         """
         try:
             if instructors is None:
-                instructors = InstructorController.get_all_instructors()
-            
-            if not instructors:
-                return False, "Aucun moniteur à exporter"
-            
-            # Préparer les données
-            data = [instructor.to_dict() for instructor in instructors]
-            
-            # Exporter avec ExportManager
-            export_mgr = get_export_manager()
-            filepath = export_mgr.export_to_csv(data, 'instructors', filename)
-            
-            logger.info(f"{len(instructors)} moniteurs exportés vers {filepath}")
-            return True, filepath
+                statement = select(Instructor).order_by(Instructor.full_name)
+                rows = stream_query(statement, Instructor.to_dict)
+            else:
+                rows = (Instructor.to_dict(item) for item in instructors)
             
+            return get_export_manager().export_stream(rows, filename or 'instructors', file_format=file_format)
+        
         except Exception as e:
             error_msg = f"Erreur lors de l'export : {str(e)}"
             logger.error(error_msg)
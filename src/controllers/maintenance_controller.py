@@ -3,15 +3,45 @@ Contrôleur pour la gestion de la maintenance des véhicules
 Phase 1 - Critical Improvements
 """
 
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Any
 from datetime import datetime, date, timedelta
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import joinedload
 
-from src.models import VehicleMaintenance, MaintenanceType, MaintenanceStatus, Vehicle, get_session
-from src.utils import get_logger, get_export_manager
+from src.models import VehicleMaintenance, MaintenanceType, MaintenanceStatus, Vehicle, get_session, session_scope
+from src.utils import get_logger, get_export_manager, stream_query
+from .paging import DEFAULT_PAGE_SIZE, ListSpec, Page, empty_page, list_page
 
 logger = get_logger()
 
+# Relation lue par les vues après fermeture de la session
+_LOAD_VEHICLE = joinedload(VehicleMaintenance.vehicle)
+
+# Liste paginée des maintenances (voir paging.list_page)
+_LIST_SPEC = ListSpec(
+    columns=(
+        VehicleMaintenance.id, VehicleMaintenance.scheduled_date, Vehicle.plate_number.label('vehicle_plate'),
+        VehicleMaintenance.maintenance_type, VehicleMaintenance.status, VehicleMaintenance.provider_name,
+        VehicleMaintenance.total_cost, VehicleMaintenance.completion_date, VehicleMaintenance.vehicle_id,
+    ),
+    date_column=VehicleMaintenance.scheduled_date,
+    joins=((Vehicle, Vehicle.id == VehicleMaintenance.vehicle_id),),
+    filters={
+        'vehicle_id': VehicleMaintenance.vehicle_id,
+        'status': VehicleMaintenance.status,
+        'maintenance_type': VehicleMaintenance.maintenance_type,
+    },
+    sorts={
+        'vehicle': Vehicle.plate_number,
+        'maintenance_type': VehicleMaintenance.maintenance_type,
+        'status': VehicleMaintenance.status,
+        'provider': VehicleMaintenance.provider_name,
+        'cost': VehicleMaintenance.total_cost,
+    },
+    search_entity='maintenances',
+    search_columns=(Vehicle.plate_number, VehicleMaintenance.provider_name, VehicleMaintenance.description),
+)
+
 
 class MaintenanceController:
     """Contrôleur pour gérer la maintenance des véhicules"""
@@ -29,9 +59,8 @@ class MaintenanceController:
         Returns:
             VehicleMaintenance créée ou None si erreur
         """
+        session = get_session()
         try:
-            session = get_session()
-            
             # Créer la maintenance
             maintenance = VehicleMaintenance(
                 vehicle_id=maintenance_data['vehicle_id'],
@@ -72,42 +101,76 @@ class MaintenanceController:
             logger.error(f"Erreur lors de la création de la maintenance : {e}")
             session.rollback()
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def get_maintenance_by_id(maintenance_id: int) -> Optional[VehicleMaintenance]:
         """Obtenir une maintenance par ID"""
+        session = get_session()
         try:
-            session = get_session()
-            return session.query(VehicleMaintenance).filter(
+            return session.query(VehicleMaintenance).options(_LOAD_VEHICLE).filter(
                 VehicleMaintenance.id == maintenance_id
             ).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de la maintenance {maintenance_id} : {e}")
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def get_all_maintenances() -> List[VehicleMaintenance]:
         """Obtenir toutes les maintenances"""
+        session = get_session()
         try:
-            session = get_session()
-            return session.query(VehicleMaintenance).order_by(
+            return session.query(VehicleMaintenance).options(_LOAD_VEHICLE).order_by(
                 VehicleMaintenance.scheduled_date.desc()
             ).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des maintenances : {e}")
             return []
+        finally:
+            session.close()
+    
+    @staticmethod
+    def list_page(filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None,
+                  offset: int = 0, limit: Optional[int] = DEFAULT_PAGE_SIZE,
+                  after: Optional[tuple] = None, with_total: bool = True) -> Page:
+        """
+        Page de maintenances filtrée, triée et paginée par la base
+        
+        Args:
+            filters: search, date_from, date_to, vehicle_id, status, maintenance_type
+            sort: date (défaut '-date'), id, vehicle, maintenance_type, status, provider, cost
+            offset: Nombre de lignes à sauter
+            limit: Taille de la page (None: tout, 0: total seul)
+            after: Curseur page.next_cursor de la page précédente (tri par date ou id)
+            with_total: Compter les lignes correspondant aux filtres (sinon total = -1)
+        
+        Returns:
+            Page de lignes (id, scheduled_date, vehicle_plate, maintenance_type,
+            status, provider_name, total_cost, completion_date, vehicle_id)
+        """
+        try:
+            with session_scope() as session:
+                return list_page(session, _LIST_SPEC, filters, sort, offset, limit, after, with_total)
+        except Exception as e:
+            logger.error(f"Erreur lors de la pagination des maintenances : {e}")
+            return empty_page(limit)
     
     @staticmethod
     def get_maintenances_by_vehicle(vehicle_id: int) -> List[VehicleMaintenance]:
         """Obtenir les maintenances d'un véhicule"""
+        session = get_session()
         try:
-            session = get_session()
-            return session.query(VehicleMaintenance).filter(
+            return session.query(VehicleMaintenance).options(_LOAD_VEHICLE).filter(
                 VehicleMaintenance.vehicle_id == vehicle_id
             ).order_by(VehicleMaintenance.scheduled_date.desc()).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des maintenances du véhicule {vehicle_id} : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def update_maintenance(maintenance_id: int, maintenance_data: dict) -> bool:
@@ -121,8 +184,8 @@ class MaintenanceController:
         Returns:
             True si succès, False sinon
         """
+        session = get_session()
         try:
-            session = get_session()
             maintenance = session.query(VehicleMaintenance).filter(
                 VehicleMaintenance.id == maintenance_id
             ).first()
@@ -148,6 +211,8 @@ class MaintenanceController:
             logger.error(f"Erreur lors de la mise à jour de la maintenance {maintenance_id} : {e}")
             session.rollback()
             return False
+        finally:
+            session.close()
     
     @staticmethod
     def delete_maintenance(maintenance_id: int) -> bool:
@@ -160,8 +225,8 @@ class MaintenanceController:
         Returns:
             True si succès, False sinon
         """
+        session = get_session()
         try:
-            session = get_session()
             maintenance = session.query(VehicleMaintenance).filter(
                 VehicleMaintenance.id == maintenance_id
             ).first()
@@ -179,6 +244,8 @@ class MaintenanceController:
             logger.error(f"Erreur lors de la suppression de la maintenance {maintenance_id} : {e}")
             session.rollback()
             return False
+        finally:
+            session.close()
     
     # ========== Recherche et Filtres ==========
     
@@ -209,9 +276,9 @@ class MaintenanceController:
         Returns:
             Liste de maintenances correspondantes
         """
+        session = get_session()
         try:
-            session = get_session()
-            query = session.query(VehicleMaintenance)
+            query = session.query(VehicleMaintenance).options(_LOAD_VEHICLE)
             
             # Filtres
             if vehicle_id:
@@ -243,14 +310,16 @@ class MaintenanceController:
         except Exception as e:
             logger.error(f"Erreur lors de la recherche de maintenances : {e}")
             return []
+        finally:
+            session.close()
     
     # ========== Gestion des statuts ==========
     
     @staticmethod
     def start_maintenance(maintenance_id: int) -> bool:
         """Démarrer une maintenance"""
+        session = get_session()
         try:
-            session = get_session()
             maintenance = session.query(VehicleMaintenance).filter(
                 VehicleMaintenance.id == maintenance_id
             ).first()
@@ -267,6 +336,8 @@ class MaintenanceController:
             logger.error(f"Erreur lors du démarrage de la maintenance {maintenance_id} : {e}")
             session.rollback()
             return False
+        finally:
+            session.close()
     
     @staticmethod
     def complete_maintenance(maintenance_id: int, completion_data: Optional[dict] = None) -> bool:
@@ -277,8 +348,8 @@ class MaintenanceController:
             maintenance_id: ID de la maintenance
             completion_data: Données de complétion (kilométrage, notes, etc.)
         """
+        session = get_session()
         try:
-            session = get_session()
             maintenance = session.query(VehicleMaintenance).filter(
                 VehicleMaintenance.id == maintenance_id
             ).first()
@@ -301,12 +372,14 @@ class MaintenanceController:
             logger.error(f"Erreur lors de la complétion de la maintenance {maintenance_id} : {e}")
             session.rollback()
             return False
+        finally:
+            session.close()
     
     @staticmethod
     def cancel_maintenance(maintenance_id: int) -> bool:
         """Annuler une maintenance"""
+        session = get_session()
         try:
-            session = get_session()
             maintenance = session.query(VehicleMaintenance).filter(
                 VehicleMaintenance.id == maintenance_id
             ).first()
@@ -323,17 +396,19 @@ class MaintenanceController:
             logger.error(f"Erreur lors de l'annulation de la maintenance {maintenance_id} : {e}")
             session.rollback()
             return False
+        finally:
+            session.close()
     
     # ========== Alertes et Rappels ==========
     
     @staticmethod
     def get_upcoming_maintenances(days: int = 30) -> List[VehicleMaintenance]:
         """Obtenir les maintenances à venir dans les N prochains jours"""
+        session = get_session()
         try:
-            session = get_session()
             end_date = datetime.now() + timedelta(days=days)
             
-            return session.query(VehicleMaintenance).filter(
+            return session.query(VehicleMaintenance).options(_LOAD_VEHICLE).filter(
                 and_(
                     VehicleMaintenance.status == MaintenanceStatus.PLANIFIEE,
                     VehicleMaintenance.scheduled_date <= end_date,
@@ -344,14 +419,15 @@ class MaintenanceController:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des maintenances à venir : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_overdue_maintenances() -> List[VehicleMaintenance]:
         """Obtenir les maintenances en retard"""
+        session = get_session()
         try:
-            session = get_session()
-            
-            return session.query(VehicleMaintenance).filter(
+            return session.query(VehicleMaintenance).options(_LOAD_VEHICLE).filter(
                 and_(
                     VehicleMaintenance.status == MaintenanceStatus.PLANIFIEE,
                     VehicleMaintenance.scheduled_date < datetime.now()
@@ -361,6 +437,8 @@ class MaintenanceController:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des maintenances en retard : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_maintenance_alerts() -> Dict[str, List[VehicleMaintenance]]:
@@ -395,8 +473,8 @@ class MaintenanceController:
         Args:
             vehicle_id: Filtrer par véhicule (optionnel)
         """
+        session = get_session()
         try:
-            session = get_session()
             query = session.query(VehicleMaintenance)
             
             if vehicle_id:
@@ -447,39 +525,39 @@ class MaintenanceController:
         except Exception as e:
             logger.error(f"Erreur lors du calcul des statistiques : {e}")
             return {}
+        finally:
+            session.close()
     
     # ========== Export ==========
     
     @staticmethod
     def export_to_csv(maintenances: Optional[List[VehicleMaintenance]] = None,
-                     filename: Optional[str] = None) -> tuple[bool, str]:
+                     filename: Optional[str] = None, file_format: str = 'csv') -> tuple[bool, str]:
         """
-        Exporter les maintenances vers un fichier CSV
+        Exporter les maintenances (CSV, CSV gzip ou XLSX)
+        
+        Sans liste fournie, la table est lue par lots (stream_query) et écrite
+        au fil de l'eau : la mémoire ne dépend pas du nombre de lignes.
         
         Args:
             maintenances: Liste de maintenances (optionnel, toutes si None)
             filename: Nom du fichier (optionnel)
+            file_format: 'csv', 'csv.gz' ou 'xlsx'
         
         Returns:
             Tuple (success, filepath/message)
         """
         try:
             if maintenances is None:
-                maintenances = MaintenanceController.get_all_maintenances()
-            
-            if not maintenances:
-                return False, "Aucune maintenance à exporter"
-            
-            # Convertir en dictionnaires
-            data = [m.to_dict() for m in maintenances]
-            
-            # Exporter avec ExportManager
-            export_mgr = get_export_manager()
-            filepath = export_mgr.export_to_csv(data, 'maintenances', filename)
-            
-            logger.info(f"{len(maintenances)} maintenances exportées vers {filepath}")
-            return True, filepath
-            
+                statement = select(VehicleMaintenance).options(
+                    joinedload(VehicleMaintenance.vehicle)
+                ).order_by(VehicleMaintenance.scheduled_date.desc())
+                rows = stream_query(statement, VehicleMaintenance.to_dict)
+            else:
+                rows = (VehicleMaintenance.to_dict(item) for item in maintenances)
+            
+            return get_export_manager().export_stream(rows, filename or 'maintenances', file_format=file_format)
+        
         except Exception as e:
             error_msg = f"Erreur lors de l'export : {str(e)}"
             logger.error(error_msg)
@@ -3,24 +3,41 @@ Contrôleur pour la gestion automatique des notifications
 Phase 2 - Système de Notifications Automatiques
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, NamedTuple, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta, date
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func, select, tuple_, update, bindparam
 import json
-import csv
 from pathlib import Path
-import os
 
 from src.models import (
     Notification, NotificationType, NotificationCategory, NotificationStatus, NotificationPriority,
-    Student, Instructor, Session, Exam, Payment, Vehicle, VehicleMaintenance,
-    get_session
+    PRIORITY_RANK, retry_backoff, unread_count, notifications_archive, archive_notifications,
+    Student, Instructor, Session, Exam, Payment, Vehicle, VehicleMaintenance, User, UserRole,
+    get_engine, get_session
 )
-from src.utils import get_logger
+from src.utils import get_logger, get_export_manager, stream_query
 from src.utils.notifications import NotificationManager
+from src.utils.notification_dispatcher import DispatchJob, NotificationDispatcher
 
 logger = get_logger()
 
+NOTIFICATION_EXPORT_FIELDS = [
+    'ID', 'Type', 'Catégorie', 'Priorité', 'Titre', 'Message',
+    'Destinataire Type', 'Destinataire ID', 'Destinataire Nom',
+    'Lu', 'Lu Le', 'Envoyé', 'Créé Le'
+]
+
+FEED_PAGE_SIZE = 20
+
+# Destinataire des notifications in-app du personnel (badge de la fenêtre principale)
+STAFF_RECIPIENT_TYPE = 'user'
+
+
+class FeedPage(NamedTuple):
+    """Page du fil in-app (next_cursor à passer pour la page suivante, None à la fin)"""
+    items: List[Notification]
+    next_cursor: Optional[Tuple[datetime, int]]
+
 
 class NotificationController:
     """Contrôleur pour gérer les notifications automatiques"""
@@ -42,9 +59,8 @@ class NotificationController:
         Returns:
             Notification créée ou None si erreur
         """
+        session = get_session()
         try:
-            session = get_session()
-            
             notification = Notification(
                 notification_type=notification_data['notification_type'],
                 category=notification_data['category'],
@@ -69,6 +85,10 @@ class NotificationController:
             session.commit()
             session.refresh(notification)
             
+            # Réveiller le planificateur si l'échéance précède celles qu'il attend
+            from .notification_scheduler import notify_scheduled
+            notify_scheduled(notification.next_attempt_at)
+            
             logger.info(f"Notification créée : ID {notification.id}, type {notification.notification_type.value}")
             return notification
             
@@ -76,55 +96,56 @@ class NotificationController:
             logger.error(f"Erreur lors de la création de la notification : {e}")
             session.rollback()
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def get_notification_by_id(notification_id: int) -> Optional[Notification]:
         """Obtenir une notification par ID"""
+        session = get_session()
         try:
-            session = get_session()
             return session.query(Notification).filter(
                 Notification.id == notification_id
             ).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de la notification {notification_id} : {e}")
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def get_pending_notifications() -> List[Notification]:
         """Obtenir les notifications en attente d'envoi"""
+        session = get_session()
         try:
-            session = get_session()
             now = datetime.now()
             
             return session.query(Notification).filter(
-                and_(
-                    Notification.status == NotificationStatus.PENDING,
-                    or_(
-                        Notification.scheduled_at.is_(None),
-                        Notification.scheduled_at <= now
-                    )
-                )
-            ).order_by(Notification.priority.desc(), Notification.scheduled_at).all()
-            
+                Notification.status == NotificationStatus.PENDING,
+                Notification.next_attempt_at <= now
+            ).order_by(Notification.priority_order().desc(), Notification.next_attempt_at).all()
+        
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des notifications en attente : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_failed_notifications_for_retry() -> List[Notification]:
         """Obtenir les notifications échouées qui peuvent être réessayées"""
+        session = get_session()
         try:
-            session = get_session()
-            
-            notifications = session.query(Notification).filter(
-                Notification.status == NotificationStatus.FAILED
-            ).all()
-            
-            return [n for n in notifications if n.can_retry()]
-            
+            return session.query(Notification).filter(
+                Notification.status == NotificationStatus.FAILED,
+                Notification.retry_count < Notification.max_retries
+            ).order_by(Notification.next_attempt_at).all()
+        
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des notifications à réessayer : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_in_app_notifications_for_user(
@@ -140,8 +161,8 @@ class NotificationController:
             recipient_id: ID du destinataire
             include_read: Inclure les notifications lues
         """
+        session = get_session()
         try:
-            session = get_session()
             query = session.query(Notification).filter(
                 and_(
                     Notification.notification_type == NotificationType.IN_APP,
@@ -158,12 +179,104 @@ class NotificationController:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des notifications in-app : {e}")
             return []
+        finally:
+            session.close()
+    
+    @staticmethod
+    def get_in_app_feed(
+        recipient_type: str,
+        recipient_id: int,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        limit: int = FEED_PAGE_SIZE,
+        unread_only: bool = False
+    ) -> FeedPage:
+        """
+        Obtenir une page du fil in-app d'un utilisateur, du plus récent au plus ancien
+        
+        La pagination par curseur (created_at, id) suit l'index
+        ix_notifications_feed : le coût d'une page ne dépend pas de sa
+        position dans l'historique.
+        
+        Args:
+            recipient_type: Type de destinataire (student, instructor, admin, user)
+            recipient_id: ID du destinataire
+            cursor: next_cursor de la page précédente (None : première page)
+            limit: Nombre de notifications par page
+            unread_only: Seulement les notifications non lues
+        """
+        session = get_session()
+        try:
+            query = session.query(Notification).filter(
+                Notification.recipient_id == recipient_id,
+                Notification.recipient_type == recipient_type,
+                Notification.notification_type == NotificationType.IN_APP
+            )
+            if unread_only:
+                query = query.filter(Notification.status != NotificationStatus.READ)
+            if cursor:
+                query = query.filter(tuple_(Notification.created_at, Notification.id) < tuple_(*cursor))
+            
+            rows = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1).all()
+            items = rows[:limit]
+            next_cursor = (items[-1].created_at, items[-1].id) if len(rows) > limit else None
+            return FeedPage(items, next_cursor)
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération du fil de notifications : {e}")
+            return FeedPage([], None)
+        finally:
+            session.close()
+    
+    @staticmethod
+    def get_unread_count(recipient_type: str, recipient_id: int) -> int:
+        """
+        Nombre de notifications in-app non lues (compteur maintenu par triggers,
+        une lecture par clé primaire)
+        """
+        session = get_session()
+        try:
+            return unread_count(session, recipient_type, recipient_id)
+        except Exception as e:
+            logger.error(f"Erreur lors du comptage des notifications non lues : {e}")
+            return 0
+        finally:
+            session.close()
+    
+    @staticmethod
+    def mark_all_as_read(recipient_type: str, recipient_id: int) -> int:
+        """
+        Marquer toutes les notifications in-app d'un utilisateur comme lues (un seul UPDATE)
+        
+        Returns:
+            Nombre de notifications marquées
+        """
+        session = get_session()
+        try:
+            now = datetime.now()
+            result = session.execute(
+                update(Notification).where(
+                    Notification.recipient_id == recipient_id,
+                    Notification.recipient_type == recipient_type,
+                    Notification.notification_type == NotificationType.IN_APP,
+                    Notification.status != NotificationStatus.READ
+                ).values(
+                    status=NotificationStatus.READ, read_at=now, next_attempt_at=None, updated_at=now
+                ).execution_options(synchronize_session=False)
+            )
+            session.commit()
+            return result.rowcount
+        except Exception as e:
+            logger.error(f"Erreur lors du marquage des notifications comme lues : {e}")
+            session.rollback()
+            return 0
+        finally:
+            session.close()
     
     @staticmethod
     def mark_notification_as_read(notification_id: int) -> bool:
         """Marquer une notification in-app comme lue"""
+        session = get_session()
         try:
-            session = get_session()
             notification = session.query(Notification).filter(
                 Notification.id == notification_id
             ).first()
@@ -178,6 +291,8 @@ class NotificationController:
             logger.error(f"Erreur lors du marquage de la notification comme lue : {e}")
             session.rollback()
             return False
+        finally:
+            session.close()
     
     @staticmethod
     def delete_notification(notification_id: int) -> bool:
@@ -190,8 +305,8 @@ class NotificationController:
         Returns:
             True si succès, False sinon
         """
+        session = get_session()
         try:
-            session = get_session()
             notification = session.query(Notification).filter(
                 Notification.id == notification_id
             ).first()
@@ -209,6 +324,8 @@ class NotificationController:
             logger.error(f"Erreur lors de la suppression de la notification : {e}")
             session.rollback()
             return False
+        finally:
+            session.close()
     
     @staticmethod
     def search_notifications(query: str, category: Optional[NotificationCategory] = None, 
@@ -226,9 +343,8 @@ class NotificationController:
         Returns:
             Liste des notifications correspondantes
         """
+        session = get_session()
         try:
-            session = get_session()
-            
             filters = []
             
             # Recherche textuelle
@@ -249,7 +365,8 @@ class NotificationController:
                 filters.append(Notification.priority == priority)
             
             if is_read is not None:
-                filters.append(Notification.is_read == is_read)
+                read = Notification.status == NotificationStatus.READ
+                filters.append(read if is_read else ~read)
             
             # Requête
             notifications_query = session.query(Notification)
@@ -267,77 +384,65 @@ class NotificationController:
         except Exception as e:
             logger.error(f"Erreur lors de la recherche de notifications : {e}")
             return []
+        finally:
+            session.close()
+    
+    @staticmethod
+    def _export_row(notif: Notification) -> Dict[str, Any]:
+        """Ligne d'export d'une notification (colonnes en français)"""
+        return {
+            'ID': notif.id,
+            'Type': notif.notification_type.value if notif.notification_type else '',
+            'Catégorie': notif.category.value if notif.category else '',
+            'Priorité': notif.priority.value if notif.priority else '',
+            'Titre': notif.title or '',
+            'Message': notif.message or '',
+            'Destinataire Type': notif.recipient_type or '',
+            'Destinataire ID': notif.recipient_id or '',
+            'Destinataire Nom': notif.recipient_name or '',
+            'Lu': 'Oui' if notif.status == NotificationStatus.READ else 'Non',
+            'Lu Le': notif.read_at.strftime("%Y-%m-%d %H:%M") if notif.read_at else '',
+            'Envoyé': 'Oui' if notif.sent_at else 'Non',
+            'Créé Le': notif.created_at.strftime("%Y-%m-%d %H:%M") if notif.created_at else ''
+        }
     
     @staticmethod
     def export_to_csv(notifications: Optional[List[Notification]] = None, 
-                     filename: Optional[str] = None) -> tuple[bool, str]:
+                     filename: Optional[str] = None, file_format: str = 'csv') -> tuple[bool, str]:
         """
-        Exporter les notifications vers un fichier CSV
+        Exporter les notifications (CSV, CSV gzip ou XLSX)
+        
+        Sans liste fournie, les notifications sont lues par lots (stream_query)
+        et écrites au fil de l'eau.
         
         Args:
             notifications: Liste des notifications à exporter (None = toutes)
-            filename: Nom du fichier CSV (None = généré automatiquement)
+            filename: Nom du fichier (None = généré automatiquement, horodaté)
+            file_format: 'csv', 'csv.gz' ou 'xlsx'
         
         Returns:
             tuple[bool, str]: (succès, message ou chemin du fichier)
         """
         try:
-            session = get_session()
-            
-            # Si aucune notification fournie, récupérer toutes
             if notifications is None:
-                notifications = session.query(Notification).order_by(
-                    Notification.created_at.desc()
-                ).all()
-            
-            if not notifications:
-                return False, "Aucune notification à exporter"
-            
-            # Générer le nom de fichier si non fourni
-            if filename is None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"notifications_export_{timestamp}.csv"
+                statement = select(Notification).order_by(Notification.created_at.desc())
+                rows = stream_query(statement, NotificationController._export_row)
+            else:
+                rows = (NotificationController._export_row(notif) for notif in notifications)
             
-            # Assurer l'extension .csv
-            if not filename.endswith('.csv'):
-                filename += '.csv'
+            # Le nom est horodaté et l'extension ajoutée par l'export
+            name = filename or 'notifications_export'
+            if name.endswith('.csv'):
+                name = name[:-len('.csv')]
             
             # Créer le répertoire d'export si nécessaire
             export_dir = "exports"
             Path(export_dir).mkdir(parents=True, exist_ok=True)
-            filepath = os.path.join(export_dir, filename)
-            
-            # Écrire le fichier CSV
-            with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                fieldnames = [
-                    'ID', 'Type', 'Catégorie', 'Priorité', 'Titre', 'Message',
-                    'Destinataire Type', 'Destinataire ID', 'Destinataire Nom',
-                    'Lu', 'Lu Le', 'Envoyé', 'Créé Le'
-                ]
-                
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for notif in notifications:
-                    writer.writerow({
-                        'ID': notif.id,
-                        'Type': notif.notification_type.value if notif.notification_type else '',
-                        'Catégorie': notif.category.value if notif.category else '',
-                        'Priorité': notif.priority.value if notif.priority else '',
-                        'Titre': notif.title or '',
-                        'Message': notif.message or '',
-                        'Destinataire Type': notif.recipient_type or '',
-                        'Destinataire ID': notif.recipient_id or '',
-                        'Destinataire Nom': notif.recipient_name or '',
-                        'Lu': 'Oui' if notif.is_read else 'Non',
-                        'Lu Le': notif.read_at.strftime("%Y-%m-%d %H:%M") if notif.read_at else '',
-                        'Envoyé': 'Oui' if notif.is_sent else 'Non',
-                        'Créé Le': notif.created_at.strftime("%Y-%m-%d %H:%M") if notif.created_at else ''
-                    })
-            
-            logger.info(f"{len(notifications)} notifications exportées vers {filepath}")
-            return True, filepath
             
+            return get_export_manager().export_stream(
+                rows, name, fieldnames=NOTIFICATION_EXPORT_FIELDS, file_format=file_format, directory=export_dir
+            )
+        
         except Exception as e:
             error_msg = f"Erreur lors de l'export CSV : {str(e)}"
             logger.error(error_msg)
@@ -355,8 +460,8 @@ class NotificationController:
         Returns:
             True si succès, False sinon
         """
+        session = get_session()
         try:
-            session = get_session()
             notification = session.query(Notification).filter(
                 Notification.id == notification_id
             ).first()
@@ -407,54 +512,201 @@ class NotificationController:
             logger.error(f"Erreur lors de l'envoi de la notification {notification_id} : {e}")
             session.rollback()
             return False
+        finally:
+            session.close()
     
-    def process_pending_notifications(self) -> Dict[str, int]:
+    @staticmethod
+    def _claim(session, conditions: list, batch_size: int, lease: int) -> list:
         """
-        Traiter toutes les notifications en attente
+        Réserver un lot de notifications dues (un seul UPDATE ... RETURNING)
+        
+        Les plus prioritaires sont prises en premier ; leur next_attempt_at
+        est repoussé de `lease` secondes pendant l'envoi, ce qui les écarte
+        d'un autre envoi concurrent et les remet en file si le processus
+        s'arrête avant d'enregistrer le résultat.
         
         Returns:
-            Dictionnaire avec le nombre de succès et d'échecs
+            Lignes réservées, de la plus prioritaire à la moins prioritaire
         """
-        pending = self.get_pending_notifications()
+        now = datetime.now()
+        candidates = select(Notification.id).where(*conditions).order_by(
+            Notification.priority_order().desc(), Notification.next_attempt_at
+        ).limit(batch_size)
+        rows = session.execute(
+            update(Notification).where(Notification.id.in_(candidates), *conditions)
+            .values(next_attempt_at=now + timedelta(seconds=lease), updated_at=now)
+            .returning(
+                Notification.id, Notification.notification_type, Notification.priority,
+                Notification.recipient_email, Notification.recipient_phone, Notification.subject,
+                Notification.message, Notification.html_content, Notification.retry_count,
+                Notification.max_retries
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+        session.commit()
+        return sorted(rows, key=lambda row: (-PRIORITY_RANK[row.priority], row.id))
+    
+    def _dispatch(self, conditions: list, label: str) -> Dict[str, int]:
+        """
+        Envoyer en lot les notifications dues répondant aux conditions
         
-        results = {
-            'total': len(pending),
-            'success': 0,
-            'failed': 0
-        }
+        Les notifications sont réservées par lots (claim_batch_size) via
+        l'index de next_attempt_at ; les notifications in-app sont marquées
+        envoyées par un UPDATE ; les emails et SMS passent par
+        NotificationDispatcher (connexions réutilisées, envois parallèles) et
+        leurs statuts sont enregistrés par lots (commit_batch_size). Un échec
+        est reprogrammé avec un délai exponentiel (retry_backoff).
+        """
+        results = {'total': 0, 'success': 0, 'failed': 0}
+        settings = self.notification_manager.config["scheduler"]
+        dispatcher = NotificationDispatcher(self.notification_manager)
+        conditions = [Notification.next_attempt_at <= datetime.now(), *conditions]
+        session = get_session()
         
-        for notification in pending:
-            if self.send_notification(notification.id):
-                results['success'] += 1
-            else:
-                results['failed'] += 1
+        try:
+            # Chaque lot réservé sort de la fenêtre (bail ou résultat) : la boucle se termine
+            while True:
+                rows = self._claim(session, conditions, settings["claim_batch_size"], settings["claim_lease"])
+                if not rows:
+                    break
+                results['total'] += len(rows)
+                now = datetime.now()
+                
+                # In-app : rien à transmettre
+                in_app_ids = [row.id for row in rows if row.notification_type == NotificationType.IN_APP]
+                if in_app_ids:
+                    session.execute(
+                        update(Notification).where(Notification.id.in_(in_app_ids))
+                        .values(status=NotificationStatus.SENT, sent_at=now, next_attempt_at=None, updated_at=now)
+                        .execution_options(synchronize_session=False)
+                    )
+                    session.commit()
+                    results['success'] += len(in_app_ids)
+                
+                attempts = {row.id: (row.retry_count + 1, row.max_retries) for row in rows}
+                jobs = (
+                    DispatchJob(
+                        row.id,
+                        row.notification_type.value,
+                        row.recipient_email if row.notification_type == NotificationType.EMAIL else row.recipient_phone,
+                        row.message,
+                        row.subject,
+                        bool(row.html_content)
+                    )
+                    for row in rows if row.notification_type != NotificationType.IN_APP
+                )
+                
+                sent, failed = [], []
+                for notification_id, success, message in dispatcher.dispatch(jobs):
+                    if success:
+                        sent.append(notification_id)
+                    else:
+                        retry_count, max_retries = attempts[notification_id]
+                        next_attempt = None
+                        if retry_count < max_retries:
+                            next_attempt = datetime.now() + retry_backoff(
+                                retry_count, settings["retry_base_delay"], settings["retry_max_delay"]
+                            )
+                        failed.append((notification_id, message, next_attempt))
+                    if len(sent) + len(failed) >= dispatcher.commit_batch_size:
+                        NotificationController._record_dispatch(session, sent, failed, results)
+                        sent, failed = [], []
+                NotificationController._record_dispatch(session, sent, failed, results)
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de l'envoi groupé des notifications : {e}")
+            session.rollback()
+        finally:
+            session.close()
         
-        logger.info(f"Traitement des notifications : {results['success']}/{results['total']} envoyées")
+        if results['total']:
+            logger.info(f"{label} : {results['success']}/{results['total']} envoyées")
         return results
     
-    def retry_failed_notifications(self) -> Dict[str, int]:
+    @staticmethod
+    def _record_dispatch(session, sent: List[int], failed: List[tuple], results: Dict[str, int]):
         """
-        Réessayer d'envoyer les notifications échouées
+        Enregistrer un lot de résultats d'envoi (un commit)
+        
+        Args:
+            sent: IDs envoyés
+            failed: (ID, erreur, prochaine tentative ou None)
+        """
+        if not sent and not failed:
+            return
+        table = Notification.__table__
+        now = datetime.now()
+        if sent:
+            session.execute(
+                table.update().where(table.c.id.in_(sent)).values(
+                    status=NotificationStatus.DELIVERED, sent_at=now, delivered_at=now,
+                    next_attempt_at=None, updated_at=now
+                )
+            )
+        if failed:
+            session.execute(
+                table.update().where(table.c.id == bindparam('notification_id')).values(
+                    status=NotificationStatus.FAILED,
+                    error_message=bindparam('error'),
+                    retry_count=table.c.retry_count + 1,
+                    next_attempt_at=bindparam('next_attempt'),
+                    updated_at=now
+                ),
+                [
+                    {'notification_id': notification_id, 'error': error, 'next_attempt': next_attempt}
+                    for notification_id, error, next_attempt in failed
+                ]
+            )
+        session.commit()
+        results['success'] += len(sent)
+        results['failed'] += len(failed)
+    
+    def active_types(self) -> List[NotificationType]:
+        """Canaux actifs : les emails / SMS restent en attente tant que leur canal est désactivé"""
+        config = self.notification_manager.config
+        types = [NotificationType.IN_APP]
+        if config["email"]["enabled"]:
+            types.append(NotificationType.EMAIL)
+        if config["sms"]["enabled"]:
+            types.append(NotificationType.SMS)
+        return types
+    
+    def process_due_notifications(self) -> Dict[str, int]:
+        """
+        Envoyer toutes les notifications dues (premiers envois et nouvelles
+        tentatives), par priorité - utilisé par NotificationScheduler
         
         Returns:
             Dictionnaire avec le nombre de succès et d'échecs
         """
-        failed = self.get_failed_notifications_for_retry()
-        
-        results = {
-            'total': len(failed),
-            'success': 0,
-            'failed': 0
-        }
+        return self._dispatch(
+            [Notification.notification_type.in_(self.active_types())],
+            "Planificateur de notifications"
+        )
+    
+    def process_pending_notifications(self) -> Dict[str, int]:
+        """
+        Traiter toutes les notifications en attente dont l'échéance est passée (envoi groupé)
         
-        for notification in failed:
-            if self.send_notification(notification.id):
-                results['success'] += 1
-            else:
-                results['failed'] += 1
+        Returns:
+            Dictionnaire avec le nombre de succès et d'échecs
+        """
+        return self._dispatch(
+            [Notification.status == NotificationStatus.PENDING],
+            "Traitement des notifications"
+        )
+    
+    def retry_failed_notifications(self) -> Dict[str, int]:
+        """
+        Réessayer les notifications échouées dont le délai d'attente est écoulé (envoi groupé)
         
-        logger.info(f"Retry notifications : {results['success']}/{results['total']} envoyées")
-        return results
+        Returns:
+            Dictionnaire avec le nombre de succès et d'échecs
+        """
+        return self._dispatch(
+            [Notification.status == NotificationStatus.FAILED],
+            "Retry notifications"
+        )
     
     # ========== Notifications Automatiques Spécialisées ==========
     
@@ -633,7 +885,13 @@ class NotificationController:
         maintenance: VehicleMaintenance,
         notification_types: List[NotificationType] = None
     ) -> List[Notification]:
-        """Envoyer une alerte de maintenance véhicule (pour admin/gestionnaire)"""
+        """
+        Envoyer une alerte de maintenance véhicule (pour admin/gestionnaire)
+        
+        L'alerte in-app est adressée à chaque administrateur actif
+        (STAFF_RECIPIENT_TYPE, son ID) : elle apparaît dans son badge et se
+        marque comme lue pour lui seul.
+        """
         if notification_types is None:
             notification_types = [NotificationType.IN_APP]
         
@@ -646,46 +904,174 @@ class NotificationController:
         )
         
         for notif_type in notification_types:
-            notification_data = {
-                'notification_type': notif_type,
-                'category': NotificationCategory.MAINTENANCE_ALERT,
-                'priority': NotificationPriority.NORMAL,
-                'recipient_type': 'admin',
-                'message': message,
-                'title': "🔧 Alerte Maintenance Véhicule",
-                'icon': "🔧",
-                'context_data': {
-                    'vehicle_id': vehicle.id,
-                    'maintenance_id': maintenance.id
+            if notif_type == NotificationType.IN_APP:
+                recipients = [
+                    {'recipient_type': STAFF_RECIPIENT_TYPE, 'recipient_id': user_id, 'recipient_name': name}
+                    for user_id, name in self.get_staff_recipients()
+                ]
+            else:
+                recipients = [{'recipient_type': 'admin'}]
+            
+            for recipient in recipients:
+                notification_data = {
+                    'notification_type': notif_type,
+                    'category': NotificationCategory.MAINTENANCE_ALERT,
+                    'priority': NotificationPriority.NORMAL,
+                    **recipient,
+                    'message': message,
+                    'title': "🔧 Alerte Maintenance Véhicule",
+                    'icon': "🔧",
+                    'context_data': {
+                        'vehicle_id': vehicle.id,
+                        'maintenance_id': maintenance.id
+                    }
                 }
-            }
-            
-            notification = self.create_notification(notification_data)
-            if notification:
-                notifications.append(notification)
+                
+                notification = self.create_notification(notification_data)
+                if notification:
+                    notifications.append(notification)
         
         return notifications
     
+    @staticmethod
+    def get_staff_recipients() -> List[Tuple[int, str]]:
+        """Administrateurs actifs (ID, nom) destinataires des alertes in-app"""
+        session = get_session()
+        try:
+            return [
+                tuple(row) for row in session.execute(
+                    select(User.id, User.full_name).where(
+                        User.role == UserRole.ADMIN, User.is_active.is_(True)
+                    ).order_by(User.id)
+                )
+            ]
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des destinataires des alertes : {e}")
+            return []
+        finally:
+            session.close()
+    
+    # ========== Statistiques ==========
+    
+    # ========== Rétention / Archivage ==========
+    
+    def retention_rules(self) -> List[Tuple[str, list]]:
+        """
+        Règles de rétention de la configuration, traduites en conditions SQL
+        
+        Une règle de catégorie remplace la règle générale du même statut.
+        Les notifications en attente ne sont jamais archivées, les échecs
+        seulement une fois les tentatives épuisées (next_attempt_at NULL).
+        
+        Returns:
+            Liste de (libellé, conditions)
+        """
+        settings = self.notification_manager.config["retention"]
+        now = datetime.now()
+        overrides: Dict[NotificationStatus, List[NotificationCategory]] = {}
+        rules = []
+        
+        def parse_status(name: str) -> Optional[NotificationStatus]:
+            status = NotificationStatus.__members__.get(name)
+            if status is None or status == NotificationStatus.PENDING:
+                logger.warning(f"Rétention : statut ignoré ({name})")
+                return None
+            return status
+        
+        def conditions(status: NotificationStatus, days: int) -> list:
+            result = [Notification.status == status, Notification.created_at < now - timedelta(days=days)]
+            if status == NotificationStatus.FAILED:
+                result.append(Notification.next_attempt_at.is_(None))
+            return result
+        
+        for category_name, days_by_status in settings.get("categories", {}).items():
+            category = NotificationCategory.__members__.get(category_name)
+            if category is None:
+                logger.warning(f"Rétention : catégorie inconnue ({category_name})")
+                continue
+            for status_name, days in days_by_status.items():
+                status = parse_status(status_name)
+                if status is None:
+                    continue
+                overrides.setdefault(status, []).append(category)
+                if days is not None:
+                    rules.append((
+                        f"{category.name}/{status.name}",
+                        [Notification.category == category, *conditions(status, days)]
+                    ))
+        
+        for status_name, days in settings.get("days", {}).items():
+            status = parse_status(status_name)
+            if status is None or days is None:
+                continue
+            rule = conditions(status, days)
+            if status in overrides:
+                rule.append(Notification.category.notin_(overrides[status]))
+            rules.append((status.name, rule))
+        
+        return rules
+    
+    def apply_retention(self) -> Dict[str, int]:
+        """
+        Archiver les notifications anciennes selon les règles de rétention
+        
+        Les lignes sont déplacées par lots (une transaction par lot) vers
+        notifications_archive.
+        
+        Returns:
+            Dict règle -> nombre de notifications archivées
+        """
+        settings = self.notification_manager.config["retention"]
+        if not settings.get("enabled", True):
+            return {}
+        
+        results = {}
+        try:
+            engine = get_engine()
+            for label, conditions in self.retention_rules():
+                moved = archive_notifications(engine, conditions, settings["chunk_size"])
+                if moved:
+                    results[label] = moved
+            if results:
+                logger.info(f"Rétention des notifications : {sum(results.values())} archivées {results}")
+        except Exception as e:
+            logger.error(f"Erreur lors de l'archivage des notifications : {e}")
+        return results
+    
     # ========== Statistiques ==========
     
     @staticmethod
     def get_notification_statistics(
         start_date: Optional[date] = None,
-        end_date: Optional[date] = None
+        end_date: Optional[date] = None,
+        include_archived: bool = False
     ) -> dict:
-        """Obtenir les statistiques des notifications"""
+        """
+        Obtenir les statistiques des notifications (comptages groupés en SQL)
+        
+        Args:
+            start_date: Début de période (date de création)
+            end_date: Fin de période (incluse)
+            include_archived: Ajouter les notifications archivées (clé 'archived' : leur nombre)
+        """
+        session = get_session()
         try:
-            session = get_session()
-            query = session.query(Notification)
-            
-            if start_date:
-                query = query.filter(Notification.created_at >= datetime.combine(start_date, datetime.min.time()))
-            if end_date:
-                query = query.filter(Notification.created_at <= datetime.combine(end_date, datetime.max.time()))
-            
-            notifications = query.all()
-            
-            if not notifications:
+            tables = [Notification.__table__]
+            if include_archived:
+                tables.append(notifications_archive)
+            
+            counts = []
+            for table in tables:
+                columns = [table.c.notification_type, table.c.category, table.c.status, table.c.priority]
+                query = select(*columns, func.count()).group_by(*columns)
+                if start_date:
+                    query = query.where(table.c.created_at >= datetime.combine(start_date, datetime.min.time()))
+                if end_date:
+                    query = query.where(table.c.created_at <= datetime.combine(end_date, datetime.max.time()))
+                counts.append(session.execute(query).all())
+            
+            total = sum(row[-1] for rows in counts for row in rows)
+            if not total:
                 return {
                     'total': 0,
                     'by_type': {},
@@ -695,35 +1081,25 @@ class NotificationController:
                 }
             
             stats = {
-                'total': len(notifications),
-                'by_type': {},
-                'by_category': {},
-                'by_status': {},
-                'by_priority': {}
+                'total': total,
+                'by_type': {notif_type.value: 0 for notif_type in NotificationType},
+                'by_category': {category.value: 0 for category in NotificationCategory},
+                'by_status': {status.value: 0 for status in NotificationStatus},
+                'by_priority': {priority.value: 0 for priority in NotificationPriority}
             }
-            
-            # Par type
-            for notif_type in NotificationType:
-                count = len([n for n in notifications if n.notification_type == notif_type])
-                stats['by_type'][notif_type.value] = count
-            
-            # Par catégorie
-            for category in NotificationCategory:
-                count = len([n for n in notifications if n.category == category])
-                stats['by_category'][category.value] = count
-            
-            # Par statut
-            for status in NotificationStatus:
-                count = len([n for n in notifications if n.status == status])
-                stats['by_status'][status.value] = count
-            
-            # Par priorité
-            for priority in NotificationPriority:
-                count = len([n for n in notifications if n.priority == priority])
-                stats['by_priority'][priority.value] = count
+            for rows in counts:
+                for notif_type, category, status, priority, count in rows:
+                    stats['by_type'][notif_type.value] += count
+                    stats['by_category'][category.value] += count
+                    stats['by_status'][status.value] += count
+                    stats['by_priority'][priority.value] += count
+            if include_archived:
+                stats['archived'] = sum(row[-1] for row in counts[1])
             
             return stats
             
         except Exception as e:
             logger.error(f"Erreur lors du calcul des statistiques : {e}")
             return {}
+        finally:
+            session.close()
@@ -0,0 +1,162 @@
+"""
+Planificateur des notifications (thread de fond)
+
+Au lieu d'interroger toute la table à intervalle fixe, le planificateur
+garde en mémoire un tas des prochaines échéances (colonne indexée
+next_attempt_at : date planifiée d'un premier envoi, ou date de la
+prochaine tentative après un échec) et dort exactement jusqu'à la plus
+proche :
+    - create_notification() le réveille (notify_scheduled) quand une
+      notification plus proche est créée
+    - les échéances sont relues depuis l'index après chaque envoi et toutes
+      les resync_interval secondes (notifications créées par un autre
+      processus)
+    - l'envoi passe par NotificationController.process_due_notifications :
+      lots réservés par priorité, échecs reprogrammés avec un délai
+      exponentiel et aléatoire
+"""
+
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select
+
+from src.models import Notification, get_session
+from src.utils import get_logger
+from .notification_controller import NotificationController
+
+logger = get_logger()
+
+_scheduler: Optional['NotificationScheduler'] = None
+_scheduler_lock = threading.Lock()
+
+
+class NotificationScheduler(threading.Thread):
+    """Thread d'envoi des notifications à leur échéance"""
+    
+    def __init__(self, controller: Optional[NotificationController] = None):
+        """
+        Args:
+            controller: Contrôleur utilisé pour les envois (configuration
+                "scheduler" de son gestionnaire de notifications)
+        """
+        super().__init__(name="notification-scheduler", daemon=True)
+        self.controller = controller or NotificationController()
+        settings = self.controller.notification_manager.config["scheduler"]
+        self.resync_interval = settings["resync_interval"]
+        self.heap_size = settings["heap_size"]
+        self._heap: List[datetime] = []
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._resync_at = 0.0
+    
+    def notify(self, when: Optional[datetime] = None):
+        """Ajouter une échéance (None = immédiatement) et réveiller le thread"""
+        with self._condition:
+            heapq.heappush(self._heap, when or datetime.now())
+            self._condition.notify()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Arrêter le planificateur (l'envoi en cours se termine)"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self.is_alive():
+            self.join(timeout)
+    
+    def _load_upcoming(self):
+        """Relire les prochaines échéances depuis l'index"""
+        session = get_session()
+        try:
+            upcoming = session.execute(
+                select(Notification.next_attempt_at)
+                .where(
+                    Notification.next_attempt_at.isnot(None),
+                    Notification.notification_type.in_(self.controller.active_types())
+                )
+                .order_by(Notification.next_attempt_at)
+                .limit(self.heap_size)
+            ).scalars().all()
+        finally:
+            session.close()
+        
+        with self._condition:
+            self._heap = list(upcoming)  # Liste triée : déjà un tas
+        self._resync_at = time.monotonic() + self.resync_interval
+    
+    def _wait_until_due(self) -> bool:
+        """
+        Dormir jusqu'à la prochaine échéance, un réveil ou une relecture
+        
+        Returns:
+            True si des notifications sont dues, False sinon (arrêt ou relecture)
+        """
+        with self._condition:
+            while not self._stopping:
+                now = datetime.now()
+                if self._heap and self._heap[0] <= now:
+                    while self._heap and self._heap[0] <= now:
+                        heapq.heappop(self._heap)
+                    return True
+                timeout = self._resync_at - time.monotonic()
+                if timeout <= 0:
+                    return False
+                if self._heap:
+                    timeout = min(timeout, (self._heap[0] - now).total_seconds())
+                self._condition.wait(timeout)
+            return False
+    
+    def run(self):
+        logger.info("Planificateur de notifications démarré")
+        while not self._stopping:
+            try:
+                if time.monotonic() >= self._resync_at:
+                    self._load_upcoming()
+                if self._wait_until_due():
+                    results = self.controller.process_due_notifications()
+                    if results['total']:
+                        # Envois terminés, échecs reprogrammés : échéances modifiées
+                        self._load_upcoming()
+            except Exception as e:
+                logger.error(f"Erreur du planificateur de notifications : {e}")
+                with self._condition:
+                    self._condition.wait(self.resync_interval)
+        logger.info("Planificateur de notifications arrêté")
+
+
+def start_notification_scheduler() -> Optional[NotificationScheduler]:
+    """
+    Démarrer le planificateur global (sans effet s'il tourne déjà)
+    
+    Returns:
+        Le planificateur, ou None s'il est désactivé dans la configuration
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None or not _scheduler.is_alive():
+            controller = NotificationController()
+            if not controller.notification_manager.config["scheduler"]["enabled"]:
+                return None
+            _scheduler = NotificationScheduler(controller)
+            _scheduler.start()
+        return _scheduler
+
+
+def stop_notification_scheduler(timeout: Optional[float] = 10):
+    """Arrêter le planificateur global"""
+    global _scheduler
+    with _scheduler_lock:
+        scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.stop(timeout)
+
+
+def notify_scheduled(when: Optional[datetime]):
+    """Signaler une nouvelle échéance au planificateur global s'il tourne"""
+    scheduler = _scheduler
+    if scheduler is not None and when is not None:
+        scheduler.notify(when)
+
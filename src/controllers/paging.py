@@ -0,0 +1,229 @@
+"""
+Listes paginées côté base : filtres, tri et pagination par clé
+
+Chaque contrôleur décrit sa liste par un ListSpec (colonnes sélectionnées,
+colonne de date, filtres et tris autorisés) et expose
+list_page(filters, sort, offset, limit, after) qui renvoie une Page de
+lignes légères (tuples nommés SQLAlchemy, sans objets ORM) avec le total.
+
+Pagination par clé (keyset) : avec le tri par défaut sur (date, id) (ou
+le tri par id), la page suivante se demande avec after=page.next_cursor. La requête devient
+WHERE (date, id) < (:date, :id) ORDER BY date DESC, id DESC LIMIT n, qui
+parcourt l'index sur la date (l'id y est implicite) : le coût d'une page
+ne dépend pas de sa position ni de la taille de la table, contrairement à
+OFFSET.
+
+Filtres communs à toutes les listes :
+    'search'     Saisie libre (index FTS5, LIKE en repli)
+    'date_from'  Date minimale (incluse)
+    'date_to'    Date maximale (incluse)
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import DateTime, and_, func, or_, select, tuple_
+
+from src.models import matching_ids_select, search_index_exists
+
+DEFAULT_PAGE_SIZE = 50
+DATE_SORT = 'date'
+ID_SORT = 'id'
+KEYSET_SORTS = (DATE_SORT, ID_SORT)  # Tris à colonne non nulle, paginables par clé
+
+# Filtre: colonne (égalité, ou IN pour une liste) ou fonction valeur -> condition SQL
+FilterDef = Union[Any, Callable[[Any], Any]]
+
+
+@dataclass
+class Page:
+    """Page de résultats d'une liste"""
+    rows: List[Any]  # Tuples nommés (Row SQLAlchemy)
+    total: int  # Nombre de lignes correspondant aux filtres (-1 si non compté)
+    offset: int = 0
+    limit: Optional[int] = DEFAULT_PAGE_SIZE
+    next_cursor: Optional[Tuple[Any, int]] = None  # (date ou id, id) de la dernière ligne
+    
+    @property
+    def has_more(self) -> bool:
+        if self.limit is None or len(self.rows) < self.limit:
+            return False
+        return self.total < 0 or self.offset + len(self.rows) < self.total
+
+
+@dataclass(frozen=True)
+class ListSpec:
+    """
+    Description d'une liste paginée
+    
+    Attributes:
+        columns: Colonnes sélectionnées, la première étant l'id
+        date_column: Colonne de date du tri par défaut et de la pagination par clé
+        joins: Jointures externes (entité, condition) pour les colonnes liées
+        filters: Nom -> colonne ou fonction(valeur) -> condition
+        sorts: Nom -> colonne ('date' et 'id' sont toujours disponibles)
+        search_entity: Entité de l'index plein texte ('students'...)
+        search_columns: Colonnes de la recherche LIKE de repli
+    """
+    columns: Tuple[Any, ...]
+    date_column: Any
+    joins: Tuple[Tuple[Any, Any], ...] = ()
+    filters: Dict[str, FilterDef] = field(default_factory=dict)
+    sorts: Dict[str, Any] = field(default_factory=dict)
+    search_entity: Optional[str] = None
+    search_columns: Tuple[Any, ...] = ()
+    
+    @property
+    def id_column(self):
+        return self.columns[0]
+
+
+def _parse_sort(spec: ListSpec, sort: Optional[str]) -> Tuple[str, Any, bool]:
+    """'-date' -> ('date', colonne, descendant)"""
+    sort = sort or f"-{DATE_SORT}"
+    descending = sort.startswith('-')
+    name = sort.lstrip('-+')
+    if name == DATE_SORT:
+        return name, spec.date_column, descending
+    if name == ID_SORT:
+        return name, spec.id_column, descending
+    if name not in spec.sorts:
+        raise ValueError(f"Tri inconnu : {name}")
+    return name, spec.sorts[name], descending
+
+
+def _date_bounds(spec: ListSpec, date_from, date_to) -> list:
+    """Conditions de période, bornes incluses (jour entier pour un DateTime)"""
+    conditions = []
+    column = spec.date_column
+    is_datetime = isinstance(column.type, DateTime)
+    if date_from is not None:
+        if is_datetime and not isinstance(date_from, datetime):
+            date_from = datetime.combine(date_from, time.min)
+        conditions.append(column >= date_from)
+    if date_to is not None:
+        if is_datetime and not isinstance(date_to, datetime):
+            conditions.append(column < datetime.combine(date_to + timedelta(days=1), time.min))
+        else:
+            conditions.append(column <= date_to)
+    return conditions
+
+
+def _search_condition(session, spec: ListSpec, text_value: str):
+    text_value = (text_value or "").strip()
+    if not text_value:
+        return None
+    if spec.search_entity and search_index_exists(session.connection()):
+        ids = matching_ids_select(text_value, spec.search_entity)
+        # Saisie sans mot indexable (ponctuation seule): aucun résultat
+        return spec.id_column.in_(ids) if ids is not None else spec.id_column.is_(None)
+    pattern = f"%{text_value}%"
+    return or_(*(column.ilike(pattern) for column in spec.search_columns))
+
+
+def build_conditions(session, spec: ListSpec, filters: Optional[Dict[str, Any]]) -> list:
+    """
+    Conditions SQL des filtres d'une liste
+    
+    Les valeurs None sont ignorées (filtre inactif).
+    
+    Raises:
+        ValueError: Filtre non déclaré dans le ListSpec
+    """
+    filters = dict(filters or {})
+    conditions = _date_bounds(spec, filters.pop('date_from', None), filters.pop('date_to', None))
+    
+    search = _search_condition(session, spec, filters.pop('search', None))
+    if search is not None:
+        conditions.append(search)
+    
+    for name, value in filters.items():
+        if value is None:
+            continue
+        if name not in spec.filters:
+            raise ValueError(f"Filtre inconnu : {name}")
+        definition = spec.filters[name]
+        if callable(definition) and not hasattr(definition, 'in_'):
+            conditions.append(definition(value))
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            conditions.append(definition.in_(list(value)))
+        else:
+            conditions.append(definition == value)
+    return conditions
+
+
+def _with_joins(statement, spec: ListSpec):
+    for target, onclause in spec.joins:
+        statement = statement.outerjoin(target, onclause)
+    return statement
+
+
+def list_page(session, spec: ListSpec, filters: Optional[Dict[str, Any]] = None,
+              sort: Optional[str] = None, offset: int = 0,
+              limit: Optional[int] = DEFAULT_PAGE_SIZE,
+              after: Optional[Sequence[Any]] = None, with_total: bool = True) -> Page:
+    """
+    Page d'une liste, filtrée et triée par la base
+    
+    Args:
+        session: Session SQLAlchemy
+        spec: Description de la liste
+        filters: Nom du filtre -> valeur (voir ListSpec.filters et filtres communs)
+        sort: Nom du tri, préfixé par '-' pour un ordre décroissant (défaut: '-date')
+        offset: Nombre de lignes à sauter ; avec after, position de la page
+                (non appliquée en SQL, sert au calcul de has_more)
+        limit: Taille de la page (None: toutes les lignes, 0: total seul)
+        after: Curseur page.next_cursor de la page précédente (tri par date ou id)
+        with_total: Compter les lignes correspondant aux filtres
+    
+    Returns:
+        Page
+    """
+    conditions = build_conditions(session, spec, filters)
+    sort_name, sort_column, descending = _parse_sort(spec, sort)
+    id_column = spec.id_column
+    
+    total = -1
+    if with_total:
+        count_statement = _with_joins(select(func.count(id_column)).select_from(id_column.table), spec)
+        if conditions:
+            count_statement = count_statement.where(and_(*conditions))
+        total = session.execute(count_statement).scalar() or 0
+    
+    rows = []
+    if limit is None or limit > 0:
+        statement = _with_joins(select(*spec.columns), spec)
+        page_conditions = list(conditions)
+        
+        if after is not None:
+            if sort_name not in KEYSET_SORTS:
+                raise ValueError("La pagination par clé n'est possible qu'avec le tri par date ou id")
+            key = tuple_(sort_column, id_column)
+            page_conditions.append(key < tuple(after) if descending else key > tuple(after))
+        
+        if page_conditions:
+            statement = statement.where(and_(*page_conditions))
+        
+        if descending:
+            statement = statement.order_by(sort_column.desc(), id_column.desc())
+        else:
+            statement = statement.order_by(sort_column.asc(), id_column.asc())
+        
+        if after is None and offset:
+            statement = statement.offset(offset)
+        if limit is not None:
+            statement = statement.limit(limit)
+        rows = session.execute(statement).all()
+    
+    next_cursor = None
+    if rows and sort_name in KEYSET_SORTS:
+        last = rows[-1]
+        next_cursor = (last._mapping[sort_column], last._mapping[id_column])
+    
+    return Page(rows=rows, total=total, offset=offset, limit=limit, next_cursor=next_cursor)
+
+
+def empty_page(limit: Optional[int] = DEFAULT_PAGE_SIZE) -> Page:
+    """Page vide (erreur de requête)"""
+    return Page(rows=[], total=0, limit=limit)
@@ -6,11 +6,50 @@ from typing import List, Optional, Dict, Any
 from datetime import date
 from decimal import Decimal
 
-from src.models import Payment, PaymentMethod, Student, get_session
-from src.utils import get_logger, get_export_manager
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from src.models import (
+    Payment, PaymentMethod, Student, get_session, session_scope,
+    rollup_totals, payments_column, revenue_column
+)
+from src.utils import get_logger, get_export_manager, stream_query
+from .paging import DEFAULT_PAGE_SIZE, ListSpec, Page, empty_page, list_page
 
 logger = get_logger()
 
+# Relation lue par les vues après fermeture de la session
+_LOAD_STUDENT = joinedload(Payment.student)
+
+# Liste paginée des paiements (voir paging.list_page)
+_LIST_SPEC = ListSpec(
+    columns=(
+        Payment.id, Payment.payment_date, Payment.receipt_number, Student.full_name.label('student_name'),
+        Payment.amount, Payment.payment_method, Payment.category, Payment.is_validated,
+        Payment.validated_by, Payment.is_cancelled,
+    ),
+    date_column=Payment.payment_date,
+    joins=((Student, Student.id == Payment.student_id),),
+    filters={
+        'student_id': Payment.student_id,
+        'method': Payment.payment_method,
+        'category': Payment.category,
+        'validated': Payment.is_validated,
+        'cancelled': Payment.is_cancelled,
+    },
+    sorts={
+        'receipt': Payment.receipt_number,
+        'student': Student.full_name,
+        'amount': Payment.amount,
+        'method': Payment.payment_method,
+        'category': Payment.category,
+        'validated': Payment.is_validated,
+        'validated_by': Payment.validated_by,
+    },
+    search_entity='payments',
+    search_columns=(Student.full_name, Payment.receipt_number),
+)
+
 # Constantes de validation
 MIN_AMOUNT = 0.01
 MAX_AMOUNT = 100000.00
@@ -88,16 +127,20 @@ class PaymentController:
             error_msg = f"Erreur lors de la création du paiement : {str(e)}"
             logger.error(error_msg)
             return False, error_msg, None
+        finally:
+            session.close()
     
     @staticmethod
     def get_payments_by_student(student_id: int) -> List[Payment]:
         """Obtenir les paiements d'un élève"""
+        session = get_session()
         try:
-            session = get_session()
-            return session.query(Payment).filter(Payment.student_id == student_id).order_by(Payment.payment_date.desc()).all()
+            return session.query(Payment).options(_LOAD_STUDENT).filter(Payment.student_id == student_id).order_by(Payment.payment_date.desc()).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des paiements : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_monthly_revenue(year: int, month: int) -> float:
@@ -111,11 +154,11 @@ class PaymentController:
         Returns:
             Montant total des paiements du mois
         """
+        session = get_session()
         try:
             from datetime import datetime
             from sqlalchemy import extract
             
-            session = get_session()
             payments = session.query(Payment).filter(
                 extract('year', Payment.payment_date) == year,
                 extract('month', Payment.payment_date) == month,
@@ -127,6 +170,24 @@ class PaymentController:
         except Exception as e:
             logger.error(f"Erreur lors du calcul du CA mensuel : {e}")
             return 0.0
+        finally:
+            session.close()
+    
+    @staticmethod
+    def receipt_data(payment: Payment) -> Dict[str, Any]:
+        """Données du reçu d'un paiement (élève chargé)"""
+        student = payment.student
+        return {
+            'receipt_number': payment.receipt_number,
+            'date': payment.payment_date.strftime('%d/%m/%Y'),
+            'student_name': student.full_name,
+            'student_cin': student.cin,
+            'student_phone': student.phone,
+            'amount': payment.amount,
+            'payment_method': payment.payment_method.value,
+            'description': payment.description or 'Paiement formation',
+            'validated_by': payment.validated_by or 'Administration',
+        }
     
     @staticmethod
     def generate_receipt_pdf(payment_id: int) -> tuple[bool, str]:
@@ -139,27 +200,15 @@ class PaymentController:
         Returns:
             Tuple (success, filepath_or_error)
         """
+        session = get_session()
         try:
-            session = get_session()
             payment = session.query(Payment).filter(Payment.id == payment_id).first()
             
             if not payment:
                 return False, "Paiement introuvable"
             
-            student = payment.student
-            
             # Préparer les données du reçu
-            receipt_data = {
-                'receipt_number': payment.receipt_number,
-                'date': payment.payment_date.strftime('%d/%m/%Y'),
-                'student_name': student.full_name,
-                'student_cin': student.cin,
-                'student_phone': student.phone,
-                'amount': payment.amount,
-                'payment_method': payment.payment_method.value,
-                'description': payment.description or 'Paiement formation',
-                'validated_by': payment.validated_by or 'Administration',
-            }
+            receipt_data = PaymentController.receipt_data(payment)
             
             # Générer le PDF professionnel avec ReportLab
             from src.utils.pdf_generator import get_pdf_generator
@@ -170,37 +219,71 @@ class PaymentController:
             error_msg = f"Erreur lors de la génération du reçu : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def get_all_payments() -> List[Payment]:
         """Obtenir tous les paiements"""
+        session = get_session()
         try:
-            session = get_session()
-            payments = session.query(Payment).order_by(Payment.payment_date.desc()).all()
+            payments = session.query(Payment).options(_LOAD_STUDENT).order_by(Payment.payment_date.desc()).all()
             return payments
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des paiements : {e}")
             return []
+        finally:
+            session.close()
+    
+    @staticmethod
+    def list_page(filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None,
+                  offset: int = 0, limit: Optional[int] = DEFAULT_PAGE_SIZE,
+                  after: Optional[tuple] = None, with_total: bool = True) -> Page:
+        """
+        Page de paiements filtrée, triée et paginée par la base
+        
+        Args:
+            filters: search, date_from, date_to, student_id, method, category, validated, cancelled
+            sort: date (défaut '-date'), id, receipt, student, amount, method, category, validated, validated_by
+            offset: Nombre de lignes à sauter
+            limit: Taille de la page (None: tout, 0: total seul)
+            after: Curseur page.next_cursor de la page précédente (tri par date ou id)
+            with_total: Compter les lignes correspondant aux filtres (sinon total = -1)
+        
+        Returns:
+            Page de lignes (id, payment_date, receipt_number, student_name, amount,
+            payment_method, category, is_validated, validated_by, is_cancelled)
+        """
+        try:
+            with session_scope() as session:
+                return list_page(session, _LIST_SPEC, filters, sort, offset, limit, after, with_total)
+        except Exception as e:
+            logger.error(f"Erreur lors de la pagination des paiements : {e}")
+            return empty_page(limit)
     
     @staticmethod
     def get_payment_by_id(payment_id: int) -> Optional[Payment]:
         """Récupérer un paiement par son ID"""
+        session = get_session()
         try:
-            session = get_session()
-            return session.query(Payment).filter(Payment.id == payment_id).first()
+            return session.query(Payment).options(_LOAD_STUDENT).filter(Payment.id == payment_id).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du paiement {payment_id} : {e}")
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def get_payment_by_receipt(receipt_number: str) -> Optional[Payment]:
         """Récupérer un paiement par son numéro de reçu"""
+        session = get_session()
         try:
-            session = get_session()
-            return session.query(Payment).filter(Payment.receipt_number == receipt_number).first()
+            return session.query(Payment).options(_LOAD_STUDENT).filter(Payment.receipt_number == receipt_number).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du paiement (reçu {receipt_number}) : {e}")
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def update_payment(payment_id: int, **kwargs) -> tuple[bool, str]:
@@ -277,6 +360,8 @@ class PaymentController:
             error_msg = f"Erreur lors de la mise à jour du paiement : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def cancel_payment(payment_id: int, reason: str = "") -> tuple[bool, str]:
@@ -337,6 +422,8 @@ class PaymentController:
             error_msg = f"Erreur lors de l'annulation du paiement : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def validate_payment(payment_id: int, validated_by: str) -> tuple[bool, str]:
@@ -350,8 +437,8 @@ class PaymentController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             payment = session.query(Payment).filter(Payment.id == payment_id).first()
             
             if not payment:
@@ -368,6 +455,8 @@ class PaymentController:
             error_msg = f"Erreur lors de la validation du paiement : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def search_payments(query: str) -> List[Payment]:
@@ -380,12 +469,12 @@ class PaymentController:
         Returns:
             Liste des paiements correspondants
         """
+        session = get_session()
         try:
             from sqlalchemy import or_
-            session = get_session()
             search_term = f"%{query}%"
             
-            payments = session.query(Payment).join(Student).filter(
+            payments = session.query(Payment).options(_LOAD_STUDENT).join(Student).filter(
                 or_(
                     Payment.receipt_number.like(search_term),
                     Payment.description.like(search_term),
@@ -398,6 +487,8 @@ class PaymentController:
         except Exception as e:
             logger.error(f"Erreur lors de la recherche de paiements : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_payments_by_date_range(start_date: date, end_date: date) -> List[Payment]:
@@ -411,15 +502,17 @@ class PaymentController:
         Returns:
             Liste des paiements
         """
+        session = get_session()
         try:
-            session = get_session()
-            return session.query(Payment).filter(
+            return session.query(Payment).options(_LOAD_STUDENT).filter(
                 Payment.payment_date >= start_date,
                 Payment.payment_date <= end_date
             ).order_by(Payment.payment_date.desc()).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des paiements : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_payments_by_method(payment_method: PaymentMethod) -> List[Payment]:
@@ -432,14 +525,16 @@ class PaymentController:
         Returns:
             Liste des paiements
         """
+        session = get_session()
         try:
-            session = get_session()
-            return session.query(Payment).filter(
+            return session.query(Payment).options(_LOAD_STUDENT).filter(
                 Payment.payment_method == payment_method
             ).order_by(Payment.payment_date.desc()).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des paiements : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_payment_statistics(start_date: Optional[date] = None,
@@ -455,56 +550,29 @@ class PaymentController:
             Dictionnaire de statistiques
         """
         try:
-            session = get_session()
-            query = session.query(Payment).filter(Payment.is_cancelled == False)  # IMPORTANT
-            
-            if start_date:
-                query = query.filter(Payment.payment_date >= start_date)
-            if end_date:
-                query = query.filter(Payment.payment_date <= end_date)
-            
-            payments = query.all()
-            
-            if not payments:
-                return {
-                    'total_payments': 0,
-                    'total_amount': 0.0,
-                    'average_amount': 0.0,
-                    'by_method': {},
-                    'validated_count': 0,
-                    'pending_count': 0,
-                    'cancelled_count': 0
+            with session_scope() as session:
+                # Agrégats journaliers (daily_rollups) : une ligne par jour de la période
+                totals = rollup_totals(session, start_date, end_date)
+            
+            by_method = {
+                method.value: {
+                    'count': totals[payments_column(method)],
+                    'amount': round(totals[revenue_column(method)] / 100, 2)
                 }
-            
-            total = len(payments)
-            total_amount = sum(float(p.amount) for p in payments)
-            average_amount = total_amount / total if total > 0 else 0.0
-            
-            # Statistiques par méthode de paiement
-            by_method = {}
-            for method in PaymentMethod:
-                method_payments = [p for p in payments if p.payment_method == method]
-                if method_payments:
-                    by_method[method.value] = {
-                        'count': len(method_payments),
-                        'amount': round(sum(float(p.amount) for p in method_payments), 2)
-                    }
-            
-            # Compter aussi les annulés (pour info)
-            all_payments_query = session.query(Payment)
-            if start_date:
-                all_payments_query = all_payments_query.filter(Payment.payment_date >= start_date)
-            if end_date:
-                all_payments_query = all_payments_query.filter(Payment.payment_date <= end_date)
-            cancelled_count = all_payments_query.filter(Payment.is_cancelled == True).count()
+                for method in PaymentMethod if totals[payments_column(method)]
+            }
+            total = sum(stats['count'] for stats in by_method.values())
+            total_amount = sum(totals[revenue_column(method)] for method in PaymentMethod) / 100
+            validated_count = totals['payments_validated']
+            cancelled_count = totals['payments_cancelled']
             
             return {
                 'total_payments': total,
                 'total_amount': round(total_amount, 2),
-                'average_amount': round(average_amount, 2),
+                'average_amount': round(total_amount / total, 2) if total > 0 else 0.0,
                 'by_method': by_method,
-                'validated_count': len([p for p in payments if p.is_validated]),
-                'pending_count': len([p for p in payments if not p.is_validated and not p.is_cancelled]),
+                'validated_count': validated_count,
+                'pending_count': total - validated_count,
                 'cancelled_count': cancelled_count
             }
             
@@ -512,45 +580,49 @@ class PaymentController:
             logger.error(f"Erreur lors du calcul des statistiques : {e}")
             return {}
     
+    @staticmethod
+    def _export_row(payment: Payment) -> Dict[str, Any]:
+        """Ligne d'export d'un paiement, avec nom et CIN de l'élève"""
+        payment_dict = payment.to_dict()
+        payment_dict['student_name'] = payment.student.full_name if payment.student else ''
+        payment_dict['student_cin'] = payment.student.cin if payment.student else ''
+        return payment_dict
+    
     @staticmethod
     def export_to_csv(payments: Optional[List[Payment]] = None,
-                     filename: Optional[str] = None) -> tuple[bool, str]:
+                     filename: Optional[str] = None, file_format: str = 'csv',
+                     include_cancelled: bool = True, directory: Optional[str] = None) -> tuple[bool, str]:
         """
-        Exporter les paiements vers un fichier CSV
+        Exporter les paiements, avec nom et CIN de l'élève (CSV, CSV gzip ou XLSX)
+        
+        Sans liste fournie, la table est lue par lots (stream_query) et écrite
+        au fil de l'eau : la mémoire ne dépend pas du nombre de lignes.
         
         Args:
             payments: Liste de paiements (optionnel, tous si None)
             filename: Nom du fichier (optionnel)
+            file_format: 'csv', 'csv.gz' ou 'xlsx'
+            include_cancelled: Exporter aussi les paiements annulés (table entière)
+            directory: Répertoire de destination (None = répertoire des exports)
         
         Returns:
             Tuple (success, filepath/message)
         """
         try:
             if payments is None:
-                payments = PaymentController.get_all_payments()
-            
-            if not payments:
-                return False, "Aucun paiement à exporter"
-            
-            # Préparer les données avec infos élève
-            data = []
-            for payment in payments:
-                payment_dict = payment.to_dict()
-                if payment.student:
-                    payment_dict['student_name'] = payment.student.full_name
-                    payment_dict['student_cin'] = payment.student.cin
-                else:
-                    payment_dict['student_name'] = ''
-                    payment_dict['student_cin'] = ''
-                data.append(payment_dict)
-            
-            # Exporter avec ExportManager
-            export_mgr = get_export_manager()
-            filepath = export_mgr.export_to_csv(data, 'payments', filename)
-            
-            logger.info(f"{len(payments)} paiements exportés vers {filepath}")
-            return True, filepath
-            
+                statement = select(Payment).options(
+                    joinedload(Payment.student)
+                ).order_by(Payment.payment_date.desc())
+                if not include_cancelled:
+                    statement = statement.where(Payment.is_cancelled.is_(False))
+                rows = stream_query(statement, PaymentController._export_row)
+            else:
+                rows = (PaymentController._export_row(item) for item in payments)
+            
+            return get_export_manager().export_stream(
+                rows, filename or 'payments', file_format=file_format, directory=directory
+            )
+        
         except Exception as e:
             error_msg = f"Erreur lors de l'export : {str(e)}"
             logger.error(error_msg)
@@ -0,0 +1,345 @@
+"""
+Index en mémoire des créneaux occupés (moniteurs, véhicules, élèves)
+
+Un arbre d'intervalles par ressource, construit depuis les sessions non
+annulées. Les tests de disponibilité et de conflits ne touchent plus la
+base : O(log n) par ressource au lieu d'une requête.
+
+L'index est tenu à jour par des événements ORM : toute création,
+modification ou suppression d'une Session (y compris les suppressions en
+cascade, ex: suppression d'un élève) est relevée au flush et appliquée au
+commit ; un rollback l'annule. Les UPDATE/DELETE en masse sur les sessions
+forcent une reconstruction au prochain accès.
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, object_session
+
+from src.models import Session, SessionStatus, session_scope
+from src.utils import get_logger
+from src.utils.interval_tree import IntervalTree
+
+logger = get_logger()
+
+# Ressource -> colonne de la session qui la désigne
+RESOURCE_FIELDS = {
+    'instructor': 'instructor_id',
+    'vehicle': 'vehicle_id',
+    'student': 'student_id',
+}
+
+# Clé de Session.info : modifications en attente de commit (ID -> état, None si supprimée)
+PENDING_CHANGES_KEY = 'schedule_index_changes'
+STALE_KEY = 'schedule_index_stale'
+
+
+def session_snapshot(session_obj: Session) -> Optional[dict]:
+    """État indexé d'une session (None si elle n'occupe aucun créneau)"""
+    if session_obj.status == SessionStatus.CANCELLED:
+        return None
+    snapshot = {field: getattr(session_obj, field) for field in RESOURCE_FIELDS.values()}
+    snapshot['start_datetime'] = session_obj.start_datetime
+    snapshot['end_datetime'] = session_obj.end_datetime
+    return snapshot
+
+
+class ScheduleIndex:
+    """Index des créneaux occupés, par ressource"""
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._trees: Dict[Tuple[str, int], IntervalTree] = {}
+        self._session_resources: Dict[int, List[Tuple[str, int]]] = {}  # session -> ressources indexées
+        self._loaded = False
+        self._build_lock = threading.Lock()  # Une seule construction à la fois
+        self._changes_during_build: Optional[Dict[int, Optional[dict]]] = None
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+    
+    def rebuild(self, force: bool = True):
+        """
+        (Re)construire l'index depuis les sessions non annulées
+        
+        Les modifications validées pendant la lecture sont rejouées sur
+        l'index construit (elles peuvent manquer au résultat de la requête).
+        
+        Args:
+            force: Reconstruire même si l'index est déjà chargé
+        """
+        with self._build_lock:
+            with self._lock:
+                if self._loaded and not force:
+                    return  # Construit par un autre thread entre-temps
+                self._changes_during_build = {}
+            
+            try:
+                with session_scope() as session:
+                    rows = session.query(
+                        Session.id, Session.student_id, Session.instructor_id, Session.vehicle_id,
+                        Session.start_datetime, Session.end_datetime
+                    ).filter(Session.status != SessionStatus.CANCELLED).all()
+            except Exception:
+                with self._lock:
+                    self._changes_during_build = None
+                raise
+            
+            with self._lock:
+                self._trees.clear()
+                self._session_resources.clear()
+                for session_id, student_id, instructor_id, vehicle_id, start, end in rows:
+                    self._add(session_id, {
+                        'student_id': student_id,
+                        'instructor_id': instructor_id,
+                        'vehicle_id': vehicle_id,
+                    }, start, end)
+                for session_id, snapshot in self._changes_during_build.items():
+                    self._apply(session_id, snapshot)
+                self._changes_during_build = None
+                self._loaded = True
+        
+        logger.debug(f"Index des créneaux construit : {len(rows)} sessions")
+    
+    def invalidate(self):
+        """Forcer une reconstruction au prochain accès (modifications hors contrôleur)"""
+        with self._lock:
+            self._loaded = False
+    
+    def ensure_loaded(self):
+        """Construire l'index au premier usage"""
+        if not self._loaded:
+            self.rebuild(force=False)
+    
+    # ------------------------------------------------------------------
+    # Mise à jour
+    # ------------------------------------------------------------------
+    
+    def sync_session(self, session_obj: Session):
+        """
+        Refléter l'état d'une session enregistrée (création ou modification)
+        
+        Args:
+            session_obj: Session ORM après commit
+        """
+        self.apply_changes({session_obj.id: session_snapshot(session_obj)})
+    
+    def remove_session(self, session_id: int):
+        """Retirer une session supprimée"""
+        self.apply_changes({session_id: None})
+    
+    def apply_changes(self, changes: Dict[int, Optional[dict]]):
+        """
+        Appliquer des modifications validées
+        
+        Args:
+            changes: ID de session -> état (session_snapshot), None si supprimée ou annulée
+        """
+        with self._lock:
+            if self._changes_during_build is not None:
+                self._changes_during_build.update(changes)  # Rejouées en fin de construction
+                return
+            if not self._loaded:
+                return  # Seront lues lors de la construction
+            for session_id, snapshot in changes.items():
+                self._apply(session_id, snapshot)
+    
+    def _apply(self, session_id: int, snapshot: Optional[dict]):
+        self._remove(session_id)
+        if snapshot is not None:
+            self._add(session_id, snapshot, snapshot['start_datetime'], snapshot['end_datetime'])
+    
+    def _add(self, session_id: int, resource_ids: dict, start: datetime, end: datetime):
+        if start is None or end is None or not start < end:
+            return
+        resources = []
+        for resource, field in RESOURCE_FIELDS.items():
+            resource_id = resource_ids.get(field)
+            if resource_id is None:
+                continue
+            key = (resource, resource_id)
+            self._trees.setdefault(key, IntervalTree()).add(start, end, session_id)
+            resources.append(key)
+        self._session_resources[session_id] = resources
+    
+    def _remove(self, session_id: int):
+        for key in self._session_resources.pop(session_id, []):
+            tree = self._trees.get(key)
+            if tree is not None:
+                tree.remove(session_id)
+                if not len(tree):
+                    del self._trees[key]
+    
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+    
+    def is_free(self, resource: str, resource_id: int, start: datetime, end: datetime,
+                exclude_session_id: Optional[int] = None) -> bool:
+        """
+        La ressource est-elle libre sur [start, end) ?
+        
+        Args:
+            resource: 'instructor', 'vehicle' ou 'student'
+            resource_id: ID de la ressource
+            start: Début du créneau
+            end: Fin du créneau (exclue)
+            exclude_session_id: Session à ignorer (édition)
+        """
+        self.ensure_loaded()
+        with self._lock:
+            tree = self._trees.get((resource, resource_id))
+            return tree is None or tree.is_free(start, end, exclude_session_id)
+    
+    def find_conflicts(self, resource: str, resource_id: int, start: datetime, end: datetime,
+                       exclude_session_id: Optional[int] = None) -> List[int]:
+        """
+        IDs des sessions de la ressource chevauchant [start, end)
+        
+        Returns:
+            Liste d'IDs de sessions, triée par heure de début
+        """
+        self.ensure_loaded()
+        with self._lock:
+            tree = self._trees.get((resource, resource_id))
+            if tree is None:
+                return []
+            return [sid for sid in tree.overlapping(start, end) if sid != exclude_session_id]
+    
+    def check_session(self, session_data: dict,
+                      exclude_session_id: Optional[int] = None) -> Dict[str, List[int]]:
+        """
+        Tous les conflits d'une session proposée
+        
+        Args:
+            session_data: Dict avec start_datetime, end_datetime et les IDs
+                          student_id / instructor_id / vehicle_id (optionnels)
+            exclude_session_id: Session à ignorer (édition)
+        
+        Returns:
+            Dict ressource -> IDs des sessions en conflit (ressources en conflit uniquement)
+        """
+        conflicts = {}
+        for resource, field in RESOURCE_FIELDS.items():
+            resource_id = session_data.get(field)
+            if resource_id is None:
+                continue
+            ids = self.find_conflicts(
+                resource, resource_id,
+                session_data['start_datetime'], session_data['end_datetime'],
+                exclude_session_id
+            )
+            if ids:
+                conflicts[resource] = ids
+        return conflicts
+    
+    def validate_batch(self, proposals: List[dict]) -> List[dict]:
+        """
+        Valider en un appel un lot de sessions proposées (ex: une semaine)
+        
+        Chaque proposition est comparée aux sessions existantes et aux
+        propositions précédentes du lot.
+        
+        Args:
+            proposals: Liste de dicts au format de check_session (clé 'id'
+                       optionnelle pour une session existante modifiée)
+        
+        Returns:
+            Liste alignée sur proposals de dicts:
+            {'valid': bool, 'conflicts': {ressource: [IDs sessions]},
+             'batch_conflicts': {ressource: [indices de propositions]}}
+        """
+        self.ensure_loaded()
+        batch_trees: Dict[Tuple[str, int], IntervalTree] = {}
+        results = []
+        
+        with self._lock:
+            for index, proposal in enumerate(proposals):
+                start, end = proposal['start_datetime'], proposal['end_datetime']
+                conflicts = self.check_session(proposal, proposal.get('id'))
+                batch_conflicts = {}
+                
+                for resource, field in RESOURCE_FIELDS.items():
+                    resource_id = proposal.get(field)
+                    if resource_id is None:
+                        continue
+                    tree = batch_trees.setdefault((resource, resource_id), IntervalTree())
+                    overlapping = tree.overlapping(start, end)
+                    if overlapping:
+                        batch_conflicts[resource] = overlapping
+                    if start < end:
+                        tree.add(start, end, index)
+                
+                results.append({
+                    'valid': not conflicts and not batch_conflicts,
+                    'conflicts': conflicts,
+                    'batch_conflicts': batch_conflicts,
+                })
+        
+        return results
+
+
+_schedule_index: Optional[ScheduleIndex] = None
+_schedule_index_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------
+# Synchronisation par événements ORM
+# ----------------------------------------------------------------------
+
+def _record_change(target: Session, snapshot: Optional[dict]):
+    orm_session = object_session(target)
+    if orm_session is not None and target.id is not None:
+        orm_session.info.setdefault(PENDING_CHANGES_KEY, {})[target.id] = snapshot
+
+
+@event.listens_for(Session, 'after_insert')
+@event.listens_for(Session, 'after_update')
+def _session_saved(mapper, connection, target):
+    _record_change(target, session_snapshot(target))
+
+
+@event.listens_for(Session, 'after_delete')
+def _session_deleted(mapper, connection, target):
+    _record_change(target, None)
+
+
+@event.listens_for(OrmSession, 'do_orm_execute')
+def _bulk_statement(orm_execute_state):
+    """UPDATE/DELETE en masse sur les sessions : lignes touchées inconnues"""
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is Session:
+            orm_execute_state.session.info[STALE_KEY] = True
+
+
+@event.listens_for(OrmSession, 'after_commit')
+def _apply_committed(orm_session):
+    changes = orm_session.info.pop(PENDING_CHANGES_KEY, None)
+    stale = orm_session.info.pop(STALE_KEY, False)
+    if _schedule_index is None:
+        return
+    if stale:
+        _schedule_index.invalidate()
+    elif changes:
+        _schedule_index.apply_changes(changes)
+
+
+@event.listens_for(OrmSession, 'after_rollback')
+def _discard_rolled_back(orm_session):
+    orm_session.info.pop(PENDING_CHANGES_KEY, None)
+    orm_session.info.pop(STALE_KEY, None)
+
+
+def get_schedule_index() -> ScheduleIndex:
+    """Obtenir l'index des créneaux partagé"""
+    global _schedule_index
+    if _schedule_index is None:
+        with _schedule_index_lock:
+            if _schedule_index is None:
+                _schedule_index = ScheduleIndex()
+    return _schedule_index
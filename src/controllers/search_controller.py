@@ -3,88 +3,283 @@ Contrôleur pour la recherche globale multi-entités
 Phase 4 - Recherche avancée
 """
 
-from typing import Dict, List, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Callable, Iterator, Optional, Tuple
+
 from src.controllers import (
     StudentController, InstructorController, VehicleController,
     SessionController, PaymentController, ExamController,
     MaintenanceController, NotificationController
 )
+from sqlalchemy.orm import joinedload
+
+from src.models import (
+    Student, Instructor, Vehicle, Exam, Payment, VehicleMaintenance, Notification,
+    get_session, get_scoped_session, remove_scoped_session, search_documents, search_entity
+)
+from src.models.search_index import group_by_entity
 from src.utils import get_logger
 
 logger = get_logger()
 
+# Catégorie de résultats -> modèle (ordre d'affichage)
+SEARCH_MODELS = {
+    'students': Student,
+    'instructors': Instructor,
+    'vehicles': Vehicle,
+    'exams': Exam,
+    'payments': Payment,
+    'maintenances': VehicleMaintenance,
+    'notifications': Notification,
+}
+
+# Relations chargées avec les objets (lues après fermeture de la session)
+_SEARCH_LOADS = {
+    'exams': (joinedload(Exam.student),),
+    'payments': (joinedload(Payment.student),),
+    'maintenances': (joinedload(VehicleMaintenance.vehicle),),
+}
+
+# Échéance par défaut de la recherche parallèle (secondes)
+DEFAULT_DEADLINE = 2.0
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """Résultat léger de recherche (pas d'objet ORM)"""
+    category: str
+    id: int
+    title: str
+    details: str = ""
+
+
+@dataclass
+class SearchResults:
+    """Résultats d'une recherche parallèle"""
+    query: str
+    hits: Dict[str, List[SearchHit]] = field(default_factory=dict)
+    completed: List[str] = field(default_factory=list)  # Catégories terminées (ordre d'arrivée)
+    timed_out: List[str] = field(default_factory=list)  # Catégories abandonnées à l'échéance
+    elapsed_seconds: float = 0.0
+    
+    @property
+    def total(self) -> int:
+        return sum(len(hits) for hits in self.hits.values())
+
+
+# Recherches LIKE de repli par catégorie (sans index FTS5)
+_LIKE_SEARCHES = {
+    'students': StudentController.search_students,
+    'instructors': InstructorController.search_instructors,
+    'vehicles': VehicleController.search_vehicles,
+    'exams': ExamController.search_exams,
+    'payments': PaymentController.search_payments,
+    'maintenances': lambda query: MaintenanceController.search_maintenances(provider_name=query),
+    'notifications': NotificationController.search_notifications,
+}
+
+# Libellés (titre, détails) d'un objet ORM pour la recherche de repli
+_LIKE_LABELS = {
+    'students': lambda o: (o.full_name, f"{o.cin} {o.phone}"),
+    'instructors': lambda o: (o.full_name, f"{o.cin} {o.phone}"),
+    'vehicles': lambda o: (o.plate_number, f"{o.make} {o.model}"),
+    'exams': lambda o: (o.student.full_name if o.student else "", o.summons_number or ""),
+    'payments': lambda o: (o.student.full_name if o.student else "", o.receipt_number or ""),
+    'maintenances': lambda o: (o.provider_name or "", o.description or ""),
+    'notifications': lambda o: (o.title or "", o.message or ""),
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Pool de threads partagé de la recherche (un thread par catégorie)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=len(SEARCH_MODELS), thread_name_prefix="search")
+    return _executor
+
+
+def _search_category(category: str, query: str, limit: int, offset: int) -> List[SearchHit]:
+    """Rechercher une catégorie (thread worker, session dédiée)"""
+    try:
+        rows = search_entity(get_scoped_session(), query, category, limit, offset)
+        return [
+            SearchHit(category, entity_id, title, " ".join(details.split()))
+            for entity_id, title, details in rows
+        ]
+    except Exception as e:
+        logger.debug(f"Index de recherche indisponible pour {category}, recherche LIKE : {e}")
+    finally:
+        # Threads du pool réutilisés : ne pas garder la session d'une recherche à l'autre
+        remove_scoped_session()
+    
+    label = _LIKE_LABELS[category]
+    return [
+        SearchHit(category, obj.id, *label(obj))
+        for obj in _LIKE_SEARCHES[category](query)[offset:offset + limit]
+    ]
+
 
 class SearchController:
     """Contrôleur pour effectuer des recherches globales"""
     
+    # Résultats maximum par catégorie (les plus pertinents)
+    MAX_RESULTS_PER_CATEGORY = 50
+    
     @staticmethod
     def global_search(query: str) -> Dict[str, List[Any]]:
         """
         Recherche globale dans toutes les entités
         
+        Utilise l'index plein texte FTS5 (préfixes, sans accents, classé par
+        pertinence, MAX_RESULTS_PER_CATEGORY par catégorie) ; à défaut, les
+        recherches LIKE de chaque contrôleur.
+        
         Args:
             query: Terme de recherche
-            
+        
         Returns:
             Dictionnaire avec les résultats par catégorie
         """
         if not query or len(query.strip()) < 2:
             return {}
         
-        results = {}
+        try:
+            results = SearchController._indexed_search(query, SearchController.MAX_RESULTS_PER_CATEGORY)
+            logger.debug(f"Recherche globale '{query}' : {sum(len(v) for v in results.values())} résultat(s)")
+            return results
+        except Exception as e:
+            logger.warning(f"Index de recherche indisponible, recherche LIKE : {e}")
         
+        return SearchController._like_search(query)
+    
+    @staticmethod
+    def _indexed_search(query: str, limit_per_category: int) -> Dict[str, List[Any]]:
+        """Recherche via l'index FTS5, objets chargés en une requête par catégorie"""
+        session = get_session()
         try:
-            # Recherche dans les étudiants
-            students = StudentController.search_students(query)
-            if students:
-                results['students'] = students
-                logger.info(f"{len(students)} étudiant(s) trouvé(s)")
-            
-            # Recherche dans les moniteurs
-            instructors = InstructorController.search_instructors(query)
-            if instructors:
-                results['instructors'] = instructors
-                logger.info(f"{len(instructors)} moniteur(s) trouvé(s)")
-            
-            # Recherche dans les véhicules
-            vehicles = VehicleController.search_vehicles(query)
-            if vehicles:
-                results['vehicles'] = vehicles
-                logger.info(f"{len(vehicles)} véhicule(s) trouvé(s)")
-            
-            # Recherche dans les examens
-            exams = ExamController.search_exams(query)
-            if exams:
-                results['exams'] = exams
-                logger.info(f"{len(exams)} examen(s) trouvé(s)")
-            
-            # Recherche dans les paiements
-            payments = PaymentController.search_payments(query)
-            if payments:
-                results['payments'] = payments
-                logger.info(f"{len(payments)} paiement(s) trouvé(s)")
+            grouped = group_by_entity(search_documents(session, query, limit_per_entity=limit_per_category))
             
-            # Recherche dans les maintenances
-            maintenances = MaintenanceController.search_maintenances(query)
-            if maintenances:
-                results['maintenances'] = maintenances
-                logger.info(f"{len(maintenances)} maintenance(s) trouvée(s)")
-            
-            # Recherche dans les notifications
-            notifications = NotificationController.search_notifications(query)
-            if notifications:
-                results['notifications'] = notifications
-                logger.info(f"{len(notifications)} notification(s) trouvée(s)")
+            results = {}
+            for category, model in SEARCH_MODELS.items():
+                ids = grouped.get(category)
+                if not ids:
+                    continue
+                objects = {
+                    obj.id: obj
+                    for obj in session.query(model).options(*_SEARCH_LOADS.get(category, ())).filter(model.id.in_(ids))
+                }
+                # Conserver l'ordre de pertinence de l'index
+                ranked = [objects[entity_id] for entity_id in ids if entity_id in objects]
+                if ranked:
+                    results[category] = ranked
+            return results
+        finally:
+            session.close()
+    
+    @staticmethod
+    def _like_search(query: str) -> Dict[str, List[Any]]:
+        """Recherche de repli (LIKE) via les contrôleurs, sans index plein texte"""
+        results = {}
+        
+        try:
+            for category, search in _LIKE_SEARCHES.items():
+                found = search(query)
+                if found:
+                    results[category] = found
             
             total = sum(len(v) for v in results.values())
-            logger.info(f"Recherche globale '{query}' : {total} résultat(s) total")
+            logger.debug(f"Recherche globale (LIKE) '{query}' : {total} résultat(s) total")
             
             return results
-            
+        
         except Exception as e:
             logger.error(f"Erreur lors de la recherche globale : {e}")
             return {}
     
+    @staticmethod
+    def iter_search(query: str, limit: int = 20, offset: int = 0,
+                    categories: Optional[List[str]] = None,
+                    deadline: float = DEFAULT_DEADLINE) -> Iterator[Tuple[str, List[SearchHit]]]:
+        """
+        Recherche parallèle: résultats émis catégorie par catégorie dès qu'ils arrivent
+        
+        Chaque catégorie est cherchée dans un thread du pool, avec sa propre
+        session. Les catégories non terminées à l'échéance sont abandonnées.
+        
+        Args:
+            query: Terme de recherche
+            limit: Nombre de résultats par catégorie
+            offset: Décalage dans chaque catégorie (pagination)
+            categories: Catégories à interroger (défaut: toutes)
+            deadline: Délai maximum en secondes pour l'ensemble de la recherche
+        
+        Yields:
+            (catégorie, liste de SearchHit) dans l'ordre de fin des recherches
+        """
+        if not query or len(query.strip()) < 2:
+            return
+        
+        executor = _get_executor()
+        futures = {
+            executor.submit(_search_category, category, query, limit, offset): category
+            for category in (categories or list(SEARCH_MODELS))
+        }
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                yield futures[future], future.result()
+        except FuturesTimeoutError:
+            pending = [category for future, category in futures.items() if not future.done()]
+            logger.warning(f"Recherche '{query}' : délai dépassé pour {', '.join(pending)}")
+        finally:
+            # Appelant arrêté ou délai dépassé: ne pas lancer les recherches en attente
+            for future in futures:
+                future.cancel()
+    
+    @staticmethod
+    def search(query: str, limit: int = 20, offset: int = 0,
+               categories: Optional[List[str]] = None,
+               deadline: float = DEFAULT_DEADLINE,
+               on_partial: Optional[Callable[[str, List[SearchHit]], None]] = None) -> SearchResults:
+        """
+        Recherche parallèle paginée avec échéance globale
+        
+        Args:
+            query: Terme de recherche
+            limit: Nombre de résultats par catégorie
+            offset: Décalage dans chaque catégorie (pagination)
+            categories: Catégories à interroger (défaut: toutes)
+            deadline: Délai maximum en secondes
+            on_partial: Appelé (catégorie, résultats) dès qu'une catégorie est prête
+        
+        Returns:
+            SearchResults (catégories abandonnées dans timed_out)
+        """
+        started = time.perf_counter()
+        requested = categories or list(SEARCH_MODELS)
+        results = SearchResults(query=query)
+        
+        for category, hits in SearchController.iter_search(query, limit, offset, requested, deadline):
+            if hits:
+                results.hits[category] = hits
+            results.completed.append(category)
+            if on_partial is not None:
+                on_partial(category, hits)
+        
+        if query and len(query.strip()) >= 2:
+            results.timed_out = [c for c in requested if c not in results.completed]
+        results.elapsed_seconds = time.perf_counter() - started
+        logger.debug(
+            f"Recherche '{query}' : {results.total} résultat(s) en {results.elapsed_seconds * 1000:.0f} ms"
+        )
+        return results
+    
     @staticmethod
     def get_search_summary(results: Dict[str, List[Any]]) -> str:
         """
@@ -92,7 +287,7 @@ class SearchController:
         
         Args:
             results: Résultats de la recherche globale
-            
+        
         Returns:
             Chaîne de résumé formatée
         """
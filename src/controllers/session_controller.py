@@ -2,14 +2,93 @@
 Contrôleur pour la gestion des sessions de conduite
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Any
 from datetime import datetime, date, timedelta
 
-from src.models import Session, SessionStatus, get_session
-from src.utils import get_logger, get_export_manager
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import joinedload
+
+from src.models import Session, SessionStatus, get_session, Student, Instructor, Vehicle, session_scope
+from src.utils import get_logger, get_export_manager, stream_query
+from .paging import DEFAULT_PAGE_SIZE, ListSpec, Page, empty_page, list_page
+from .schedule_index import get_schedule_index
 
 logger = get_logger()
 
+# Relations lues par les vues après fermeture de la session
+_LOAD_RELATED = (joinedload(Session.student), joinedload(Session.instructor), joinedload(Session.vehicle))
+
+# Liste paginée des sessions (voir paging.list_page)
+_LIST_SPEC = ListSpec(
+    columns=(
+        Session.id, Session.start_datetime, Session.end_datetime,
+        Student.full_name.label('student_name'), Instructor.full_name.label('instructor_name'),
+        Vehicle.plate_number.label('vehicle_plate'), Session.session_type, Session.status,
+        Session.student_id, Session.instructor_id, Session.vehicle_id,
+    ),
+    date_column=Session.start_datetime,
+    joins=(
+        (Student, Student.id == Session.student_id),
+        (Instructor, Instructor.id == Session.instructor_id),
+        (Vehicle, Vehicle.id == Session.vehicle_id),
+    ),
+    filters={
+        'student_id': Session.student_id,
+        'instructor_id': Session.instructor_id,
+        'vehicle_id': Session.vehicle_id,
+        'status': Session.status,
+        'session_type': Session.session_type,
+    },
+    sorts={
+        'student': Student.full_name,
+        'instructor': Instructor.full_name,
+        'vehicle': Vehicle.plate_number,
+        'session_type': Session.session_type,
+        'status': Session.status,
+    },
+    search_columns=(Student.full_name, Instructor.full_name, Vehicle.plate_number),
+)
+
+
+def session_stat_columns() -> list:
+    """
+    Agrégats des sessions pour une requête groupée par ressource
+    
+    Sessions comptées par statut (SUM(CASE ...)) et heures des sessions
+    terminées calculées en SQL, labels : total_sessions, completed_sessions,
+    cancelled_sessions, total_hours.
+    """
+    completed = Session.status == SessionStatus.COMPLETED
+    hours = (func.julianday(Session.end_datetime) - func.julianday(Session.start_datetime)) * 24
+    return [
+        func.count(Session.id).label('total_sessions'),
+        func.coalesce(func.sum(case((completed, 1), else_=0)), 0).label('completed_sessions'),
+        func.coalesce(func.sum(case((Session.status == SessionStatus.CANCELLED, 1), else_=0)), 0)
+        .label('cancelled_sessions'),
+        func.coalesce(func.sum(case((completed, hours), else_=0)), 0).label('total_hours'),
+    ]
+
+
+def session_period_conditions(start_date: Optional[date] = None, end_date: Optional[date] = None) -> list:
+    """Conditions sur le début des sessions, jours entiers inclus"""
+    conditions = []
+    if start_date:
+        conditions.append(Session.start_datetime >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        conditions.append(Session.start_datetime <= datetime.combine(end_date, datetime.max.time()))
+    return conditions
+
+
+def session_counts(row) -> Dict[str, Any]:
+    """Compteurs d'une ligne agrégée par session_stat_columns"""
+    return {
+        'total_sessions': row.total_sessions,
+        'completed_sessions': row.completed_sessions,
+        'cancelled_sessions': row.cancelled_sessions,
+        'pending_sessions': row.total_sessions - row.completed_sessions - row.cancelled_sessions,
+        'total_hours': round(float(row.total_hours), 2),
+    }
+
 
 class SessionController:
     """Contrôleur pour gérer les sessions"""
@@ -17,29 +96,60 @@ class SessionController:
     @staticmethod
     def get_sessions_by_date_range(start_date: date, end_date: date) -> List[Session]:
         """Obtenir les sessions dans une plage de dates"""
+        session_db = get_session()
         try:
-            session_db = get_session()
             start_datetime = datetime.combine(start_date, datetime.min.time())
             end_datetime = datetime.combine(end_date, datetime.max.time())
             
-            return session_db.query(Session).filter(
+            return session_db.query(Session).options(*_LOAD_RELATED).filter(
                 Session.start_datetime >= start_datetime,
                 Session.start_datetime <= end_datetime
             ).order_by(Session.start_datetime).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des sessions : {e}")
             return []
+        finally:
+            session_db.close()
     
     @staticmethod
     def get_all_sessions() -> List[Session]:
         """Obtenir toutes les sessions"""
+        session = get_session()
         try:
-            session = get_session()
-            sessions = session.query(Session).order_by(Session.start_datetime.desc()).all()
+            sessions = session.query(Session).options(*_LOAD_RELATED).order_by(Session.start_datetime.desc()).all()
             return sessions
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des sessions : {e}")
             return []
+        finally:
+            session.close()
+    
+    @staticmethod
+    def list_page(filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None,
+                  offset: int = 0, limit: Optional[int] = DEFAULT_PAGE_SIZE,
+                  after: Optional[tuple] = None, with_total: bool = True) -> Page:
+        """
+        Page de sessions filtrée, triée et paginée par la base
+        
+        Args:
+            filters: search, date_from, date_to, student_id, instructor_id, vehicle_id, status, session_type
+            sort: date (défaut '-date'), id, student, instructor, vehicle, session_type, status
+            offset: Nombre de lignes à sauter
+            limit: Taille de la page (None: tout, 0: total seul)
+            after: Curseur page.next_cursor de la page précédente (tri par date ou id)
+            with_total: Compter les lignes correspondant aux filtres (sinon total = -1)
+        
+        Returns:
+            Page de lignes (id, start_datetime, end_datetime, student_name,
+            instructor_name, vehicle_plate, session_type, status, student_id,
+            instructor_id, vehicle_id)
+        """
+        try:
+            with session_scope() as session:
+                return list_page(session, _LIST_SPEC, filters, sort, offset, limit, after, with_total)
+        except Exception as e:
+            logger.error(f"Erreur lors de la pagination des sessions : {e}")
+            return empty_page(limit)
     
     @staticmethod
     def get_today_sessions() -> List[Session]:
@@ -57,22 +167,39 @@ class SessionController:
     @staticmethod
     def get_session_by_id(session_id: int) -> Optional[Session]:
         """Obtenir une session par ID"""
+        session_db = get_session()
         try:
-            session_db = get_session()
-            return session_db.query(Session).filter(Session.id == session_id).first()
+            return session_db.query(Session).options(*_LOAD_RELATED).filter(Session.id == session_id).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de la session : {e}")
             return None
+        finally:
+            session_db.close()
     
     @staticmethod
     def get_sessions_by_student(student_id: int) -> List[Session]:
         """Obtenir toutes les sessions d'un élève"""
+        session_db = get_session()
         try:
-            session_db = get_session()
-            return session_db.query(Session).filter(Session.student_id == student_id).order_by(Session.start_datetime.desc()).all()
+            return session_db.query(Session).options(*_LOAD_RELATED).filter(Session.student_id == student_id).order_by(Session.start_datetime.desc()).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des sessions de l'élève : {e}")
             return []
+        finally:
+            session_db.close()
+    
+    @staticmethod
+    def _load_conflicts(resource: str, resource_id: int, start_dt: datetime, end_dt: datetime,
+                        exclude_session_id: Optional[int]) -> List[Session]:
+        """Sessions en conflit: IDs via l'index des créneaux, objets chargés seulement si conflit"""
+        ids = get_schedule_index().find_conflicts(resource, resource_id, start_dt, end_dt, exclude_session_id)
+        if not ids:
+            return []
+        session_db = get_session()
+        try:
+            return session_db.query(Session).options(*_LOAD_RELATED).filter(Session.id.in_(ids)).order_by(Session.start_datetime).all()
+        finally:
+            session_db.close()
     
     @staticmethod
     def check_instructor_conflict(instructor_id: int, start_dt: datetime, end_dt: datetime, 
@@ -90,18 +217,9 @@ class SessionController:
             Liste des sessions en conflit
         """
         try:
-            session_db = get_session()
-            query = session_db.query(Session).filter(
-                Session.instructor_id == instructor_id,
-                Session.status != SessionStatus.CANCELLED,
-                Session.start_datetime < end_dt,
-                Session.end_datetime > start_dt
+            return SessionController._load_conflicts(
+                'instructor', instructor_id, start_dt, end_dt, exclude_session_id
             )
-            
-            if exclude_session_id:
-                query = query.filter(Session.id != exclude_session_id)
-            
-            return query.all()
         except Exception as e:
             logger.error(f"Erreur lors de la vérification des conflits moniteur : {e}")
             return []
@@ -122,18 +240,9 @@ class SessionController:
             Liste des sessions en conflit
         """
         try:
-            session_db = get_session()
-            query = session_db.query(Session).filter(
-                Session.vehicle_id == vehicle_id,
-                Session.status != SessionStatus.CANCELLED,
-                Session.start_datetime < end_dt,
-                Session.end_datetime > start_dt
+            return SessionController._load_conflicts(
+                'vehicle', vehicle_id, start_dt, end_dt, exclude_session_id
             )
-            
-            if exclude_session_id:
-                query = query.filter(Session.id != exclude_session_id)
-            
-            return query.all()
         except Exception as e:
             logger.error(f"Erreur lors de la vérification des conflits véhicule : {e}")
             return []
@@ -154,20 +263,47 @@ class SessionController:
             Liste des sessions en conflit
         """
         try:
-            session_db = get_session()
-            query = session_db.query(Session).filter(
-                Session.student_id == student_id,
-                Session.status != SessionStatus.CANCELLED,
-                Session.start_datetime < end_dt,
-                Session.end_datetime > start_dt
+            return SessionController._load_conflicts(
+                'student', student_id, start_dt, end_dt, exclude_session_id
             )
+        except Exception as e:
+            logger.error(f"Erreur lors de la vérification des conflits élève : {e}")
+            return []
+    
+    @staticmethod
+    def check_conflicts(session_data: dict, exclude_session_id: Optional[int] = None) -> Dict[str, List[int]]:
+        """
+        Tous les conflits (moniteur, véhicule, élève) d'une session proposée
+        
+        Args:
+            session_data: Dictionnaire avec start_datetime, end_datetime,
+                          student_id, instructor_id, vehicle_id
+            exclude_session_id: ID de session à exclure (pour édition)
             
-            if exclude_session_id:
-                query = query.filter(Session.id != exclude_session_id)
+        Returns:
+            Dict ressource ('instructor', 'vehicle', 'student') -> IDs des sessions en conflit
+        """
+        try:
+            return get_schedule_index().check_session(session_data, exclude_session_id)
+        except Exception as e:
+            logger.error(f"Erreur lors de la vérification des conflits : {e}")
+            return {}
+    
+    @staticmethod
+    def validate_sessions(proposals: List[dict]) -> List[dict]:
+        """
+        Valider un lot de sessions proposées (ex: planning d'une semaine)
+        
+        Args:
+            proposals: Liste de dictionnaires au format de check_conflicts
             
-            return query.all()
+        Returns:
+            Liste de {'valid', 'conflicts', 'batch_conflicts'} alignée sur proposals
+        """
+        try:
+            return get_schedule_index().validate_batch(proposals)
         except Exception as e:
-            logger.error(f"Erreur lors de la vérification des conflits élève : {e}")
+            logger.error(f"Erreur lors de la validation du lot de sessions : {e}")
             return []
     
     @staticmethod
@@ -181,9 +317,8 @@ class SessionController:
         Returns:
             Session créée ou None si erreur
         """
+        session_db = get_session()
         try:
-            session_db = get_session()
-            
             # Créer la session
             new_session = Session(
                 student_id=session_data['student_id'],
@@ -207,6 +342,8 @@ class SessionController:
             logger.error(f"Erreur lors de la création de la session : {e}")
             session_db.rollback()
             return None
+        finally:
+            session_db.close()
     
     @staticmethod
     def update_session(session_id: int, session_data: dict) -> bool:
@@ -220,8 +357,8 @@ class SessionController:
         Returns:
             True si succès, False sinon
         """
+        session_db = get_session()
         try:
-            session_db = get_session()
             session_obj = session_db.query(Session).filter(Session.id == session_id).first()
             
             if not session_obj:
@@ -241,6 +378,8 @@ class SessionController:
             logger.error(f"Erreur lors de la mise à jour de la session : {e}")
             session_db.rollback()
             return False
+        finally:
+            session_db.close()
     
     @staticmethod
     def delete_session(session_id: int) -> bool:
@@ -253,8 +392,8 @@ class SessionController:
         Returns:
             True si succès, False sinon
         """
+        session_db = get_session()
         try:
-            session_db = get_session()
             session_obj = session_db.query(Session).filter(Session.id == session_id).first()
             
             if not session_obj:
@@ -270,57 +409,59 @@ class SessionController:
             logger.error(f"Erreur lors de la suppression de la session : {e}")
             session_db.rollback()
             return False
+        finally:
+            session_db.close()
+    
+    @staticmethod
+    def _export_row(session_obj: Session) -> Dict[str, Any]:
+        """Ligne d'export d'une session, avec élève, moniteur et véhicule"""
+        return {
+            'id': session_obj.id,
+            'student_id': session_obj.student_id,
+            'student_name': session_obj.student.full_name if session_obj.student else '',
+            'student_cin': session_obj.student.cin if session_obj.student else '',
+            'instructor_id': session_obj.instructor_id,
+            'instructor_name': session_obj.instructor.full_name if session_obj.instructor else '',
+            'vehicle_id': session_obj.vehicle_id,
+            'vehicle_plate': session_obj.vehicle.plate_number if session_obj.vehicle else '',
+            'session_type': session_obj.session_type.value if session_obj.session_type else '',
+            'start_datetime': session_obj.start_datetime.isoformat() if session_obj.start_datetime else '',
+            'end_datetime': session_obj.end_datetime.isoformat() if session_obj.end_datetime else '',
+            'duration_hours': session_obj.duration_hours,
+            'status': session_obj.status.value if session_obj.status else '',
+            'performance_score': session_obj.performance_score,
+            'notes': session_obj.notes or '',
+            'created_at': session_obj.created_at.isoformat() if session_obj.created_at else ''
+        }
     
     @staticmethod
     def export_to_csv(sessions: Optional[List[Session]] = None,
-                     filename: Optional[str] = None) -> tuple[bool, str]:
+                     filename: Optional[str] = None, file_format: str = 'csv') -> tuple[bool, str]:
         """
-        Exporter les sessions vers un fichier CSV
+        Exporter les sessions, avec élève, moniteur et véhicule (CSV, CSV gzip ou XLSX)
+        
+        Sans liste fournie, la table est lue par lots (stream_query) et écrite
+        au fil de l'eau : la mémoire ne dépend pas du nombre de lignes.
         
         Args:
             sessions: Liste de sessions (optionnel, toutes si None)
             filename: Nom du fichier (optionnel)
+            file_format: 'csv', 'csv.gz' ou 'xlsx'
         
         Returns:
             Tuple (success, filepath/message)
         """
         try:
             if sessions is None:
-                sessions = SessionController.get_all_sessions()
-            
-            if not sessions:
-                return False, "Aucune session à exporter"
-            
-            # Préparer les données avec infos complètes
-            data = []
-            for session_obj in sessions:
-                session_dict = {
-                    'id': session_obj.id,
-                    'student_id': session_obj.student_id,
-                    'student_name': session_obj.student.full_name if session_obj.student else '',
-                    'student_cin': session_obj.student.cin if session_obj.student else '',
-                    'instructor_id': session_obj.instructor_id,
-                    'instructor_name': session_obj.instructor.full_name if session_obj.instructor else '',
-                    'vehicle_id': session_obj.vehicle_id,
-                    'vehicle_plate': session_obj.vehicle.plate_number if session_obj.vehicle else '',
-                    'session_type': session_obj.session_type,
-                    'start_datetime': session_obj.start_datetime.isoformat() if session_obj.start_datetime else '',
-                    'end_datetime': session_obj.end_datetime.isoformat() if session_obj.end_datetime else '',
-                    'duration_hours': session_obj.duration_hours,
-                    'status': session_obj.status.value if session_obj.status else '',
-                    'performance_rating': session_obj.performance_rating,
-                    'notes': session_obj.notes or '',
-                    'created_at': session_obj.created_at.isoformat() if session_obj.created_at else ''
-                }
-                data.append(session_dict)
-            
-            # Exporter avec ExportManager
-            export_mgr = get_export_manager()
-            filepath = export_mgr.export_to_csv(data, 'sessions', filename)
-            
-            logger.info(f"{len(sessions)} sessions exportées vers {filepath}")
-            return True, filepath
+                statement = select(Session).options(
+                    joinedload(Session.student), joinedload(Session.instructor), joinedload(Session.vehicle)
+                ).order_by(Session.start_datetime.desc())
+                rows = stream_query(statement, SessionController._export_row)
+            else:
+                rows = (SessionController._export_row(item) for item in sessions)
             
+            return get_export_manager().export_stream(rows, filename or 'sessions', file_format=file_format)
+        
         except Exception as e:
             error_msg = f"Erreur lors de l'export : {str(e)}"
             logger.error(error_msg)
@@ -6,20 +6,31 @@ Phase 2 - Statistiques Avancées & Analytics
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta
-from sqlalchemy import func, and_, extract, case
-from collections import defaultdict
+import numpy as np
+from sqlalchemy import func, and_, select
 
 from src.models import (
     Student, StudentStatus,
     Session, SessionStatus,
-    Payment, PaymentMethod,
+    PaymentMethod,
     Exam, ExamType, ExamResult,
     Instructor,
     Vehicle,
     VehicleMaintenance,
-    get_session
+    session_scope,
+    daily_rollups,
+    rollup_rows,
+    rollup_totals,
+    payments_column,
+    revenue_column,
+    session_status_column,
+    exams_column
 )
 from src.utils import get_logger
+from .analytics import (
+    DEFAULT_WINDOW, breakdown, index_to_list, load_frame, moving_average,
+    period_delta, records, series_to_list, time_series
+)
 
 logger = get_logger()
 
@@ -41,100 +52,101 @@ class StatisticsController:
             Dict avec total, par méthode, par période, tendances
         """
         try:
-            session = get_session()
-            
             # Dates par défaut: dernier mois
             if not end_date:
                 end_date = date.today()
             if not start_date:
                 start_date = end_date - timedelta(days=30)
             
-            # Query de base
-            query = session.query(Payment).filter(
-                and_(
-                    Payment.date >= start_date,
-                    Payment.date <= end_date
-                )
-            )
-            
-            payments = query.all()
-            
-            if not payments:
-                return {
-                    'total_revenue': 0.0,
-                    'total_payments': 0,
-                    'average_payment': 0.0,
-                    'by_method': {},
-                    'by_day': {},
-                    'trend': 'stable'
-                }
-            
-            # Total
-            total_revenue = sum(p.amount for p in payments)
-            total_payments = len(payments)
-            average_payment = total_revenue / total_payments if total_payments > 0 else 0.0
-            
-            # Par méthode de paiement
-            by_method = {}
-            for method in PaymentMethod:
-                method_payments = [p for p in payments if p.payment_method == method]
-                by_method[method.value] = {
-                    'count': len(method_payments),
-                    'total': sum(p.amount for p in method_payments)
+            with session_scope() as session:
+                # Une ligne d'agrégats par jour (table daily_rollups)
+                day_rows = rollup_rows(session, start_date, end_date)
+                
+                method_counts = {method: 0 for method in PaymentMethod}
+                method_cents = {method: 0 for method in PaymentMethod}
+                by_day = {}
+                for row in day_rows:
+                    day_count, day_cents = 0, 0
+                    for method in PaymentMethod:
+                        count = row._mapping[payments_column(method)]
+                        cents = row._mapping[revenue_column(method)]
+                        method_counts[method] += count
+                        method_cents[method] += cents
+                        day_count += count
+                        day_cents += cents
+                    if day_count:
+                        by_day[row.day.isoformat()] = {'count': day_count, 'total': day_cents / 100}
+                
+                by_method = {
+                    method.value: {'count': method_counts[method], 'total': method_cents[method] / 100}
+                    for method in PaymentMethod
                 }
-            
-            # Par jour
-            by_day = {}
-            for payment in payments:
-                day_key = payment.date.strftime('%Y-%m-%d')
-                if day_key not in by_day:
-                    by_day[day_key] = {'count': 0, 'total': 0.0}
-                by_day[day_key]['count'] += 1
-                by_day[day_key]['total'] += payment.amount
-            
-            # Tendance (comparaison avec période précédente)
-            period_days = (end_date - start_date).days
-            previous_start = start_date - timedelta(days=period_days)
-            previous_end = start_date - timedelta(days=1)
-            
-            previous_payments = session.query(Payment).filter(
-                and_(
-                    Payment.date >= previous_start,
-                    Payment.date <= previous_end
+                total_payments = sum(method_counts.values())
+                total_revenue = sum(method_cents.values()) / 100
+                
+                if not total_payments:
+                    return {
+                        'total_revenue': 0.0,
+                        'total_payments': 0,
+                        'average_payment': 0.0,
+                        'by_method': {},
+                        'by_day': {},
+                        'trend': 'stable'
+                    }
+                
+                average_payment = total_revenue / total_payments
+                
+                # Tendance (comparaison avec période précédente)
+                period_days = (end_date - start_date).days
+                previous_start = start_date - timedelta(days=period_days)
+                previous_end = start_date - timedelta(days=1)
+                
+                _, previous_revenue = StatisticsController._payment_totals(
+                    session, previous_start, previous_end
                 )
-            ).all()
-            
-            previous_revenue = sum(p.amount for p in previous_payments)
-            
-            if previous_revenue > 0:
-                change_percent = ((total_revenue - previous_revenue) / previous_revenue) * 100
-                if change_percent > 10:
-                    trend = f'hausse +{change_percent:.1f}%'
-                elif change_percent < -10:
-                    trend = f'baisse {change_percent:.1f}%'
+                
+                if previous_revenue > 0:
+                    change_percent = ((total_revenue - previous_revenue) / previous_revenue) * 100
+                    if change_percent > 10:
+                        trend = f'hausse +{change_percent:.1f}%'
+                    elif change_percent < -10:
+                        trend = f'baisse {change_percent:.1f}%'
+                    else:
+                        trend = 'stable'
                 else:
-                    trend = 'stable'
-            else:
-                trend = 'nouveau'
-            
-            return {
-                'total_revenue': total_revenue,
-                'total_payments': total_payments,
-                'average_payment': average_payment,
-                'by_method': by_method,
-                'by_day': by_day,
-                'previous_period_revenue': previous_revenue,
-                'trend': trend,
-                'period': {
-                    'start': start_date.isoformat(),
-                    'end': end_date.isoformat()
+                    trend = 'nouveau'
+                
+                return {
+                    'total_revenue': total_revenue,
+                    'total_payments': total_payments,
+                    'average_payment': average_payment,
+                    'by_method': by_method,
+                    'by_day': by_day,
+                    'previous_period_revenue': previous_revenue,
+                    'trend': trend,
+                    'period': {
+                        'start': start_date.isoformat(),
+                        'end': end_date.isoformat()
+                    }
                 }
-            }
-            
+                
         except Exception as e:
             logger.error(f"Erreur lors du calcul des statistiques de revenus : {e}")
             return {}
     
+    @staticmethod
+    def _payment_totals(session, start_date: date, end_date: date) -> Tuple[int, float]:
+        """
+        Nombre et somme des paiements non annulés d'une période (agrégats journaliers)
+        
+        Returns:
+            Tuple (nombre de paiements, montant total)
+        """
+        totals = rollup_totals(session, start_date, end_date)
+        count = sum(totals[payments_column(method)] for method in PaymentMethod)
+        cents = sum(totals[revenue_column(method)] for method in PaymentMethod)
+        return count, cents / 100
+    
     @staticmethod
     def get_expenses_statistics(
         start_date: Optional[date] = None,
@@ -147,69 +159,81 @@ class StatisticsController:
             Dict avec total dépenses, par type, par véhicule
         """
         try:
-            session = get_session()
-            
             if not end_date:
                 end_date = date.today()
             if not start_date:
                 start_date = end_date - timedelta(days=30)
             
-            # Query maintenances terminées dans la période
-            maintenances = session.query(VehicleMaintenance).filter(
-                and_(
+            with session_scope() as session:
+                # Filtre des maintenances terminées dans la période
+                period_filter = and_(
                     VehicleMaintenance.completion_date.isnot(None),
                     VehicleMaintenance.completion_date >= start_date,
                     VehicleMaintenance.completion_date <= end_date
                 )
-            ).all()
-            
-            if not maintenances:
-                return {
-                    'total_expenses': 0.0,
-                    'total_maintenances': 0,
-                    'average_expense': 0.0,
-                    'by_type': {},
-                    'by_vehicle': {}
+                
+                total_maintenances, total_expenses = session.query(
+                    func.count(VehicleMaintenance.id),
+                    func.coalesce(func.sum(VehicleMaintenance.total_cost), 0.0)
+                ).filter(period_filter).one()
+                
+                if not total_maintenances:
+                    return {
+                        'total_expenses': 0.0,
+                        'total_maintenances': 0,
+                        'average_expense': 0.0,
+                        'by_type': {},
+                        'by_vehicle': {}
+                    }
+                
+                total_expenses = float(total_expenses)
+                average_expense = total_expenses / total_maintenances
+                
+                # Par type de maintenance
+                type_rows = session.query(
+                    VehicleMaintenance.maintenance_type,
+                    func.count(VehicleMaintenance.id),
+                    func.coalesce(func.sum(VehicleMaintenance.total_cost), 0.0)
+                ).filter(period_filter).group_by(VehicleMaintenance.maintenance_type).all()
+                
+                by_type = {
+                    m_type.value: {'count': count, 'total': float(total)}
+                    for m_type, count, total in type_rows
                 }
-            
-            total_expenses = sum(m.total_cost for m in maintenances)
-            total_maintenances = len(maintenances)
-            average_expense = total_expenses / total_maintenances if total_maintenances > 0 else 0.0
-            
-            # Par type de maintenance
-            by_type = {}
-            for maintenance in maintenances:
-                m_type = maintenance.maintenance_type.value
-                if m_type not in by_type:
-                    by_type[m_type] = {'count': 0, 'total': 0.0}
-                by_type[m_type]['count'] += 1
-                by_type[m_type]['total'] += maintenance.total_cost
-            
-            # Par véhicule
-            by_vehicle = {}
-            for maintenance in maintenances:
-                vehicle_id = maintenance.vehicle_id
-                if vehicle_id not in by_vehicle:
-                    by_vehicle[vehicle_id] = {
-                        'vehicle_plate': maintenance.vehicle.plate_number if maintenance.vehicle else 'N/A',
-                        'count': 0,
-                        'total': 0.0
+                
+                # Par véhicule (jointure externe pour la plaque)
+                vehicle_rows = session.query(
+                    VehicleMaintenance.vehicle_id,
+                    Vehicle.plate_number,
+                    func.count(VehicleMaintenance.id),
+                    func.coalesce(func.sum(VehicleMaintenance.total_cost), 0.0)
+                ).outerjoin(
+                    Vehicle, Vehicle.id == VehicleMaintenance.vehicle_id
+                ).filter(period_filter).group_by(
+                    VehicleMaintenance.vehicle_id, Vehicle.plate_number
+                ).all()
+                
+                by_vehicle = {
+                    vehicle_id: {
+                        'vehicle_plate': plate_number or 'N/A',
+                        'count': count,
+                        'total': float(total)
                     }
-                by_vehicle[vehicle_id]['count'] += 1
-                by_vehicle[vehicle_id]['total'] += maintenance.total_cost
-            
-            return {
-                'total_expenses': total_expenses,
-                'total_maintenances': total_maintenances,
-                'average_expense': average_expense,
-                'by_type': by_type,
-                'by_vehicle': by_vehicle,
-                'period': {
-                    'start': start_date.isoformat(),
-                    'end': end_date.isoformat()
+                    for vehicle_id, plate_number, count, total in vehicle_rows
                 }
-            }
-            
+                
+                return {
+                    'total_expenses': total_expenses,
+                    'total_maintenances': total_maintenances,
+                    'average_expense': average_expense,
+                    'by_type': by_type,
+                    'by_vehicle': by_vehicle,
+                    'period': {
+                        'start': start_date.isoformat(),
+                        'end': end_date.isoformat()
+                    }
+                }
+                
         except Exception as e:
             logger.error(f"Erreur lors du calcul des statistiques de dépenses : {e}")
             return {}
@@ -257,12 +281,14 @@ class StatisticsController:
             Dict avec progression moyenne, taux d'achèvement, distribution
         """
         try:
-            session = get_session()
-            students = session.query(Student).filter(
-                Student.status.in_([StudentStatus.ACTIVE, StudentStatus.GRADUATED])
-            ).all()
-            
-            if not students:
+            with session_scope() as session:
+                frame = load_frame(session, select(
+                    Student.status.label('status'),
+                    Student.hours_completed.label('hours_completed'),
+                    Student.hours_planned.label('hours_planned')
+                ).where(Student.status.in_([StudentStatus.ACTIVE, StudentStatus.GRADUATED])))
+            
+            if frame.empty:
                 return {
                     'total_students': 0,
                     'average_progress': 0.0,
@@ -270,47 +296,34 @@ class StatisticsController:
                     'by_status': {}
                 }
             
-            # Progression moyenne
-            total_progress = sum(s.completion_rate for s in students)
-            average_progress = total_progress / len(students) if students else 0.0
+            # Taux de complétion par élève (même règle que Student.completion_rate)
+            planned = frame['hours_planned'].to_numpy(dtype=float)
+            completed = frame['hours_completed'].to_numpy(dtype=float)
+            rates = np.zeros(len(frame))
+            np.divide(completed * 100, planned, out=rates, where=planned != 0)
+            rates = np.minimum(rates, 100.0)
+            
+            total_students = len(frame)
+            average_progress = float(rates.mean())
             
             # Taux d'achèvement (élèves qui ont terminé leur formation)
-            completed_students = [s for s in students if s.completion_rate >= 100]
-            completion_rate = (len(completed_students) / len(students) * 100) if students else 0.0
+            completed_students = int((rates >= 100).sum())
+            completion_rate = completed_students / total_students * 100
             
             # Distribution par statut
-            by_status = {}
-            for status in StudentStatus:
-                count = len([s for s in students if s.status == status])
-                by_status[status.value] = count
+            status_counts = frame['status'].value_counts()
+            by_status = {status.value: int(status_counts.get(status, 0)) for status in StudentStatus}
             
             # Distribution par tranche de progression
-            progression_ranges = {
-                '0-25%': 0,
-                '25-50%': 0,
-                '50-75%': 0,
-                '75-100%': 0,
-                '100%+': 0
-            }
-            
-            for student in students:
-                rate = student.completion_rate
-                if rate < 25:
-                    progression_ranges['0-25%'] += 1
-                elif rate < 50:
-                    progression_ranges['25-50%'] += 1
-                elif rate < 75:
-                    progression_ranges['50-75%'] += 1
-                elif rate < 100:
-                    progression_ranges['75-100%'] += 1
-                else:
-                    progression_ranges['100%+'] += 1
+            labels = ['0-25%', '25-50%', '50-75%', '75-100%', '100%+']
+            range_counts = np.bincount(np.digitize(rates, [25, 50, 75, 100]), minlength=len(labels))
+            progression_ranges = dict(zip(labels, (int(count) for count in range_counts)))
             
             return {
-                'total_students': len(students),
+                'total_students': total_students,
                 'average_progress': average_progress,
                 'completion_rate': completion_rate,
-                'completed_students': len(completed_students),
+                'completed_students': completed_students,
                 'by_status': by_status,
                 'by_progression_range': progression_ranges
             }
@@ -328,12 +341,31 @@ class StatisticsController:
             Dict avec taux de réussite global, par type d'examen
         """
         try:
-            session = get_session()
-            exams = session.query(Exam).filter(
-                Exam.result.in_([ExamResult.PASSED, ExamResult.FAILED])
-            ).all()
+            with session_scope() as session:
+                # Comptages par type et résultat : agrégats journaliers
+                totals = rollup_totals(session)
+                
+                # Moyenne des scores (théorique uniquement)
+                average_theory_score = session.query(func.avg(Exam.theory_score)).filter(
+                    Exam.exam_type == ExamType.THEORETICAL,
+                    Exam.result.in_([ExamResult.PASSED, ExamResult.FAILED]),
+                    Exam.theory_score.isnot(None)
+                ).scalar()
+            
+            # Par type d'examen
+            by_exam_type = {}
+            for exam_type in ExamType:
+                type_passed = totals[exams_column(exam_type, ExamResult.PASSED)]
+                type_total = type_passed + totals[exams_column(exam_type, ExamResult.FAILED)]
+                by_exam_type[exam_type.value] = {
+                    'total': type_total,
+                    'passed': type_passed,
+                    'failed': type_total - type_passed,
+                    'success_rate': (type_passed / type_total * 100) if type_total else 0.0
+                }
             
-            if not exams:
+            total_exams = sum(stats['total'] for stats in by_exam_type.values())
+            if not total_exams:
                 return {
                     'total_exams': 0,
                     'success_rate': 0.0,
@@ -341,34 +373,15 @@ class StatisticsController:
                 }
             
             # Taux de réussite global
-            passed_exams = [e for e in exams if e.result == ExamResult.PASSED]
-            success_rate = (len(passed_exams) / len(exams) * 100) if exams else 0.0
-            
-            # Par type d'examen
-            by_exam_type = {}
-            for exam_type in ExamType:
-                type_exams = [e for e in exams if e.exam_type == exam_type]
-                type_passed = [e for e in type_exams if e.result == ExamResult.PASSED]
-                
-                by_exam_type[exam_type.value] = {
-                    'total': len(type_exams),
-                    'passed': len(type_passed),
-                    'failed': len(type_exams) - len(type_passed),
-                    'success_rate': (len(type_passed) / len(type_exams) * 100) if type_exams else 0.0
-                }
-            
-            # Moyenne des scores (théorique uniquement)
-            theory_exams = [e for e in exams if e.exam_type == ExamType.THEORY and e.theory_score is not None]
-            average_theory_score = (
-                sum(e.theory_score for e in theory_exams) / len(theory_exams)
-            ) if theory_exams else 0.0
+            passed_exams = sum(stats['passed'] for stats in by_exam_type.values())
+            success_rate = passed_exams / total_exams * 100
             
             return {
-                'total_exams': len(exams),
-                'passed_exams': len(passed_exams),
+                'total_exams': total_exams,
+                'passed_exams': passed_exams,
                 'success_rate': success_rate,
                 'by_exam_type': by_exam_type,
-                'average_theory_score': average_theory_score
+                'average_theory_score': float(average_theory_score or 0.0)
             }
             
         except Exception as e:
@@ -389,56 +402,47 @@ class StatisticsController:
             Dict avec heures d'utilisation, sessions, coûts par véhicule
         """
         try:
-            session_db = get_session()
-            
             if not end_date:
                 end_date = date.today()
             if not start_date:
                 start_date = end_date - timedelta(days=30)
             
-            # Sessions dans la période
-            sessions = session_db.query(Session).filter(
-                and_(
-                    Session.start_datetime >= datetime.combine(start_date, datetime.min.time()),
-                    Session.start_datetime <= datetime.combine(end_date, datetime.max.time()),
-                    Session.status == SessionStatus.COMPLETED,
+            with session_scope() as session:
+                # Sessions terminées de la période (colonnes seules)
+                sessions = load_frame(session, select(
+                    Session.vehicle_id.label('vehicle_id'),
+                    Session.duration_minutes.label('duration_minutes'),
+                    Session.distance_km.label('distance_km')
+                ).where(
+                    *StatisticsController._completed_sessions_filter(start_date, end_date),
                     Session.vehicle_id.isnot(None)
-                )
-            ).all()
-            
-            # Stats par véhicule
-            by_vehicle = {}
-            for session_obj in sessions:
-                vehicle_id = session_obj.vehicle_id
-                if vehicle_id not in by_vehicle:
-                    by_vehicle[vehicle_id] = {
-                        'vehicle_plate': session_obj.vehicle.plate_number if session_obj.vehicle else 'N/A',
-                        'total_sessions': 0,
-                        'total_hours': 0.0,
-                        'total_km': 0.0
-                    }
+                ))
                 
-                by_vehicle[vehicle_id]['total_sessions'] += 1
-                if session_obj.duration_hours:
-                    by_vehicle[vehicle_id]['total_hours'] += session_obj.duration_hours
-                if session_obj.distance_km:
-                    by_vehicle[vehicle_id]['total_km'] += session_obj.distance_km
-            
-            # Coûts de maintenance par véhicule dans la période
-            maintenances = session_db.query(VehicleMaintenance).filter(
-                and_(
+                # Coûts de maintenance de la période
+                maintenances = load_frame(session, select(
+                    VehicleMaintenance.vehicle_id.label('vehicle_id'),
+                    VehicleMaintenance.total_cost.label('total_cost')
+                ).where(
                     VehicleMaintenance.completion_date.isnot(None),
                     VehicleMaintenance.completion_date >= start_date,
                     VehicleMaintenance.completion_date <= end_date
-                )
-            ).all()
-            
-            for maintenance in maintenances:
-                vehicle_id = maintenance.vehicle_id
-                if vehicle_id in by_vehicle:
-                    if 'maintenance_cost' not in by_vehicle[vehicle_id]:
-                        by_vehicle[vehicle_id]['maintenance_cost'] = 0.0
-                    by_vehicle[vehicle_id]['maintenance_cost'] += maintenance.total_cost
+                ))
+                plates = dict(session.query(Vehicle.id, Vehicle.plate_number).all())
+            
+            # Stats par véhicule (groupby vectorisé)
+            sessions['duration_hours'] = sessions['duration_minutes'] / 60
+            per_vehicle = breakdown(sessions, 'vehicle_id', {
+                'total_sessions': ('vehicle_id', 'size'),
+                'total_hours': ('duration_hours', 'sum'),
+                'total_km': ('distance_km', 'sum'),
+            })
+            per_vehicle.insert(0, 'vehicle_plate', per_vehicle.index.map(lambda vehicle_id: plates.get(vehicle_id, 'N/A')))
+            by_vehicle = records(per_vehicle)
+            
+            costs = maintenances.groupby('vehicle_id')['total_cost'].sum()
+            for vehicle_id, cost in costs.items():
+                if int(vehicle_id) in by_vehicle:
+                    by_vehicle[int(vehicle_id)]['maintenance_cost'] = float(cost)
             
             return {
                 'total_sessions': len(sessions),
@@ -453,6 +457,15 @@ class StatisticsController:
             logger.error(f"Erreur lors du calcul des statistiques d'utilisation des véhicules : {e}")
             return {}
     
+    @staticmethod
+    def _completed_sessions_filter(start_date: date, end_date: date) -> list:
+        """Conditions SQL des sessions terminées d'une période (bornes incluses)"""
+        return [
+            Session.start_datetime >= datetime.combine(start_date, datetime.min.time()),
+            Session.start_datetime <= datetime.combine(end_date, datetime.max.time()),
+            Session.status == SessionStatus.COMPLETED,
+        ]
+    
     # ========== Statistiques Moniteurs ==========
     
     @staticmethod
@@ -467,48 +480,37 @@ class StatisticsController:
             Dict avec heures enseignées, élèves formés, taux de réussite par moniteur
         """
         try:
-            session_db = get_session()
-            
             if not end_date:
                 end_date = date.today()
             if not start_date:
                 start_date = end_date - timedelta(days=30)
             
-            # Sessions terminées dans la période
-            sessions = session_db.query(Session).filter(
-                and_(
-                    Session.start_datetime >= datetime.combine(start_date, datetime.min.time()),
-                    Session.start_datetime <= datetime.combine(end_date, datetime.max.time()),
-                    Session.status == SessionStatus.COMPLETED,
+            with session_scope() as session:
+                # Sessions terminées de la période (colonnes seules)
+                sessions = load_frame(session, select(
+                    Session.instructor_id.label('instructor_id'),
+                    Session.student_id.label('student_id'),
+                    Session.duration_minutes.label('duration_minutes')
+                ).where(
+                    *StatisticsController._completed_sessions_filter(start_date, end_date),
                     Session.instructor_id.isnot(None)
-                )
-            ).all()
-            
-            # Stats par moniteur
-            by_instructor = {}
-            for session_obj in sessions:
-                instructor_id = session_obj.instructor_id
-                if instructor_id not in by_instructor:
-                    by_instructor[instructor_id] = {
-                        'instructor_name': session_obj.instructor.full_name if session_obj.instructor else 'N/A',
-                        'total_sessions': 0,
-                        'total_hours': 0.0,
-                        'unique_students': set()
-                    }
-                
-                by_instructor[instructor_id]['total_sessions'] += 1
-                if session_obj.duration_hours:
-                    by_instructor[instructor_id]['total_hours'] += session_obj.duration_hours
-                if session_obj.student_id:
-                    by_instructor[instructor_id]['unique_students'].add(session_obj.student_id)
-            
-            # Convertir sets en counts
-            for instructor_id in by_instructor:
-                by_instructor[instructor_id]['unique_students'] = len(by_instructor[instructor_id]['unique_students'])
+                ))
+                names = dict(session.query(Instructor.id, Instructor.full_name).all())
+            
+            # Stats par moniteur (groupby vectorisé)
+            sessions['duration_hours'] = sessions['duration_minutes'] / 60
+            per_instructor = breakdown(sessions, 'instructor_id', {
+                'total_sessions': ('instructor_id', 'size'),
+                'total_hours': ('duration_hours', 'sum'),
+                'unique_students': ('student_id', 'nunique'),
+            })
+            per_instructor.insert(
+                0, 'instructor_name', per_instructor.index.map(lambda instructor_id: names.get(instructor_id, 'N/A'))
+            )
             
             return {
                 'total_sessions': len(sessions),
-                'by_instructor': by_instructor,
+                'by_instructor': records(per_instructor),
                 'period': {
                     'start': start_date.isoformat(),
                     'end': end_date.isoformat()
@@ -519,6 +521,82 @@ class StatisticsController:
             logger.error(f"Erreur lors du calcul des statistiques de performance des moniteurs : {e}")
             return {}
     
+    # ========== Séries temporelles ==========
+    
+    @staticmethod
+    def get_time_series(
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        bucket: str = 'day',
+        window: int = DEFAULT_WINDOW
+    ) -> Dict[str, Any]:
+        """
+        Séries temporelles des revenus et des séances
+        
+        Args:
+            start_date: Début de la période (défaut: 90 jours avant la fin)
+            end_date: Fin de la période (défaut: aujourd'hui)
+            bucket: Regroupement 'day', 'week' ou 'month'
+            window: Fenêtre de la moyenne mobile, en regroupements
+        
+        Returns:
+            Dict de listes alignées sur 'buckets' (début de chaque regroupement)
+        """
+        try:
+            if not end_date:
+                end_date = date.today()
+            if not start_date:
+                start_date = end_date - timedelta(days=90)
+            
+            columns = daily_rollups.c
+            with session_scope() as session:
+                # Une ligne par jour (agrégats journaliers), lue en colonnes
+                days = load_frame(session, select(
+                    func.date(columns.day).label('day'),
+                    *(columns[payments_column(method)] for method in PaymentMethod),
+                    *(columns[revenue_column(method)] for method in PaymentMethod),
+                    *(columns[session_status_column(status)] for status in SessionStatus),
+                    columns.completed_minutes
+                ).where(columns.day >= start_date, columns.day <= end_date), date_columns=['day'])
+            
+            days['payments'] = days[[payments_column(method) for method in PaymentMethod]].sum(axis=1)
+            days['revenue'] = days[[revenue_column(method) for method in PaymentMethod]].sum(axis=1) / 100
+            days['sessions'] = days[[session_status_column(status) for status in SessionStatus]].sum(axis=1)
+            days['completed_hours'] = days['completed_minutes'] / 60
+            
+            series = time_series(days, 'day', {
+                'revenue': ('revenue', 'sum'),
+                'payments': ('payments', 'sum'),
+                'sessions': ('sessions', 'sum'),
+                'completed_hours': ('completed_hours', 'sum'),
+            }, start_date, end_date, bucket)
+            
+            revenue_delta = period_delta(series['revenue'])
+            sessions_delta = period_delta(series['sessions'])
+            
+            return {
+                'bucket': bucket,
+                'window': window,
+                'buckets': index_to_list(series.index),
+                'revenue': series_to_list(series['revenue']),
+                'revenue_moving_average': series_to_list(moving_average(series['revenue'], window)),
+                'revenue_delta': series_to_list(revenue_delta['delta']),
+                'revenue_delta_percent': series_to_list(revenue_delta['percent'], 1),
+                'payments': series_to_list(series['payments'], 0),
+                'sessions': series_to_list(series['sessions'], 0),
+                'sessions_moving_average': series_to_list(moving_average(series['sessions'], window)),
+                'sessions_delta': series_to_list(sessions_delta['delta'], 0),
+                'completed_hours': series_to_list(series['completed_hours']),
+                'period': {
+                    'start': start_date.isoformat(),
+                    'end': end_date.isoformat()
+                }
+            }
+        
+        except Exception as e:
+            logger.error(f"Erreur lors du calcul des séries temporelles : {e}")
+            return {}
+    
     # ========== Dashboard Global ==========
     
     @staticmethod
@@ -3,14 +3,39 @@ Contrôleur pour la gestion des élèves
 """
 
 from typing import List, Optional, Dict, Any
-from datetime import date
 
-from sqlalchemy import or_
-from src.models import Student, StudentStatus, get_session
-from src.utils import get_logger, export_to_csv, import_from_csv
+from sqlalchemy import case, func, or_
+from src.models import Student, StudentStatus, get_session, session_scope
+from src.utils import get_logger, export_stream
+from .paging import DEFAULT_PAGE_SIZE, ListSpec, Page, empty_page, list_page
 
 logger = get_logger()
 
+# Liste paginée des élèves (voir paging.list_page)
+_LIST_SPEC = ListSpec(
+    columns=(
+        Student.id, Student.full_name, Student.cin, Student.phone, Student.license_type, Student.status,
+        Student.hours_completed, Student.hours_planned, Student.balance, Student.registration_date,
+    ),
+    date_column=Student.registration_date,
+    filters={
+        'status': Student.status,
+        'license_type': Student.license_type,
+        'with_debt': lambda with_debt: Student.balance < 0 if with_debt else Student.balance >= 0,
+    },
+    sorts={
+        'name': Student.full_name,
+        'cin': Student.cin,
+        'phone': Student.phone,
+        'license_type': Student.license_type,
+        'status': Student.status,
+        'hours': Student.hours_completed,
+        'balance': Student.balance,
+    },
+    search_entity='students',
+    search_columns=(Student.full_name, Student.cin, Student.phone),
+)
+
 
 class StudentController:
     """Contrôleur pour gérer les opérations sur les élèves"""
@@ -26,8 +51,8 @@ class StudentController:
         Returns:
             Liste des élèves
         """
+        session = get_session()
         try:
-            session = get_session()
             query = session.query(Student)
             
             if status:
@@ -38,6 +63,34 @@ class StudentController:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des élèves : {e}")
             return []
+        finally:
+            session.close()
+    
+    @staticmethod
+    def list_page(filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None,
+                  offset: int = 0, limit: Optional[int] = DEFAULT_PAGE_SIZE,
+                  after: Optional[tuple] = None, with_total: bool = True) -> Page:
+        """
+        Page de élèves filtrée, triée et paginée par la base
+        
+        Args:
+            filters: search, date_from, date_to, status, license_type, with_debt
+            sort: date (défaut '-date'), id, name, cin, phone, license_type, status, hours, balance
+            offset: Nombre de lignes à sauter
+            limit: Taille de la page (None: tout, 0: total seul)
+            after: Curseur page.next_cursor de la page précédente (tri par date ou id)
+            with_total: Compter les lignes correspondant aux filtres (sinon total = -1)
+        
+        Returns:
+            Page de lignes (id, full_name, cin, phone, license_type, status,
+            hours_completed, hours_planned, balance, registration_date)
+        """
+        try:
+            with session_scope() as session:
+                return list_page(session, _LIST_SPEC, filters, sort, offset, limit, after, with_total)
+        except Exception as e:
+            logger.error(f"Erreur lors de la pagination des élèves : {e}")
+            return empty_page(limit)
     
     @staticmethod
     def get_student_by_id(student_id: int) -> Optional[Student]:
@@ -50,12 +103,28 @@ class StudentController:
         Returns:
             Élève ou None
         """
+        session = get_session()
         try:
-            session = get_session()
             return session.query(Student).filter(Student.id == student_id).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de l'élève {student_id} : {e}")
             return None
+        finally:
+            session.close()
+    
+    @staticmethod
+    def contract_data(student: Student) -> Dict[str, Any]:
+        """Données du contrat d'un élève (PDFGenerator.generate_contract)"""
+        return {
+            'full_name': student.full_name,
+            'cin': student.cin,
+            'date_of_birth': student.date_of_birth.strftime('%d/%m/%Y') if student.date_of_birth else 'N/A',
+            'phone': student.phone,
+            'address': student.address or 'N/A',
+            'license_type': student.license_type if student.license_type else 'B',
+            'hours_planned': student.hours_planned or 20,
+            'total_due': student.total_due or 0
+        }
     
     @staticmethod
     def get_student_by_cin(cin: str) -> Optional[Student]:
@@ -68,12 +137,14 @@ class StudentController:
         Returns:
             Élève ou None
         """
+        session = get_session()
         try:
-            session = get_session()
             return session.query(Student).filter(Student.cin == cin).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de l'élève CIN {cin} : {e}")
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def search_students(query: str) -> List[Student]:
@@ -86,8 +157,8 @@ class StudentController:
         Returns:
             Liste des élèves correspondants
         """
+        session = get_session()
         try:
-            session = get_session()
             search_term = f"%{query}%"
             
             students = session.query(Student).filter(
@@ -103,6 +174,8 @@ class StudentController:
         except Exception as e:
             logger.error(f"Erreur lors de la recherche d'élèves : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def create_student(student_data: Dict[str, Any]) -> tuple[bool, str, Optional[Student]]:
@@ -115,9 +188,8 @@ class StudentController:
         Returns:
             Tuple (success, message, student)
         """
+        session = get_session()
         try:
-            session = get_session()
-            
             # Vérifier si le CIN existe déjà
             existing = session.query(Student).filter(Student.cin == student_data['cin']).first()
             if existing:
@@ -137,6 +209,8 @@ class StudentController:
             error_msg = f"Erreur lors de la création de l'élève : {str(e)}"
             logger.error(error_msg)
             return False, error_msg, None
+        finally:
+            session.close()
     
     @staticmethod
     def update_student(student_id: int, student_data: Dict[str, Any]) -> tuple[bool, str, Optional[Student]]:
@@ -150,8 +224,8 @@ class StudentController:
         Returns:
             Tuple (success, message, student)
         """
+        session = get_session()
         try:
-            session = get_session()
             student = session.query(Student).filter(Student.id == student_id).first()
             
             if not student:
@@ -187,6 +261,8 @@ class StudentController:
             error_msg = f"Erreur lors de la mise à jour de l'élève : {str(e)}"
             logger.error(error_msg)
             return False, error_msg, None
+        finally:
+            session.close()
     
     @staticmethod
     def delete_student(student_id: int) -> tuple[bool, str]:
@@ -227,23 +303,53 @@ class StudentController:
     @staticmethod
     def get_active_students() -> List[Student]:
         """Obtenir tous les élèves actifs"""
+        session = get_session()
         try:
-            session = get_session()
             students = session.query(Student).filter(Student.status == StudentStatus.ACTIVE).all()
             return students
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des élèves actifs : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_active_students_count() -> int:
         """Obtenir le nombre d'élèves actifs"""
+        session = get_session()
         try:
-            session = get_session()
             return session.query(Student).filter(Student.status == StudentStatus.ACTIVE).count()
         except Exception as e:
             logger.error(f"Erreur lors du comptage des élèves actifs : {e}")
             return 0
+        finally:
+            session.close()
+    
+    @staticmethod
+    def get_summary_counts() -> Dict[str, int]:
+        """
+        Compteurs de la liste des élèves en une requête d'agrégats
+        
+        Returns:
+            {'total', 'active', 'graduated', 'debt'}
+        """
+        try:
+            with session_scope() as session:
+                total, active, graduated, debt = session.query(
+                    func.count(Student.id),
+                    func.sum(case((Student.status == StudentStatus.ACTIVE, 1), else_=0)),
+                    func.sum(case((Student.status == StudentStatus.GRADUATED, 1), else_=0)),
+                    func.sum(case((Student.balance < 0, 1), else_=0)),
+                ).one()
+            return {
+                'total': total or 0,
+                'active': int(active or 0),
+                'graduated': int(graduated or 0),
+                'debt': int(debt or 0),
+            }
+        except Exception as e:
+            logger.error(f"Erreur lors du comptage des élèves : {e}")
+            return {'total': 0, 'active': 0, 'graduated': 0, 'debt': 0}
     
     @staticmethod
     def get_students_with_debt() -> List[Student]:
@@ -252,12 +358,14 @@ class StudentController:
         Balance = total_due - total_paid
         Balance > 0 = L'étudiant doit de l'argent (dette)
         """
+        session = get_session()
         try:
-            session = get_session()
             return session.query(Student).filter(Student.balance < 0).order_by(Student.balance).all()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des élèves endettés : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def export_students_to_csv(students: List[Student], filename: str = "students") -> tuple[bool, str]:
@@ -272,8 +380,8 @@ class StudentController:
             Tuple (success, filepath_or_error)
         """
         try:
-            data = [student.to_dict() for student in students]
-            return export_to_csv(data, filename)
+            rows = (student.to_dict() for student in students)
+            return export_stream(rows, filename)
         except Exception as e:
             error_msg = f"Erreur lors de l'export : {str(e)}"
             logger.error(error_msg)
@@ -291,44 +399,11 @@ class StudentController:
             Tuple (success, count, message)
         """
         try:
-            required_fields = ['full_name', 'cin', 'date_of_birth', 'phone']
-            success, data, message = import_from_csv(filepath, required_fields)
-            
-            if not success:
-                return False, 0, message
-            
-            session = get_session()
-            imported_count = 0
-            errors = []
-            
-            for row in data:
-                try:
-                    # Vérifier si le CIN existe déjà
-                    if session.query(Student).filter(Student.cin == row['cin']).first():
-                        errors.append(f"CIN {row['cin']} existe déjà")
-                        continue
-                    
-                    # Convertir la date de naissance
-                    if isinstance(row['date_of_birth'], str):
-                        row['date_of_birth'] = date.fromisoformat(row['date_of_birth'])
-                    
-                    # Créer l'élève
-                    student = Student(**row)
-                    session.add(student)
-                    imported_count += 1
-                    
-                except Exception as e:
-                    errors.append(f"Erreur ligne {imported_count + 1} : {str(e)}")
-            
-            session.commit()
-            
-            result_message = f"{imported_count} élèves importés"
-            if errors:
-                result_message += f" ({len(errors)} erreurs)"
-            
-            logger.info(result_message)
-            return True, imported_count, result_message
-            
+            # Lecture en flux, un lot = une requête IN + une insertion en masse
+            from .student_import import import_students
+            result = import_students(filepath)
+            return True, result.success, result.message
+        
         except Exception as e:
             error_msg = f"Erreur lors de l'import : {str(e)}"
             logger.error(error_msg)
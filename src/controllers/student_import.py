@@ -0,0 +1,289 @@
+"""
+Import CSV des élèves en flux, par lots transactionnels
+
+Le fichier est lu par blocs (iter_csv_chunks) : la mémoire ne dépend que de
+la taille d'un bloc. Pour chaque bloc :
+    1. validation et conversion des lignes (erreurs rapportées par ligne)
+    2. une seule requête SELECT cin ... WHERE cin IN (...) pour écarter les
+       CIN déjà en base (et les doublons à l'intérieur du fichier)
+    3. insertion en masse (executemany) dans un savepoint ; si le lot
+       échoue, le savepoint est annulé et les lignes sont réinsérées une à
+       une, chacune dans son savepoint, pour isoler les lignes fautives
+    4. commit du bloc
+
+Une ligne invalide n'affecte donc ni les autres lignes ni l'état de la
+session.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+
+from src.models import Student, StudentStatus, get_session
+from src.utils import get_logger, iter_csv_chunks
+from src.utils.export import ExportManager
+
+logger = get_logger()
+
+IMPORT_CHUNK_SIZE = 1000
+REQUIRED_FIELDS = ['full_name', 'cin', 'phone', 'date_of_birth']
+LICENSE_TYPES = ['A', 'B', 'C', 'D', 'E']
+
+# Statuts acceptés (français ou anglais)
+STATUS_MAP = {
+    'actif': StudentStatus.ACTIVE,
+    'active': StudentStatus.ACTIVE,
+    'en_attente': StudentStatus.PENDING,
+    'pending': StudentStatus.PENDING,
+    'suspendu': StudentStatus.SUSPENDED,
+    'suspended': StudentStatus.SUSPENDED,
+    'diplome': StudentStatus.GRADUATED,
+    'graduated': StudentStatus.GRADUATED,
+    'abandonne': StudentStatus.ABANDONED,
+    'abandoned': StudentStatus.ABANDONED
+}
+
+# Champs numériques -> (minimum, maximum)
+NUMERIC_FIELDS = {
+    'hours_planned': (1, 100),
+    'hours_completed': (0, 100),
+    'theoretical_exam_attempts': (0, 10),
+    'practical_exam_attempts': (0, 10),
+    'total_due': (0, 999999),
+    'total_paid': (0, 999999)
+}
+
+# Progression : (lignes traitées, total estimé, message)
+ProgressCallback = Callable[[int, int, str], None]
+
+
+@dataclass
+class ImportResult:
+    """Bilan d'un import (les détails d'erreurs portent le numéro de ligne)"""
+    total: int = 0
+    success: int = 0
+    errors: int = 0
+    skipped: int = 0  # CIN déjà existants
+    error_details: List[Dict[str, Any]] = field(default_factory=list)
+    
+    def add_error(self, row_number: int, row: Dict[str, Any], errors: List[str]):
+        self.errors += 1
+        self.error_details.append({'row': row_number, 'data': row, 'errors': errors})
+    
+    def add_skipped(self, row_number: int, row: Dict[str, Any], message: str):
+        self.skipped += 1
+        self.error_details.append({'row': row_number, 'data': row, 'errors': [message]})
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'success': self.success,
+            'errors': self.errors,
+            'skipped': self.skipped,
+            'error_details': self.error_details
+        }
+    
+    @property
+    def message(self) -> str:
+        text = f"{self.success} élèves importés"
+        if self.skipped:
+            text += f", {self.skipped} CIN déjà existants"
+        if self.errors:
+            text += f" ({self.errors} erreurs)"
+        return text
+
+
+def _value(row: Dict[str, Any], name: str) -> str:
+    return (row.get(name) or '').strip()
+
+
+def validate_student_row(row: Dict[str, Any]) -> List[str]:
+    """
+    Valider une ligne CSV d'élève
+    
+    Returns:
+        Liste des erreurs (vide si la ligne est valide)
+    """
+    errors = []
+    
+    # Champs requis
+    for name in REQUIRED_FIELDS:
+        if not _value(row, name):
+            errors.append(f"Champ requis manquant: {name}")
+    
+    # CIN (8 caractères)
+    cin = _value(row, 'cin')
+    if cin and len(cin) != 8:
+        errors.append(f"CIN invalide (doit être 8 caractères): {cin}")
+    
+    # Téléphone (0XXXXXXXXX ou +212 XXX-XXXXXX)
+    phone = _value(row, 'phone')
+    if phone:
+        phone_clean = phone.replace(' ', '').replace('-', '').replace('+', '')
+        if phone_clean.startswith('212'):
+            phone_clean = '0' + phone_clean[3:]
+        if not (phone_clean.isdigit() and len(phone_clean) == 10 and phone_clean.startswith('0')):
+            errors.append(f"Téléphone invalide (format: 0XXXXXXXXX ou +212 XXX-XXXXXX): {phone}")
+    
+    email = _value(row, 'email')
+    if email and '@' not in email:
+        errors.append(f"Email invalide: {email}")
+    
+    license_type = _value(row, 'license_type')
+    if license_type and license_type not in LICENSE_TYPES:
+        errors.append(f"Type de permis invalide (A, B, C, D, E): {license_type}")
+    
+    status = _value(row, 'status').lower()
+    if status and status not in STATUS_MAP:
+        errors.append(f"Statut invalide: {status}")
+    
+    for name, (min_value, max_value) in NUMERIC_FIELDS.items():
+        value = _value(row, name)
+        if value:
+            try:
+                number = float(value)
+                if number < min_value or number > max_value:
+                    errors.append(f"{name} hors limites ({min_value}-{max_value}): {value}")
+            except ValueError:
+                errors.append(f"{name} n'est pas un nombre valide: {value}")
+    
+    date_of_birth = _value(row, 'date_of_birth')
+    if date_of_birth:
+        try:
+            birth = datetime.strptime(date_of_birth, '%Y-%m-%d')
+            age = (datetime.now() - birth).days / 365.25
+            if age < 16 or age > 100:
+                errors.append(f"Âge invalide (16-100 ans): {date_of_birth}")
+        except ValueError:
+            errors.append(f"Date de naissance invalide (format: YYYY-MM-DD): {date_of_birth}")
+    
+    return errors
+
+
+def prepare_student_mapping(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convertir une ligne CSV validée en valeurs de colonnes de la table students
+    
+    Les valeurs par défaut du modèle (date d'inscription, compteurs...) sont
+    explicites : l'insertion en masse ne passe pas par Student.__init__.
+    """
+    total_due = float(_value(row, 'total_due') or 0)
+    now = datetime.now()
+    return {
+        'full_name': _value(row, 'full_name'),
+        'cin': _value(row, 'cin'),
+        'date_of_birth': date.fromisoformat(_value(row, 'date_of_birth')),
+        'phone': _value(row, 'phone'),
+        'email': _value(row, 'email') or None,
+        'address': _value(row, 'address') or None,
+        'registration_date': date.today(),
+        'status': STATUS_MAP.get(_value(row, 'status').lower() or 'actif', StudentStatus.ACTIVE),
+        'license_type': _value(row, 'license_type') or 'B',
+        'theoretical_exam_passed': 0,
+        'practical_exam_passed': 0,
+        'theoretical_exam_attempts': int(float(_value(row, 'theoretical_exam_attempts') or 0)),
+        'practical_exam_attempts': int(float(_value(row, 'practical_exam_attempts') or 0)),
+        'total_paid': 0,  # Alimenté par les paiements enregistrés
+        'total_due': total_due,
+        'balance': 0.0 - total_due,  # total_paid - total_due, négatif = dette
+        'hours_completed': int(float(_value(row, 'hours_completed') or 0)),
+        'hours_planned': int(float(_value(row, 'hours_planned') or 20)),
+        'notes': _value(row, 'notes') or None,
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+def _insert_chunk(session, pending: List[tuple], result: ImportResult):
+    """Insérer un lot dans un savepoint ; en cas d'échec, ligne par ligne"""
+    try:
+        with session.begin_nested():
+            session.bulk_insert_mappings(Student, [mapping for _number, _row, mapping in pending])
+        result.success += len(pending)
+        return
+    except Exception as e:
+        logger.warning(f"Import CSV : échec du lot ({getattr(e, 'orig', e)}), insertion ligne par ligne")
+    
+    for number, row, mapping in pending:
+        try:
+            with session.begin_nested():
+                session.bulk_insert_mappings(Student, [mapping])
+            result.success += 1
+        except Exception as e:
+            result.add_error(number, row, [f"Erreur d'importation: {getattr(e, 'orig', e)}"])
+
+
+def import_students(filepath: str, chunk_size: int = IMPORT_CHUNK_SIZE, dry_run: bool = False,
+                    progress: Optional[ProgressCallback] = None,
+                    should_stop: Optional[Callable[[], bool]] = None) -> ImportResult:
+    """
+    Importer des élèves depuis un CSV, en flux et par lots
+    
+    Args:
+        filepath: Chemin du fichier CSV
+        chunk_size: Nombre de lignes par lot (une transaction par lot)
+        dry_run: Valider seulement (aucune écriture)
+        progress: Rappel (lignes traitées, total estimé, message) après chaque lot
+        should_stop: Rappel d'interruption, consulté entre deux lots
+    
+    Returns:
+        ImportResult
+    
+    Raises:
+        FileNotFoundError, ValueError: Fichier illisible ou colonnes obligatoires absentes
+    """
+    result = ImportResult()
+    estimated_total = ExportManager.count_csv_rows(filepath) if progress else 0
+    seen_cins = set()  # Validation seule : rien n'est inséré entre deux lots
+    session = get_session()
+    
+    try:
+        for chunk in iter_csv_chunks(filepath, chunk_size, required_fields=['full_name', 'cin', 'phone']):
+            if should_stop and should_stop():
+                break
+            result.total += len(chunk)
+            
+            # 1. Validation et conversion
+            valid = []
+            for number, row in chunk:
+                errors = validate_student_row(row)
+                if errors:
+                    result.add_error(number, row, errors)
+                else:
+                    valid.append((number, row, prepare_student_mapping(row)))
+            
+            # 2. CIN déjà en base : une requête IN par lot
+            cins = {mapping['cin'] for _number, _row, mapping in valid}
+            existing = set(session.execute(select(Student.cin).where(Student.cin.in_(cins))).scalars())
+            existing |= cins & seen_cins
+            
+            pending = []
+            for number, row, mapping in valid:
+                if mapping['cin'] in existing:
+                    result.add_skipped(number, row, f"CIN {mapping['cin']} existe déjà")
+                    continue
+                existing.add(mapping['cin'])  # Doublon plus loin dans le fichier
+                pending.append((number, row, mapping))
+            
+            # 3. Insertion en masse (savepoint), 4. commit du lot
+            if dry_run:
+                result.success += len(pending)
+                seen_cins.update(mapping['cin'] for _number, _row, mapping in pending)
+                session.rollback()
+            else:
+                _insert_chunk(session, pending, result)
+                session.commit()
+            
+            if progress:
+                processed = result.total
+                progress(processed, max(estimated_total, processed), f"Traitement ligne {processed}/{estimated_total}")
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    
+    logger.info(f"Import CSV {'(validation) ' if dry_run else ''}{filepath} : {result.message}")
+    return result
@@ -0,0 +1,419 @@
+"""
+Planification automatique des séances de conduite sur une semaine
+
+Construit, pour un lot d'élèves, un emploi du temps sans conflit :
+- créneaux d'une heure, du lundi au samedi, 8h-20h (grille du planning)
+- moniteur habilité au type de permis de l'élève, disponible, dans la
+  limite de son nombre d'élèves par jour (max_students_per_day)
+- véhicule du même type de permis, libre sur le créneau
+- sessions déjà planifiées respectées (index des créneaux)
+
+Algorithme : placement glouton par tours (une heure par élève et par tour,
+élèves des permis les plus tendus en premier), puis recherche locale qui
+déplace une séance déjà proposée pour libérer un moniteur. Les
+disponibilités sont des masques de bits (un bit par créneau), ce qui rend
+chaque test de compatibilité quasi gratuit.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+
+from src.models import Session, SessionStatus, SessionType, session_scope
+from src.utils import get_logger
+from .schedule_index import get_schedule_index
+from .session_controller import SessionController
+from .student_controller import StudentController
+from .instructor_controller import InstructorController
+from .vehicle_controller import VehicleController
+
+logger = get_logger()
+
+
+@dataclass
+class TimetableResult:
+    """Emploi du temps proposé pour une semaine"""
+    
+    week_start: date
+    # Sessions proposées, au format de SessionController.create_session
+    proposals: List[dict] = field(default_factory=list)
+    # Élève -> heures demandées mais non placées
+    unplaced_hours: Dict[int, int] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+    
+    @property
+    def planned_hours(self) -> int:
+        return len(self.proposals)
+    
+    @property
+    def is_complete(self) -> bool:
+        return not self.unplaced_hours
+
+
+class TimetablePlanner:
+    """Moteur de planification hebdomadaire des séances de conduite"""
+    
+    DAY_START_HOUR = 8
+    DAY_END_HOUR = 20
+    DAYS_PER_WEEK = 6  # Lundi ... samedi
+    MAX_HOURS_PER_DAY = 2  # Par élève
+    MAX_HOURS_PER_WEEK = 6  # Par élève
+    LOCAL_SEARCH_ROUNDS = 2
+    
+    # Pénalités du choix de créneau (plus petit = meilleur)
+    SAME_DAY_PENALTY = 10  # Étaler les heures d'un élève sur la semaine
+    INSTRUCTOR_DAY_PENALTY = 2  # Équilibrer les journées des moniteurs
+    
+    def __init__(self, week_start: date, max_hours_per_day: Optional[int] = None,
+                 max_hours_per_week: Optional[int] = None, now: Optional[datetime] = None):
+        """
+        Args:
+            week_start: Un jour de la semaine à planifier (ramené au lundi)
+            max_hours_per_day: Heures maximum par élève et par jour
+            max_hours_per_week: Heures maximum par élève sur la semaine
+            now: Date/heure de référence, les créneaux passés sont ignorés
+        """
+        self.week_start = week_start - timedelta(days=week_start.weekday())
+        self.max_hours_per_day = max_hours_per_day or self.MAX_HOURS_PER_DAY
+        self.max_hours_per_week = max_hours_per_week or self.MAX_HOURS_PER_WEEK
+        self.now = now or datetime.now()
+        
+        self.hours_per_day = self.DAY_END_HOUR - self.DAY_START_HOUR
+        self.slot_count = self.hours_per_day * self.DAYS_PER_WEEK
+        day_bits = (1 << self.hours_per_day) - 1
+        self.day_masks = [day_bits << (day * self.hours_per_day) for day in range(self.DAYS_PER_WEEK)]
+        self.open_mask = sum(
+            1 << slot for slot in range(self.slot_count) if self.slot_start(slot) >= self.now
+        )
+    
+    # ------------------------------------------------------------------
+    # Grille
+    # ------------------------------------------------------------------
+    
+    def slot_start(self, slot: int) -> datetime:
+        """Date/heure de début d'un créneau"""
+        day, hour = divmod(slot, self.hours_per_day)
+        return datetime.combine(
+            self.week_start + timedelta(days=day),
+            dt_time(self.DAY_START_HOUR + hour)
+        )
+    
+    def _day_of(self, slot: int) -> int:
+        return slot // self.hours_per_day
+    
+    def _free_mask(self, resource: str, resource_id: int) -> int:
+        """Créneaux ouverts où la ressource n'a aucune session existante"""
+        index = get_schedule_index()
+        mask = 0
+        for slot in range(self.slot_count):
+            if not self.open_mask >> slot & 1:
+                continue
+            start = self.slot_start(slot)
+            if index.is_free(resource, resource_id, start, start + timedelta(hours=1)):
+                mask |= 1 << slot
+        return mask
+    
+    def _busy_per_day(self, free_mask: int) -> List[int]:
+        """Heures déjà occupées par jour (créneaux ouverts non libres)"""
+        return [
+            bin(self.open_mask & day_mask & ~free_mask).count('1') for day_mask in self.day_masks
+        ]
+    
+    # ------------------------------------------------------------------
+    # Planification
+    # ------------------------------------------------------------------
+    
+    def plan(self, students=None, instructors=None, vehicles=None) -> TimetableResult:
+        """
+        Calculer l'emploi du temps de la semaine
+        
+        Args:
+            students: Élèves à planifier (défaut: élèves actifs)
+            instructors: Moniteurs utilisables (défaut: moniteurs disponibles
+                         habilités, via InstructorController)
+            vehicles: Véhicules utilisables (défaut: véhicules disponibles du
+                      type de permis, via VehicleController)
+        
+        Returns:
+            TimetableResult (vide en cas d'erreur)
+        """
+        started = time.perf_counter()
+        result = TimetableResult(week_start=self.week_start)
+        try:
+            if students is None:
+                students = StudentController.get_active_students()
+            self._load(students, instructors, vehicles)
+            
+            # Tours gloutons: une heure par élève et par tour
+            pending = [sid for sid in self._student_order() if self.need[sid] > 0]
+            while pending:
+                pending = [sid for sid in pending if self._place_greedy(sid) and self.need[sid] > 0]
+            
+            # Recherche locale pour les heures restantes
+            for _ in range(self.LOCAL_SEARCH_ROUNDS):
+                progress = False
+                for sid in self._student_order():
+                    while self.need[sid] > 0 and self._place_with_move(sid):
+                        progress = True
+                if not progress:
+                    break
+            
+            result.proposals = [self._to_session_data(a) for a in self.assignments if a is not None]
+            result.proposals.sort(key=lambda p: (p['start_datetime'], p['instructor_id']))
+            result.unplaced_hours = {sid: need for sid, need in self.need.items() if need > 0}
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de la planification automatique : {e}")
+        
+        result.elapsed_seconds = time.perf_counter() - started
+        logger.info(
+            f"Planification semaine du {self.week_start} : {result.planned_hours} heures proposées, "
+            f"{sum(result.unplaced_hours.values())} non placées ({result.elapsed_seconds:.2f}s)"
+        )
+        return result
+    
+    def save(self, result: TimetableResult) -> int:
+        """
+        Créer les sessions proposées (après revalidation en lot)
+        
+        Returns:
+            Nombre de sessions créées
+        """
+        created = 0
+        checks = SessionController.validate_sessions(result.proposals)
+        for proposal, check in zip(result.proposals, checks):
+            if not check['valid']:
+                logger.warning(f"Créneau devenu indisponible, ignoré : {proposal['start_datetime']}")
+                continue
+            if SessionController.create_session(proposal):
+                created += 1
+        return created
+    
+    def _load(self, students, instructors, vehicles):
+        """Initialiser masques de disponibilité, capacités et besoins"""
+        self.license_of = {s.id: (s.license_type or 'B').upper() for s in students}
+        license_types = sorted(set(self.license_of.values()))
+        
+        if instructors is None:
+            by_id = {}
+            for license_type in license_types:
+                for instructor in InstructorController.get_instructors_by_license_type(license_type, available_only=True):
+                    by_id[instructor.id] = instructor
+            instructors = list(by_id.values())
+        if vehicles is None:
+            vehicles = []
+            for license_type in license_types:
+                vehicles.extend(VehicleController.get_vehicles_by_license_type(license_type, available_only=True))
+        
+        # Moniteurs et véhicules par type de permis
+        self.instructors_by_license = {lt: [] for lt in license_types}
+        self.vehicles_by_license = {lt: [] for lt in license_types}
+        for instructor in instructors:
+            qualified = {lt.strip().upper() for lt in (instructor.license_types or '').split(',')}
+            for license_type in license_types:
+                if license_type in qualified:
+                    self.instructors_by_license[license_type].append(instructor.id)
+        for vehicle in vehicles:
+            license_type = (vehicle.license_type or '').upper()
+            if license_type in self.vehicles_by_license:
+                self.vehicles_by_license[license_type].append(vehicle.id)
+        
+        # Disponibilités (existant) et compteurs
+        self.instructor_free = {i.id: self._free_mask('instructor', i.id) for i in instructors}
+        self.instructor_cap = {i.id: i.max_students_per_day or 8 for i in instructors}
+        self.instructor_day = {iid: self._busy_per_day(mask) for iid, mask in self.instructor_free.items()}
+        self.instructor_load = {iid: 0 for iid in self.instructor_free}
+        self.vehicle_free = {v.id: self._free_mask('vehicle', v.id) for v in vehicles}
+        self.vehicle_load = {vid: 0 for vid in self.vehicle_free}
+        
+        self.student_free = {}
+        self.student_day = {}
+        self.need = {}
+        booked = self._booked_hours([s.id for s in students])
+        for student in students:
+            free = self._free_mask('student', student.id)
+            self.student_free[student.id] = free
+            self.student_day[student.id] = self._busy_per_day(free)
+            remaining = (student.hours_planned or 0) - (student.hours_completed or 0) - booked.get(student.id, 0)
+            weekly_room = self.max_hours_per_week - sum(self.student_day[student.id])
+            self.need[student.id] = max(0, min(int(remaining), weekly_room))
+        
+        self.assignments: List[Optional[dict]] = []
+        self.instructor_slots: Dict[tuple, int] = {}  # (moniteur, créneau) -> affectation proposée
+    
+    def _booked_hours(self, student_ids: List[int]) -> Dict[int, int]:
+        """Heures déjà réservées (sessions à venir non réalisées) par élève"""
+        if not student_ids:
+            return {}
+        with session_scope() as session:
+            rows = session.query(
+                Session.student_id, func.sum(Session.duration_minutes)
+            ).filter(
+                Session.student_id.in_(student_ids),
+                Session.status.in_([SessionStatus.SCHEDULED, SessionStatus.CONFIRMED]),
+                Session.start_datetime >= self.now
+            ).group_by(Session.student_id).all()
+        return {sid: int(minutes or 0) // 60 for sid, minutes in rows}
+    
+    def _student_order(self) -> List[int]:
+        """Élèves des permis les plus tendus (demande / moniteurs) puis plus gros besoins d'abord"""
+        demand = {}
+        for sid, need in self.need.items():
+            demand[self.license_of[sid]] = demand.get(self.license_of[sid], 0) + need
+        
+        def tension(sid):
+            license_type = self.license_of[sid]
+            supply = len(self.instructors_by_license.get(license_type, [])) or 0.5
+            return demand[license_type] / supply
+        
+        return sorted(self.need, key=lambda sid: (-tension(sid), -self.need[sid], sid))
+    
+    def _vehicle_mask(self, license_type: str) -> int:
+        """Créneaux où au moins un véhicule du type de permis est libre"""
+        mask = 0
+        for vid in self.vehicles_by_license.get(license_type, []):
+            mask |= self.vehicle_free[vid]
+        return mask
+    
+    def _best_slot(self, sid: int, instructor_ids: List[int], forbidden_mask: int = 0):
+        """
+        Meilleur (créneau, moniteur) pour une heure de l'élève
+        
+        Returns:
+            (slot, instructor_id) ou None
+        """
+        best = None
+        student_mask = self.student_free[sid] & self._vehicle_mask(self.license_of[sid]) & ~forbidden_mask
+        student_day = self.student_day[sid]
+        
+        for iid in instructor_ids:
+            common = student_mask & self.instructor_free[iid]
+            if not common:
+                continue
+            instructor_day = self.instructor_day[iid]
+            cap = self.instructor_cap[iid]
+            for day, day_mask in enumerate(self.day_masks):
+                if student_day[day] >= self.max_hours_per_day or instructor_day[day] >= cap:
+                    continue
+                day_bits = common & day_mask
+                if not day_bits:
+                    continue
+                slot = (day_bits & -day_bits).bit_length() - 1  # Premier créneau libre du jour
+                cost = (
+                    student_day[day] * self.SAME_DAY_PENALTY
+                    + instructor_day[day] * self.INSTRUCTOR_DAY_PENALTY
+                    + self.instructor_load[iid],
+                    slot
+                )
+                if best is None or cost < best[0]:
+                    best = (cost, slot, iid)
+        
+        return None if best is None else (best[1], best[2])
+    
+    def _assign(self, sid: int, slot: int, iid: int, vid: Optional[int] = None) -> int:
+        """Réserver le créneau pour l'élève, le moniteur et un véhicule"""
+        if vid is None:
+            candidates = [
+                v for v in self.vehicles_by_license[self.license_of[sid]]
+                if self.vehicle_free[v] >> slot & 1
+            ]
+            vid = min(candidates, key=lambda v: (self.vehicle_load[v], v))
+        
+        bit = 1 << slot
+        day = self._day_of(slot)
+        self.student_free[sid] &= ~bit
+        self.instructor_free[iid] &= ~bit
+        self.vehicle_free[vid] &= ~bit
+        self.student_day[sid][day] += 1
+        self.instructor_day[iid][day] += 1
+        self.instructor_load[iid] += 1
+        self.vehicle_load[vid] += 1
+        self.need[sid] -= 1
+        
+        self.assignments.append({'student_id': sid, 'slot': slot, 'instructor_id': iid, 'vehicle_id': vid})
+        position = len(self.assignments) - 1
+        self.instructor_slots[(iid, slot)] = position
+        return position
+    
+    def _release(self, position: int) -> dict:
+        """Annuler une affectation proposée"""
+        assignment = self.assignments[position]
+        self.assignments[position] = None
+        sid, slot = assignment['student_id'], assignment['slot']
+        iid, vid = assignment['instructor_id'], assignment['vehicle_id']
+        
+        bit = 1 << slot
+        day = self._day_of(slot)
+        self.student_free[sid] |= bit
+        self.instructor_free[iid] |= bit
+        self.vehicle_free[vid] |= bit
+        self.student_day[sid][day] -= 1
+        self.instructor_day[iid][day] -= 1
+        self.instructor_load[iid] -= 1
+        self.vehicle_load[vid] -= 1
+        self.need[sid] += 1
+        del self.instructor_slots[(iid, slot)]
+        return assignment
+    
+    def _place_greedy(self, sid: int) -> bool:
+        """Placer une heure de l'élève au meilleur créneau libre"""
+        choice = self._best_slot(sid, self.instructors_by_license.get(self.license_of[sid], []))
+        if choice is None:
+            return False
+        self._assign(sid, *choice)
+        return True
+    
+    def _place_with_move(self, sid: int) -> bool:
+        """
+        Placer une heure en déplaçant une séance proposée qui bloque un moniteur
+        
+        Pour chaque créneau libre pour l'élève (et un véhicule), si un moniteur
+        habilité n'y est occupé que par une séance proposée, on tente de
+        reloger cette séance ailleurs puis on prend le créneau libéré.
+        """
+        if self._place_greedy(sid):
+            return True
+        
+        license_type = self.license_of[sid]
+        candidates = self.student_free[sid] & self._vehicle_mask(license_type)
+        for slot in range(self.slot_count):
+            if not candidates >> slot & 1:
+                continue
+            day = self._day_of(slot)
+            if self.student_day[sid][day] >= self.max_hours_per_day:
+                continue
+            for iid in self.instructors_by_license.get(license_type, []):
+                position = self.instructor_slots.get((iid, slot))
+                if position is None:
+                    continue
+                moved = self._release(position)
+                other = moved['student_id']
+                # Le créneau libéré est réservé à l'élève courant
+                target = self._best_slot(
+                    other, self.instructors_by_license[self.license_of[other]], forbidden_mask=1 << slot
+                )
+                if target is not None:
+                    self._assign(other, *target)
+                    if (self.instructor_day[iid][day] < self.instructor_cap[iid]
+                            and self._vehicle_mask(license_type) >> slot & 1):
+                        self._assign(sid, slot, iid)
+                        return True
+                    # Moniteur complet ou pas de véhicule: on défait le déplacement
+                    self._release(len(self.assignments) - 1)
+                self._assign(other, moved['slot'], moved['instructor_id'], moved['vehicle_id'])
+        return False
+    
+    def _to_session_data(self, assignment: dict) -> dict:
+        start = self.slot_start(assignment['slot'])
+        return {
+            'student_id': assignment['student_id'],
+            'instructor_id': assignment['instructor_id'],
+            'vehicle_id': assignment['vehicle_id'],
+            'session_type': SessionType.PRACTICAL_DRIVING,
+            'start_datetime': start,
+            'end_datetime': start + timedelta(hours=1),
+            'status': SessionStatus.SCHEDULED,
+        }
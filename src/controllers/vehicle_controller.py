@@ -5,12 +5,66 @@ Contrôleur pour la gestion des véhicules
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import date, timedelta
 
-from sqlalchemy import or_, and_
-from src.models import Vehicle, VehicleStatus, Session, SessionStatus, get_session
-from src.utils import get_logger, get_export_manager
+from sqlalchemy import or_, and_, select
+from src.models import Vehicle, VehicleStatus, Session, get_session, session_scope
+from src.utils import get_logger, get_export_manager, stream_query
+from .paging import DEFAULT_PAGE_SIZE, ListSpec, Page, empty_page, list_page
+from .session_controller import session_counts, session_period_conditions, session_stat_columns
 
 logger = get_logger()
 
+# Liste paginée des véhicules (voir paging.list_page), date = création de la fiche
+_LIST_SPEC = ListSpec(
+    columns=(
+        Vehicle.id, Vehicle.plate_number, Vehicle.make, Vehicle.model, Vehicle.license_type, Vehicle.status,
+        Vehicle.is_available, Vehicle.current_mileage, Vehicle.next_maintenance_date, Vehicle.created_at,
+    ),
+    date_column=Vehicle.created_at,
+    filters={
+        'status': Vehicle.status,
+        'license_type': Vehicle.license_type,
+        'available': Vehicle.is_available,
+    },
+    sorts={
+        'plate': Vehicle.plate_number,
+        'make': Vehicle.make,
+        'status': Vehicle.status,
+        'mileage': Vehicle.current_mileage,
+    },
+    search_entity='vehicles',
+    search_columns=(Vehicle.plate_number, Vehicle.make, Vehicle.model),
+)
+
+
+def _vehicle_statistics(session, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                        vehicle_id: Optional[int] = None) -> Dict[int, Dict[str, Any]]:
+    """Véhicules et agrégats de leurs sessions (jointure externe groupée)"""
+    query = session.query(Vehicle, *session_stat_columns()).outerjoin(
+        Session, and_(Session.vehicle_id == Vehicle.id, *session_period_conditions(start_date, end_date))
+    )
+    if vehicle_id is not None:
+        query = query.filter(Vehicle.id == vehicle_id)
+    
+    statistics = {}
+    for row in query.group_by(Vehicle.id):
+        vehicle = row.Vehicle
+        statistics[vehicle.id] = {
+            'vehicle_id': vehicle.id,
+            'plate_number': vehicle.plate_number,
+            'full_name': vehicle.full_name,
+            **session_counts(row),
+            'current_mileage': vehicle.current_mileage,
+            'maintenance_cost': vehicle.maintenance_cost,
+            'insurance_cost': vehicle.insurance_cost,
+            'total_cost': vehicle.maintenance_cost + vehicle.insurance_cost,
+            'needs_maintenance': vehicle.needs_maintenance,
+            'insurance_expired': vehicle.insurance_expired,
+            'technical_inspection_expired': vehicle.technical_inspection_expired,
+            'is_available': vehicle.is_available,
+            'status': vehicle.status.value
+        }
+    return statistics
+
 
 class VehicleController:
     """Contrôleur pour gérer les opérations sur les véhicules"""
@@ -28,8 +82,8 @@ class VehicleController:
         Returns:
             Liste des véhicules
         """
+        session = get_session()
         try:
-            session = get_session()
             query = session.query(Vehicle)
             
             if status:
@@ -42,6 +96,34 @@ class VehicleController:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des véhicules : {e}")
             return []
+        finally:
+            session.close()
+    
+    @staticmethod
+    def list_page(filters: Optional[Dict[str, Any]] = None, sort: Optional[str] = None,
+                  offset: int = 0, limit: Optional[int] = DEFAULT_PAGE_SIZE,
+                  after: Optional[tuple] = None, with_total: bool = True) -> Page:
+        """
+        Page de véhicules filtrée, triée et paginée par la base
+        
+        Args:
+            filters: search, date_from, date_to, status, license_type, available
+            sort: date (défaut '-date'), id, plate, make, status, mileage
+            offset: Nombre de lignes à sauter
+            limit: Taille de la page (None: tout, 0: total seul)
+            after: Curseur page.next_cursor de la page précédente (tri par date ou id)
+            with_total: Compter les lignes correspondant aux filtres (sinon total = -1)
+        
+        Returns:
+            Page de lignes (id, plate_number, make, model, license_type, status,
+            is_available, current_mileage, next_maintenance_date, created_at)
+        """
+        try:
+            with session_scope() as session:
+                return list_page(session, _LIST_SPEC, filters, sort, offset, limit, after, with_total)
+        except Exception as e:
+            logger.error(f"Erreur lors de la pagination des véhicules : {e}")
+            return empty_page(limit)
     
     @staticmethod
     def get_vehicle_by_id(vehicle_id: int) -> Optional[Vehicle]:
@@ -54,12 +136,14 @@ class VehicleController:
         Returns:
             Véhicule ou None
         """
+        session = get_session()
         try:
-            session = get_session()
             return session.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du véhicule {vehicle_id} : {e}")
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def get_vehicle_by_plate(plate_number: str) -> Optional[Vehicle]:
@@ -72,12 +156,14 @@ class VehicleController:
         Returns:
             Véhicule ou None
         """
+        session = get_session()
         try:
-            session = get_session()
             return session.query(Vehicle).filter(Vehicle.plate_number == plate_number).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du véhicule (plaque {plate_number}) : {e}")
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def get_vehicle_by_vin(vin: str) -> Optional[Vehicle]:
@@ -90,12 +176,14 @@ class VehicleController:
         Returns:
             Véhicule ou None
         """
+        session = get_session()
         try:
-            session = get_session()
             return session.query(Vehicle).filter(Vehicle.vin == vin).first()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du véhicule (VIN {vin}) : {e}")
             return None
+        finally:
+            session.close()
     
     @staticmethod
     def search_vehicles(query: str) -> List[Vehicle]:
@@ -108,8 +196,8 @@ class VehicleController:
         Returns:
             Liste des véhicules correspondants
         """
+        session = get_session()
         try:
-            session = get_session()
             search_term = f"%{query}%"
             
             vehicles = session.query(Vehicle).filter(
@@ -126,6 +214,8 @@ class VehicleController:
         except Exception as e:
             logger.error(f"Erreur lors de la recherche de véhicules : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def create_vehicle(plate_number: str, make: str, model: str,
@@ -142,9 +232,8 @@ class VehicleController:
         Returns:
             Tuple (success, message, vehicle)
         """
+        session = get_session()
         try:
-            session = get_session()
-            
             # Vérifier que la plaque n'existe pas déjà
             existing = session.query(Vehicle).filter(Vehicle.plate_number == plate_number).first()
             if existing:
@@ -176,6 +265,8 @@ class VehicleController:
             error_msg = f"Erreur lors de la création du véhicule : {str(e)}"
             logger.error(error_msg)
             return False, error_msg, None
+        finally:
+            session.close()
     
     @staticmethod
     def update_vehicle(vehicle_id: int, **kwargs) -> tuple[bool, str]:
@@ -189,8 +280,8 @@ class VehicleController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             vehicle = session.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
             
             if not vehicle:
@@ -228,6 +319,8 @@ class VehicleController:
             error_msg = f"Erreur lors de la mise à jour du véhicule : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def delete_vehicle(vehicle_id: int) -> tuple[bool, str]:
@@ -240,8 +333,8 @@ class VehicleController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             vehicle = session.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
             
             if not vehicle:
@@ -263,6 +356,8 @@ class VehicleController:
             error_msg = f"Erreur lors de la suppression du véhicule : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def set_status(vehicle_id: int, status: VehicleStatus) -> tuple[bool, str]:
@@ -276,8 +371,8 @@ class VehicleController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             vehicle = session.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
             
             if not vehicle:
@@ -295,6 +390,8 @@ class VehicleController:
             error_msg = f"Erreur : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def record_maintenance(vehicle_id: int, cost: float = 0.0, 
@@ -312,8 +409,8 @@ class VehicleController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             vehicle = session.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
             
             if not vehicle:
@@ -339,6 +436,8 @@ class VehicleController:
             error_msg = f"Erreur : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def update_mileage(vehicle_id: int, new_mileage: int) -> tuple[bool, str]:
@@ -352,8 +451,8 @@ class VehicleController:
         Returns:
             Tuple (success, message)
         """
+        session = get_session()
         try:
-            session = get_session()
             vehicle = session.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
             
             if not vehicle:
@@ -373,6 +472,8 @@ class VehicleController:
             error_msg = f"Erreur : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            session.close()
     
     @staticmethod
     def get_vehicles_needing_maintenance() -> List[Vehicle]:
@@ -382,8 +483,8 @@ class VehicleController:
         Returns:
             Liste des véhicules
         """
+        session = get_session()
         try:
-            session = get_session()
             today = date.today()
             
             return session.query(Vehicle).filter(
@@ -393,6 +494,8 @@ class VehicleController:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des véhicules à maintenir : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def get_vehicles_with_expired_documents() -> Dict[str, List[Vehicle]]:
@@ -402,8 +505,8 @@ class VehicleController:
         Returns:
             Dictionnaire avec listes de véhicules par type de document
         """
+        session = get_session()
         try:
-            session = get_session()
             today = date.today()
             
             expired_insurance = session.query(Vehicle).filter(
@@ -422,6 +525,8 @@ class VehicleController:
         except Exception as e:
             logger.error(f"Erreur lors de la vérification des documents : {e}")
             return {'insurance': [], 'technical_inspection': []}
+        finally:
+            session.close()
     
     @staticmethod
     def get_vehicle_statistics(vehicle_id: int) -> Dict[str, Any]:
@@ -435,63 +540,32 @@ class VehicleController:
             Dictionnaire de statistiques
         """
         try:
-            session = get_session()
-            vehicle = session.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
-            
-            if not vehicle:
-                return {}
-            
-            # Compter les sessions
-            total_sessions = session.query(Session).filter(
-                Session.vehicle_id == vehicle_id
-            ).count()
-            
-            completed_sessions = session.query(Session).filter(
-                Session.vehicle_id == vehicle_id,
-                Session.status == SessionStatus.COMPLETED
-            ).count()
-            
-            cancelled_sessions = session.query(Session).filter(
-                Session.vehicle_id == vehicle_id,
-                Session.status == SessionStatus.CANCELLED
-            ).count()
-            
-            # Calculer les heures d'utilisation
-            sessions_with_duration = session.query(Session).filter(
-                Session.vehicle_id == vehicle_id,
-                Session.status == SessionStatus.COMPLETED
-            ).all()
-            
-            total_hours = sum([
-                (s.end_datetime - s.start_datetime).total_seconds() / 3600 
-                for s in sessions_with_duration
-                if s.start_datetime and s.end_datetime
-            ])
-            
-            return {
-                'vehicle_id': vehicle_id,
-                'plate_number': vehicle.plate_number,
-                'full_name': vehicle.full_name,
-                'total_sessions': total_sessions,
-                'completed_sessions': completed_sessions,
-                'cancelled_sessions': cancelled_sessions,
-                'pending_sessions': total_sessions - completed_sessions - cancelled_sessions,
-                'total_hours': round(total_hours, 2),
-                'current_mileage': vehicle.current_mileage,
-                'maintenance_cost': vehicle.maintenance_cost,
-                'insurance_cost': vehicle.insurance_cost,
-                'total_cost': vehicle.maintenance_cost + vehicle.insurance_cost,
-                'needs_maintenance': vehicle.needs_maintenance,
-                'insurance_expired': vehicle.insurance_expired,
-                'technical_inspection_expired': vehicle.technical_inspection_expired,
-                'is_available': vehicle.is_available,
-                'status': vehicle.status.value
-            }
-            
+            with session_scope() as session:
+                return _vehicle_statistics(session, vehicle_id=vehicle_id).get(vehicle_id, {})
         except Exception as e:
             logger.error(f"Erreur lors du calcul des statistiques du véhicule : {e}")
             return {}
     
+    @staticmethod
+    def get_all_vehicle_statistics(start_date: Optional[date] = None,
+                                   end_date: Optional[date] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Statistiques de tous les véhicules en une seule requête groupée
+        
+        Args:
+            start_date: Début de la période des sessions (optionnel)
+            end_date: Fin de la période des sessions (optionnel)
+        
+        Returns:
+            ID du véhicule -> statistiques (mêmes clés que get_vehicle_statistics)
+        """
+        try:
+            with session_scope() as session:
+                return _vehicle_statistics(session, start_date, end_date)
+        except Exception as e:
+            logger.error(f"Erreur lors du calcul des statistiques des véhicules : {e}")
+            return {}
+    
     @staticmethod
     def get_vehicles_by_license_type(license_type: str, available_only: bool = False) -> List[Vehicle]:
         """
@@ -504,8 +578,8 @@ class VehicleController:
         Returns:
             Liste des véhicules
         """
+        session = get_session()
         try:
-            session = get_session()
             query = session.query(Vehicle).filter(Vehicle.license_type == license_type.upper())
             
             if available_only:
@@ -516,37 +590,35 @@ class VehicleController:
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des véhicules (permis {license_type}) : {e}")
             return []
+        finally:
+            session.close()
     
     @staticmethod
     def export_to_csv(vehicles: Optional[List[Vehicle]] = None,
-                     filename: Optional[str] = None) -> tuple[bool, str]:
+                     filename: Optional[str] = None, file_format: str = 'csv') -> tuple[bool, str]:
         """
-        Exporter les véhicules vers un fichier CSV
+        Exporter les véhicules (CSV, CSV gzip ou XLSX)
+        
+        Sans liste fournie, la table est lue par lots (stream_query) et écrite
+        au fil de l'eau : la mémoire ne dépend pas du nombre de lignes.
         
         Args:
             vehicles: Liste de véhicules (optionnel, tous si None)
             filename: Nom du fichier (optionnel)
+            file_format: 'csv', 'csv.gz' ou 'xlsx'
         
         Returns:
             Tuple (success, filepath/message)
         """
         try:
             if vehicles is None:
-                vehicles = VehicleController.get_all_vehicles()
-            
-            if not vehicles:
-                return False, "Aucun véhicule à exporter"
-            
-            # Préparer les données
-            data = [vehicle.to_dict() for vehicle in vehicles]
-            
-            # Exporter avec ExportManager
-            export_mgr = get_export_manager()
-            filepath = export_mgr.export_to_csv(data, 'vehicles', filename)
-            
-            logger.info(f"{len(vehicles)} véhicules exportés vers {filepath}")
-            return True, filepath
+                statement = select(Vehicle).order_by(Vehicle.plate_number)
+                rows = stream_query(statement, Vehicle.to_dict)
+            else:
+                rows = (Vehicle.to_dict(item) for item in vehicles)
             
+            return get_export_manager().export_stream(rows, filename or 'vehicles', file_format=file_format)
+        
         except Exception as e:
             error_msg = f"Erreur lors de l'export : {str(e)}"
             logger.error(error_msg)
@@ -154,6 +154,31 @@ def main():
             success_rbac, message_rbac = initialize_rbac_system()
             if not success_rbac:
                 logger.warning(f"⚠️ RBAC init: {message_rbac}")
+        
+        # Migration 3: Échéances du planificateur de notifications (next_attempt_at)
+        if 'notifications' in existing_tables:
+            columns = [col['name'] for col in inspector.get_columns('notifications')]
+            if 'next_attempt_at' not in columns:
+                with engine.begin() as connection:
+                    connection.execute(text("ALTER TABLE notifications ADD COLUMN next_attempt_at DATETIME"))
+                    connection.execute(text(
+                        "UPDATE notifications SET next_attempt_at = COALESCE(scheduled_at, created_at) "
+                        "WHERE status = 'PENDING'"
+                    ))
+                    connection.execute(text(
+                        "UPDATE notifications SET next_attempt_at = updated_at "
+                        "WHERE status = 'FAILED' AND retry_count < max_retries"
+                    ))
+        
+        # Migration 4: Index composites (conflits de sessions, CA, examens, échéances)
+        from src.models import Base
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {idx['name'] for idx in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(engine)
     except Exception as e:
         logger.warning(f"⚠️ Erreur migrations (ignorée) : {e}")
     
@@ -175,20 +200,19 @@ def main():
         # === BACKUP AUTOMATIQUE AU DÉMARRAGE ===
         try:
             from src.utils.config_manager import get_config_manager
+            from src.utils.backup import BackupManager, RETENTION_DEFAULTS
             from src.config import DATABASE_PATH
-            import shutil
             from pathlib import Path
-            from datetime import datetime as dt
             
             config_mgr = get_config_manager()
             if config_mgr.get('database', {}).get('backup_on_start', False):
-                db_path = Path(DATABASE_PATH)
-                if db_path.exists():
-                    backup_dir = Path(config_mgr.get_backup_path())
-                    backup_dir.mkdir(exist_ok=True)
-                    timestamp = dt.now().strftime("%Y%m%d_%H%M%S")
-                    backup_path = backup_dir / f"startup_backup_{timestamp}.db"
-                    shutil.copy(db_path, backup_path)
+                if Path(DATABASE_PATH).exists():
+                    # Copie en ligne incrémentale : seuls les blocs modifiés sont écrits
+                    manager = BackupManager(str(DATABASE_PATH), config_mgr.get_backup_path())
+                    success, _ = manager.create_backup("startup_backup", incremental=True)
+                    if success:
+                        retention = config_mgr.get('database', {}).get('retention', {})
+                        manager.apply_retention(**{**RETENTION_DEFAULTS, **retention}, label="startup_backup")
         except Exception as e:
             logger.warning(f"⚠️ Erreur backup automatique: {e}")
         
@@ -210,6 +234,27 @@ def main():
                 f"Impossible de charger l'interface principale:\n{str(e)}\n\nVoir la console pour plus de détails."
             )
             app.quit()
+            return
+        
+        # === PLANIFICATEUR DES NOTIFICATIONS (thread de fond) ===
+        try:
+            from src.controllers.notification_scheduler import (
+                start_notification_scheduler, stop_notification_scheduler
+            )
+            if start_notification_scheduler():
+                app.aboutToQuit.connect(stop_notification_scheduler)
+        except Exception as e:
+            logger.warning(f"⚠️ Planificateur de notifications non démarré: {e}")
+        
+        # === ARCHIVAGE DES NOTIFICATIONS (règles de rétention, thread de fond) ===
+        try:
+            import threading
+            from src.controllers.notification_controller import NotificationController
+            threading.Thread(
+                target=NotificationController().apply_retention, name="notification-retention", daemon=True
+            ).start()
+        except Exception as e:
+            logger.warning(f"⚠️ Archivage des notifications non lancé: {e}")
     
     # Créer et connecter la fenêtre de login
     login_window = LoginWindow()
@@ -221,4 +266,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Processus de rendu PDF (pdf_batch) dans l'exécutable Windows
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
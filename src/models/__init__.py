@@ -4,7 +4,10 @@ Modèles de données pour l'application Auto-École
 
 from sqlalchemy.orm import relationship
 
-from .base import Base, get_engine, get_session, init_db
+from .base import (
+    Base, get_engine, get_session, session_scope,
+    get_scoped_session, remove_scoped_session, init_db
+)
 from .user import User, UserRole
 from .role import Role, Permission, PermissionType, user_roles, role_permissions
 from .student import Student, StudentStatus
@@ -14,8 +17,23 @@ from .session import Session, SessionType, SessionStatus
 from .payment import Payment, PaymentMethod
 from .exam import Exam, ExamType, ExamResult
 from .maintenance import VehicleMaintenance, MaintenanceType, MaintenanceStatus
-from .notification import Notification, NotificationType, NotificationCategory, NotificationStatus, NotificationPriority
+from .notification import (
+    Notification, NotificationType, NotificationCategory, NotificationStatus, NotificationPriority,
+    PRIORITY_RANK, retry_backoff
+)
 from .document import Document, DocumentType, DocumentStatus
+from .search_index import (
+    ensure_search_index, rebuild_search_index, search_documents, search_entity,
+    search_index_exists, matching_ids_select
+)
+from .daily_rollup import (
+    daily_rollups, ensure_daily_rollups, rebuild_daily_rollups, rollup_totals, rollup_rows,
+    payments_column, revenue_column, session_status_column, session_type_column, exams_column
+)
+from .unread_counter import (
+    notification_unread_counts, ensure_unread_counters, rebuild_unread_counters, unread_count
+)
+from .notification_archive import notifications_archive, archive_notifications
 
 # Configurer la relation many-to-many entre User et Role après tous les imports
 # Cela évite les imports circulaires
@@ -27,6 +45,9 @@ __all__ = [
     'Base',
     'get_engine',
     'get_session',
+    'session_scope',
+    'get_scoped_session',
+    'remove_scoped_session',
     'init_db',
     # User
     'User',
@@ -66,8 +87,36 @@ __all__ = [
     'NotificationCategory',
     'NotificationStatus',
     'NotificationPriority',
+    'PRIORITY_RANK',
+    'retry_backoff',
     # Document
     'Document',
     'DocumentType',
     'DocumentStatus',
+    # Search index
+    'ensure_search_index',
+    'rebuild_search_index',
+    'search_documents',
+    'search_entity',
+    'search_index_exists',
+    'matching_ids_select',
+    # Daily rollups
+    'daily_rollups',
+    'ensure_daily_rollups',
+    'rebuild_daily_rollups',
+    'rollup_totals',
+    'rollup_rows',
+    'payments_column',
+    'revenue_column',
+    'session_status_column',
+    'session_type_column',
+    'exams_column',
+    # Unread counters
+    'notification_unread_counts',
+    'ensure_unread_counters',
+    'rebuild_unread_counters',
+    'unread_count',
+    # Notification archive
+    'notifications_archive',
+    'archive_notifications',
 ]
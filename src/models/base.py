@@ -2,12 +2,13 @@
 Configuration de base pour SQLAlchemy
 """
 
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional
 
-from sqlalchemy import create_engine, Column, Integer, DateTime
-from sqlalchemy.orm import sessionmaker, Session, declarative_base
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import create_engine, event, Column, Integer, DateTime
+from sqlalchemy.orm import sessionmaker, scoped_session, Session, declarative_base
+from sqlalchemy.pool import QueuePool, StaticPool
 
 # Base pour tous les modèles
 Base = declarative_base()
@@ -24,6 +25,49 @@ class BaseModel:
 # Configuration de la base de données
 _engine = None
 _SessionLocal = None
+_ScopedSession = None
+
+# Connexions SQLite du pool : une par session ouverte (rendue à la fin de sa
+# transaction ou à sa fermeture). POOL_SIZE restent ouvertes ; au-delà, jusqu'à
+# POOL_MAX_OVERFLOW connexions temporaires (pics de workers), puis attente.
+POOL_SIZE = 8
+POOL_MAX_OVERFLOW = 24
+POOL_TIMEOUT = 30  # Secondes d'attente d'une connexion libre avant erreur
+
+# PRAGMA sans effet (ou refusés) sur une base en mémoire
+_FILE_ONLY_PRAGMAS = ('journal_mode', 'mmap_size')
+
+
+def get_sqlite_pragmas() -> dict:
+    """
+    PRAGMA SQLite à appliquer à chaque nouvelle connexion
+    
+    Lus depuis config.json (database.sqlite) via ConfigManager ; valeurs
+    par défaut si la configuration est indisponible.
+    
+    Returns:
+        Dict pragma -> valeur
+    """
+    try:
+        from src.utils.config_manager import get_config_manager
+        return get_config_manager().get_sqlite_pragmas()
+    except Exception:
+        from src.utils.config_manager import DEFAULT_SQLITE_PRAGMAS
+        return dict(DEFAULT_SQLITE_PRAGMAS)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, pragmas: dict, in_memory: bool = False):
+    """Exécuter les PRAGMA sur une connexion sqlite3 brute"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if value is None or (in_memory and name in _FILE_ONLY_PRAGMAS):
+                continue
+            if not str(name).isidentifier() or not str(value).lstrip('-').isalnum():
+                raise ValueError(f"PRAGMA SQLite invalide : {name}={value}")
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
 
 
 def get_engine(database_path: Optional[str] = None, echo: bool = False):
@@ -55,18 +99,37 @@ def get_engine(database_path: Optional[str] = None, echo: bool = False):
                 database_path = str(project_root / "data" / "autoecole.db")
         
         # Convertir en chemin absolu si c'est un chemin relatif
-        if not os.path.isabs(database_path):
+        if database_path != ":memory:" and not os.path.isabs(database_path):
             current_file = Path(__file__).resolve()
             project_root = current_file.parent.parent.parent
             database_path = str(project_root / database_path)
         
-        # Créer l'engine avec support multi-threading pour SQLite
+        # Une connexion par session (pool partagé entre threads) : les workers
+        # lisent en parallèle du thread GUI (WAL), aucune connexion n'est
+        # partagée entre deux sessions
+        if database_path == ":memory:":
+            # Base en mémoire: une seule connexion partagée (sinon une base par connexion)
+            pool_args = {"poolclass": StaticPool}
+        else:
+            pool_args = {
+                "poolclass": QueuePool, "pool_size": POOL_SIZE,
+                "max_overflow": POOL_MAX_OVERFLOW, "pool_timeout": POOL_TIMEOUT,
+            }
+        
         _engine = create_engine(
             f"sqlite:///{database_path}",
             connect_args={"check_same_thread": False},
-            poolclass=StaticPool,
-            echo=echo
+            echo=echo,
+            **pool_args
         )
+        
+        # WAL, cache, mmap... appliqués une fois par connexion physique
+        pragmas = get_sqlite_pragmas()
+        in_memory = database_path == ":memory:"
+        
+        @event.listens_for(_engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            _apply_sqlite_pragmas(dbapi_connection, pragmas, in_memory)
     
     return _engine
 
@@ -95,6 +158,9 @@ def get_session() -> Session:
     """
     Obtenir une session de base de données
     
+    Note: l'appelant est responsable de la fermer. Pour du nouveau code,
+    préférer session_scope() qui gère commit/rollback/fermeture.
+    
     Returns:
         Session SQLAlchemy
     """
@@ -102,6 +168,54 @@ def get_session() -> Session:
     return SessionLocal()
 
 
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Session transactionnelle à durée de vie limitée
+    
+    Commit à la sortie du bloc, rollback en cas d'exception, puis fermeture
+    (libère la connexion et l'identity map).
+    
+    Usage:
+        with session_scope() as session:
+            session.add(obj)
+    """
+    session = get_session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def get_scoped_session() -> Session:
+    """
+    Obtenir la session propre au thread courant
+    
+    Le même appel dans un même thread renvoie la même session ; chaque
+    thread (worker) a la sienne. La libérer avec remove_scoped_session()
+    à la fin du travail du thread.
+    
+    Returns:
+        Session SQLAlchemy du thread courant
+    """
+    global _ScopedSession
+    
+    if _ScopedSession is None:
+        _ScopedSession = scoped_session(get_session_factory())
+    
+    return _ScopedSession()
+
+
+def remove_scoped_session():
+    """Fermer et oublier la session du thread courant (si elle existe)"""
+    if _ScopedSession is not None:
+        _ScopedSession.remove()
+
+
 def init_db(database_path: Optional[str] = None, drop_all: bool = False):
     """
     Initialiser la base de données
@@ -141,12 +255,28 @@ def init_db(database_path: Optional[str] = None, drop_all: bool = False):
     # Créer toutes les tables
     Base.metadata.create_all(engine)
     
+    # Index plein texte de la recherche globale (FTS5 + triggers)
+    from .search_index import ensure_search_index
+    ensure_search_index(engine)
+    
+    # Agrégats journaliers des rapports (table + triggers de maintenance)
+    from .daily_rollup import ensure_daily_rollups
+    ensure_daily_rollups(engine)
+    
+    # Compteurs de notifications non lues (table + triggers de maintenance)
+    from .unread_counter import ensure_unread_counters
+    ensure_unread_counters(engine)
+    
     print(f"✓ Base de données initialisée : {database_path}")
 
 
 def close_db():
     """Fermer la connexion à la base de données"""
-    global _engine, _SessionLocal
+    global _engine, _SessionLocal, _ScopedSession
+    
+    if _ScopedSession is not None:
+        _ScopedSession.remove()
+        _ScopedSession = None
     
     if _engine:
         _engine.dispose()
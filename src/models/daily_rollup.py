@@ -0,0 +1,228 @@
+"""
+Agrégats journaliers matérialisés (table daily_rollups)
+
+Une ligne par jour contient les indicateurs des rapports : paiements et
+chiffre d'affaires par méthode, séances par statut et par type, heures
+effectuées, examens par type et résultat. Les rapports sur une année lisent
+ainsi 365 lignes au lieu de parcourir paiements, séances et examens.
+
+La table est tenue à jour par des triggers SQL sur payments, sessions et
+exams : chaque écriture applique son delta (-OLD puis +NEW) au jour concerné
+dans la même transaction, quel que soit le code qui écrit (ORM, UPDATE en
+masse de la synchronisation des statuts, import...).
+
+Les montants sont stockés en centimes (entiers) pour que les deltas
+successifs restent exacts.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Date, Integer, Table, func, select, text
+
+from .base import Base
+from .exam import ExamResult, ExamType
+from .payment import PaymentMethod
+from .session import SessionStatus, SessionType
+
+ROLLUP_TABLE = "daily_rollups"
+
+
+def payments_column(method: PaymentMethod) -> str:
+    return f"payments_{method.name.lower()}"
+
+
+def revenue_column(method: PaymentMethod) -> str:
+    return f"revenue_cents_{method.name.lower()}"
+
+
+def session_status_column(status: SessionStatus) -> str:
+    return f"sessions_status_{status.name.lower()}"
+
+
+def session_type_column(session_type: SessionType) -> str:
+    return f"sessions_type_{session_type.name.lower()}"
+
+
+def exams_column(exam_type: ExamType, result: ExamResult) -> str:
+    return f"exams_{exam_type.name.lower()}_{result.name.lower()}"
+
+
+# table source -> (expression du jour, {colonne: condition ou (condition, valeur)}, colonnes surveillées)
+# Les enums sont stockés par leur nom ; {row} est remplacé par NEW/OLD ou l'alias
+_PAYMENT_METRICS = {
+    'payments_validated': "{row}.is_cancelled = 0 AND {row}.is_validated = 1",
+    'payments_cancelled': "{row}.is_cancelled = 1",
+}
+for _method in PaymentMethod:
+    _active = f"{{row}}.is_cancelled = 0 AND {{row}}.payment_method = '{_method.name}'"
+    _PAYMENT_METRICS[payments_column(_method)] = _active
+    _PAYMENT_METRICS[revenue_column(_method)] = (_active, "CAST(round({row}.amount * 100) AS INTEGER)")
+
+_SESSION_METRICS = {
+    'completed_minutes': (f"{{row}}.status = '{SessionStatus.COMPLETED.name}'", "{row}.duration_minutes"),
+}
+for _status in SessionStatus:
+    _SESSION_METRICS[session_status_column(_status)] = f"{{row}}.status = '{_status.name}'"
+for _type in SessionType:
+    _SESSION_METRICS[session_type_column(_type)] = f"{{row}}.session_type = '{_type.name}'"
+
+_EXAM_METRICS = {}
+for _type in ExamType:
+    for _result in ExamResult:
+        _EXAM_METRICS[exams_column(_type, _result)] = (
+            f"{{row}}.exam_type = '{_type.name}' AND {{row}}.result = '{_result.name}'"
+        )
+
+_SOURCES = {
+    'payments': ("date({row}.payment_date)", _PAYMENT_METRICS,
+                 ['amount', 'payment_method', 'payment_date', 'is_validated', 'is_cancelled']),
+    'sessions': ("date({row}.start_datetime)", _SESSION_METRICS,
+                 ['status', 'session_type', 'start_datetime', 'duration_minutes']),
+    'exams': ("date({row}.scheduled_date)", _EXAM_METRICS,
+              ['exam_type', 'result', 'scheduled_date']),
+}
+
+METRIC_COLUMNS = [name for _day, metrics, _watched in _SOURCES.values() for name in metrics]
+
+daily_rollups = Table(
+    ROLLUP_TABLE, Base.metadata,
+    Column('day', Date, primary_key=True),
+    *(Column(name, Integer, nullable=False, default=0, server_default='0') for name in METRIC_COLUMNS)
+)
+
+
+def _metric_sql(definition, row: str, sign: str = "") -> str:
+    """Expression d'une métrique : 1 (comptage) ou valeur si la condition est vraie"""
+    if isinstance(definition, tuple):
+        condition, value = definition
+    else:
+        condition, value = definition, "1"
+    return f"{sign}CASE WHEN {condition.format(row=row)} THEN {value.format(row=row)} ELSE 0 END"
+
+
+def _upsert_sql(source: str, row: str, sign: str = "", aggregate: bool = False, where: str = "") -> str:
+    """
+    INSERT ... ON CONFLICT(day) DO UPDATE ajoutant les métriques d'une source
+    
+    row vaut NEW/OLD dans un trigger (une ligne), ou l'alias de table avec
+    aggregate=True pour une reconstruction (GROUP BY jour).
+    """
+    day_sql, metrics, _watched = _SOURCES[source]
+    columns = list(metrics)
+    if aggregate:
+        values = ", ".join(f"sum({_metric_sql(metrics[c], row)})" for c in columns)
+        source_sql = (
+            f"SELECT {day_sql.format(row=row)} AS d, {values} FROM {source} AS {row} "
+            f"WHERE {day_sql.format(row=row)} IS NOT NULL {where} GROUP BY d"
+        )
+    else:
+        values = ", ".join(_metric_sql(metrics[c], row, sign) for c in columns)
+        # WHERE obligatoire : lève l'ambiguïté de ON CONFLICT après un SELECT
+        source_sql = f"SELECT {day_sql.format(row=row)}, {values} WHERE {day_sql.format(row=row)} IS NOT NULL"
+    updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in columns)
+    return (
+        f"INSERT INTO {ROLLUP_TABLE}(day, {', '.join(columns)}) {source_sql} "
+        f"ON CONFLICT(day) DO UPDATE SET {updates}"
+    )
+
+
+def _trigger_statements(source: str) -> List[str]:
+    """CREATE TRIGGER de maintenance des agrégats d'une source"""
+    _day, _metrics, watched = _SOURCES[source]
+    add_new = _upsert_sql(source, "NEW") + ";"
+    remove_old = _upsert_sql(source, "OLD", sign="-") + ";"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS rollup_{source}_ai AFTER INSERT ON {source} BEGIN {add_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS rollup_{source}_au AFTER UPDATE OF {', '.join(watched)} ON {source} "
+        f"BEGIN {remove_old} {add_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS rollup_{source}_ad AFTER DELETE ON {source} BEGIN {remove_old} END",
+    ]
+
+
+def _triggers_exist(connection) -> bool:
+    names = {f"rollup_{source}_{kind}" for source in _SOURCES for kind in ('ai', 'au', 'ad')}
+    rows = connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).all()
+    return names <= {row[0] for row in rows}
+
+
+def ensure_daily_rollups(engine):
+    """
+    Créer les triggers de maintenance si nécessaire (table créée par create_all)
+    
+    À la première installation, la table est alimentée à partir des données
+    existantes.
+    """
+    with engine.begin() as connection:
+        if _triggers_exist(connection):
+            return
+        for source in _SOURCES:
+            for statement in _trigger_statements(source):
+                connection.execute(text(statement))
+        _populate(connection)
+
+
+def rebuild_daily_rollups(engine, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """
+    Recalculer les agrégats (tous les jours, ou ceux d'une période incluse)
+    
+    Args:
+        engine: Engine SQLAlchemy
+        start_date: Premier jour à recalculer (None: depuis le début)
+        end_date: Dernier jour à recalculer (None: jusqu'à la fin)
+    """
+    with engine.begin() as connection:
+        _populate(connection, start_date, end_date)
+
+
+def _populate(connection, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    bounds, params = [], {}
+    if start_date is not None:
+        bounds.append("{day} >= :start")
+        params['start'] = start_date.isoformat()
+    if end_date is not None:
+        bounds.append("{day} <= :end")
+        params['end'] = end_date.isoformat()
+    
+    delete_where = " AND ".join(bound.format(day="day") for bound in bounds)
+    connection.execute(
+        text(f"DELETE FROM {ROLLUP_TABLE}" + (f" WHERE {delete_where}" if delete_where else "")),
+        params
+    )
+    for source, (day_sql, _metrics, _watched) in _SOURCES.items():
+        day = day_sql.format(row="t")
+        where = "".join(f" AND {bound.format(day=day)}" for bound in bounds)
+        connection.execute(text(_upsert_sql(source, "t", aggregate=True, where=where)), params)
+
+
+def _period(start_date: Optional[date], end_date: Optional[date]) -> list:
+    columns = daily_rollups.c
+    conditions = []
+    if start_date is not None:
+        conditions.append(columns.day >= start_date)
+    if end_date is not None:
+        conditions.append(columns.day <= end_date)
+    return conditions
+
+
+def rollup_totals(session, start_date: Optional[date] = None,
+                  end_date: Optional[date] = None) -> Dict[str, int]:
+    """
+    Somme de chaque métrique sur une période (bornes incluses, None: sans borne)
+    
+    Returns:
+        Dict colonne -> total (0 si aucune ligne)
+    """
+    row = session.execute(
+        select(*(func.coalesce(func.sum(daily_rollups.c[name]), 0) for name in METRIC_COLUMNS))
+        .where(*_period(start_date, end_date))
+    ).one()
+    return dict(zip(METRIC_COLUMNS, (int(value) for value in row)))
+
+
+def rollup_rows(session, start_date: Optional[date] = None,
+                end_date: Optional[date] = None) -> List[Tuple]:
+    """Lignes journalières d'une période, triées par jour (jours sans activité absents)"""
+    return session.execute(
+        select(daily_rollups).where(*_period(start_date, end_date)).order_by(daily_rollups.c.day)
+    ).all()
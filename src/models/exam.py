@@ -6,7 +6,7 @@ import enum
 from datetime import datetime, date
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Enum, Date, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Enum, Date, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 
 from .base import Base, BaseModel
@@ -30,6 +30,10 @@ class Exam(Base, BaseModel):
     """Modèle examen pour la gestion des sessions d'examen"""
     
     __tablename__ = "exams"
+    __table_args__ = (
+        # Taux de réussite / examens à venir: résultat puis période
+        Index('ix_exams_result_date', 'result', 'scheduled_date'),
+    )
     
     # Relation avec l'élève
     student_id = Column(Integer, ForeignKey('students.id', ondelete='CASCADE'), nullable=False, index=True)
@@ -57,7 +57,7 @@ class VehicleMaintenance(Base):
     status = Column(SQLEnum(MaintenanceStatus), default=MaintenanceStatus.PLANIFIEE, nullable=False)
     
     # Dates
-    scheduled_date = Column(DateTime, nullable=False)  # Date prévue
+    scheduled_date = Column(DateTime, nullable=False, index=True)  # Date prévue
     start_date = Column(DateTime, nullable=True)  # Date de début réelle
     completion_date = Column(DateTime, nullable=True)  # Date de fin réelle
     
@@ -3,9 +3,10 @@ Modèle pour l'historique et la gestion des notifications
 Phase 2 - Système de Notifications Automatiques
 """
 
-from datetime import datetime
+import random
+from datetime import datetime, timedelta
 from enum import Enum
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Index, case, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -47,6 +48,41 @@ class NotificationPriority(str, Enum):
     URGENT = "urgente"
 
 
+# Rang des priorités : la colonne stocke le nom de l'énumération, un tri
+# direct sur priority serait alphabétique (LOW > HIGH > NORMAL > URGENT)
+PRIORITY_RANK = {
+    NotificationPriority.LOW: 0,
+    NotificationPriority.NORMAL: 1,
+    NotificationPriority.HIGH: 2,
+    NotificationPriority.URGENT: 3,
+}
+
+# Délai de base et plafond des nouvelles tentatives après un échec
+RETRY_BASE_DELAY = 60
+RETRY_MAX_DELAY = 3600
+
+
+def retry_backoff(retry_count: int, base_delay: float = RETRY_BASE_DELAY,
+                  max_delay: float = RETRY_MAX_DELAY) -> timedelta:
+    """
+    Délai avant la prochaine tentative (exponentiel, avec gigue)
+    
+    base_delay * 2^(échecs - 1), plafonné à max_delay, dont la moitié est
+    tirée au hasard : des envois échoués ensemble (panne SMTP) ne sont pas
+    tous réessayés au même instant.
+    
+    Args:
+        retry_count: Nombre d'échecs déjà enregistrés (1 après le premier)
+    """
+    delay = min(max_delay, base_delay * 2 ** max(retry_count - 1, 0))
+    return timedelta(seconds=delay / 2 + random.uniform(0, delay / 2))
+
+
+def _initial_attempt(context) -> datetime:
+    """Première tentative : date planifiée, sinon immédiatement"""
+    return context.get_current_parameters().get('scheduled_at') or datetime.now()
+
+
 class Notification(Base):
     """
     Modèle pour l'historique et la gestion des notifications
@@ -60,6 +96,14 @@ class Notification(Base):
     """
     
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # Prochaines échéances du planificateur (NULL une fois la notification terminée)
+        Index('ix_notifications_next_attempt', 'next_attempt_at'),
+        # Fil in-app d'un destinataire, pagination par curseur (created_at, id)
+        Index('ix_notifications_feed', 'recipient_id', 'recipient_type', 'notification_type', 'created_at'),
+        # Règles de rétention (statut + ancienneté)
+        Index('ix_notifications_status_created', 'status', 'created_at'),
+    )
     
     # Clé primaire
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -97,6 +141,7 @@ class Notification(Base):
     error_message = Column(Text, nullable=True)
     retry_count = Column(Integer, default=0, nullable=False)
     max_retries = Column(Integer, default=3, nullable=False)
+    next_attempt_at = Column(DateTime, default=_initial_attempt, nullable=True)  # Prochain envoi (NULL = rien à faire)
     
     # Données contextuelles (JSON)
     context_data = Column(Text, nullable=True)  # Données additionnelles (JSON serialisé)
@@ -121,22 +166,28 @@ class Notification(Base):
         """Marquer la notification comme envoyée"""
         self.status = NotificationStatus.SENT
         self.sent_at = sent_at or datetime.now()
+        self.next_attempt_at = None
     
     def mark_as_delivered(self, delivered_at=None):
         """Marquer la notification comme livrée"""
         self.status = NotificationStatus.DELIVERED
         self.delivered_at = delivered_at or datetime.now()
+        self.next_attempt_at = None
     
     def mark_as_failed(self, error_message: str):
-        """Marquer la notification comme échouée"""
+        """Marquer la notification comme échouée (nouvelle tentative différée si possible)"""
         self.status = NotificationStatus.FAILED
         self.error_message = error_message
         self.retry_count += 1
+        self.next_attempt_at = (
+            datetime.now() + retry_backoff(self.retry_count) if self.can_retry() else None
+        )
     
     def mark_as_read(self, read_at=None):
         """Marquer la notification in-app comme lue"""
         self.status = NotificationStatus.READ
         self.read_at = read_at or datetime.now()
+        self.next_attempt_at = None
     
     def can_retry(self) -> bool:
         """Vérifier si la notification peut être renvoyée"""
@@ -158,6 +209,14 @@ class Notification(Base):
         delta = self.scheduled_at - datetime.now()
         return int(delta.total_seconds() / 60)
     
+    @staticmethod
+    def priority_order():
+        """Expression SQL de tri par priorité (URGENT en premier avec .desc())"""
+        return case(
+            {priority.name: rank for priority, rank in PRIORITY_RANK.items()},
+            value=Notification.__table__.c.priority
+        )
+    
     def to_dict(self):
         """Convertir en dictionnaire"""
         return {
@@ -183,6 +242,7 @@ class Notification(Base):
             'error_message': self.error_message,
             'retry_count': self.retry_count,
             'max_retries': self.max_retries,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'is_overdue': self.is_overdue(),
             'can_retry': self.can_retry(),
@@ -0,0 +1,88 @@
+"""
+Archive des notifications traitées (table notifications_archive)
+
+La table notifications ne fait que grossir : les notifications envoyées,
+livrées ou lues restent à côté de la file d'attente et chaque recherche,
+statistique ou parcours en paie le prix. Les règles de rétention
+(NotificationController.apply_retention) déplacent les lignes anciennes
+vers notifications_archive, par lots : une transaction courte par lot,
+l'application reste utilisable pendant l'archivage.
+
+L'archive est dans le même fichier SQLite que la base : sauvegardes et
+restaurations la couvrent sans traitement particulier. Les lignes
+archivées gardent leur identifiant d'origine (notification_id) ; la clé
+de l'archive est propre, SQLite pouvant réattribuer un id supprimé.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Column, DateTime, Index, Integer, Table, delete, insert, literal, select
+
+from .base import Base
+from .notification import Notification
+
+ARCHIVE_TABLE = "notifications_archive"
+ARCHIVE_CHUNK_SIZE = 1000
+
+# Colonnes copiées (next_attempt_at n'a plus de sens pour une notification archivée)
+ARCHIVED_COLUMNS = [
+    column.name for column in Notification.__table__.columns if column.name not in ('id', 'next_attempt_at')
+]
+
+notifications_archive = Table(
+    ARCHIVE_TABLE, Base.metadata,
+    Column('archive_id', Integer, primary_key=True, autoincrement=True),
+    Column('notification_id', Integer, nullable=False),
+    *(
+        Column(column.name, column.type.copy(), nullable=column.nullable)
+        for column in Notification.__table__.columns if column.name in ARCHIVED_COLUMNS
+    ),
+    Column('archived_at', DateTime, nullable=False),
+    Index('ix_notifications_archive_notification', 'notification_id'),
+    Index('ix_notifications_archive_created', 'created_at'),
+)
+
+
+def archive_notifications(engine, conditions: list, chunk_size: int = ARCHIVE_CHUNK_SIZE,
+                          archived_at: Optional[datetime] = None) -> int:
+    """
+    Déplacer vers l'archive les notifications répondant aux conditions
+    
+    Chaque lot (chunk_size lignes) est copié puis supprimé de la table
+    principale dans sa propre transaction.
+    
+    Args:
+        engine: Engine SQLAlchemy
+        conditions: Expressions sur Notification (combinées par AND)
+        chunk_size: Nombre de lignes par transaction
+        archived_at: Date d'archivage enregistrée (défaut : maintenant)
+    
+    Returns:
+        Nombre de notifications archivées
+    """
+    table = Notification.__table__
+    archived_at = archived_at or datetime.now()
+    moved = 0
+    
+    while True:
+        with engine.begin() as connection:
+            ids: List[int] = connection.execute(
+                select(table.c.id).where(*conditions).order_by(table.c.created_at).limit(chunk_size)
+            ).scalars().all()
+            if not ids:
+                break
+            connection.execute(
+                insert(notifications_archive).from_select(
+                    ['notification_id', *ARCHIVED_COLUMNS, 'archived_at'],
+                    select(
+                        table.c.id, *(table.c[name] for name in ARCHIVED_COLUMNS), literal(archived_at, DateTime)
+                    ).where(table.c.id.in_(ids))
+                )
+            )
+            connection.execute(delete(table).where(table.c.id.in_(ids)))
+        moved += len(ids)
+        if len(ids) < chunk_size:
+            break
+    
+    return moved
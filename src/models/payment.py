@@ -6,7 +6,7 @@ import enum
 from datetime import datetime, date
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Enum, Date, Float, ForeignKey, Text, Boolean, Numeric
+from sqlalchemy import Column, Integer, String, Enum, Date, Float, ForeignKey, Text, Boolean, Numeric, Index
 from sqlalchemy.orm import relationship
 from decimal import Decimal
 
@@ -26,6 +26,10 @@ class Payment(Base, BaseModel):
     """Modèle paiement pour la gestion des transactions financières"""
     
     __tablename__ = "payments"
+    __table_args__ = (
+        # Statistiques / CA: paiements non annulés sur une période
+        Index('ix_payments_cancelled_date', 'is_cancelled', 'payment_date'),
+    )
     
     # Relation avec l'élève
     student_id = Column(Integer, ForeignKey('students.id', ondelete='CASCADE'), nullable=False, index=True)
@@ -0,0 +1,280 @@
+"""
+Index plein texte (SQLite FTS5) pour la recherche globale
+
+Une table virtuelle `search_index` contient un document par élève,
+moniteur, véhicule, examen, paiement, maintenance et notification. Elle est
+tenue à jour par des triggers SQL (insert / update / delete), quel que soit
+le code qui écrit en base.
+
+- Tokenizer unicode61 avec suppression des accents : "Hélène" = "helene"
+- Index de préfixes : recherche "dup" -> "Dupont" sans parcours de table
+- Classement bm25, le titre (nom, plaque...) pesant plus que le reste
+
+Le rowid d'un document encode l'entité : rowid = id * 8 + code, ce qui
+permet aux triggers de supprimer/remplacer un document par clé primaire.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, column, text
+
+SEARCH_TABLE = "search_index"
+_ROWID_FACTOR = 8
+
+# entité -> (code, table, expression du titre, expressions du corps)
+# {row} est remplacé par NEW/OLD dans les triggers, par l'alias de table sinon
+_ENTITIES = {
+    'students': (1, 'students', "{row}.full_name",
+                 ["{row}.cin", "{row}.phone", "{row}.email"]),
+    'instructors': (2, 'instructors', "{row}.full_name",
+                    ["{row}.cin", "{row}.phone", "{row}.email", "{row}.license_number"]),
+    'vehicles': (3, 'vehicles', "{row}.plate_number",
+                 ["{row}.make", "{row}.model", "{row}.vin", "{row}.color"]),
+    'exams': (4, 'exams', "(SELECT full_name FROM students WHERE id = {row}.student_id)",
+              ["{row}.summons_number", "{row}.exam_center", "{row}.location",
+               "(SELECT cin FROM students WHERE id = {row}.student_id)"]),
+    'payments': (5, 'payments', "(SELECT full_name FROM students WHERE id = {row}.student_id)",
+                 ["{row}.receipt_number", "{row}.description",
+                  "(SELECT cin FROM students WHERE id = {row}.student_id)"]),
+    'maintenances': (6, 'vehicle_maintenances', "(SELECT plate_number FROM vehicles WHERE id = {row}.vehicle_id)",
+                     ["{row}.description", "{row}.provider_name", "{row}.technician_name",
+                      "{row}.invoice_number", "{row}.parts_replaced"]),
+    'notifications': (7, 'notifications', "{row}.title",
+                      ["{row}.message", "{row}.recipient_name", "{row}.subject"]),
+}
+
+# Colonnes dont la modification change le document indexé
+_INDEXED_COLUMNS = {
+    'students': ['full_name', 'cin', 'phone', 'email'],
+    'instructors': ['full_name', 'cin', 'phone', 'email', 'license_number'],
+    'vehicles': ['plate_number', 'make', 'model', 'vin', 'color'],
+    'exams': ['student_id', 'summons_number', 'exam_center', 'location'],
+    'payments': ['student_id', 'receipt_number', 'description'],
+    'maintenances': ['vehicle_id', 'description', 'provider_name', 'technician_name',
+                     'invoice_number', 'parts_replaced'],
+    'notifications': ['title', 'message', 'recipient_name', 'subject'],
+}
+
+# Documents dépendants à réindexer quand une entité "parente" change
+# parent -> [(entité enfant, colonne de clé étrangère)]
+_DEPENDENTS = {
+    'students': [('exams', 'student_id'), ('payments', 'student_id')],
+    'vehicles': [('maintenances', 'vehicle_id')],
+}
+
+_CODE_TO_ENTITY = {code: entity for entity, (code, *_rest) in _ENTITIES.items()}
+
+# Poids bm25 par colonne : entity (non indexée), title, body
+_BM25 = f"bm25({SEARCH_TABLE}, 0.0, 10.0, 1.0)"
+
+
+def _document_sql(entity: str, row: str) -> Tuple[str, str, str]:
+    """Expressions SQL (rowid, titre, corps) du document d'une entité"""
+    code, _table, title, body = _ENTITIES[entity]
+    rowid = f"{row}.id * {_ROWID_FACTOR} + {code}"
+    title_sql = f"coalesce({title.format(row=row)}, '')"
+    body_sql = " || ' ' || ".join(f"coalesce({expr.format(row=row)}, '')" for expr in body)
+    return rowid, title_sql, body_sql
+
+
+def _insert_select_sql(entity: str, where: str = "") -> str:
+    """INSERT ... SELECT des documents d'une entité (reconstruction / dépendants)"""
+    _code, table, _title, _body = _ENTITIES[entity]
+    rowid, title_sql, body_sql = _document_sql(entity, "t")
+    return (
+        f"INSERT INTO {SEARCH_TABLE}(rowid, entity, title, body) "
+        f"SELECT {rowid}, '{entity}', {title_sql}, {body_sql} FROM {table} AS t {where}"
+    )
+
+
+def _trigger_statements(entity: str) -> List[str]:
+    """CREATE TRIGGER de synchronisation d'une entité"""
+    code, table, _title, _body = _ENTITIES[entity]
+    rowid_new, title_new, body_new = _document_sql(entity, "NEW")
+    insert_new = (
+        f"INSERT INTO {SEARCH_TABLE}(rowid, entity, title, body) "
+        f"VALUES ({rowid_new}, '{entity}', {title_new}, {body_new});"
+    )
+    delete_old = f"DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id * {_ROWID_FACTOR} + {code};"
+    
+    refresh_dependents = ""
+    for child, foreign_key in _DEPENDENTS.get(entity, []):
+        child_code, child_table, _t, _b = _ENTITIES[child]
+        refresh_dependents += (
+            f" DELETE FROM {SEARCH_TABLE} WHERE rowid IN "
+            f"(SELECT id * {_ROWID_FACTOR} + {child_code} FROM {child_table} WHERE {foreign_key} = NEW.id);"
+            f" {_insert_select_sql(child, f'WHERE t.{foreign_key} = NEW.id')};"
+        )
+    
+    columns = ", ".join(_INDEXED_COLUMNS[entity])
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS fts_{table}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS fts_{table}_au AFTER UPDATE OF {columns} ON {table} "
+        f"BEGIN {delete_old} {insert_new}{refresh_dependents} END",
+        f"CREATE TRIGGER IF NOT EXISTS fts_{table}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+    ]
+
+
+def search_index_exists(connection) -> bool:
+    """La table FTS existe-t-elle dans la base ?"""
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SEARCH_TABLE}
+    ).first() is not None
+
+
+def ensure_search_index(engine) -> bool:
+    """
+    Créer la table FTS5 et ses triggers si nécessaire (puis l'alimenter)
+    
+    Args:
+        engine: Engine SQLAlchemy (tables métier déjà créées)
+    
+    Returns:
+        True si l'index est disponible, False si SQLite n'a pas FTS5
+    """
+    with engine.begin() as connection:
+        if not search_index_exists(connection):
+            try:
+                connection.execute(text(
+                    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+                    f"entity UNINDEXED, title, body, "
+                    f"tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+                ))
+            except Exception:
+                return False  # SQLite compilé sans FTS5: recherche LIKE
+            _populate(connection)
+        
+        for entity in _ENTITIES:
+            for statement in _trigger_statements(entity):
+                connection.execute(text(statement))
+    return True
+
+
+def rebuild_search_index(engine):
+    """Reconstruire entièrement l'index (après import massif ou restauration)"""
+    with engine.begin() as connection:
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+        _populate(connection)
+        connection.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"))
+
+
+def _populate(connection):
+    for entity in _ENTITIES:
+        connection.execute(text(_insert_select_sql(entity)))
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Convertir la saisie utilisateur en requête FTS5 (préfixes, ET implicite)
+    
+    "jean dup" -> "jean"* "dup"*
+    """
+    terms = [term for term in re.split(r"[^\w]+", query or "") if term]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_documents(connection, query: str, entity: Optional[str] = None,
+                     limit: Optional[int] = None, offset: int = 0,
+                     limit_per_entity: Optional[int] = None) -> List[Tuple[str, int]]:
+    """
+    Rechercher dans l'index, meilleurs résultats en premier
+    
+    Args:
+        connection: Connexion ou session SQLAlchemy
+        query: Saisie utilisateur
+        entity: Limiter à une entité ('students', 'payments'...)
+        limit: Nombre maximum de résultats
+        offset: Nombre de résultats à sauter
+        limit_per_entity: Nombre maximum de résultats par entité (une seule requête)
+    
+    Returns:
+        Liste de (entité, id)
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+    
+    params = {"match": match}
+    where = f"{SEARCH_TABLE} MATCH :match"
+    if entity is not None:
+        where += " AND entity = :entity"
+        params["entity"] = entity
+    
+    if limit_per_entity is not None:
+        # Classement par entité en une passe sur les correspondances
+        # (bm25 n'est utilisable que dans la requête MATCH elle-même)
+        sql = (
+            f"WITH matches AS (SELECT rowid AS doc, entity, {_BM25} AS score "
+            f"FROM {SEARCH_TABLE} WHERE {where}) "
+            f"SELECT doc FROM (SELECT doc, score, "
+            f"row_number() OVER (PARTITION BY entity ORDER BY score) AS position FROM matches) "
+            f"WHERE position > :offset AND position <= :offset + :per_entity ORDER BY score"
+        )
+        params.update(offset=offset, per_entity=limit_per_entity)
+    else:
+        sql = f"SELECT rowid FROM {SEARCH_TABLE} WHERE {where} ORDER BY {_BM25}"
+        if limit is not None:
+            sql += " LIMIT :limit OFFSET :offset"
+            params.update(limit=limit, offset=offset)
+    
+    rows = connection.execute(text(sql), params).fetchall()
+    return [
+        (_CODE_TO_ENTITY[rowid % _ROWID_FACTOR], rowid // _ROWID_FACTOR) for (rowid,) in rows
+    ]
+
+
+def matching_ids_select(query: str, entity: str):
+    """
+    Sous-requête des IDs d'une entité correspondant à la saisie
+    
+    À utiliser dans un filtre : Model.id.in_(matching_ids_select(...))
+    
+    Returns:
+        Select textuel (colonne id) ou None si la saisie est vide
+    """
+    match = build_match_query(query)
+    if match is None:
+        return None
+    return text(
+        f"SELECT rowid / {_ROWID_FACTOR} AS id FROM {SEARCH_TABLE} "
+        f"WHERE {SEARCH_TABLE} MATCH :fts_match AND entity = :fts_entity"
+    ).bindparams(fts_match=match, fts_entity=entity).columns(column('id', Integer))
+
+
+def search_entity(connection, query: str, entity: str, limit: int,
+                  offset: int = 0) -> List[Tuple[int, str, str]]:
+    """
+    Page de résultats d'une entité avec le texte indexé (sans charger les objets)
+    
+    Args:
+        connection: Connexion ou session SQLAlchemy
+        query: Saisie utilisateur
+        entity: Entité ('students', 'payments'...)
+        limit: Taille de la page
+        offset: Nombre de résultats à sauter
+    
+    Returns:
+        Liste de (id, titre, corps), meilleurs résultats en premier
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+    
+    rows = connection.execute(text(
+        f"SELECT rowid, title, body FROM {SEARCH_TABLE} "
+        f"WHERE {SEARCH_TABLE} MATCH :match AND entity = :entity "
+        f"ORDER BY {_BM25} LIMIT :limit OFFSET :offset"
+    ), {"match": match, "entity": entity, "limit": limit, "offset": offset}).fetchall()
+    return [(rowid // _ROWID_FACTOR, title, body) for rowid, title, body in rows]
+
+
+def group_by_entity(documents: List[Tuple[str, int]]) -> Dict[str, List[int]]:
+    """Regrouper les (entité, id) par entité en conservant l'ordre de pertinence"""
+    grouped: Dict[str, List[int]] = {}
+    for entity, entity_id in documents:
+        grouped.setdefault(entity, []).append(entity_id)
+    return grouped
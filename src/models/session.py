@@ -6,7 +6,7 @@ import enum
 from datetime import datetime, timedelta
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Enum, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, Enum, DateTime, ForeignKey, Text, Float, Index
 from sqlalchemy.orm import relationship
 
 from .base import Base, BaseModel
@@ -38,6 +38,13 @@ class Session(Base, BaseModel):
     """Modèle session pour la gestion des créneaux de conduite"""
     
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Détection de conflits: égalité sur la ressource puis plage horaire
+        # (status en dernier, filtré par "!=" donc non utilisable en recherche)
+        Index('ix_sessions_instructor_period', 'instructor_id', 'start_datetime', 'end_datetime', 'status'),
+        Index('ix_sessions_vehicle_period', 'vehicle_id', 'start_datetime', 'end_datetime', 'status'),
+        Index('ix_sessions_student_period', 'student_id', 'start_datetime', 'end_datetime', 'status'),
+    )
     
     # Relations avec d'autres entités
     student_id = Column(Integer, ForeignKey('students.id', ondelete='CASCADE'), nullable=False, index=True)
@@ -36,7 +36,7 @@ class Student(Base, BaseModel):
     address = Column(String(255), nullable=True)
     
     # Informations inscription
-    registration_date = Column(Date, default=date.today, nullable=False)
+    registration_date = Column(Date, default=date.today, nullable=False, index=True)
     status = Column(Enum(StudentStatus), default=StudentStatus.ACTIVE, nullable=False)
     
     # Informations permis
@@ -0,0 +1,114 @@
+"""
+Compteurs de notifications in-app non lues (table notification_unread_counts)
+
+Une ligne par destinataire (recipient_type, recipient_id) contient le
+nombre de ses notifications in-app non lues : le badge de la fenêtre
+principale lit une ligne par clé primaire, quel que soit l'historique.
+
+Comme daily_rollups, la table est tenue à jour par des triggers SQL sur
+notifications : création, lecture (unitaire ou « tout marquer comme lu »
+en un seul UPDATE), suppression ou archivage appliquent leur delta dans la
+même transaction, quel que soit le code qui écrit.
+"""
+
+from typing import Optional
+
+from sqlalchemy import Column, Integer, String, Table, select, text
+
+from .base import Base
+from .notification import NotificationStatus, NotificationType
+
+UNREAD_TABLE = "notification_unread_counts"
+
+# Notification comptée : in-app, non lue, destinataire identifié
+# (les enums sont stockés par leur nom ; {row} est remplacé par NEW/OLD ou l'alias)
+_UNREAD_CONDITION = (
+    f"{{row}}.notification_type = '{NotificationType.IN_APP.name}' "
+    f"AND {{row}}.status <> '{NotificationStatus.READ.name}' "
+    "AND {row}.recipient_id IS NOT NULL"
+)
+_WATCHED_COLUMNS = ['notification_type', 'status', 'recipient_type', 'recipient_id']
+
+notification_unread_counts = Table(
+    UNREAD_TABLE, Base.metadata,
+    Column('recipient_type', String(50), primary_key=True),  # '' si non renseigné
+    Column('recipient_id', Integer, primary_key=True),
+    Column('unread', Integer, nullable=False, default=0, server_default='0')
+)
+
+
+def _increment_sql(row: str) -> str:
+    return (
+        f"INSERT INTO {UNREAD_TABLE}(recipient_type, recipient_id, unread) "
+        f"SELECT COALESCE({row}.recipient_type, ''), {row}.recipient_id, 1 "
+        f"WHERE {_UNREAD_CONDITION.format(row=row)} "
+        "ON CONFLICT(recipient_type, recipient_id) DO UPDATE SET unread = unread + 1;"
+    )
+
+
+def _decrement_sql(row: str) -> str:
+    return (
+        f"UPDATE {UNREAD_TABLE} SET unread = unread - 1 "
+        f"WHERE recipient_type = COALESCE({row}.recipient_type, '') AND recipient_id = {row}.recipient_id "
+        f"AND {_UNREAD_CONDITION.format(row=row)};"
+    )
+
+
+def _trigger_statements():
+    """CREATE TRIGGER de maintenance des compteurs"""
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS unread_notifications_ai AFTER INSERT ON notifications "
+        f"BEGIN {_increment_sql('NEW')} END",
+        f"CREATE TRIGGER IF NOT EXISTS unread_notifications_au AFTER UPDATE OF {', '.join(_WATCHED_COLUMNS)} "
+        f"ON notifications BEGIN {_decrement_sql('OLD')} {_increment_sql('NEW')} END",
+        f"CREATE TRIGGER IF NOT EXISTS unread_notifications_ad AFTER DELETE ON notifications "
+        f"BEGIN {_decrement_sql('OLD')} END",
+    ]
+
+
+def _triggers_exist(connection) -> bool:
+    names = {f"unread_notifications_{kind}" for kind in ('ai', 'au', 'ad')}
+    rows = connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).all()
+    return names <= {row[0] for row in rows}
+
+
+def ensure_unread_counters(engine):
+    """
+    Créer les triggers de maintenance si nécessaire (table créée par create_all)
+    
+    À la première installation, les compteurs sont calculés à partir des
+    notifications existantes.
+    """
+    with engine.begin() as connection:
+        if _triggers_exist(connection):
+            return
+        for statement in _trigger_statements():
+            connection.execute(text(statement))
+        _populate(connection)
+
+
+def rebuild_unread_counters(engine):
+    """Recalculer tous les compteurs"""
+    with engine.begin() as connection:
+        _populate(connection)
+
+
+def _populate(connection):
+    connection.execute(text(f"DELETE FROM {UNREAD_TABLE}"))
+    connection.execute(text(
+        f"INSERT INTO {UNREAD_TABLE}(recipient_type, recipient_id, unread) "
+        "SELECT COALESCE(n.recipient_type, ''), n.recipient_id, count(*) FROM notifications AS n "
+        f"WHERE {_UNREAD_CONDITION.format(row='n')} "
+        "GROUP BY COALESCE(n.recipient_type, ''), n.recipient_id"
+    ))
+
+
+def unread_count(session, recipient_type: Optional[str], recipient_id: int) -> int:
+    """Nombre de notifications in-app non lues d'un destinataire (lecture par clé primaire)"""
+    count = session.execute(
+        select(notification_unread_counts.c.unread).where(
+            notification_unread_counts.c.recipient_type == (recipient_type or ''),
+            notification_unread_counts.c.recipient_id == recipient_id
+        )
+    ).scalar()
+    return count or 0
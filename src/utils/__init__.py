@@ -3,13 +3,19 @@ Utilitaires pour l'application Auto-École
 """
 
 from .auth import AuthManager, login, logout, get_current_user, require_role, bypass_login
-from .backup import BackupManager, create_backup, restore_backup, list_backups
-from .export import ExportManager, export_to_csv, export_to_pdf, import_from_csv, get_export_manager
+from .backup import BackupManager, create_backup, restore_backup, list_backups, verify_backup, apply_retention
+from .export import (
+    ExportManager, export_to_csv, export_stream, stream_query, export_to_pdf, import_from_csv,
+    iter_csv_chunks, get_export_manager, EXPORT_FORMATS
+)
 from .logger import setup_logger, get_logger
 from .pdf_generator import PDFGenerator, get_pdf_generator
+from .pdf_batch import BatchResult, render_batch, merge_pdfs
 from .notifications import NotificationManager, get_notification_manager
+from .notification_dispatcher import NotificationDispatcher, DispatchJob
 from .config_manager import ConfigManager, get_config_manager
 from .license_manager import LicenseManager, get_license_manager
+from .interval_tree import IntervalTree
 
 __all__ = [
     # Auth
@@ -24,24 +30,37 @@ __all__ = [
     'create_backup',
     'restore_backup',
     'list_backups',
+    'verify_backup',
+    'apply_retention',
     # Export
     'ExportManager',
     'export_to_csv',
+    'export_stream',
+    'stream_query',
+    'EXPORT_FORMATS',
     'export_to_pdf',
     'import_from_csv',
+    'iter_csv_chunks',
     'get_export_manager',
     # PDF
     'PDFGenerator',
     'get_pdf_generator',
+    'BatchResult',
+    'render_batch',
+    'merge_pdfs',
     # Notifications
     'NotificationManager',
     'get_notification_manager',
+    'NotificationDispatcher',
+    'DispatchJob',
     # Config Manager
     'ConfigManager',
     'get_config_manager',
     # License Manager
     'LicenseManager',
     'get_license_manager',
+    # Interval Tree
+    'IntervalTree',
     # Logger
     'setup_logger',
     'get_logger',
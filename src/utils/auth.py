@@ -36,9 +36,8 @@ class AuthManager:
         Returns:
             Tuple (success, message, user)
         """
+        session = get_session()
         try:
-            session = get_session()
-            
             # Rechercher l'utilisateur
             user = session.query(User).filter(User.username == username).first()
             
@@ -73,6 +72,9 @@ class AuthManager:
             user.record_login_attempt(success=True)
             session.commit()
             
+            if self._session:
+                self._session.close()
+            
             self._current_user = user
             self._session = session
             
@@ -82,6 +84,10 @@ class AuthManager:
         except Exception as e:
             logger.error(f"Erreur lors de la connexion : {e}")
             return False, f"Erreur lors de la connexion : {str(e)}", None
+        finally:
+            # La session de l'utilisateur connecté reste ouverte jusqu'à logout()
+            if session is not self._session:
+                session.close()
     
     def bypass_login(self, preferred_roles: Optional[list[UserRole]] = None) -> tuple[bool, str, Optional[User]]:
         """Forcer une connexion sans vérifier le mot de passe (mode temporaire)."""
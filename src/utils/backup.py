@@ -1,19 +1,332 @@
 """
 Gestionnaire de sauvegarde et restauration de la base de données
+
+Les copies passent par l'API de sauvegarde en ligne de SQLite
+(sqlite3.Connection.backup) : la base est copiée par paquets de pages, de
+façon cohérente, sans bloquer les écritures de l'application entre deux
+paquets (pas de copie de fichier « déchirée » pendant une écriture).
+
+Sauvegardes incrémentales : l'instantané est découpé en blocs de pages,
+stockés une seule fois sous le nom de leur empreinte SHA-256
+(backups/chunks/ab/abcd...). Chaque sauvegarde n'est qu'un manifeste
+(.manifest, JSON) listant ses blocs : une sauvegarde fréquente n'écrit que
+les blocs modifiés depuis la précédente.
+
+Toute restauration reconstitue d'abord la base dans un fichier temporaire
+et en vérifie l'intégrité (empreintes, PRAGMA integrity_check) avant de
+remplacer la base courante.
+
+Catalogue : chaque sauvegarde est décrite dans backups/catalog.json (taille,
+empreintes, version du schéma, lignes par table). Le listage et la politique
+de rétention (GFS : quotidienne / hebdomadaire / mensuelle) lisent ce seul
+fichier, sans parcourir ni ouvrir les sauvegardes du répertoire, qui peut se
+trouver sur un partage réseau lent. Les blocs des sauvegardes incrémentales
+ont un compteur de références (chunks/refs.json) : supprimer une sauvegarde
+ne lit que son manifeste.
+
+Plusieurs gestionnaires (instance globale, sauvegarde automatique, autre
+poste sur le même partage) peuvent écrire dans le même répertoire :
+catalog.json et refs.json sont relus à chaque accès, et chaque
+lecture-modification-écriture se fait sous un verrou de fichier
+(backups/.lock).
 """
 
+import hashlib
+import json
 import os
+import re
 import shutil
+import sqlite3
+import tempfile
+import threading
 import zipfile
+import zlib
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Callable, Dict, Optional, List, Set
 
 from .logger import get_logger
 from .config_manager import get_config_manager
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 logger = get_logger()
 
+BACKUP_PAGE_STEP = 256  # Pages copiées par étape de l'API backup
+BACKUP_CHUNK_PAGES = 16  # Pages par bloc d'une sauvegarde incrémentale
+MANIFEST_SUFFIX = '.manifest'
+MANIFEST_FORMAT = 'autoecole-pages'
+CHUNKS_DIR = 'chunks'
+CHUNK_REFS_FILE = 'refs.json'
+CATALOG_FILE = 'catalog.json'
+LOCK_FILE = '.lock'
+BACKUP_EXTENSIONS = ('.db', '.zip', MANIFEST_SUFFIX)
+_TIMESTAMP_SUFFIX = re.compile(r'_\d{8}_\d{6}$')
+
+# Rétention GFS par défaut : nombre d'heures, jours, semaines et mois
+# conservés (la sauvegarde la plus récente de chaque période)
+RETENTION_DEFAULTS = {'hourly': 24, 'daily': 7, 'weekly': 4, 'monthly': 12}
+
+# Progression : (pages copiées, total des pages)
+ProgressCallback = Callable[[int, int], None]
+
+
+def online_copy(source_path: str, target_path: str, progress: Optional[ProgressCallback] = None,
+                pages: int = BACKUP_PAGE_STEP):
+    """
+    Copier une base SQLite en service avec l'API backup
+    
+    La copie avance par paquets de pages ; entre deux paquets, le verrou est
+    relâché et l'application peut continuer à écrire (la copie reprend alors
+    les pages modifiées). Le journal WAL est pris en compte.
+    
+    Args:
+        source_path: Base à copier
+        target_path: Base de destination (remplacée)
+        progress: Rappel (pages copiées, total) après chaque paquet
+        pages: Pages par paquet
+    """
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        def report(_status, remaining, total):
+            if progress:
+                progress(total - remaining, total)
+        
+        source.backup(target, pages=pages, progress=report)
+    finally:
+        target.close()
+        source.close()
+
+
+def integrity_error(db_path: str) -> Optional[str]:
+    """
+    Vérifier l'intégrité d'une base SQLite
+    
+    Returns:
+        None si la base est saine, sinon le message d'erreur
+    """
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("PRAGMA integrity_check").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        return str(e)
+    if rows != [('ok',)]:
+        return "; ".join(row[0] for row in rows[:5])
+    return None
+
+
+def _write_json(path: str, data: Any):
+    """Écrire un fichier JSON de façon atomique (fichier temporaire + remplacement)"""
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(f"{path}.tmp", path)
+
+
+class _DirectoryLock:
+    """Verrou d'un répertoire de sauvegarde (threads du processus + autres processus)"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+    
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._file = open(self.path, 'a+b')
+                if fcntl:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+                else:
+                    while True:
+                        try:
+                            self._file.seek(0)
+                            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:
+                            continue  # LK_LOCK abandonne après 10 s : réessayer
+            except Exception:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+    
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                if fcntl:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                self._file.close()
+                self._file = None
+        self._thread_lock.release()
+
+
+_directory_locks: Dict[str, _DirectoryLock] = {}
+_directory_locks_guard = threading.Lock()
+
+
+@contextmanager
+def backup_dir_lock(backup_dir: str):
+    """
+    Verrouiller un répertoire de sauvegarde (réentrant dans un même thread)
+    
+    À prendre autour de toute lecture-modification-écriture de catalog.json
+    ou de chunks/refs.json, partagés par tous les gestionnaires du répertoire.
+    """
+    path = os.path.join(os.path.abspath(backup_dir), LOCK_FILE)
+    with _directory_locks_guard:
+        lock = _directory_locks.setdefault(path, _DirectoryLock(path))
+    lock.acquire()
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_metadata(snapshot_path: str) -> Dict[str, Any]:
+    """
+    Métadonnées d'un instantané local : empreinte, version du schéma, lignes par table
+    """
+    conn = sqlite3.connect(snapshot_path)
+    try:
+        tables = [
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+        ]
+        row_counts = {name: conn.execute(f'SELECT count(*) FROM "{name}"').fetchone()[0] for name in tables}
+        # L'API backup réinitialise PRAGMA schema_version : la version du
+        # schéma est l'empreinte des définitions (tables, index, triggers)
+        definitions = conn.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY type, name"
+        ).fetchall()
+        schema_version = hashlib.sha256(repr(definitions).encode('utf-8')).hexdigest()[:16]
+    finally:
+        conn.close()
+    return {
+        'db_size': os.path.getsize(snapshot_path),
+        'db_sha256': file_sha256(snapshot_path),
+        'schema_version': schema_version,
+        'row_counts': row_counts,
+    }
+
+
+def gfs_retained(entries: List[Dict[str, Any]], daily: int, weekly: int, monthly: int,
+                 hourly: int = 0) -> Set[str]:
+    """
+    Sauvegardes conservées par une rotation GFS (grand-père / père / fils)
+    
+    Pour chacune des `hourly` dernières heures, `daily` dernières journées,
+    `weekly` dernières semaines ISO et `monthly` derniers mois ayant une
+    sauvegarde, la plus récente de la période est conservée (les sauvegardes
+    automatiques fréquentes gardent ainsi leur granularité horaire sur la
+    dernière journée). La sauvegarde la plus récente l'est toujours.
+    
+    Args:
+        entries: Entrées du catalogue (clés filename et created_at)
+    
+    Returns:
+        Noms de fichiers conservés
+    """
+    ordered = sorted(entries, key=lambda entry: entry['created_at'], reverse=True)
+    keep = {ordered[0]['filename']} if ordered else set()
+    periods = (
+        (hourly, lambda moment: (moment.date(), moment.hour)),
+        (daily, lambda moment: moment.date()),
+        (weekly, lambda moment: moment.isocalendar()[:2]),
+        (monthly, lambda moment: (moment.year, moment.month)),
+    )
+    for count, period_of in periods:
+        seen = set()
+        for entry in ordered:
+            period = period_of(datetime.fromisoformat(entry['created_at']))
+            if period in seen:
+                continue
+            if len(seen) >= count:
+                break
+            seen.add(period)
+            keep.add(entry['filename'])
+    return keep
+
+
+class BackupCatalog:
+    """
+    Catalogue des sauvegardes (catalog.json du répertoire de sauvegarde)
+    
+    Une entrée par sauvegarde : filename, label (série : nom sans
+    horodatage), kind (db / zip / manifest), created_at, size (octets écrits), checksum (du fichier de sauvegarde),
+    db_size, db_sha256 (de la base sauvegardée), schema_version, row_counts.
+    
+    Le fichier est relu à chaque accès (d'autres gestionnaires peuvent l'avoir
+    modifié) ; les modifications le relisent et le réécrivent sous
+    backup_dir_lock.
+    """
+    
+    def __init__(self, backup_dir: str):
+        self.backup_dir = backup_dir
+        self.path = os.path.join(backup_dir, CATALOG_FILE)
+    
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return {entry['filename']: entry for entry in json.load(f)['backups']}
+    
+    def _save(self, entries: Dict[str, Dict[str, Any]]):
+        _write_json(self.path, {'version': 1, 'backups': list(entries.values())})
+    
+    def entries(self) -> List[Dict[str, Any]]:
+        """Entrées, de la plus récente à la plus ancienne"""
+        return sorted(self._load().values(), key=lambda entry: entry['created_at'], reverse=True)
+    
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        return self._load().get(filename)
+    
+    def add(self, entry: Dict[str, Any]):
+        with backup_dir_lock(self.backup_dir):
+            entries = self._load()
+            entries[entry['filename']] = entry
+            self._save(entries)
+    
+    def remove(self, filenames: List[str]):
+        with backup_dir_lock(self.backup_dir):
+            entries = self._load()
+            for filename in filenames:
+                entries.pop(filename, None)
+            self._save(entries)
+    
+    def replace_all(self, entries: List[Dict[str, Any]]):
+        with backup_dir_lock(self.backup_dir):
+            self._save({entry['filename']: entry for entry in entries})
+
 
 class BackupManager:
     """Gestionnaire de sauvegarde de la base de données"""
@@ -32,18 +345,203 @@ class BackupManager:
         
         # Créer le répertoire de sauvegarde s'il n'existe pas
         os.makedirs(self.backup_dir, exist_ok=True)
+        
+        self.catalog = BackupCatalog(self.backup_dir)
+    
+    # ========== Blocs de pages (sauvegardes incrémentales) ==========
+    
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.backup_dir, CHUNKS_DIR, digest[:2], digest)
+    
+    def _refs_path(self) -> str:
+        return os.path.join(self.backup_dir, CHUNKS_DIR, CHUNK_REFS_FILE)
+    
+    def _load_chunk_refs(self) -> Dict[str, int]:
+        """Compteurs de références des blocs (relus à chaque appel, recomptés s'ils manquent)"""
+        if os.path.exists(self._refs_path()):
+            with open(self._refs_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return self._count_chunk_refs()
+    
+    def _save_chunk_refs(self, refs: Dict[str, int]):
+        os.makedirs(os.path.join(self.backup_dir, CHUNKS_DIR), exist_ok=True)
+        _write_json(self._refs_path(), refs)
+    
+    def _count_chunk_refs(self) -> Dict[str, int]:
+        """Compter les références en lisant tous les manifestes"""
+        refs: Dict[str, int] = {}
+        for manifest_path in self._manifest_paths():
+            for digest in set(self._read_manifest(manifest_path)['chunks']):
+                refs[digest] = refs.get(digest, 0) + 1
+        return refs
+    
+    def _release_chunks(self, manifest_path: str) -> int:
+        """Décrémenter les références d'un manifeste et supprimer les blocs orphelins"""
+        with backup_dir_lock(self.backup_dir):
+            refs = self._load_chunk_refs()
+            removed = 0
+            for digest in set(self._read_manifest(manifest_path)['chunks']):
+                count = refs.get(digest, 0) - 1
+                if count > 0:
+                    refs[digest] = count
+                    continue
+                refs.pop(digest, None)
+                path = self._chunk_path(digest)
+                if os.path.exists(path):
+                    os.remove(path)
+                    removed += 1
+            self._save_chunk_refs(refs)
+        return removed
+    
+    def _store_chunks(self, snapshot_path: str) -> Dict:
+        """
+        Découper un instantané en blocs et écrire ceux qui manquent
+        
+        À appeler sous backup_dir_lock jusqu'à l'écriture du manifeste (sinon
+        prune_chunks pourrait supprimer les blocs qu'il ne référence pas encore).
+        
+        Returns:
+            Manifeste (sans date ni nom) : taille, empreintes, blocs écrits
+        """
+        conn = sqlite3.connect(snapshot_path)
+        try:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        finally:
+            conn.close()
+        chunk_size = page_size * BACKUP_CHUNK_PAGES
+        
+        refs = self._load_chunk_refs()
+        digests, written, written_bytes = [], 0, 0
+        whole = hashlib.sha256()
+        with open(snapshot_path, 'rb') as snapshot:
+            while True:
+                block = snapshot.read(chunk_size)
+                if not block:
+                    break
+                whole.update(block)
+                digest = hashlib.sha256(block).hexdigest()
+                digests.append(digest)
+                
+                if digest in refs:
+                    continue  # Bloc inchangé : déjà stocké
+                path = self._chunk_path(digest)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                data = zlib.compress(block)
+                with open(f"{path}.tmp", 'wb') as target:
+                    target.write(data)
+                os.replace(f"{path}.tmp", path)
+                written += 1
+                written_bytes += len(data)
+                refs[digest] = 0
+        
+        for digest in set(digests):
+            refs[digest] += 1
+        self._save_chunk_refs(refs)
+        
+        return {
+            'format': MANIFEST_FORMAT,
+            'version': 1,
+            'page_size': page_size,
+            'chunk_size': chunk_size,
+            'size': os.path.getsize(snapshot_path),
+            'sha256': whole.hexdigest(),
+            'chunks': digests,
+            'written_chunks': written,
+            'written_bytes': written_bytes,
+        }
+    
+    @staticmethod
+    def _read_manifest(manifest_path: str) -> Dict:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != MANIFEST_FORMAT:
+            raise ValueError(f"Manifeste de sauvegarde inconnu : {manifest_path}")
+        return manifest
+    
+    def _materialize(self, manifest_path: str, target_path: str):
+        """
+        Reconstituer la base d'une sauvegarde incrémentale en vérifiant chaque bloc
+        
+        Raises:
+            ValueError: Bloc manquant ou altéré
+        """
+        manifest = self._read_manifest(manifest_path)
+        whole = hashlib.sha256()
+        with open(target_path, 'wb') as target:
+            for digest in manifest['chunks']:
+                path = self._chunk_path(digest)
+                if not os.path.exists(path):
+                    raise ValueError(f"Bloc manquant : {digest}")
+                try:
+                    with open(path, 'rb') as source:
+                        block = zlib.decompress(source.read())
+                except zlib.error:
+                    raise ValueError(f"Bloc altéré : {digest}")
+                if hashlib.sha256(block).hexdigest() != digest:
+                    raise ValueError(f"Bloc altéré : {digest}")
+                whole.update(block)
+                target.write(block)
+        if whole.hexdigest() != manifest['sha256']:
+            raise ValueError("Empreinte de la base reconstituée incorrecte")
     
-    def create_backup(self, backup_name: Optional[str] = None, compress: bool = True) -> tuple[bool, str]:
+    def _manifest_paths(self) -> List[str]:
+        return [
+            os.path.join(self.backup_dir, filename)
+            for filename in os.listdir(self.backup_dir) if filename.endswith(MANIFEST_SUFFIX)
+        ]
+    
+    def prune_chunks(self) -> int:
         """
-        Créer une sauvegarde de la base de données
+        Recompter les références à partir des manifestes et supprimer les blocs orphelins
+        
+        Maintenance complète (lit tous les manifestes et le répertoire des
+        blocs) ; la suppression d'une sauvegarde n'en a pas besoin.
+        
+        Returns:
+            Nombre de blocs supprimés
+        """
+        chunks_dir = os.path.join(self.backup_dir, CHUNKS_DIR)
+        if not os.path.isdir(chunks_dir):
+            return 0
+        
+        with backup_dir_lock(self.backup_dir):
+            try:
+                refs = self._count_chunk_refs()
+            except Exception as e:
+                # Manifeste illisible : ne rien supprimer par prudence
+                logger.warning(f"Nettoyage des blocs annulé (manifeste illisible : {e})")
+                return 0
+            self._save_chunk_refs(refs)
+            
+            removed = 0
+            for prefix in os.listdir(chunks_dir):
+                prefix_dir = os.path.join(chunks_dir, prefix)
+                if not os.path.isdir(prefix_dir):
+                    continue
+                for digest in os.listdir(prefix_dir):
+                    if digest not in refs:
+                        os.remove(os.path.join(prefix_dir, digest))
+                        removed += 1
+        if removed:
+            logger.info(f"{removed} blocs de sauvegarde orphelins supprimés")
+        return removed
+    
+    def create_backup(self, backup_name: Optional[str] = None, compress: bool = True,
+                      incremental: bool = False,
+                      progress: Optional[ProgressCallback] = None) -> tuple[bool, str]:
+        """
+        Créer une sauvegarde de la base de données (copie en ligne cohérente)
         
         Args:
             backup_name: Nom personnalisé pour la sauvegarde (optionnel)
-            compress: Compresser en ZIP
+            compress: Compresser en ZIP (sauvegarde complète)
+            incremental: Sauvegarde incrémentale (manifeste + blocs modifiés)
+            progress: Rappel (pages copiées, total) pendant la copie
         
         Returns:
             Tuple (success, filepath_or_error_message)
         """
+        snapshot_path = None
         try:
             # Vérifier que la base de données existe
             if not os.path.exists(self.db_path):
@@ -56,28 +554,59 @@ class BackupManager:
             if backup_name:
                 # Nettoyer le nom personnalisé
                 backup_name = "".join(c for c in backup_name if c.isalnum() or c in (' ', '-', '_')).strip()
-                base_name = f"{backup_name}_{timestamp}"
             else:
-                base_name = f"autoecole_backup_{timestamp}"
+                backup_name = "autoecole_backup"
+            base_name = f"{backup_name}_{timestamp}"
             
-            # Chemins de sauvegarde
-            if compress:
-                backup_filename = f"{base_name}.zip"
-                backup_filepath = os.path.join(self.backup_dir, backup_filename)
-                
-                # Créer une archive ZIP
-                with zipfile.ZipFile(backup_filepath, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    zipf.write(self.db_path, os.path.basename(self.db_path))
+            # Instantané cohérent local, puis archivage
+            fd, snapshot_path = tempfile.mkstemp(suffix='.db')
+            os.close(fd)
+            online_copy(self.db_path, snapshot_path, progress)
+            entry = snapshot_metadata(snapshot_path)
+            
+            if incremental:
+                backup_filepath = os.path.join(self.backup_dir, f"{base_name}{MANIFEST_SUFFIX}")
+                with backup_dir_lock(self.backup_dir):
+                    manifest = self._store_chunks(snapshot_path)
+                    manifest['created_at'] = datetime.now().isoformat()
+                    manifest['source'] = os.path.basename(self.db_path)
+                    _write_json(backup_filepath, manifest)
+                entry.update(
+                    kind='manifest', size=os.path.getsize(backup_filepath) + manifest['written_bytes'],
+                    checksum=file_sha256(backup_filepath)
+                )
                 
-                logger.info(f"Sauvegarde compressée créée : {backup_filepath}")
+                logger.info(
+                    f"Sauvegarde incrémentale créée : {backup_filepath} "
+                    f"({manifest['written_chunks']}/{len(manifest['chunks'])} blocs écrits, "
+                    f"{manifest['written_bytes']} octets)"
+                )
             else:
-                backup_filename = f"{base_name}.db"
-                backup_filepath = os.path.join(self.backup_dir, backup_filename)
-                
-                # Copier la base de données
-                shutil.copy2(self.db_path, backup_filepath)
+                extension = '.zip' if compress else '.db'
+                backup_filepath = os.path.join(self.backup_dir, f"{base_name}{extension}")
+                archive_path = snapshot_path
+                if compress:
+                    # Créer une archive ZIP (localement, puis copiée en une fois)
+                    archive_path = f"{snapshot_path}.zip"
+                    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                        zipf.write(snapshot_path, os.path.basename(self.db_path))
+                try:
+                    entry.update(
+                        kind=extension[1:], size=os.path.getsize(archive_path),
+                        checksum=file_sha256(archive_path)
+                    )
+                    shutil.copyfile(archive_path, f"{backup_filepath}.tmp")
+                    os.replace(f"{backup_filepath}.tmp", backup_filepath)
+                finally:
+                    if archive_path != snapshot_path:
+                        os.remove(archive_path)
                 
-                logger.info(f"Sauvegarde créée : {backup_filepath}")
+                logger.info(f"Sauvegarde {'compressée ' if compress else ''}créée : {backup_filepath}")
+            
+            entry['filename'] = os.path.basename(backup_filepath)
+            entry['label'] = backup_name
+            entry['created_at'] = datetime.now().isoformat()
+            self.catalog.add(entry)
             
             return True, backup_filepath
             
@@ -85,6 +614,44 @@ class BackupManager:
             error_msg = f"Erreur lors de la création de la sauvegarde : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            if snapshot_path and os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+    
+    def _extract_backup(self, backup_path: str, target_path: str):
+        """Reconstituer la base d'une sauvegarde (manifeste, ZIP ou .db) dans un fichier"""
+        if backup_path.endswith(MANIFEST_SUFFIX):
+            self._materialize(backup_path, target_path)
+        elif backup_path.endswith('.zip'):
+            with zipfile.ZipFile(backup_path, 'r') as zipf:
+                # Trouver le fichier .db dans l'archive
+                db_files = [f for f in zipf.namelist() if f.endswith('.db')]
+                if not db_files:
+                    raise ValueError("Aucune base de données trouvée dans l'archive ZIP")
+                with zipf.open(db_files[0]) as source, open(target_path, 'wb') as target:
+                    shutil.copyfileobj(source, target)
+        else:
+            shutil.copy2(backup_path, target_path)
+    
+    def verify_backup(self, backup_path: str) -> tuple[bool, str]:
+        """
+        Vérifier qu'une sauvegarde est restaurable (empreintes et intégrité SQLite)
+        
+        Returns:
+            Tuple (success, message)
+        """
+        fd, temp_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            self._extract_backup(backup_path, temp_path)
+            problem = integrity_error(temp_path)
+            if problem:
+                return False, f"Sauvegarde corrompue : {problem}"
+            return True, "Sauvegarde intègre"
+        except Exception as e:
+            return False, f"Sauvegarde invalide : {str(e)}"
+        finally:
+            os.remove(temp_path)
     
     def restore_backup(self, backup_path: str, create_backup_before: bool = True) -> tuple[bool, str]:
         """
@@ -106,35 +673,26 @@ class BackupManager:
             
             # Créer une sauvegarde de sécurité de la base actuelle
             if create_backup_before and os.path.exists(self.db_path):
-                success, result = self.create_backup(backup_name="before_restore")
+                success, result = self.create_backup(backup_name="before_restore", incremental=True)
                 if not success:
                     logger.warning(f"Impossible de créer la sauvegarde de sécurité : {result}")
             
-            # Déterminer si c'est un fichier ZIP ou DB direct
-            if backup_path.endswith('.zip'):
-                # Extraire du ZIP
-                with zipfile.ZipFile(backup_path, 'r') as zipf:
-                    # Trouver le fichier .db dans l'archive
-                    db_files = [f for f in zipf.namelist() if f.endswith('.db')]
-                    if not db_files:
-                        error_msg = "Aucune base de données trouvée dans l'archive ZIP"
-                        logger.error(error_msg)
-                        return False, error_msg
-                    
-                    # Extraire dans un fichier temporaire
-                    temp_path = f"{self.db_path}.temp"
-                    with zipf.open(db_files[0]) as source, open(temp_path, 'wb') as target:
-                        shutil.copyfileobj(source, target)
-                    
-                    # Remplacer la base actuelle
-                    if os.path.exists(self.db_path):
-                        os.remove(self.db_path)
-                    shutil.move(temp_path, self.db_path)
-            else:
-                # Copie directe
-                if os.path.exists(self.db_path):
-                    os.remove(self.db_path)
-                shutil.copy2(backup_path, self.db_path)
+            # Reconstituer et vérifier avant de toucher à la base courante
+            temp_path = f"{self.db_path}.restore"
+            try:
+                self._extract_backup(backup_path, temp_path)
+                problem = integrity_error(temp_path)
+                if problem:
+                    error_msg = f"Sauvegarde corrompue, restauration annulée : {problem}"
+                    logger.error(error_msg)
+                    return False, error_msg
+                
+                # Remplacer le contenu par l'API backup (journal WAL et
+                # connexions ouvertes pris en charge par SQLite)
+                online_copy(temp_path, self.db_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
             
             logger.info(f"Base de données restaurée depuis : {backup_path}")
             return True, "Restauration réussie"
@@ -146,42 +704,86 @@ class BackupManager:
     
     def list_backups(self) -> List[dict]:
         """
-        Lister les sauvegardes disponibles
+        Lister les sauvegardes disponibles (lues dans le catalogue)
         
         Returns:
-            Liste de dictionnaires avec les informations des sauvegardes
+            Liste de dictionnaires avec les informations des sauvegardes,
+            de la plus récente à la plus ancienne
         """
         backups = []
         
         try:
-            if not os.path.exists(self.backup_dir):
-                return backups
-            
-            for filename in os.listdir(self.backup_dir):
-                if filename.endswith(('.db', '.zip')):
-                    filepath = os.path.join(self.backup_dir, filename)
-                    file_stat = os.stat(filepath)
-                    
-                    backups.append({
-                        'filename': filename,
-                        'filepath': filepath,
-                        'size': file_stat.st_size,
-                        'size_mb': round(file_stat.st_size / (1024 * 1024), 2),
-                        'created': datetime.fromtimestamp(file_stat.st_ctime),
-                        'modified': datetime.fromtimestamp(file_stat.st_mtime),
-                    })
-            
-            # Trier par date de modification (plus récent en premier)
-            backups.sort(key=lambda x: x['modified'], reverse=True)
+            if not self.catalog.exists():
+                self.rebuild_catalog()
             
+            for entry in self.catalog.entries():
+                created = datetime.fromisoformat(entry['created_at'])
+                backups.append({
+                    **entry,
+                    'filepath': os.path.join(self.backup_dir, entry['filename']),
+                    'size_mb': round(entry['size'] / (1024 * 1024), 2),
+                    'created': created,
+                    'modified': created,
+                    'incremental': entry['kind'] == 'manifest',
+                    'total_rows': sum((entry.get('row_counts') or {}).values()),
+                })
+        
         except Exception as e:
             logger.error(f"Erreur lors du listage des sauvegardes : {e}")
         
         return backups
     
+    def rebuild_catalog(self) -> int:
+        """
+        Reconstruire le catalogue à partir du répertoire (migration, réparation)
+        
+        Seul cas où le répertoire est parcouru. Les entrées déjà cataloguées
+        sont conservées ; les fichiers inconnus sont ajoutés avec leur taille
+        et leur date (métadonnées du manifeste pour les sauvegardes
+        incrémentales, inconnues sinon).
+        
+        Returns:
+            Nombre de sauvegardes cataloguées
+        """
+        with backup_dir_lock(self.backup_dir):
+            catalogued = {entry['filename']: entry for entry in self.catalog.entries()}
+            entries = []
+            for filename in os.listdir(self.backup_dir):
+                if not filename.endswith(BACKUP_EXTENSIONS):
+                    continue
+                known = catalogued.get(filename)
+                if known:
+                    entries.append(known)
+                    continue
+                
+                filepath = os.path.join(self.backup_dir, filename)
+                file_stat = os.stat(filepath)
+                entry = {
+                    'filename': filename,
+                    'label': _TIMESTAMP_SUFFIX.sub('', filename[:-len(MANIFEST_SUFFIX)] if filename.endswith(MANIFEST_SUFFIX)
+                                                   else os.path.splitext(filename)[0]),
+                    'kind': 'manifest' if filename.endswith(MANIFEST_SUFFIX) else filename.rsplit('.', 1)[1],
+                    'created_at': datetime.fromtimestamp(file_stat.st_mtime).isoformat(timespec='seconds'),
+                    'size': file_stat.st_size,
+                    'checksum': None,
+                    'db_size': None,
+                    'db_sha256': None,
+                    'schema_version': None,
+                    'row_counts': None,
+                }
+                if entry['kind'] == 'manifest':
+                    manifest = self._read_manifest(filepath)
+                    entry.update(db_size=manifest['size'], db_sha256=manifest['sha256'],
+                                 checksum=file_sha256(filepath))
+                entries.append(entry)
+            
+            self.catalog.replace_all(entries)
+        logger.info(f"Catalogue des sauvegardes reconstruit : {len(entries)} sauvegardes")
+        return len(entries)
+    
     def delete_backup(self, backup_path: str) -> tuple[bool, str]:
         """
-        Supprimer une sauvegarde
+        Supprimer une sauvegarde (et les blocs devenus orphelins)
         
         Args:
             backup_path: Chemin vers le fichier de sauvegarde
@@ -193,7 +795,11 @@ class BackupManager:
             if not os.path.exists(backup_path):
                 return False, "Fichier introuvable"
             
-            os.remove(backup_path)
+            with backup_dir_lock(self.backup_dir):
+                if backup_path.endswith(MANIFEST_SUFFIX):
+                    self._release_chunks(backup_path)
+                os.remove(backup_path)
+            self.catalog.remove([os.path.basename(backup_path)])
             logger.info(f"Sauvegarde supprimée : {backup_path}")
             return True, "Sauvegarde supprimée"
             
@@ -213,19 +819,52 @@ class BackupManager:
             Nombre de sauvegardes supprimées
         """
         backups = self.list_backups()
-        deleted_count = 0
+        return self._delete_backups([backup['filename'] for backup in backups[keep_count:]])
+    
+    def apply_retention(self, daily: int = RETENTION_DEFAULTS['daily'],
+                        weekly: int = RETENTION_DEFAULTS['weekly'],
+                        monthly: int = RETENTION_DEFAULTS['monthly'],
+                        hourly: int = RETENTION_DEFAULTS['hourly'], label: Optional[str] = None) -> int:
+        """
+        Appliquer la rétention GFS (voir gfs_retained), d'après le catalogue seul
         
-        # Garder seulement les N plus récentes
-        if len(backups) > keep_count:
-            for backup in backups[keep_count:]:
-                success, _ = self.delete_backup(backup['filepath'])
-                if success:
-                    deleted_count += 1
+        Args:
+            hourly: Nombre d'heures conservées (une sauvegarde par heure)
+            daily: Nombre de jours conservés (une sauvegarde par jour)
+            weekly: Nombre de semaines conservées (une par semaine)
+            monthly: Nombre de mois conservés (une par mois)
+            label: Série à faire tourner (ex. 'auto_backup'), None = toutes
         
-        if deleted_count > 0:
-            logger.info(f"{deleted_count} anciennes sauvegardes supprimées")
+        Returns:
+            Nombre de sauvegardes supprimées
+        """
+        if not self.catalog.exists():
+            self.rebuild_catalog()
+        entries = [
+            entry for entry in self.catalog.entries() if label is None or entry.get('label') == label
+        ]
+        keep = gfs_retained(entries, daily, weekly, monthly, hourly)
+        return self._delete_backups([entry['filename'] for entry in entries if entry['filename'] not in keep])
+    
+    def _delete_backups(self, filenames: List[str]) -> int:
+        """Supprimer des sauvegardes (fichier, blocs orphelins, entrée du catalogue)"""
+        deleted = []
+        for filename in filenames:
+            filepath = os.path.join(self.backup_dir, filename)
+            try:
+                with backup_dir_lock(self.backup_dir):
+                    if os.path.exists(filepath):
+                        if filename.endswith(MANIFEST_SUFFIX):
+                            self._release_chunks(filepath)
+                        os.remove(filepath)
+                deleted.append(filename)
+            except Exception as e:
+                logger.error(f"Erreur lors de la suppression de {filename} : {e}")
+        if deleted:
+            self.catalog.remove(deleted)
+            logger.info(f"{len(deleted)} anciennes sauvegardes supprimées")
         
-        return deleted_count
+        return len(deleted)
 
 
 # Fonctions globales
@@ -240,9 +879,10 @@ def get_backup_manager() -> BackupManager:
     return _default_backup_manager
 
 
-def create_backup(backup_name: Optional[str] = None, compress: bool = True) -> tuple[bool, str]:
+def create_backup(backup_name: Optional[str] = None, compress: bool = True,
+                  incremental: bool = False, progress: Optional[ProgressCallback] = None) -> tuple[bool, str]:
     """Créer une sauvegarde"""
-    return get_backup_manager().create_backup(backup_name, compress)
+    return get_backup_manager().create_backup(backup_name, compress, incremental, progress)
 
 
 def restore_backup(backup_path: str, create_backup_before: bool = True) -> tuple[bool, str]:
@@ -253,3 +893,14 @@ def restore_backup(backup_path: str, create_backup_before: bool = True) -> tuple
 def list_backups() -> List[dict]:
     """Lister les sauvegardes"""
     return get_backup_manager().list_backups()
+
+
+def verify_backup(backup_path: str) -> tuple[bool, str]:
+    """Vérifier qu'une sauvegarde est restaurable"""
+    return get_backup_manager().verify_backup(backup_path)
+
+
+def apply_retention(daily: int = RETENTION_DEFAULTS['daily'], weekly: int = RETENTION_DEFAULTS['weekly'],
+                    monthly: int = RETENTION_DEFAULTS['monthly'], hourly: int = RETENTION_DEFAULTS['hourly']) -> int:
+    """Appliquer la rétention GFS des sauvegardes"""
+    return get_backup_manager().apply_retention(daily, weekly, monthly, hourly)
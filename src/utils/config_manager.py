@@ -7,6 +7,17 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 
 
+# Réglages SQLite par défaut (surchargeables via config.json -> database.sqlite)
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',        # Lectures non bloquées par les écritures
+    'synchronous': 'NORMAL',      # Sûr en mode WAL, beaucoup moins de fsync
+    'cache_size': -64000,         # Négatif = en Kio (64 Mo)
+    'mmap_size': 268435456,       # 256 Mo de lecture mappée en mémoire
+    'temp_store': 'MEMORY',       # Tables temporaires / tris en mémoire
+    'busy_timeout': 5000,         # Attente (ms) d'un verrou avant erreur
+}
+
+
 class ConfigManager:
     """Gestionnaire de configuration centralisé"""
     
@@ -132,6 +143,17 @@ class ConfigManager:
         """Récupère le chemin du dossier backups depuis config"""
         return self._config.get('paths', {}).get('backups', 'backups')
     
+    def get_sqlite_pragmas(self) -> Dict[str, Any]:
+        """
+        Récupère les PRAGMA SQLite appliqués à chaque connexion
+        
+        Returns:
+            Dict pragma -> valeur (défauts complétés par config.json)
+        """
+        pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+        pragmas.update(self._config.get('database', {}).get('sqlite', {}) or {})
+        return pragmas
+    
     def get_app_info(self) -> Dict[str, str]:
         """Récupère les informations de l'application"""
         app = self._config.get('app', {})
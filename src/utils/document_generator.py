@@ -104,8 +104,10 @@ class DocumentGenerator:
         """Ajouter le pied de page"""
         canvas.saveState()
         
-        # Infos légales du centre
-        legal_info = self.config.get_center_legal_info()
+        # Infos légales du centre (une ligne, champs renseignés seulement)
+        legal = self.config.get_center_legal_info()
+        labels = [('license_number', 'Agrément N°'), ('siret', 'SIRET'), ('tva_number', 'TVA')]
+        legal_info = ' | '.join(f"{label} {legal[key]}" for key, label in labels if legal.get(key))
         if legal_info:
             canvas.setFont('Helvetica', 8)
             canvas.setFillColor(colors.grey)
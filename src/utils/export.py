@@ -3,9 +3,13 @@ Gestionnaire d'export de données (CSV, PDF)
 """
 
 import csv
+import enum
+import gzip
+import itertools
+import json
 import os
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
 from pathlib import Path
 
 from .logger import get_logger
@@ -13,6 +17,22 @@ from .config_manager import get_config_manager
 
 logger = get_logger()
 
+EXPORT_FORMATS = ('csv', 'csv.gz', 'xlsx')
+EXPORT_BATCH_SIZE = 1000  # Lignes lues par aller-retour (yield_per)
+
+
+def _xlsx_value(value: Any) -> Any:
+    """Valeur de cellule XLSX (énumérations -> libellé, listes jointes, dict en JSON, vide pour None)"""
+    if value is None:
+        return ''
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (list, tuple, set)):
+        return ', '.join(str(_xlsx_value(item)) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
 
 class ExportManager:
     """Gestionnaire d'export de données"""
@@ -45,64 +65,121 @@ class ExportManager:
             if not data:
                 return False, "Aucune donnée à exporter"
             
-            logger.info(f"Export CSV: filename={filename}, data type={type(data)}, data length={len(data)}")
-            logger.info(f"Export CSV: First item type={type(data[0])}, has to_dict={hasattr(data[0], 'to_dict')}")
-            
-            # Convertir les objets SQLAlchemy en dictionnaires
-            if hasattr(data[0], 'to_dict'):
-                data = [item.to_dict() for item in data]
-                logger.info(f"Export CSV: Converted using to_dict(), first item keys={list(data[0].keys())[:5]}")
-            elif hasattr(data[0], '__dict__') and not isinstance(data[0], dict):
-                # Si c'est un objet SQLAlchemy sans to_dict, utiliser __dict__
-                data = [{k: v for k, v in item.__dict__.items() if not k.startswith('_')} for item in data]
-                logger.info(f"Export CSV: Converted using __dict__, first item keys={list(data[0].keys())[:5]}")
-            elif isinstance(data[0], dict):
-                logger.info(f"Export CSV: Already dict, first item keys={list(data[0].keys())[:5]}")
+            # Convertir les objets SQLAlchemy en dictionnaires, à la volée
+            first = data[0]
+            if hasattr(first, 'to_dict'):
+                rows = (item.to_dict() for item in data)
+            elif isinstance(first, dict):
+                rows = iter(data)
+            elif hasattr(first, '__dict__'):
+                # Objet SQLAlchemy sans to_dict : utiliser __dict__
+                rows = ({k: v for k, v in item.__dict__.items() if not k.startswith('_')} for item in data)
             else:
-                logger.error(f"Export CSV: Cannot convert data! Type={type(data[0])}, Value={data[0]}")
-                return False, f"Type de données non supporté: {type(data[0])}"
+                logger.error(f"Export CSV: Cannot convert data! Type={type(first)}, Value={first}")
+                return False, f"Type de données non supporté: {type(first)}"
             
-            # Générer le nom de fichier
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            csv_filename = f"{filename}_{timestamp}.csv"
-            filepath = os.path.join(self.export_dir, csv_filename)
-            
-            # Déterminer les champs
+            return self.export_stream(rows, filename, fieldnames)
+        
+        except Exception as e:
+            error_msg = f"Erreur lors de l'export CSV : {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
+    
+    def export_stream(self, rows: Iterable[Dict[str, Any]], filename: str,
+                      fieldnames: Optional[List[str]] = None, file_format: str = 'csv',
+                      directory: Optional[str] = None) -> tuple[bool, str]:
+        """
+        Exporter des lignes au fil de l'eau (CSV, CSV gzip ou XLSX)
+        
+        Les lignes sont écrites une à une à mesure que l'itérable les produit
+        (par ex. stream_query) : la mémoire ne dépend pas du nombre de lignes.
+        
+        Args:
+            rows: Itérable de dictionnaires
+            filename: Nom du fichier (sans extension, horodaté)
+            fieldnames: Colonnes exportées (None = clés de la première ligne)
+            file_format: 'csv', 'csv.gz' ou 'xlsx'
+            directory: Répertoire de destination (None = répertoire des exports)
+        
+        Returns:
+            Tuple (success, filepath_or_error)
+        """
+        if file_format not in EXPORT_FORMATS:
+            return False, f"Format d'export inconnu : {file_format}"
+        
+        filepath = None
+        try:
+            rows = iter(rows)
+            first = next(rows, None)
+            if first is None:
+                return False, "Aucune donnée à exporter"
             if fieldnames is None:
-                if not isinstance(data[0], dict):
-                    logger.error(f"Export CSV: data[0] is not a dict! Type={type(data[0])}")
-                    return False, "Données mal formatées"
-                fieldnames = list(data[0].keys())
+                fieldnames = list(first.keys())
+            rows = itertools.chain([first], rows)
             
-            # Écrire le CSV avec en-tête du centre
-            with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                # En-tête avec informations du centre
-                center = self.config.get_center_info()
-                csvfile.write(f"# {center.get('name', 'Auto-École Manager')}\n")
-                if center.get('address'):
-                    csvfile.write(f"# {center['address']}\n")
-                if center.get('phone') or center.get('email'):
-                    contact_parts = []
-                    if center.get('phone'):
-                        contact_parts.append(f"Tél: {center['phone']}")
-                    if center.get('email'):
-                        contact_parts.append(f"Email: {center['email']}")
-                    csvfile.write(f"# {' | '.join(contact_parts)}\n")
-                csvfile.write(f"# Exporté le {datetime.now().strftime('%d/%m/%Y à %H:%M')}\n")
-                csvfile.write("#\n")
-                
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
-                writer.writeheader()
-                writer.writerows(data)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filepath = os.path.join(directory or self.export_dir, f"{filename}_{timestamp}.{file_format}")
             
-            logger.info(f"Export CSV créé : {filepath} ({len(data)} lignes)")
-            return True, filepath
+            if file_format == 'xlsx':
+                count = self._write_xlsx(filepath, rows, fieldnames, sheet_name=filename)
+            elif file_format == 'csv.gz':
+                with gzip.open(filepath, 'wt', newline='', encoding='utf-8-sig') as csvfile:
+                    count = self._write_csv(csvfile, rows, fieldnames)
+            else:
+                with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
+                    count = self._write_csv(csvfile, rows, fieldnames)
             
+            logger.info(f"Export {file_format.upper()} créé : {filepath} ({count} lignes)")
+            return True, filepath
+        
         except Exception as e:
-            error_msg = f"Erreur lors de l'export CSV : {str(e)}"
+            if filepath and os.path.exists(filepath):
+                os.remove(filepath)  # Pas de fichier partiel
+            error_msg = f"Erreur lors de l'export : {str(e)}"
             logger.error(error_msg)
             return False, error_msg
     
+    def _write_csv(self, csvfile, rows: Iterable[Dict[str, Any]], fieldnames: List[str]) -> int:
+        """Écrire l'en-tête du centre puis les lignes, une à une"""
+        center = self.config.get_center_info()
+        csvfile.write(f"# {center.get('name', 'Auto-École Manager')}\n")
+        if center.get('address'):
+            csvfile.write(f"# {center['address']}\n")
+        if center.get('phone') or center.get('email'):
+            contact_parts = []
+            if center.get('phone'):
+                contact_parts.append(f"Tél: {center['phone']}")
+            if center.get('email'):
+                contact_parts.append(f"Email: {center['email']}")
+            csvfile.write(f"# {' | '.join(contact_parts)}\n")
+        csvfile.write(f"# Exporté le {datetime.now().strftime('%d/%m/%Y à %H:%M')}\n")
+        csvfile.write("#\n")
+        
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        return count
+    
+    @staticmethod
+    def _write_xlsx(filepath: str, rows: Iterable[Dict[str, Any]], fieldnames: List[str],
+                    sheet_name: str = 'Export') -> int:
+        """Écrire un classeur XLSX en mode mémoire constante (ligne par ligne)"""
+        import xlsxwriter
+        
+        workbook = xlsxwriter.Workbook(filepath, {'constant_memory': True, 'strings_to_urls': False})
+        try:
+            worksheet = workbook.add_worksheet(sheet_name[:31])
+            worksheet.write_row(0, 0, fieldnames, workbook.add_format({'bold': True}))
+            count = 0
+            for count, row in enumerate(rows, start=1):
+                worksheet.write_row(count, 0, [_xlsx_value(row.get(name)) for name in fieldnames])
+        finally:
+            workbook.close()
+        return count
+    
     def import_from_csv(self, filepath: str, 
                        required_fields: Optional[List[str]] = None) -> tuple[bool, List[Dict[str, Any]], str]:
         """
@@ -143,6 +220,49 @@ class ExportManager:
             logger.error(error_msg)
             return False, [], error_msg
     
+    def iter_csv_chunks(self, filepath: str, chunk_size: int = 1000,
+                        required_fields: Optional[List[str]] = None) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+        """
+        Lire un CSV par blocs, sans charger le fichier en mémoire
+        
+        Les lignes de commentaire (commençant par #) sont ignorées.
+        
+        Args:
+            filepath: Chemin vers le fichier CSV
+            chunk_size: Nombre de lignes par bloc
+            required_fields: Colonnes obligatoires
+        
+        Yields:
+            Listes de (numéro de ligne de données, à partir de 1, ligne)
+        
+        Raises:
+            FileNotFoundError: Fichier introuvable
+            ValueError: Colonnes obligatoires absentes
+        """
+        with open(filepath, 'r', encoding='utf-8-sig', newline='') as csvfile:
+            reader = csv.DictReader(line for line in csvfile if not line.strip().startswith('#'))
+            
+            if required_fields:
+                missing_fields = set(required_fields) - set(reader.fieldnames or [])
+                if missing_fields:
+                    raise ValueError(f"Champs manquants : {', '.join(sorted(missing_fields))}")
+            
+            chunk = []
+            for number, row in enumerate(reader, start=1):
+                chunk.append((number, row))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+    
+    @staticmethod
+    def count_csv_rows(filepath: str) -> int:
+        """Nombre approximatif de lignes de données (lecture en flux, pour la progression)"""
+        with open(filepath, 'r', encoding='utf-8-sig') as csvfile:
+            lines = sum(1 for line in csvfile if line.strip() and not line.strip().startswith('#'))
+        return max(lines - 1, 0)  # En-tête
+    
     def export_to_pdf(self, content: str, filename: str, 
                      title: Optional[str] = None) -> tuple[bool, str]:
         """
@@ -553,6 +673,39 @@ def export_to_csv(data: List[Dict[str, Any]], filename: str,
     return get_export_manager().export_to_csv(data, filename, fieldnames)
 
 
+def export_stream(rows: Iterable[Dict[str, Any]], filename: str,
+                  fieldnames: Optional[List[str]] = None, file_format: str = 'csv') -> tuple[bool, str]:
+    """Exporter des lignes au fil de l'eau (CSV, CSV gzip, XLSX)"""
+    return get_export_manager().export_stream(rows, filename, fieldnames, file_format)
+
+
+def stream_query(statement, transform: Callable[[Any], Dict[str, Any]],
+                 batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Parcourir une requête ORM par lots (curseur, yield_per) en dictionnaires
+    
+    Les objets ne sont chargés que par paquets de batch_size : ceux déjà
+    convertis sont libérés (la session ne garde que des références faibles).
+    La session est fermée à la fin du parcours, ou si l'export s'interrompt.
+    
+    Args:
+        statement: select(Entité) (relations many-to-one en joinedload)
+        transform: Entité -> dictionnaire exporté
+        batch_size: Nombre de lignes lues à la fois
+    """
+    from src.models import session_scope
+    
+    with session_scope() as session:
+        for entity in session.scalars(statement.execution_options(yield_per=batch_size)):
+            yield transform(entity)
+
+
+def iter_csv_chunks(filepath: str, chunk_size: int = 1000,
+                    required_fields: Optional[List[str]] = None) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    """Lire un CSV par blocs (flux)"""
+    return get_export_manager().iter_csv_chunks(filepath, chunk_size, required_fields)
+
+
 def export_to_pdf(content: str, filename: str, title: Optional[str] = None) -> tuple[bool, str]:
     """Exporter vers PDF/HTML"""
     return get_export_manager().export_to_pdf(content, filename, title)
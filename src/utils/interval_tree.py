@@ -0,0 +1,169 @@
+"""
+Arbre d'intervalles pour la détection de chevauchements
+
+Arbre binaire de recherche équilibré (treap) trié par début d'intervalle et
+augmenté de la fin maximale de chaque sous-arbre. Insertion, suppression et
+test "libre sur [début, fin)" en O(log n) ; énumération des k chevauchements
+en O(log n + k).
+
+Les intervalles sont semi-ouverts : [10h, 11h) et [11h, 12h) ne se
+chevauchent pas.
+"""
+
+import random
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+class _Node:
+    """Nœud du treap"""
+    __slots__ = ('key', 'start', 'end', 'item', 'priority', 'max_end', 'left', 'right')
+    
+    def __init__(self, key: tuple, start, end, item: Hashable):
+        self.key = key
+        self.start = start
+        self.end = end
+        self.item = item
+        self.priority = random.random()
+        self.max_end = end
+        self.left: Optional['_Node'] = None
+        self.right: Optional['_Node'] = None
+    
+    def update(self):
+        """Recalculer la fin maximale du sous-arbre"""
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    """Fusionner deux treaps (toutes les clés de left < clés de right)"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+def _split(node: Optional[_Node], key: tuple, inclusive: bool) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Couper un treap en (clés < key, clés >= key), ou (<=, >) si inclusive"""
+    if node is None:
+        return None, None
+    goes_left = node.key <= key if inclusive else node.key < key
+    if goes_left:
+        node.right, right = _split(node.right, key, inclusive)
+        node.update()
+        return node, right
+    left, node.left = _split(node.left, key, inclusive)
+    node.update()
+    return left, node
+
+
+class IntervalTree:
+    """
+    Index d'intervalles [début, fin) associés à des éléments uniques
+    
+    Usage:
+        tree = IntervalTree()
+        tree.add(start, end, session_id)
+        tree.overlapping(a, b)  # éléments chevauchant [a, b)
+    """
+    
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._keys: Dict[Hashable, tuple] = {}  # élément -> clé du nœud
+        self._sequence = 0  # départage des intervalles identiques
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._keys
+    
+    def add(self, start, end, item: Hashable):
+        """
+        Ajouter (ou déplacer) l'intervalle d'un élément
+        
+        Args:
+            start: Début (inclus)
+            end: Fin (exclue), doit être > start
+            item: Identifiant unique de l'élément
+        """
+        if not start < end:
+            raise ValueError(f"Intervalle vide ou inversé : [{start}, {end})")
+        if item in self._keys:
+            self.remove(item)
+        
+        self._sequence += 1
+        key = (start, end, self._sequence)
+        left, right = _split(self._root, key, inclusive=False)
+        self._root = _merge(_merge(left, _Node(key, start, end, item)), right)
+        self._keys[item] = key
+    
+    def remove(self, item: Hashable) -> bool:
+        """
+        Retirer l'intervalle d'un élément
+        
+        Returns:
+            True si l'élément était présent
+        """
+        key = self._keys.pop(item, None)
+        if key is None:
+            return False
+        left, right = _split(self._root, key, inclusive=False)
+        _, right = _split(right, key, inclusive=True)
+        self._root = _merge(left, right)
+        return True
+    
+    def overlapping(self, start, end) -> List[Hashable]:
+        """Éléments dont l'intervalle chevauche [start, end), triés par début"""
+        nodes = sorted(self._iter_overlaps(self._root, start, end), key=lambda node: node.key)
+        return [node.item for node in nodes]
+    
+    def is_free(self, start, end, exclude: Optional[Hashable] = None) -> bool:
+        """Aucun intervalle (hors `exclude`) ne chevauche [start, end)"""
+        for node in self._iter_overlaps(self._root, start, end):
+            if node.item != exclude:
+                return False
+        return True
+    
+    def items(self) -> Iterator[Tuple[Any, Any, Hashable]]:
+        """Parcourir les (début, fin, élément) par ordre de début"""
+        stack, node = [], self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.start, node.end, node.item
+            node = node.right
+    
+    def clear(self):
+        """Vider l'index"""
+        self._root = None
+        self._keys.clear()
+    
+    @staticmethod
+    def _iter_overlaps(node: Optional[_Node], start, end) -> Iterator[_Node]:
+        """Parcours élagué: sous-arbres finissant avant start ou commençant après end ignorés"""
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            if node.max_end <= start:
+                continue
+            if node.start < end:
+                # Le sous-arbre droit commence après node.start: utile seulement ici
+                if node.right is not None:
+                    stack.append(node.right)
+                if node.end > start:
+                    yield node
+            if node.left is not None:
+                stack.append(node.left)
@@ -0,0 +1,190 @@
+"""
+Envoi groupé des notifications Email/SMS
+
+NotificationManager.send_email ouvre, authentifie et ferme une connexion
+SMTP par message. Pour un lot (rappels de la veille, relances de paiement),
+le répartiteur :
+    - garde une connexion SMTP authentifiée par thread pendant tout le lot
+      (reconnexion automatique si le serveur la ferme) et réutilise le
+      client Twilio du gestionnaire
+    - envoie en parallèle dans un pool borné par canal (email_workers,
+      sms_workers), sans soumettre plus de quelques messages d'avance
+    - respecte un débit maximal par canal (seau à jetons partagé)
+    - rend les résultats au fil de l'eau : l'appelant enregistre les
+      statuts par lots (NotificationController)
+"""
+
+import smtplib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from .logger import get_logger
+from .notifications import NotificationManager, get_notification_manager
+
+logger = get_logger()
+
+EMAIL = "email"
+SMS = "sms"
+IN_FLIGHT_PER_WORKER = 4  # Messages soumis d'avance par thread
+
+
+class DispatchJob(NamedTuple):
+    """Message à envoyer (canal : 'email' ou 'sms', valeurs de NotificationType)"""
+    notification_id: int
+    channel: str
+    recipient: Optional[str]
+    body: str
+    subject: Optional[str] = None
+    html: bool = False
+
+
+class RateLimiter:
+    """Seau à jetons partagé entre threads : au plus `rate` envois par seconde"""
+    
+    def __init__(self, rate_per_second: float, burst: Optional[int] = None):
+        self.rate = rate_per_second
+        self.capacity = burst or max(1, int(rate_per_second))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Attendre un jeton (immédiat si le débit n'est pas limité)"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+class SmtpConnectionPool:
+    """Une connexion SMTP authentifiée par thread, réutilisée pour tout le lot"""
+    
+    def __init__(self, manager: NotificationManager):
+        self.manager = manager
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+    
+    def _connection(self, reconnect: bool = False) -> smtplib.SMTP:
+        server = getattr(self._local, 'server', None)
+        if server is None or reconnect:
+            server = self.manager.open_smtp()
+            self._local.server = server
+            with self._lock:
+                self._connections.append(server)
+        return server
+    
+    def send(self, message):
+        try:
+            self._connection().send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Connexion fermée par le serveur (délai d'inactivité...) : une reconnexion
+            self._connection(reconnect=True).send_message(message)
+    
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for server in connections:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+
+
+class NotificationDispatcher:
+    """
+    Répartiteur d'envois groupés
+    
+    Utilisation :
+        for notification_id, success, message in NotificationDispatcher().dispatch(jobs):
+            ...
+    """
+    
+    def __init__(self, manager: Optional[NotificationManager] = None, **overrides):
+        """
+        Args:
+            manager: Gestionnaire de notifications (configuration, client Twilio)
+            overrides: Valeurs remplaçant la section "dispatch" de la configuration
+                (email_workers, sms_workers, email_per_second, sms_per_second,
+                commit_batch_size)
+        """
+        self.manager = manager or get_notification_manager()
+        self.settings: Dict = {**self.manager.config["dispatch"], **overrides}
+        self.limiters = {
+            EMAIL: RateLimiter(self.settings["email_per_second"]),
+            SMS: RateLimiter(self.settings["sms_per_second"]),
+        }
+    
+    @property
+    def commit_batch_size(self) -> int:
+        return self.settings["commit_batch_size"]
+    
+    def _send(self, job: DispatchJob, smtp: SmtpConnectionPool) -> Tuple[bool, str]:
+        if not job.recipient:
+            return False, "Destinataire manquant"
+        self.limiters[job.channel].acquire()
+        
+        if job.channel == SMS:
+            return self.manager.send_sms(job.recipient, job.body)
+        
+        if not self.manager.config["email"]["enabled"]:
+            return False, "Les notifications par email ne sont pas activées"
+        try:
+            message = self.manager.build_email(job.recipient, job.subject or "Notification", job.body, job.html)
+            smtp.send(message)
+            return True, "Email envoyé avec succès"
+        except Exception as e:
+            return False, f"Erreur lors de l'envoi de l'email : {str(e)}"
+    
+    def dispatch(self, jobs: Iterable[DispatchJob]) -> Iterator[Tuple[int, bool, str]]:
+        """
+        Envoyer des messages en parallèle, résultats dans l'ordre d'achèvement
+        
+        Args:
+            jobs: Messages à envoyer (lus au fur et à mesure)
+        
+        Yields:
+            (notification_id, success, message)
+        """
+        workers = {EMAIL: self.settings["email_workers"], SMS: self.settings["sms_workers"]}
+        executors = {
+            channel: ThreadPoolExecutor(max_workers=count, thread_name_prefix=f"notif-{channel}")
+            for channel, count in workers.items()
+        }
+        max_in_flight = sum(workers.values()) * IN_FLIGHT_PER_WORKER
+        smtp = SmtpConnectionPool(self.manager)
+        in_flight = {}
+        
+        def completed(futures):
+            for future in futures:
+                success, message = future.result()
+                yield in_flight.pop(future), success, message
+        
+        try:
+            for job in jobs:
+                if job.channel not in executors:
+                    yield job.notification_id, False, f"Canal non pris en charge : {job.channel}"
+                    continue
+                if len(in_flight) >= max_in_flight:
+                    done, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+                    yield from completed(done)
+                future = executors[job.channel].submit(self._send, job, smtp)
+                in_flight[future] = job.notification_id
+            
+            while in_flight:
+                done, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from completed(done)
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True, cancel_futures=True)
+            smtp.close()
@@ -2,6 +2,7 @@
 Système de notifications Email/SMS avec Twilio et SMTP
 """
 
+import copy
 import os
 import smtplib
 from email.mime.text import MIMEText
@@ -25,13 +26,43 @@ DEFAULT_CONFIG = {
         "smtp_user": "",
         "smtp_password": "",
         "from_name": "Auto-École",
-        "from_email": ""
+        "from_email": "",
+        "use_tls": True,  # STARTTLS avant authentification
+        "timeout": 30
     },
     "sms": {
         "enabled": False,
         "twilio_account_sid": "",
         "twilio_auth_token": "",
         "twilio_phone_number": ""
+    },
+    # Envoi groupé (NotificationDispatcher) : threads et débit par canal
+    "dispatch": {
+        "email_workers": 4,  # Connexions SMTP simultanées
+        "sms_workers": 2,
+        "email_per_second": 14,  # 0 = sans limite
+        "sms_per_second": 1,  # Débit d'un numéro Twilio standard
+        "commit_batch_size": 200
+    },
+    # Planificateur (NotificationScheduler) : échéances et nouvelles tentatives
+    "scheduler": {
+        "enabled": True,
+        "retry_base_delay": 60,  # Secondes avant la 1re nouvelle tentative, doublées ensuite
+        "retry_max_delay": 3600,
+        "claim_lease": 900,  # Réservation d'un lot en cours d'envoi (reprise après arrêt brutal)
+        "claim_batch_size": 500,
+        "resync_interval": 300,  # Relecture des échéances créées par un autre processus
+        "heap_size": 1000  # Échéances gardées en mémoire
+    },
+    # Rétention : notifications traitées déplacées vers notifications_archive
+    "retention": {
+        "enabled": True,
+        "chunk_size": 1000,  # Lignes déplacées par transaction
+        # Ancienneté en jours (date de création) par statut, null = jamais archivée ;
+        # les notifications en attente et les échecs encore réessayables restent en place
+        "days": {"READ": 30, "SENT": 90, "DELIVERED": 90, "FAILED": 180},
+        # Règles propres à une catégorie (remplacent "days" pour les statuts indiqués)
+        "categories": {"PAYMENT_RECEIPT": {"SENT": 365, "DELIVERED": 365}}
     }
 }
 
@@ -55,7 +86,7 @@ class NotificationManager:
     
     def load_config(self, config_path: str) -> Dict[str, Any]:
         """Charger la configuration"""
-        config = DEFAULT_CONFIG.copy()
+        config = copy.deepcopy(DEFAULT_CONFIG)
         
         if os.path.exists(config_path):
             try:
@@ -71,6 +102,17 @@ class NotificationManager:
                         
                         if "sms" in notif_config:
                             config["sms"].update(notif_config["sms"])
+                        
+                        if "dispatch" in notif_config:
+                            config["dispatch"].update(notif_config["dispatch"])
+                        
+                        if "scheduler" in notif_config:
+                            config["scheduler"].update(notif_config["scheduler"])
+                        
+                        if "retention" in notif_config:
+                            retention = dict(notif_config["retention"])
+                            config["retention"]["days"].update(retention.pop("days", {}))
+                            config["retention"].update(retention)
                 
                 logger.info("Configuration des notifications chargée")
             except Exception as e:
@@ -94,6 +136,60 @@ class NotificationManager:
         except Exception as e:
             logger.error(f"Erreur lors de l'initialisation de Twilio : {e}")
     
+    def build_email(self, to_email: str, subject: str, body: str, html: bool = False,
+                    attachments: Optional[List[str]] = None) -> MIMEMultipart:
+        """Construire un message email (expéditeur de la configuration)"""
+        msg = MIMEMultipart()
+        msg['From'] = f"{self.config['email']['from_name']} <{self.config['email']['from_email']}>"
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg['Date'] = datetime.now().strftime("%a, %d %b %Y %H:%M:%S %z")
+        
+        # Corps du message
+        if html:
+            msg.attach(MIMEText(body, 'html'))
+        else:
+            msg.attach(MIMEText(body, 'plain'))
+        
+        # Pièces jointes
+        if attachments:
+            for filepath in attachments:
+                if os.path.exists(filepath):
+                    with open(filepath, 'rb') as f:
+                        part = MIMEBase('application', 'octet-stream')
+                        part.set_payload(f.read())
+                        encoders.encode_base64(part)
+                        part.add_header(
+                            'Content-Disposition',
+                            f'attachment; filename= {os.path.basename(filepath)}'
+                        )
+                        msg.attach(part)
+        
+        return msg
+    
+    def open_smtp(self) -> smtplib.SMTP:
+        """
+        Ouvrir une connexion SMTP authentifiée
+        
+        La connexion peut envoyer plusieurs messages (NotificationDispatcher
+        la garde ouverte pendant tout un lot) ; l'appelant la ferme par quit().
+        """
+        email_config = self.config["email"]
+        server = smtplib.SMTP(
+            email_config["smtp_host"],
+            email_config["smtp_port"],
+            timeout=email_config.get("timeout", 30)
+        )
+        try:
+            if email_config.get("use_tls", True):
+                server.starttls()
+            if email_config["smtp_user"]:
+                server.login(email_config["smtp_user"], email_config["smtp_password"])
+        except Exception:
+            server.close()
+            raise
+        return server
+    
     def send_email(self, 
                    to_email: str,
                    subject: str,
@@ -117,44 +213,10 @@ class NotificationManager:
             return False, "Les notifications par email ne sont pas activées"
         
         try:
-            # Créer le message
-            msg = MIMEMultipart()
-            msg['From'] = f"{self.config['email']['from_name']} <{self.config['email']['from_email']}>"
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            msg['Date'] = datetime.now().strftime("%a, %d %b %Y %H:%M:%S %z")
-            
-            # Corps du message
-            if html:
-                msg.attach(MIMEText(body, 'html'))
-            else:
-                msg.attach(MIMEText(body, 'plain'))
-            
-            # Pièces jointes
-            if attachments:
-                for filepath in attachments:
-                    if os.path.exists(filepath):
-                        with open(filepath, 'rb') as f:
-                            part = MIMEBase('application', 'octet-stream')
-                            part.set_payload(f.read())
-                            encoders.encode_base64(part)
-                            part.add_header(
-                                'Content-Disposition',
-                                f'attachment; filename= {os.path.basename(filepath)}'
-                            )
-                            msg.attach(part)
+            msg = self.build_email(to_email, subject, body, html, attachments)
             
             # Connexion SMTP et envoi
-            server = smtplib.SMTP(
-                self.config["email"]["smtp_host"],
-                self.config["email"]["smtp_port"]
-            )
-            server.starttls()
-            server.login(
-                self.config["email"]["smtp_user"],
-                self.config["email"]["smtp_password"]
-            )
-            
+            server = self.open_smtp()
             server.send_message(msg)
             server.quit()
             
@@ -0,0 +1,192 @@
+"""
+Génération de documents PDF par lots (reçus, contrats, convocations)
+
+PDFGenerator et DocumentGenerator produisent un document par appel. Pour un
+jour d'examen ou une fin de mois (des centaines de convocations ou de
+reçus), render_batch répartit les documents sur un ProcessPoolExecutor :
+ReportLab est du Python pur, un seul processus n'occupe qu'un cœur quel que
+soit le nombre de threads.
+
+Chaque processus de travail garde ses générateurs (styles, configuration du
+centre) pour tous les documents qu'il rend. Les données sont des
+dictionnaires préparés par l'appelant : les objets SQLAlchemy ne traversent
+pas les processus. Les fichiers produits peuvent être fusionnés en un seul
+PDF prêt à imprimer (merge_pdfs).
+
+Les processus sont démarrés en mode « spawn » (pas de fork d'un processus Qt
+multithreadé) ; l'exécutable Windows appelle multiprocessing.freeze_support()
+au démarrage.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .logger import get_logger
+
+logger = get_logger()
+
+DOCUMENT_KINDS = ('receipt', 'contract', 'summons', 'registration_contract')
+
+# En dessous, les documents sont rendus dans le thread appelant : un processus de travail
+# met ~0,5 s à démarrer (imports), un document se rend en quelques millisecondes
+POOL_THRESHOLD = 50
+
+# Progression : (documents traités, total, message)
+ProgressCallback = Callable[[int, int, str], None]
+
+# Générateurs du processus courant (créés au premier document)
+_generators: Dict[str, Any] = {}
+
+
+def _generator(name: str):
+    if name not in _generators:
+        if name == 'document':
+            from .document_generator import DocumentGenerator
+            _generators[name] = DocumentGenerator()
+        else:
+            from .pdf_generator import PDFGenerator
+            _generators[name] = PDFGenerator()
+    return _generators[name]
+
+
+def render_document(kind: str, data: Dict[str, Any]) -> Tuple[bool, str]:
+    """
+    Rendre un document (exécuté dans un processus de travail)
+    
+    Args:
+        kind: Type de document (DOCUMENT_KINDS)
+        data: Données du document ; pour 'registration_contract' :
+              {'output_path': ..., 'student': ..., 'contract': ...}
+    
+    Returns:
+        Tuple (success, filepath_or_error)
+    """
+    if kind == 'registration_contract':
+        path = data['output_path']
+        if _generator('document').generate_registration_contract(path, data['student'], data['contract']):
+            return True, path
+        return False, f"Erreur lors de la génération du contrat : {os.path.basename(path)}"
+    
+    generator = _generator('pdf')
+    methods = {
+        'receipt': generator.generate_professional_receipt,  # Comme le reçu unitaire
+        'contract': generator.generate_contract,
+        'summons': generator.generate_summons,
+    }
+    return methods[kind](data, open_file=False)
+
+
+@dataclass
+class BatchResult:
+    """Bilan d'une génération par lots (fichiers dans l'ordre demandé)"""
+    total: int = 0
+    files: List[str] = field(default_factory=list)
+    keys: List[Any] = field(default_factory=list)  # Clé de chaque fichier de files
+    errors: List[Tuple[Any, str]] = field(default_factory=list)  # (clé, message)
+    merged_path: Optional[str] = None
+    cancelled: bool = False
+    
+    @property
+    def message(self) -> str:
+        text = f"{len(self.files)} document(s) générés sur {self.total}"
+        if self.errors:
+            text += f" ({len(self.errors)} erreurs)"
+        if self.cancelled:
+            text += ", génération interrompue"
+        return text
+
+
+def merge_pdfs(paths: Sequence[str], output_path: str) -> str:
+    """
+    Fusionner des PDF en un seul fichier (dans l'ordre donné)
+    
+    Returns:
+        Chemin du fichier fusionné
+    """
+    from pypdf import PdfWriter
+    
+    writer = PdfWriter()
+    for path in paths:
+        writer.append(path)
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+    writer.close()
+    return output_path
+
+
+def render_batch(kind: str, items: Sequence[Tuple[Any, Dict[str, Any]]],
+                 merge_to: Optional[str] = None, max_workers: Optional[int] = None,
+                 progress: Optional[ProgressCallback] = None,
+                 should_stop: Optional[Callable[[], bool]] = None) -> BatchResult:
+    """
+    Rendre une liste de documents sur un pool de processus
+    
+    Args:
+        kind: Type de document (DOCUMENT_KINDS)
+        items: Couples (clé, données) ; la clé identifie le document dans les erreurs
+        merge_to: Chemin du PDF fusionné (aucune fusion si None)
+        max_workers: Nombre de processus (défaut : nombre de cœurs)
+        progress: Rappel (documents traités, total, message) après chaque document
+        should_stop: Rappel d'interruption, consulté après chaque document
+    
+    Returns:
+        BatchResult
+    """
+    if kind not in DOCUMENT_KINDS:
+        raise ValueError(f"Type de document inconnu : {kind}")
+    
+    result = BatchResult(total=len(items))
+    outputs: List[Optional[str]] = [None] * len(items)
+    done = 0
+    
+    def record(index: int, success: bool, value: str):
+        nonlocal done
+        done += 1
+        if success:
+            outputs[index] = value
+        else:
+            result.errors.append((items[index][0], value))
+        if progress:
+            progress(done, result.total, os.path.basename(value) if success else value)
+    
+    workers = min(max_workers or os.cpu_count() or 1, len(items))
+    if workers <= 1 or len(items) < POOL_THRESHOLD:
+        for index, (_, data) in enumerate(items):
+            if should_stop and should_stop():
+                result.cancelled = True
+                break
+            try:
+                record(index, *render_document(kind, data))
+            except Exception as e:
+                record(index, False, str(e))
+    else:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {
+                executor.submit(render_document, kind, data): index for index, (_, data) in enumerate(items)
+            }
+            for future in as_completed(futures):
+                try:
+                    record(futures[future], *future.result())
+                except Exception as e:
+                    record(futures[future], False, str(e))
+                if should_stop and should_stop() and done < result.total:
+                    result.cancelled = True
+                    executor.shutdown(cancel_futures=True)
+                    break
+    
+    for (key, _), path in zip(items, outputs):
+        if path:
+            result.keys.append(key)
+            result.files.append(path)
+    if merge_to and result.files:
+        try:
+            result.merged_path = merge_pdfs(result.files, merge_to)
+        except Exception as e:
+            logger.error(f"Erreur lors de la fusion des PDF : {e}")
+            result.errors.append((None, f"Fusion impossible : {e}"))
+    
+    logger.info(f"Génération par lots ({kind}) : {result.message}")
+    return result
@@ -220,13 +220,14 @@ class PDFGenerator:
         canvas_obj.drawRightString(A4[0]-2*cm, 1.5*cm, page_num)
         
         canvas_obj.restoreState()
-        
-    def generate_receipt(self, payment_data: Dict[str, Any]) -> tuple[bool, str]:
+    
+    def generate_receipt(self, payment_data: Dict[str, Any], open_file: bool = True) -> tuple[bool, str]:
         """
         Générer un reçu de paiement professionnel
         
         Args:
             payment_data: Données du paiement
+            open_file: Ouvrir le PDF une fois généré
         
         Returns:
             Tuple (success, filepath_or_error)
@@ -383,9 +384,10 @@ class PDFGenerator:
             
             logger.info(f"Reçu PDF généré : {filepath}")
             
-            # Ouvrir automatiquement le PDF
-            import webbrowser
-            webbrowser.open(filepath)
+            # Ouvrir automatiquement le PDF (pas en génération par lots)
+            if open_file:
+                import webbrowser
+                webbrowser.open(filepath)
             
             return True, filepath
             
@@ -394,12 +396,13 @@ class PDFGenerator:
             logger.error(error_msg)
             return False, error_msg
     
-    def generate_contract(self, student_data: Dict[str, Any]) -> tuple[bool, str]:
+    def generate_contract(self, student_data: Dict[str, Any], open_file: bool = True) -> tuple[bool, str]:
         """
         Générer un contrat d'inscription
         
         Args:
             student_data: Données de l'élève
+            open_file: Ouvrir le PDF une fois généré
         
         Returns:
             Tuple (success, filepath_or_error)
@@ -472,9 +475,10 @@ class PDFGenerator:
             
             logger.info(f"Contrat PDF généré : {filepath}")
             
-            # Ouvrir automatiquement le PDF
-            import webbrowser
-            webbrowser.open(filepath)
+            # Ouvrir automatiquement le PDF (pas en génération par lots)
+            if open_file:
+                import webbrowser
+                webbrowser.open(filepath)
             
             return True, filepath
             
@@ -483,12 +487,13 @@ class PDFGenerator:
             logger.error(error_msg)
             return False, error_msg
     
-    def generate_summons(self, exam_data: Dict[str, Any]) -> tuple[bool, str]:
+    def generate_summons(self, exam_data: Dict[str, Any], open_file: bool = True) -> tuple[bool, str]:
         """
         Générer une convocation d'examen
         
         Args:
             exam_data: Données de l'examen
+            open_file: Ouvrir le PDF une fois généré
         
         Returns:
             Tuple (success, filepath_or_error)
@@ -545,9 +550,10 @@ class PDFGenerator:
             
             logger.info(f"Convocation PDF générée : {filepath}")
             
-            # Ouvrir automatiquement le PDF
-            import webbrowser
-            webbrowser.open(filepath)
+            # Ouvrir automatiquement le PDF (pas en génération par lots)
+            if open_file:
+                import webbrowser
+                webbrowser.open(filepath)
             
             return True, filepath
             
@@ -556,7 +562,7 @@ class PDFGenerator:
             logger.error(error_msg)
             return False, error_msg
     
-    def generate_professional_receipt(self, receipt_data: Dict[str, Any]) -> tuple[bool, str]:
+    def generate_professional_receipt(self, receipt_data: Dict[str, Any], open_file: bool = True) -> tuple[bool, str]:
         """
         Générer un reçu de paiement PDF professionnel style GenSpark
         
@@ -571,6 +577,7 @@ class PDFGenerator:
                 - payment_method: Méthode de paiement
                 - description: Description
                 - validated_by: Validé par
+            open_file: Ouvrir le PDF une fois généré
         
         Returns:
             Tuple (success, filepath_or_error)
@@ -715,9 +722,10 @@ class PDFGenerator:
             
             logger.info(f"Reçu PDF professionnel généré : {filepath}")
             
-            # Ouvrir automatiquement le PDF
-            import webbrowser
-            webbrowser.open(filepath)
+            # Ouvrir automatiquement le PDF (pas en génération par lots)
+            if open_file:
+                import webbrowser
+                webbrowser.open(filepath)
             
             return True, filepath
             
@@ -1,110 +1,239 @@
 """
 Gestionnaire de synchronisation des données et statuts
 Phase 4 - Synchronisation automatique
+
+Deux modes :
+- Complet (sync_all) : statuts recalculés par des UPDATE ... WHERE
+  ensemblistes, sans charger les objets ni leurs relations.
+- Incrémental (sync_pending) : les événements ORM after_insert /
+  after_update / after_delete des examens, séances, élèves et maintenances
+  placent les élèves et véhicules concernés dans une file ; seuls ceux-ci
+  sont réévalués, avec les mêmes UPDATE restreints à leurs ids.
 """
 
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Set
 from datetime import datetime, date
+
+from sqlalchemy import event, exists, func, select, update
+from sqlalchemy.orm.attributes import get_history
+
 from src.models import (
     Student, StudentStatus, Instructor, Vehicle, VehicleStatus,
     Session, SessionStatus, Exam, ExamResult, Payment,
     VehicleMaintenance, MaintenanceStatus, Document, DocumentStatus,
-    get_session
+    session_scope
 )
 from src.utils import get_logger
 
 logger = get_logger()
 
+# File des élèves / véhicules à réévaluer (remplie par les événements ORM)
+_dirty_lock = threading.Lock()
+_dirty_students: Set[int] = set()
+_dirty_vehicles: Set[int] = set()
+_listeners_installed = False
+
+
+
+def _mark(dirty: Set[int], target, attribute: str):
+    """Ajouter à la file la valeur actuelle et l'ancienne valeur d'une clé"""
+    ids = {getattr(target, attribute)}
+    ids.update(get_history(target, attribute).deleted or ())
+    ids.discard(None)
+    if ids:
+        with _dirty_lock:
+            dirty.update(ids)
+
+
+def _on_student_related_change(mapper, connection, target):
+    _mark(_dirty_students, target, 'student_id')
+
+
+def _on_maintenance_change(mapper, connection, target):
+    _mark(_dirty_vehicles, target, 'vehicle_id')
+
+
+def _on_student_insert(mapper, connection, target):
+    with _dirty_lock:
+        _dirty_students.add(target.id)
+
+
+def _on_student_update(mapper, connection, target):
+    # Seule la progression change le statut calculé (pas une saisie manuelle)
+    if (get_history(target, 'hours_completed').has_changes()
+            or get_history(target, 'hours_planned').has_changes()):
+        with _dirty_lock:
+            _dirty_students.add(target.id)
+
+
+def _take(dirty: Set[int]) -> Set[int]:
+    with _dirty_lock:
+        ids = set(dirty)
+        dirty.clear()
+    return ids
+
+
+def _restrict(statement, id_column, ids: Optional[Iterable[int]]):
+    if ids is not None:
+        statement = statement.where(id_column.in_(list(ids)))
+    return statement
+
+
+def _update_student_statuses(session, ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Statuts des élèves en trois UPDATE ensemblistes (conditions exclusives)
+    
+    Règles : 2 examens réussis -> diplômé ; heures effectuées (ou objectif
+    atteint) -> actif ; aucune heure et aucune séance -> en attente.
+    """
+    passed = (
+        select(func.count(Exam.id))
+        .where(Exam.student_id == Student.id, Exam.result == ExamResult.PASSED)
+        .scalar_subquery()
+    )
+    has_sessions = exists().where(Session.student_id == Student.id)
+    progressing = (Student.hours_completed >= Student.hours_planned) | (Student.hours_completed > 0)
+    
+    rules = [
+        (StudentStatus.GRADUATED, passed >= 2),
+        (StudentStatus.ACTIVE, (passed < 2) & progressing),
+        (StudentStatus.PENDING, (passed < 2) & ~progressing & ~has_sessions),
+    ]
+    updated_count = 0
+    for new_status, condition in rules:
+        statement = _restrict(
+            update(Student).where(condition, Student.status != new_status), Student.id, ids
+        ).values(status=new_status).execution_options(synchronize_session=False)
+        count = session.execute(statement).rowcount
+        if count:
+            logger.info(f"Étudiants → {new_status.value}: {count}")
+        updated_count += count
+    return updated_count
+
+
+def _update_vehicle_statuses(session, ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Statuts des véhicules : en maintenance tant qu'une maintenance est en
+    cours (ou planifiée et dont la date est arrivée)
+    """
+    ongoing = exists().where(
+        VehicleMaintenance.vehicle_id == Vehicle.id,
+        (VehicleMaintenance.status == MaintenanceStatus.EN_COURS)
+        | ((VehicleMaintenance.status == MaintenanceStatus.PLANIFIEE)
+           & (VehicleMaintenance.scheduled_date <= datetime.now()))
+    )
+    rules = [
+        (VehicleStatus.MAINTENANCE, ongoing & (Vehicle.status != VehicleStatus.MAINTENANCE)),
+        # Plus de maintenance en cours : remettre disponible
+        (VehicleStatus.AVAILABLE, ~ongoing & (Vehicle.status == VehicleStatus.MAINTENANCE)),
+    ]
+    updated_count = 0
+    for new_status, condition in rules:
+        statement = _restrict(
+            update(Vehicle).where(condition), Vehicle.id, ids
+        ).values(status=new_status).execution_options(synchronize_session=False)
+        count = session.execute(statement).rowcount
+        if count:
+            logger.info(f"Véhicules → {new_status.value}: {count}")
+        updated_count += count
+    return updated_count
+
 
 class SyncManager:
     """Gestionnaire de synchronisation des statuts et données"""
     
     @staticmethod
-    def sync_student_statuses() -> int:
+    def install_listeners():
+        """
+        Activer le suivi incrémental : les changements d'examens, séances,
+        progression des élèves et maintenances alimentent la file de
+        sync_pending (idempotent)
+        """
+        global _listeners_installed
+        if _listeners_installed:
+            return
+        for model in (Exam, Session):
+            for name in ('after_insert', 'after_update', 'after_delete'):
+                event.listen(model, name, _on_student_related_change)
+        for name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(VehicleMaintenance, name, _on_maintenance_change)
+        event.listen(Student, 'after_insert', _on_student_insert)
+        event.listen(Student, 'after_update', _on_student_update)
+        _listeners_installed = True
+    
+    @staticmethod
+    def pending_count() -> int:
+        """Nombre d'élèves et véhicules en attente de réévaluation"""
+        with _dirty_lock:
+            return len(_dirty_students) + len(_dirty_vehicles)
+    
+    @staticmethod
+    def sync_pending() -> Dict[str, int]:
+        """
+        Réévaluer uniquement les élèves et véhicules modifiés depuis le
+        dernier appel (file remplie par les événements ORM)
+        
+        Returns:
+            Dictionnaire {'students', 'vehicles'} des mises à jour
+        """
+        student_ids = _take(_dirty_students)
+        vehicle_ids = _take(_dirty_vehicles)
+        results = {'students': 0, 'vehicles': 0}
+        if not student_ids and not vehicle_ids:
+            return results
+        
+        results['students'] = SyncManager.sync_student_statuses(student_ids) if student_ids else 0
+        results['vehicles'] = SyncManager.sync_vehicle_statuses(vehicle_ids) if vehicle_ids else 0
+        return results
+    
+    @staticmethod
+    def sync_student_statuses(student_ids: Optional[Iterable[int]] = None) -> int:
         """
         Synchroniser les statuts des étudiants basés sur leur progression
         
+        Args:
+            student_ids: Élèves à réévaluer (tous si None)
+        
         Returns:
             Nombre d'étudiants mis à jour
         """
         try:
-            session = get_session()
-            updated_count = 0
-            
-            students = session.query(Student).all()
-            
-            for student in students:
-                old_status = student.status
-                new_status = None
-                
-                # Vérifier les examens réussis
-                passed_exams = [e for e in student.exams if e.result == ExamResult.PASSED]
-                
-                if len(passed_exams) >= 2:  # Code + Conduite réussis
-                    new_status = StudentStatus.GRADUATED
-                elif student.hours_completed >= student.hours_planned:
-                    new_status = StudentStatus.ACTIVE
-                elif student.hours_completed > 0:
-                    new_status = StudentStatus.ACTIVE
-                elif len(student.sessions) == 0:
-                    new_status = StudentStatus.PENDING
-                
-                if new_status and new_status != old_status:
-                    student.status = new_status
-                    updated_count += 1
-                    logger.info(f"Étudiant {student.full_name}: {old_status.value} → {new_status.value}")
-            
-            session.commit()
+            with session_scope() as session:
+                updated_count = _update_student_statuses(session, student_ids)
             logger.info(f"Synchronisation statuts étudiants: {updated_count} mis à jour")
             return updated_count
             
         except Exception as e:
             logger.error(f"Erreur sync statuts étudiants: {e}")
-            session.rollback()
+            if student_ids is not None:
+                # Réessayer au prochain passage
+                with _dirty_lock:
+                    _dirty_students.update(student_ids)
             return 0
     
     @staticmethod
-    def sync_vehicle_statuses() -> int:
+    def sync_vehicle_statuses(vehicle_ids: Optional[Iterable[int]] = None) -> int:
         """
         Synchroniser les statuts des véhicules basés sur leur maintenance
         
+        Args:
+            vehicle_ids: Véhicules à réévaluer (tous si None)
+        
         Returns:
             Nombre de véhicules mis à jour
         """
         try:
-            session = get_session()
-            updated_count = 0
-            
-            vehicles = session.query(Vehicle).all()
-            
-            for vehicle in vehicles:
-                old_status = vehicle.status
-                new_status = None
-                
-                # Vérifier les maintenances en cours
-                ongoing_maintenances = [
-                    m for m in vehicle.maintenances 
-                    if m.status in [MaintenanceStatus.PENDING, MaintenanceStatus.IN_PROGRESS]
-                ]
-                
-                if ongoing_maintenances:
-                    new_status = VehicleStatus.MAINTENANCE
-                elif vehicle.status == VehicleStatus.MAINTENANCE:
-                    # Si plus de maintenance en cours, remettre disponible
-                    new_status = VehicleStatus.AVAILABLE
-                
-                if new_status and new_status != old_status:
-                    vehicle.status = new_status
-                    updated_count += 1
-                    logger.info(f"Véhicule {vehicle.immatriculation}: {old_status.value} → {new_status.value}")
-            
-            session.commit()
+            with session_scope() as session:
+                updated_count = _update_vehicle_statuses(session, vehicle_ids)
             logger.info(f"Synchronisation statuts véhicules: {updated_count} mis à jour")
             return updated_count
             
         except Exception as e:
             logger.error(f"Erreur sync statuts véhicules: {e}")
-            session.rollback()
+            if vehicle_ids is not None:
+                with _dirty_lock:
+                    _dirty_vehicles.update(vehicle_ids)
             return 0
     
     @staticmethod
@@ -116,31 +245,19 @@ class SyncManager:
             Nombre de séances mises à jour
         """
         try:
-            session = get_session()
-            updated_count = 0
-            
-            now = datetime.now()
-            
-            # Marquer les séances passées comme COMPLETED si elles sont toujours PLANNED
-            sessions = session.query(Session).filter(
-                Session.status == SessionStatus.SCHEDULED
-            ).all()
-            
-            for sess in sessions:
-                session_datetime = sess.start_datetime
-                
-                if session_datetime < now:
-                    sess.status = SessionStatus.COMPLETED
-                    updated_count += 1
-                    logger.info(f"Séance {sess.id} marquée COMPLETED (date passée)")
-            
-            session.commit()
+            # Séances passées toujours SCHEDULED -> COMPLETED, en un UPDATE
+            with session_scope() as session:
+                updated_count = session.execute(
+                    update(Session)
+                    .where(Session.status == SessionStatus.SCHEDULED, Session.start_datetime < datetime.now())
+                    .values(status=SessionStatus.COMPLETED)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
             logger.info(f"Synchronisation statuts séances: {updated_count} mis à jour")
             return updated_count
             
         except Exception as e:
             logger.error(f"Erreur sync statuts séances: {e}")
-            session.rollback()
             return 0
     
     @staticmethod
@@ -152,42 +269,35 @@ class SyncManager:
             Nombre de documents mis à jour
         """
         try:
-            session = get_session()
-            updated_count = 0
-            
-            today = date.today()
-            
-            # Documents expirés
-            documents = session.query(Document).filter(
-                Document.expiry_date < today,
-                Document.status != DocumentStatus.EXPIRED
-            ).all()
-            
-            for doc in documents:
-                old_status = doc.status
-                doc.status = DocumentStatus.EXPIRED
-                updated_count += 1
-                logger.info(f"Document {doc.title} marqué EXPIRED (expiré le {doc.expiry_date})")
-            
-            session.commit()
+            # Documents expirés, en un UPDATE
+            with session_scope() as session:
+                updated_count = session.execute(
+                    update(Document)
+                    .where(Document.expiry_date < date.today(), Document.status != DocumentStatus.EXPIRED)
+                    .values(status=DocumentStatus.EXPIRED)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
             logger.info(f"Synchronisation statuts documents: {updated_count} mis à jour")
             return updated_count
             
         except Exception as e:
             logger.error(f"Erreur sync statuts documents: {e}")
-            session.rollback()
             return 0
     
     @staticmethod
     def sync_all() -> Dict[str, int]:
         """
-        Synchroniser tous les statuts de l'application
+        Synchroniser tous les statuts de l'application (UPDATE ensemblistes)
         
         Returns:
             Dictionnaire avec le nombre de mises à jour par catégorie
         """
         logger.info("=== Début synchronisation globale ===")
         
+        # La synchronisation complète couvre aussi la file incrémentale
+        _take(_dirty_students)
+        _take(_dirty_vehicles)
+        
         results = {
             'students': SyncManager.sync_student_statuses(),
             'vehicles': SyncManager.sync_vehicle_statuses(),
@@ -7,16 +7,22 @@ from pathlib import Path
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QStackedWidget, QFrame,
-    QMessageBox, QMenuBar, QMenu, QToolBar, QStatusBar
+    QMessageBox, QMenuBar, QMenu, QToolBar, QStatusBar, QToolButton
 )
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QTimer
 from PySide6.QtGui import QAction, QIcon, QFont
 
 from src.utils import logout, get_current_user, get_logger
-from src.models import UserRole
+from src.models import NotificationStatus, UserRole
+from src.utils.sync_manager import SyncManager
+from src.controllers.notification_controller import NotificationController, STAFF_RECIPIENT_TYPE
 
 logger = get_logger()
 
+SYNC_INTERVAL_MS = 5000  # Vidage de la file de synchronisation des statuts
+BADGE_INTERVAL_MS = 15000  # Badge des notifications (lecture d'un compteur maintenu par triggers)
+NOTIFICATION_MENU_SIZE = 10
+
 
 class MainWindow(QMainWindow):
     """Fenêtre principale avec navigation et modules"""
@@ -46,6 +52,9 @@ class MainWindow(QMainWindow):
         # Afficher le Dashboard professionnel par défaut
         self.show_dashboard()
         
+        self.setup_status_sync()
+        self.setup_notification_badge()
+    
     def setup_ui(self):
         """Configurer l'interface utilisateur"""
         # Widget central
@@ -66,7 +75,21 @@ class MainWindow(QMainWindow):
         
         # Appliquer le style
         self.apply_style()
-        
+    
+    def setup_status_sync(self):
+        """Synchronisation incrémentale des statuts (élèves et véhicules modifiés uniquement)"""
+        SyncManager.install_listeners()
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(SyncManager.sync_pending)
+        self.sync_timer.start(SYNC_INTERVAL_MS)
+    
+    def setup_notification_badge(self):
+        """Rafraîchissement périodique du badge des notifications in-app"""
+        self.badge_timer = QTimer(self)
+        self.badge_timer.timeout.connect(self.refresh_notification_badge)
+        self.badge_timer.start(BADGE_INTERVAL_MS)
+        self.refresh_notification_badge()
+    
     def create_sidebar(self, layout):
         """Créer la barre latérale de navigation"""
         sidebar = QFrame()
@@ -233,6 +256,56 @@ class MainWindow(QMainWindow):
         refresh.triggered.connect(self.refresh_current_view)
         toolbar.addAction(refresh)
         
+        # Notifications in-app (badge + derniers messages)
+        self.notifications_menu = QMenu(self)
+        self.notifications_menu.aboutToShow.connect(self.populate_notifications_menu)
+        self.notifications_button = QToolButton()
+        self.notifications_button.setText("🔔")
+        self.notifications_button.setPopupMode(QToolButton.InstantPopup)
+        self.notifications_button.setMenu(self.notifications_menu)
+        toolbar.addWidget(self.notifications_button)
+    
+    def refresh_notification_badge(self):
+        """Mettre à jour le badge (nombre de notifications non lues)"""
+        count = NotificationController.get_unread_count(STAFF_RECIPIENT_TYPE, self.user.id)
+        self.notifications_button.setText(f"🔔 {count}" if count else "🔔")
+        self.notifications_button.setToolTip(
+            f"{count} notification(s) non lue(s)" if count else "Aucune notification non lue"
+        )
+    
+    def populate_notifications_menu(self):
+        """Afficher les dernières notifications (première page du fil)"""
+        self.notifications_menu.clear()
+        page = NotificationController.get_in_app_feed(
+            STAFF_RECIPIENT_TYPE, self.user.id, limit=NOTIFICATION_MENU_SIZE
+        )
+        if not page.items:
+            self.notifications_menu.addAction("Aucune notification").setEnabled(False)
+            return
+        
+        for notification in page.items:
+            unread = notification.status != NotificationStatus.READ
+            text = f"{'● ' if unread else ''}{notification.icon or ''} {notification.title or notification.message[:60]}"
+            action = self.notifications_menu.addAction(text.strip())
+            action.setToolTip(notification.message)
+            if unread:
+                action.triggered.connect(
+                    lambda checked=False, notification_id=notification.id: self.read_notification(notification_id)
+                )
+        
+        self.notifications_menu.addSeparator()
+        self.notifications_menu.addAction("✓ Tout marquer comme lu", self.mark_all_notifications_read)
+    
+    def read_notification(self, notification_id):
+        """Marquer une notification comme lue"""
+        NotificationController.mark_notification_as_read(notification_id)
+        self.refresh_notification_badge()
+    
+    def mark_all_notifications_read(self):
+        """Marquer toutes les notifications de l'utilisateur comme lues"""
+        NotificationController.mark_all_as_read(STAFF_RECIPIENT_TYPE, self.user.id)
+        self.refresh_notification_badge()
+    
     def create_status_bar(self):
         """Créer la barre de statut"""
         status = self.statusBar()
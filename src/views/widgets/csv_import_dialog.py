@@ -9,12 +9,9 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtGui import QFont, QColor
-import csv
-from datetime import datetime
 from pathlib import Path
 
-from src.controllers.student_controller import StudentController
-from src.models import StudentStatus
+from src.controllers.student_import import import_students, prepare_student_mapping, validate_student_row
 
 
 class CSVImportWorker(QThread):
@@ -34,204 +31,30 @@ class CSVImportWorker(QThread):
         self.should_stop = True
     
     def run(self):
-        """Import CSV file with validation"""
-        results = {
-            'total': 0,
-            'success': 0,
-            'errors': 0,
-            'skipped': 0,
-            'error_details': []
-        }
-        
+        """Import CSV file with validation (streamed, in transactional chunks)"""
         try:
-            with open(self.file_path, 'r', encoding='utf-8-sig') as file:
-                # Skip comment lines (starting with #)
-                lines = [line for line in file if not line.strip().startswith('#')]
-                # Read CSV
-                csv_reader = csv.DictReader(lines)
-                rows = list(csv_reader)
-                results['total'] = len(rows)
-                
-                for idx, row in enumerate(rows):
-                    if self.should_stop:
-                        break
-                    
-                    # Emit progress
-                    self.progress.emit(idx + 1, results['total'], 
-                                      f"Traitement ligne {idx + 1}/{results['total']}")
-                    
-                    # Validate and process row
-                    try:
-                        validation_result = self.validate_row(row, idx + 1)
-                        
-                        if not validation_result['valid']:
-                            results['errors'] += 1
-                            results['error_details'].append({
-                                'row': idx + 1,
-                                'data': row,
-                                'errors': validation_result['errors']
-                            })
-                            continue
-                        
-                        # If preview mode, just validate
-                        if self.preview_mode:
-                            results['success'] += 1
-                            continue
-                        
-                        # Create student
-                        student_data = self.prepare_student_data(row)
-                        StudentController.create_student(student_data)
-                        results['success'] += 1
-                        
-                    except Exception as e:
-                        results['errors'] += 1
-                        results['error_details'].append({
-                            'row': idx + 1,
-                            'data': row,
-                            'errors': [f"Erreur d'importation: {str(e)}"]
-                        })
-            
-            self.finished.emit(results)
-            
+            result = import_students(
+                self.file_path,
+                dry_run=self.preview_mode,
+                progress=self.progress.emit,
+                should_stop=lambda: self.should_stop
+            )
+            self.finished.emit(result.as_dict())
+        
         except Exception as e:
             self.error.emit(f"Erreur lors de la lecture du fichier: {str(e)}")
     
     def validate_row(self, row, row_num):
         """Validate a CSV row"""
-        errors = []
-        
-        # Required fields
-        required_fields = ['full_name', 'cin', 'phone']
-        for field in required_fields:
-            if not row.get(field, '').strip():
-                errors.append(f"Champ requis manquant: {field}")
-        
-        # Validate CIN format (8 characters)
-        cin = row.get('cin', '').strip()
-        if cin and len(cin) != 8:
-            errors.append(f"CIN invalide (doit être 8 caractères): {cin}")
-        
-        # Validate phone format (accept both 0XXXXXXXXX and +212 XXX-XXXXXX)
-        phone = row.get('phone', '').strip()
-        if phone:
-            phone_clean = phone.replace(' ', '').replace('-', '').replace('+', '')
-            # Accept Moroccan format: +212XXXXXXXXX or 0XXXXXXXXX
-            if phone_clean.startswith('212'):
-                phone_clean = '0' + phone_clean[3:]  # Convert +212 to 0
-            if not (phone_clean.isdigit() and len(phone_clean) == 10 and phone_clean.startswith('0')):
-                errors.append(f"Téléphone invalide (format: 0XXXXXXXXX ou +212 XXX-XXXXXX): {phone}")
-        
-        # Validate email format
-        email = row.get('email', '').strip()
-        if email and '@' not in email:
-            errors.append(f"Email invalide: {email}")
-        
-        # Validate license type
-        license_type = row.get('license_type', '').strip()
-        if license_type and license_type not in ['A', 'B', 'C', 'D', 'E']:
-            errors.append(f"Type de permis invalide (A, B, C, D, E): {license_type}")
-        
-        # Validate status (accept both English and French status values)
-        status = row.get('status', '').strip().lower()
-        # Map French status to English StudentStatus enum values
-        status_mapping = {
-            'actif': 'ACTIVE',
-            'active': 'ACTIVE',
-            'en_attente': 'PENDING',
-            'pending': 'PENDING',
-            'suspendu': 'SUSPENDED',
-            'suspended': 'SUSPENDED',
-            'diplome': 'GRADUATED',
-            'graduated': 'GRADUATED',
-            'abandonne': 'ABANDONED',
-            'abandoned': 'ABANDONED'
-        }
-        if status and status not in status_mapping:
-            errors.append(f"Statut invalide: {status}")
-        
-        # Validate numeric fields
-        numeric_fields = {
-            'hours_planned': (1, 100),
-            'hours_completed': (0, 100),
-            'theoretical_exam_attempts': (0, 10),
-            'practical_exam_attempts': (0, 10),
-            'total_due': (0, 999999),
-            'total_paid': (0, 999999)
-        }
-        
-        for field, (min_val, max_val) in numeric_fields.items():
-            value = row.get(field, '').strip()
-            if value:
-                try:
-                    num_value = float(value)
-                    if num_value < min_val or num_value > max_val:
-                        errors.append(f"{field} hors limites ({min_val}-{max_val}): {value}")
-                except ValueError:
-                    errors.append(f"{field} n'est pas un nombre valide: {value}")
-        
-        # Validate date
-        dob = row.get('date_of_birth', '').strip()
-        if dob:
-            try:
-                date_obj = datetime.strptime(dob, '%Y-%m-%d')
-                # Check age (must be at least 16)
-                age = (datetime.now() - date_obj).days / 365.25
-                if age < 16 or age > 100:
-                    errors.append(f"Âge invalide (16-100 ans): {dob}")
-            except ValueError:
-                errors.append(f"Date de naissance invalide (format: YYYY-MM-DD): {dob}")
-        
+        errors = validate_student_row(row)
         return {
             'valid': len(errors) == 0,
             'errors': errors
         }
     
     def prepare_student_data(self, row):
-        """Prepare student data dictionary from CSV row"""
-        data = {
-            'full_name': row.get('full_name', '').strip(),
-            'cin': row.get('cin', '').strip(),
-            'phone': row.get('phone', '').strip(),
-            'email': row.get('email', '').strip() or None,
-            'address': row.get('address', '').strip() or None,
-            'license_type': row.get('license_type', 'B').strip() or 'B',
-        }
-        
-        # Parse date of birth
-        dob = row.get('date_of_birth', '').strip()
-        if dob:
-            try:
-                data['date_of_birth'] = datetime.strptime(dob, '%Y-%m-%d').date()
-            except ValueError:
-                data['date_of_birth'] = None
-        
-        # Parse status (accept both English and French)
-        status_map = {
-            'actif': StudentStatus.ACTIVE,
-            'active': StudentStatus.ACTIVE,
-            'en_attente': StudentStatus.PENDING,
-            'pending': StudentStatus.PENDING,
-            'suspendu': StudentStatus.SUSPENDED,
-            'suspended': StudentStatus.SUSPENDED,
-            'diplome': StudentStatus.GRADUATED,
-            'graduated': StudentStatus.GRADUATED,
-            'abandonne': StudentStatus.ABANDONED,
-            'abandoned': StudentStatus.ABANDONED
-        }
-        status_str = row.get('status', 'actif').strip().lower()
-        data['status'] = status_map.get(status_str, StudentStatus.ACTIVE)
-        
-        # Parse numeric fields with defaults
-        data['hours_planned'] = int(row.get('hours_planned', '20') or '20')
-        data['hours_completed'] = int(row.get('hours_completed', '0') or '0')
-        data['theoretical_exam_attempts'] = int(row.get('theoretical_exam_attempts', '0') or '0')
-        data['practical_exam_attempts'] = int(row.get('practical_exam_attempts', '0') or '0')
-        data['total_due'] = float(row.get('total_due', '0') or '0')
-        
-        # Notes
-        data['notes'] = row.get('notes', '').strip() or None
-        
-        return data
+        """Prepare student column values from a validated CSV row"""
+        return prepare_student_mapping(row)
 
 
 class CSVImportDialog(QDialog):
@@ -527,6 +350,7 @@ class CSVImportDialog(QDialog):
             self.validation_text.append(f"  • Total lignes: {results['total']}")
             self.validation_text.append(f"  • Valides: {results['success']}")
             self.validation_text.append(f"  • Erreurs: {results['errors']}")
+            self.validation_text.append(f"  • Déjà existants (ignorés): {results['skipped']}")
             self.validation_text.append(f"\n✅ Tous les enregistrements sont valides. Prêt à importer!")
             self.import_btn.setEnabled(True)
         else:
@@ -534,7 +358,8 @@ class CSVImportDialog(QDialog):
             self.validation_text.append(f"📊 Résumé:")
             self.validation_text.append(f"  • Total lignes: {results['total']}")
             self.validation_text.append(f"  • Valides: {results['success']}")
-            self.validation_text.append(f"  • Erreurs: {results['errors']}\n")
+            self.validation_text.append(f"  • Erreurs: {results['errors']}")
+            self.validation_text.append(f"  • Déjà existants (ignorés): {results['skipped']}\n")
             self.validation_text.append("❌ Erreurs détaillées:\n")
             
             for error_detail in results['error_details'][:10]:  # Show first 10 errors
@@ -561,6 +386,7 @@ class CSVImportDialog(QDialog):
         msg_text += f"  • Total lignes traitées: {results['total']}\n"
         msg_text += f"  • Succès: {results['success']}\n"
         msg_text += f"  • Erreurs: {results['errors']}\n"
+        msg_text += f"  • Déjà existants (ignorés): {results['skipped']}\n"
         
         if results['errors'] > 0:
             msg_text += f"\n⚠️ {results['errors']} enregistrement(s) n'ont pas pu être importés.\n"
@@ -569,11 +395,13 @@ class CSVImportDialog(QDialog):
             # Show error details in validation text
             self.validation_text.clear()
             self.validation_text.append("❌ Erreurs d'importation:\n")
-            for error_detail in results['error_details']:
+            for error_detail in results['error_details'][:100]:  # Show first 100 errors
                 self.validation_text.append(f"Ligne {error_detail['row']}:")
                 for error in error_detail['errors']:
                     self.validation_text.append(f"  • {error}")
                 self.validation_text.append("")
+            if len(results['error_details']) > 100:
+                self.validation_text.append(f"... et {len(results['error_details']) - 100} autres")
         
         QMessageBox.information(self, "Importation Terminée", msg_text)
         
@@ -15,9 +15,10 @@ from PySide6.QtCharts import (
     QBarSeries, QBarSet, QBarCategoryAxis, QValueAxis
 )
 
-from datetime import datetime, timedelta, date
-from src.controllers import StudentController, PaymentController, SessionController
-from src.models import StudentStatus, SessionStatus, get_session
+from datetime import datetime, date
+from src.controllers import DashboardController, DashboardSnapshot
+from src.models import StudentStatus
+from src.views.widgets.data_loader import DataLoader
 
 
 class ModernStatCard(QFrame):
@@ -92,7 +93,11 @@ class DashboardProfessionalWidget(QWidget):
     def __init__(self, user, parent=None):
         super().__init__(parent)
         self.user = user
-        self.db_session = get_session()
+        
+        # Chargement de l'instantané hors du thread GUI
+        self.data_loader = DataLoader(self)
+        self.data_loader.loaded.connect(self.on_snapshot_loaded)
+        self.data_loader.failed.connect(self.on_snapshot_failed)
         
         self.setup_ui()
         self.load_data()
@@ -469,25 +474,38 @@ class DashboardProfessionalWidget(QWidget):
         self.alerts_layout.insertWidget(self.alerts_layout.count() - 1, alert)
         
     def load_data(self):
-        """Charger toutes les données du dashboard"""
+        """Charger toutes les données du dashboard (en arrière-plan)"""
+        self.update_date()
+        
+        # Un seul instantané agrégé pour toutes les cartes et graphiques
+        self.data_loader.load(DashboardController.get_snapshot)
+    
+    def on_snapshot_loaded(self, snapshot: DashboardSnapshot):
+        """Afficher l'instantané reçu du thread worker"""
         try:
-            self.update_date()
-            self.load_kpi_cards()
-            self.load_revenue_chart()
-            self.load_payment_pie_chart()
-            self.load_students_chart()
-            self.load_sessions_chart()
-            self.load_recent_activities()
-            self.load_alerts()
-            
+            self.render_snapshot(snapshot)
             print("✅ Dashboard professionnel chargé avec succès")
             
         except Exception as e:
             print(f"❌ Erreur lors du chargement du dashboard: {e}")
             import traceback
             traceback.print_exc()
+    
+    def on_snapshot_failed(self, message: str):
+        """Erreur lors du calcul de l'instantané"""
+        print(f"❌ Erreur lors du chargement du dashboard: {message}")
+    
+    def render_snapshot(self, snapshot: DashboardSnapshot):
+        """Afficher un instantané du dashboard (aucun accès base de données)"""
+        self.load_kpi_cards(snapshot)
+        self.load_revenue_chart(snapshot)
+        self.load_payment_pie_chart(snapshot)
+        self.load_students_chart(snapshot)
+        self.load_sessions_chart(snapshot)
+        self.load_recent_activities(snapshot)
+        self.load_alerts(snapshot)
             
-    def load_kpi_cards(self):
+    def load_kpi_cards(self, snapshot: DashboardSnapshot):
         """Charger les cartes KPI"""
         # Nettoyer la grille
         for i in reversed(range(self.stats_grid.count())): 
@@ -495,51 +513,26 @@ class DashboardProfessionalWidget(QWidget):
             if widget:
                 widget.setParent(None)
         
-        # Récupérer les données
-        students = StudentController.get_all_students()
-        active_students = sum(1 for s in students if s.status == StudentStatus.ACTIVE)
-        
-        # CA mensuel
-        today = datetime.now()
-        start_of_month = today.replace(day=1).date()
-        all_payments = PaymentController.get_all_payments()
-        payments_this_month = [p for p in all_payments if p.payment_date and 
-                              p.payment_date >= start_of_month]
-        monthly_revenue = sum(p.amount for p in payments_this_month if p.is_validated)
-        
-        # Calculer le CA du mois précédent pour la tendance
-        start_last_month = (start_of_month - timedelta(days=1)).replace(day=1)
-        payments_last_month = [p for p in all_payments if p.payment_date and 
-                              start_last_month <= p.payment_date < start_of_month]
-        last_month_revenue = sum(p.amount for p in payments_last_month if p.is_validated)
-        
         revenue_trend = ""
-        if last_month_revenue > 0:
-            trend_percent = ((monthly_revenue - last_month_revenue) / last_month_revenue) * 100
+        trend_percent = snapshot.revenue_trend_percent
+        if trend_percent is not None:
             if trend_percent > 0:
                 revenue_trend = f"↗ +{trend_percent:.1f}%"
             elif trend_percent < 0:
                 revenue_trend = f"↘ {trend_percent:.1f}%"
         
-        # Sessions aujourd'hui
-        sessions_today = SessionController.get_today_sessions()
-        
-        # Élèves avec dette (balance < 0 car balance = total_paid - total_due)
-        students_with_debt = sum(1 for s in students if s.balance < 0)
-        total_debt = sum(abs(s.balance) for s in students if s.balance < 0)
-        
         # Créer les cartes
         cards = [
             ModernStatCard(
                 "Élèves Actifs", 
-                active_students,
-                f"sur {len(students)} total",
+                snapshot.active_students,
+                f"sur {snapshot.total_students} total",
                 "👥", 
                 "#3498db"
             ),
             ModernStatCard(
                 "CA Mensuel", 
-                f"{monthly_revenue:,.0f} DH",
+                f"{snapshot.monthly_revenue:,.0f} DH",
                 f"vs mois dernier",
                 "💰", 
                 "#27ae60",
@@ -547,15 +540,15 @@ class DashboardProfessionalWidget(QWidget):
             ),
             ModernStatCard(
                 "Sessions Aujourd'hui", 
-                len(sessions_today),
+                snapshot.sessions_today,
                 "planifiées",
                 "📅", 
                 "#f39c12"
             ),
             ModernStatCard(
                 "Impayés", 
-                students_with_debt,
-                f"{total_debt:,.0f} DH de dette",
+                snapshot.students_with_debt,
+                f"{snapshot.total_debt:,.0f} DH de dette",
                 "⚠️", 
                 "#e74c3c"
             ),
@@ -565,7 +558,7 @@ class DashboardProfessionalWidget(QWidget):
         for i, card in enumerate(cards):
             self.stats_grid.addWidget(card, 0, i)
             
-    def load_revenue_chart(self):
+    def load_revenue_chart(self, snapshot: DashboardSnapshot):
         """Charger le graphique d'évolution du CA"""
         chart = self.revenue_chart_view.chart()
         
@@ -577,15 +570,9 @@ class DashboardProfessionalWidget(QWidget):
         series = QLineSeries()
         series.setName("CA journalier (DH)")
         
-        # Récupérer les paiements des 7 derniers jours
-        all_payments = PaymentController.get_all_payments()
-        today = datetime.now().date()
-        
-        for i in range(6, -1, -1):
-            day = today - timedelta(days=i)
-            daily_revenue = sum(p.amount for p in all_payments 
-                              if p.payment_date == day and p.is_validated)
-            series.append(6-i, daily_revenue)
+        # CA des 7 derniers jours (du plus ancien à aujourd'hui)
+        for i, daily_revenue in enumerate(snapshot.revenue_last_7_days):
+            series.append(i, daily_revenue)
         
         chart.addSeries(series)
         chart.createDefaultAxes()
@@ -595,21 +582,13 @@ class DashboardProfessionalWidget(QWidget):
             if isinstance(axis, QValueAxis):
                 axis.setTitleText("Montant (DH)")
                 
-    def load_payment_pie_chart(self):
+    def load_payment_pie_chart(self, snapshot: DashboardSnapshot):
         """Charger le graphique camembert des paiements"""
         chart = self.payment_chart_view.chart()
         chart.removeAllSeries()
         
         series = QPieSeries()
         
-        # Compter par méthode
-        all_payments = PaymentController.get_all_payments()
-        methods = {}
-        for p in all_payments:
-            if p.payment_method:
-                method = p.payment_method.value
-                methods[method] = methods.get(method, 0) + p.amount
-        
         # Ajouter au camembert
         colors = {
             "especes": "#27ae60",
@@ -618,7 +597,7 @@ class DashboardProfessionalWidget(QWidget):
             "virement": "#9b59b6"
         }
         
-        for method, amount in methods.items():
+        for method, amount in snapshot.revenue_by_method.items():
             slice = series.append(method.replace('_', ' ').title(), amount)
             if method in colors:
                 slice.setBrush(QColor(colors[method]))
@@ -626,7 +605,7 @@ class DashboardProfessionalWidget(QWidget):
         
         chart.addSeries(series)
         
-    def load_students_chart(self):
+    def load_students_chart(self, snapshot: DashboardSnapshot):
         """Charger le graphique des élèves"""
         chart = self.students_chart_view.chart()
         
@@ -635,26 +614,18 @@ class DashboardProfessionalWidget(QWidget):
         for axis in chart.axes():
             chart.removeAxis(axis)
         
-        students = StudentController.get_all_students()
-        
-        # Compter par statut
-        statuses = {
-            "active": 0,
-            "pending": 0,
-            "suspended": 0,
-            "completed": 0
-        }
-        
-        for s in students:
-            if s.status:
-                status_val = s.status.value if hasattr(s.status, 'value') else str(s.status)
-                if status_val in statuses:
-                    statuses[status_val] += 1
+        # Compter par statut (mêmes catégories que l'axe X)
+        displayed_statuses = [
+            StudentStatus.ACTIVE,
+            StudentStatus.PENDING,
+            StudentStatus.SUSPENDED,
+            StudentStatus.GRADUATED
+        ]
+        counts = [snapshot.students_by_status.get(status.value, 0) for status in displayed_statuses]
         
         series = QBarSeries()
         bar_set = QBarSet("Élèves")
-        bar_set.append([statuses["active"], statuses["pending"], 
-                       statuses["suspended"], statuses["completed"]])
+        bar_set.append(counts)
         
         # Couleurs
         bar_set.setColor(QColor("#3498db"))
@@ -669,11 +640,11 @@ class DashboardProfessionalWidget(QWidget):
         series.attachAxis(axis_x)
         
         axis_y = QValueAxis()
-        axis_y.setRange(0, max(statuses.values()) + 1)
+        axis_y.setRange(0, max(counts) + 1)
         chart.addAxis(axis_y, Qt.AlignLeft)
         series.attachAxis(axis_y)
         
-    def load_sessions_chart(self):
+    def load_sessions_chart(self, snapshot: DashboardSnapshot):
         """Charger le graphique des sessions de la semaine"""
         chart = self.sessions_chart_view.chart()
         
@@ -682,21 +653,7 @@ class DashboardProfessionalWidget(QWidget):
         for axis in chart.axes():
             chart.removeAxis(axis)
         
-        # Récupérer toutes les sessions
-        from src.controllers.session_controller import SessionController
-        all_sessions = SessionController.get_all_sessions()
-        
-        # Compter par jour de la semaine
-        today = datetime.now().date()
-        start_week = today - timedelta(days=today.weekday())
-        
-        sessions_by_day = [0] * 7
-        for session in all_sessions:
-            session_date = session.start_datetime.date()
-            if session_date >= start_week:
-                day_index = (session_date - start_week).days
-                if 0 <= day_index < 7:
-                    sessions_by_day[day_index] += 1
+        sessions_by_day = snapshot.sessions_this_week or [0] * 7
         
         series = QBarSeries()
         bar_set = QBarSet("Sessions")
@@ -714,71 +671,30 @@ class DashboardProfessionalWidget(QWidget):
         series.attachAxis(axis_x)
         
         axis_y = QValueAxis()
-        axis_y.setRange(0, max(sessions_by_day) + 1 if sessions_by_day else 5)
+        axis_y.setRange(0, max(sessions_by_day) + 1)
         chart.addAxis(axis_y, Qt.AlignLeft)
         series.attachAxis(axis_y)
         
-    def load_recent_activities(self):
+    def load_recent_activities(self, snapshot: DashboardSnapshot):
         """Charger les activités récentes (mélange de tous types)"""
         self.activities_table.setRowCount(0)
         
-        activities = []
-        
-        # Récupérer les derniers paiements (3 derniers)
-        all_payments = PaymentController.get_all_payments()
-        recent_payments = sorted([p for p in all_payments if p.payment_date], 
-                                key=lambda p: p.payment_date, reverse=True)[:3]
-        
-        for payment in recent_payments:
-            activities.append({
-                'date': payment.payment_date,
-                'type': '💰 Paiement',
-                'desc': f"{payment.amount:.0f} DH - {payment.student.full_name if payment.student else 'N/A'}"
-            })
-        
-        # Récupérer les sessions récentes (2 dernières)
-        all_sessions = SessionController.get_all_sessions()
-        recent_sessions = sorted([s for s in all_sessions if s.start_datetime], 
-                                key=lambda s: s.start_datetime, reverse=True)[:2]
-        
-        for session in recent_sessions:
-            activities.append({
-                'date': session.start_datetime.date(),
-                'type': '🚗 Session',
-                'desc': f"{session.student.full_name if session.student else 'N/A'} - {session.session_type.value if session.session_type else 'N/A'}"
-            })
-        
-        # Récupérer les nouveaux élèves (2 derniers)
-        all_students = StudentController.get_all_students()
-        recent_students = sorted([s for s in all_students if s.created_at], 
-                                key=lambda s: s.created_at, reverse=True)[:2]
-        
-        for student in recent_students:
-            activities.append({
-                'date': student.created_at.date(),
-                'type': '👤 Nouvel Élève',
-                'desc': f"{student.full_name} - {student.license_type}"
-            })
-        
-        # Trier toutes les activités par date (plus récentes en premier)
-        activities.sort(key=lambda x: x['date'], reverse=True)
-        
-        # Afficher les 7 plus récentes
-        for activity in activities[:7]:
+        # Afficher les activités déjà triées (plus récentes en premier)
+        for activity_date, activity_type, description in snapshot.recent_activities:
             row = self.activities_table.rowCount()
             self.activities_table.insertRow(row)
             
             # Date
-            date_str = activity['date'].strftime("%d/%m/%Y") if hasattr(activity['date'], 'strftime') else str(activity['date'])
+            date_str = activity_date.strftime("%d/%m/%Y") if hasattr(activity_date, 'strftime') else str(activity_date)
             self.activities_table.setItem(row, 0, QTableWidgetItem(date_str))
             
             # Type
-            self.activities_table.setItem(row, 1, QTableWidgetItem(activity['type']))
+            self.activities_table.setItem(row, 1, QTableWidgetItem(activity_type))
             
             # Description
-            self.activities_table.setItem(row, 2, QTableWidgetItem(activity['desc']))
+            self.activities_table.setItem(row, 2, QTableWidgetItem(description))
             
-    def load_alerts(self):
+    def load_alerts(self, snapshot: DashboardSnapshot):
         """Charger les alertes et notifications importantes"""
         # Nettoyer
         while self.alerts_layout.count():
@@ -786,49 +702,32 @@ class DashboardProfessionalWidget(QWidget):
             if item.widget():
                 item.widget().deleteLater()
         
-        students = StudentController.get_all_students()
-        
         # 1. Élèves avec dette (PRIORITÉ HAUTE)
-        # Balance < 0 = dette (logique correcte: balance = total_paid - total_due)
-        students_with_debt = [s for s in students if s.balance < 0]
-        if students_with_debt:
-            total_debt = sum(abs(s.balance) for s in students_with_debt)
+        if snapshot.students_with_debt:
             self.add_alert(
                 "⚠️", 
-                f"{len(students_with_debt)} élève(s) impayés - Total: {total_debt:.0f} DH",
+                f"{snapshot.students_with_debt} élève(s) impayés - Total: {snapshot.total_debt:.0f} DH",
                 "#e74c3c"
             )
         
         # 2. Sessions aujourd'hui
-        sessions_today = SessionController.get_today_sessions()
-        planned_sessions = [s for s in sessions_today if s.status == SessionStatus.SCHEDULED]
-        
-        if planned_sessions:
+        if snapshot.planned_sessions_today:
             self.add_alert(
                 "📅", 
-                f"{len(planned_sessions)} session(s) planifiée(s) aujourd'hui",
+                f"{snapshot.planned_sessions_today} session(s) planifiée(s) aujourd'hui",
                 "#f39c12"
             )
             
             # Sessions prochaines (dans les 2 heures)
-            now = datetime.now()
-            upcoming_sessions = [
-                s for s in planned_sessions 
-                if s.start_datetime > now 
-                and s.start_datetime < now + timedelta(hours=2)
-            ]
-            
-            if upcoming_sessions:
-                for session in upcoming_sessions[:2]:  # Max 2 alertes
-                    time_until = session.start_datetime - now
-                    minutes = int(time_until.total_seconds() / 60)
-                    student_name = session.student.full_name if session.student else "N/A"
-                    
-                    self.add_alert(
-                        "🔔",
-                        f"Session dans {minutes} min - {student_name}",
-                        "#e67e22"
-                    )
+            for start_datetime, student_name in snapshot.upcoming_sessions:
+                time_until = start_datetime - snapshot.generated_at
+                minutes = int(time_until.total_seconds() / 60)
+                
+                self.add_alert(
+                    "🔔",
+                    f"Session dans {minutes} min - {student_name}",
+                    "#e67e22"
+                )
         else:
             self.add_alert(
                 "ℹ️", 
@@ -837,87 +736,41 @@ class DashboardProfessionalWidget(QWidget):
             )
         
         # 3. Examens dans les 3 prochains jours
-        from src.controllers import ExamController
-        try:
-            from datetime import date
-            today = date.today()
-            three_days_later = today + timedelta(days=3)
-            
-            exams = ExamController.get_all_exams()
-            upcoming_exams = [
-                e for e in exams 
-                if e.scheduled_date and today <= e.scheduled_date <= three_days_later
-            ]
-            
-            if upcoming_exams:
-                self.add_alert(
-                    "📝",
-                    f"{len(upcoming_exams)} examen(s) dans les 3 prochains jours",
-                    "#e67e22"
-                )
-        except:
-            pass
+        if snapshot.upcoming_exams:
+            self.add_alert(
+                "📝",
+                f"{snapshot.upcoming_exams} examen(s) dans les 3 prochains jours",
+                "#e67e22"
+            )
         
         # 4. Véhicules - Assurance/Visite technique expirante (30 jours)
-        from src.controllers import VehicleController
-        try:
-            vehicles = VehicleController.get_all_vehicles()
-            today = date.today()
-            thirty_days_later = today + timedelta(days=30)
-            
-            # Assurances expirantes
-            insurance_expiring = []
-            for v in vehicles:
-                if v.insurance_expiry_date and today <= v.insurance_expiry_date <= thirty_days_later:
-                    days_left = (v.insurance_expiry_date - today).days
-                    insurance_expiring.append((v, days_left))
-            
-            if insurance_expiring:
-                for vehicle, days in insurance_expiring[:2]:  # Max 2 alertes
-                    self.add_alert(
-                        "🚗",
-                        f"Assurance {vehicle.plate_number} expire dans {days}j",
-                        "#e67e22" if days > 7 else "#e74c3c"
-                    )
-            
-            # Visites techniques expirantes
-            inspection_expiring = []
-            for v in vehicles:
-                if v.technical_inspection_date and today <= v.technical_inspection_date <= thirty_days_later:
-                    days_left = (v.technical_inspection_date - today).days
-                    inspection_expiring.append((v, days_left))
-            
-            if inspection_expiring:
-                for vehicle, days in inspection_expiring[:2]:  # Max 2 alertes
-                    self.add_alert(
-                        "🔧",
-                        f"Visite technique {vehicle.plate_number} expire dans {days}j",
-                        "#e67e22" if days > 7 else "#e74c3c"
-                    )
-        except Exception as e:
-            print(f"Erreur alertes véhicules: {e}")
-            pass
+        for plate_number, days in snapshot.insurance_expiring:
+            self.add_alert(
+                "🚗",
+                f"Assurance {plate_number} expire dans {days}j",
+                "#e67e22" if days > 7 else "#e74c3c"
+            )
+        
+        for plate_number, days in snapshot.inspection_expiring:
+            self.add_alert(
+                "🔧",
+                f"Visite technique {plate_number} expire dans {days}j",
+                "#e67e22" if days > 7 else "#e74c3c"
+            )
         
         # 5. Maintenance véhicules
-        from src.controllers import VehicleController
-        try:
-            vehicles = VehicleController.get_all_vehicles()
-            vehicles_in_maintenance = [v for v in vehicles if v.status and v.status.value == "under_maintenance"]
-            if vehicles_in_maintenance:
-                self.add_alert(
-                    "🔧",
-                    f"{len(vehicles_in_maintenance)} véhicule(s) en maintenance",
-                    "#f39c12"
-                )
-        except:
-            pass
+        if snapshot.vehicles_in_maintenance:
+            self.add_alert(
+                "🔧",
+                f"{snapshot.vehicles_in_maintenance} véhicule(s) en maintenance",
+                "#f39c12"
+            )
         
         # 6. Élèves actifs (message positif)
-        active_students = sum(1 for s in students if s.status == StudentStatus.ACTIVE)
-        if active_students > 0:
+        if snapshot.active_students > 0:
             self.add_alert(
                 "✅", 
-                f"{active_students} élève(s) actif(s) en formation",
+                f"{snapshot.active_students} élève(s) actif(s) en formation",
                 "#27ae60"
             )
             
@@ -925,10 +778,7 @@ class DashboardProfessionalWidget(QWidget):
         """Nettoyer lors de la fermeture"""
         if hasattr(self, 'refresh_timer'):
             self.refresh_timer.stop()
-        try:
-            if hasattr(self, 'db_session') and self.db_session:
-                self.db_session.close()
-        except:
-            pass
+        if hasattr(self, 'data_loader'):
+            self.data_loader.cancel()
         event.accept()
 
@@ -0,0 +1,162 @@
+"""
+Chargement des données en arrière-plan pour les tableaux de bord
+
+Les requêtes des contrôleurs sont exécutées dans le QThreadPool global afin
+de ne pas bloquer le thread graphique. Le résultat est renvoyé au widget via
+des signaux Qt ; le rendu (widgets, graphiques) reste dans le thread GUI.
+
+Usage:
+    self.data_loader = DataLoader(self)
+    self.data_loader.loaded.connect(self.on_data_loaded)
+    self.data_loader.load(self.fetch_data, start_date, end_date)
+
+Un nouvel appel à load() annule le chargement précédent : son résultat,
+devenu obsolète, n'est jamais émis.
+"""
+
+import threading
+import traceback
+from typing import Callable, Dict, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from src.models import remove_scoped_session
+from src.utils import get_logger
+
+logger = get_logger()
+
+
+class DataLoadSignals(QObject):
+    """Signaux émis par une tâche de chargement (thread worker -> thread GUI)"""
+    finished = Signal(int, object)  # generation, result
+    error = Signal(int, str)  # generation, error message
+
+
+class DataLoadTask(QRunnable):
+    """Tâche exécutant une fonction de chargement dans le pool de threads"""
+    
+    def __init__(self, generation: int, fn: Callable, args: tuple, kwargs: dict):
+        super().__init__()
+        # La durée de vie est gérée par DataLoader (références Python)
+        self.setAutoDelete(False)
+        self.generation = generation
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = DataLoadSignals()
+        self._cancelled = threading.Event()
+    
+    def cancel(self):
+        """Marquer la tâche comme obsolète (son résultat sera ignoré)"""
+        self._cancelled.set()
+    
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    def run(self):
+        """Exécuter la fonction de chargement (thread worker)"""
+        # Un signal est toujours émis pour que DataLoader libère la tâche
+        if self.is_cancelled:
+            self.signals.finished.emit(self.generation, None)
+            return
+        
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement en arrière-plan : {e}\n{traceback.format_exc()}")
+            self.signals.error.emit(self.generation, str(e))
+            return
+        finally:
+            # Libérer la session propre à ce thread worker
+            remove_scoped_session()
+        
+        self.signals.finished.emit(self.generation, None if self.is_cancelled else result)
+
+
+class DataLoader(QObject):
+    """
+    Chargeur de données asynchrone réutilisable
+    
+    Un seul chargement est actif à la fois : chaque appel à load() annule le
+    précédent et seul le résultat le plus récent est émis via `loaded`.
+    """
+    loaded = Signal(object)  # résultat de la fonction de chargement
+    failed = Signal(str)  # message d'erreur
+    busy_changed = Signal(bool)  # True pendant un chargement
+    
+    def __init__(self, parent: Optional[QObject] = None, pool: Optional[QThreadPool] = None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._generation = 0
+        self._current_task: Optional[DataLoadTask] = None
+        self._running_tasks: Dict[int, DataLoadTask] = {}  # generation -> tâche
+    
+    @property
+    def is_busy(self) -> bool:
+        """Un chargement est-il en cours ?"""
+        return self._current_task is not None
+    
+    def load(self, fn: Callable, *args, **kwargs) -> int:
+        """
+        Lancer un chargement en arrière-plan
+        
+        Args:
+            fn: Fonction à exécuter hors du thread GUI (ne doit pas toucher aux widgets)
+            *args, **kwargs: Arguments transmis à la fonction
+        
+        Returns:
+            Numéro de génération du chargement
+        """
+        was_busy = self.is_busy
+        self._cancel_current()
+        
+        self._generation += 1
+        task = DataLoadTask(self._generation, fn, args, kwargs)
+        task.signals.finished.connect(self._on_task_finished)
+        task.signals.error.connect(self._on_task_error)
+        self._current_task = task
+        self._running_tasks[task.generation] = task
+        
+        self.pool.start(task)
+        if not was_busy:
+            self.busy_changed.emit(True)
+        return self._generation
+    
+    def cancel(self):
+        """Annuler le chargement en cours"""
+        if self.is_busy:
+            self._cancel_current()
+            self.busy_changed.emit(False)
+    
+    def _cancel_current(self):
+        """Annuler la tâche courante (retirée du pool si pas encore démarrée)"""
+        task = self._current_task
+        if task is None:
+            return
+        task.cancel()
+        if self.pool.tryTake(task):
+            # Jamais démarrée: aucun signal ne sera émis
+            self._running_tasks.pop(task.generation, None)
+        self._current_task = None
+    
+    def _is_current(self, generation: int) -> bool:
+        return self._current_task is not None and generation == self._generation
+    
+    @Slot(int, object)
+    def _on_task_finished(self, generation: int, result):
+        self._running_tasks.pop(generation, None)
+        if not self._is_current(generation):
+            return
+        self._current_task = None
+        self.busy_changed.emit(False)
+        self.loaded.emit(result)
+    
+    @Slot(int, str)
+    def _on_task_error(self, generation: int, message: str):
+        self._running_tasks.pop(generation, None)
+        if not self._is_current(generation):
+            return
+        self._current_task = None
+        self.busy_changed.emit(False)
+        self.failed.emit(message)
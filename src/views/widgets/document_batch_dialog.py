@@ -0,0 +1,103 @@
+"""
+Génération de documents par lots depuis les listes (convocations, reçus)
+
+DocumentBatchWorker exécute generate_documents dans un QThread : le rendu
+se fait dans un pool de processus et la fenêtre reste réactive.
+start_document_batch affiche la progression (annulable), puis ouvre le PDF
+fusionné prêt à imprimer.
+"""
+
+import os
+import webbrowser
+from typing import Callable, List, Optional
+
+from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtWidgets import QMessageBox, QProgressDialog, QWidget
+
+from src.controllers.document_batch import generate_documents
+from src.utils.pdf_batch import BatchResult
+
+MAX_ERRORS_SHOWN = 10
+
+
+class DocumentBatchWorker(QThread):
+    """Génération par lots dans un thread (l'interface reste réactive)"""
+    progress = Signal(int, int, str)  # documents traités, total, fichier ou erreur
+    finished_batch = Signal(object)  # BatchResult
+    
+    def __init__(self, kind: str, ids: Optional[List[int]] = None,
+                 id_source: Optional[Callable[[], List[int]]] = None, merge: bool = True, parent=None):
+        super().__init__(parent)
+        self.kind = kind
+        self.ids = ids
+        self.id_source = id_source  # IDs lus dans le thread (listes filtrées complètes)
+        self.merge = merge
+        self.should_stop = False
+    
+    def stop(self):
+        """Interrompre après le document en cours"""
+        self.should_stop = True
+    
+    def run(self):
+        try:
+            ids = self.ids if self.ids is not None else self.id_source()
+            result = generate_documents(
+                self.kind, ids, merge=self.merge,
+                progress=self.progress.emit,
+                should_stop=lambda: self.should_stop
+            )
+        except Exception as e:
+            result = BatchResult(errors=[(None, str(e))])
+        self.finished_batch.emit(result)
+
+
+def start_document_batch(parent: QWidget, kind: str, title: str, ids: Optional[List[int]] = None,
+                         id_source: Optional[Callable[[], List[int]]] = None) -> DocumentBatchWorker:
+    """
+    Lancer une génération par lots avec une fenêtre de progression
+    
+    Args:
+        parent: Widget appelant (il garde une référence au worker retourné)
+        kind: Type de document (voir generate_documents)
+        title: Libellé des documents ("Convocations", "Reçus"...)
+        ids: IDs des enregistrements, ou
+        id_source: Fonction renvoyant les IDs (appelée dans le thread)
+    
+    Returns:
+        DocumentBatchWorker démarré
+    """
+    dialog = QProgressDialog(f"{title} : préparation...", "Annuler", 0, 100, parent)
+    dialog.setWindowTitle(f"{title} par lots")
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(500)
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+    
+    worker = DocumentBatchWorker(kind, ids, id_source, parent=parent)
+    
+    def on_progress(done, total, message):
+        dialog.setLabelText(f"{title} : {done}/{total}\n{message}")
+        dialog.setValue(int(done * 100 / total) if total else 100)
+    
+    def on_finished(result):
+        dialog.close()
+        text = result.message
+        if result.merged_path:
+            text += f"\n\nPDF à imprimer : {result.merged_path}"
+            webbrowser.open('file://' + os.path.abspath(result.merged_path))
+        elif result.files:
+            text += f"\n\nDossier : {os.path.dirname(result.files[0])}"
+        if result.errors:
+            details = "\n".join(
+                f"• {key}: {message}" if key is not None else f"• {message}"
+                for key, message in result.errors[:MAX_ERRORS_SHOWN]
+            )
+            QMessageBox.warning(parent, f"{title} par lots", f"{text}\n\nErreurs :\n{details}")
+        else:
+            QMessageBox.information(parent, f"{title} par lots", text)
+    
+    dialog.canceled.connect(worker.stop)
+    worker.progress.connect(on_progress)
+    worker.finished_batch.connect(on_finished)
+    worker.start()
+    return worker
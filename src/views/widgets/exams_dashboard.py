@@ -22,7 +22,8 @@ from collections import defaultdict
 
 from src.controllers.exam_controller import ExamController
 from src.controllers.student_controller import StudentController
-from src.models import ExamType, ExamResult, get_session, Exam
+from src.models import ExamType, ExamResult
+from src.views.widgets.data_loader import DataLoader
 
 
 class ExamsDashboard(QWidget):
@@ -31,6 +32,11 @@ class ExamsDashboard(QWidget):
     def __init__(self):
         super().__init__()
         self.current_period = 'all'  # Par défaut: tous les examens
+        
+        # Chargement des données hors du thread GUI
+        self.data_loader = DataLoader(self)
+        self.data_loader.loaded.connect(self.on_stats_loaded)
+        
         self.setup_ui()
         self.load_stats()
     
@@ -282,23 +288,56 @@ class ExamsDashboard(QWidget):
         return today, today
     
     def load_stats(self):
-        """Charger les statistiques"""
-        # Nettoyer les cartes existantes
-        while self.stats_layout.count():
-            item = self.stats_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
+        """Charger les statistiques en arrière-plan"""
+        start_date, end_date = self.get_date_range()
+        self.data_loader.load(self.fetch_stats_data, start_date, end_date)
+    
+    @staticmethod
+    def fetch_stats_data(start_date, end_date):
+        """
+        Récupérer les données des examens (exécuté dans un thread worker)
+        
+        Returns:
+            Dict avec les examens (tous / période), les examens à venir
+            et les noms des élèves
+        """
         # Récupérer tous les examens
         all_exams = ExamController.get_all_exams()
         
         # Filtrer selon la période
-        start_date, end_date = self.get_date_range()
         exams = [
             e for e in all_exams
             if start_date <= e.scheduled_date <= end_date
         ]
         
+        # Examens en attente des 7 prochains jours
+        today = date.today()
+        next_week = today + timedelta(days=7)
+        upcoming = [
+            e for e in all_exams
+            if today <= e.scheduled_date <= next_week and e.result == ExamResult.PENDING
+        ]
+        upcoming.sort(key=lambda x: x.scheduled_date)
+        
+        return {
+            'all_exams': all_exams,
+            'exams': exams,
+            'upcoming': upcoming,
+            'student_names': {s.id: s.full_name for s in StudentController.get_all_students()},
+        }
+    
+    def on_stats_loaded(self, data):
+        """Afficher les statistiques chargées"""
+        # Nettoyer les cartes existantes
+        while self.stats_layout.count():
+            item = self.stats_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+        
+        all_exams = data['all_exams']
+        exams = data['exams']
+        student_names = data['student_names']
+        
         # Calculer les statistiques
         total = len(exams)
         passed = sum(1 for e in exams if e.result == ExamResult.PASSED)
@@ -334,8 +373,8 @@ class ExamsDashboard(QWidget):
         # Charger les autres sections
         self.load_type_distribution(exams)
         self.load_result_distribution(exams)
-        self.load_upcoming_exams()
-        self.load_top_students(all_exams)
+        self.load_upcoming_exams(data['upcoming'], student_names)
+        self.load_top_students(all_exams, student_names)
         self.load_attempts_distribution(exams)
         self.load_centers(exams)
     
@@ -499,25 +538,14 @@ class ExamsDashboard(QWidget):
         
         self.result_layout.addStretch()
     
-    def load_upcoming_exams(self):
-        """Charger les examens à venir"""
+    def load_upcoming_exams(self, upcoming, student_names):
+        """Charger les examens à venir (7 prochains jours, triés par date)"""
         # Nettoyer
         while self.upcoming_layout.count():
             item = self.upcoming_layout.takeAt(0)
             if item.widget():
                 item.widget().deleteLater()
         
-        # Récupérer les examens des 7 prochains jours
-        today = date.today()
-        next_week = today + timedelta(days=7)
-        
-        all_exams = ExamController.get_all_exams()
-        upcoming = [
-            e for e in all_exams
-            if today <= e.scheduled_date <= next_week and e.result == ExamResult.PENDING
-        ]
-        upcoming.sort(key=lambda x: x.scheduled_date)
-        
         if not upcoming:
             no_data = QLabel("✅ Aucun examen prévu dans les 7 prochains jours")
             no_data.setFont(QFont("Segoe UI", 10))
@@ -527,9 +555,7 @@ class ExamsDashboard(QWidget):
             return
         
         # Afficher les 5 premiers
-        session = get_session()
         for exam in upcoming[:5]:
-            student = session.query(Exam).filter_by(id=exam.id).first().student if exam.id else None
             
             row = QWidget()
             row.setFixedHeight(40)
@@ -552,7 +578,7 @@ class ExamsDashboard(QWidget):
             row_layout.addWidget(type_label)
             
             # Élève
-            student_name = student.full_name if student else "Inconnu"
+            student_name = student_names.get(exam.student_id, "Inconnu")
             if len(student_name) > 25:
                 student_name = student_name[:22] + "..."
             
@@ -579,7 +605,7 @@ class ExamsDashboard(QWidget):
         
         self.upcoming_layout.addStretch()
     
-    def load_top_students(self, exams):
+    def load_top_students(self, exams, student_names):
         """Charger les top élèves avec le plus de réussites"""
         # Nettoyer
         while self.top_students_layout.count():
@@ -604,11 +630,9 @@ class ExamsDashboard(QWidget):
         # Top 5
         top_5 = sorted(student_success.items(), key=lambda x: -x[1])[:5]
         
-        session = get_session()
         for idx, (student_id, count) in enumerate(top_5, 1):
-            from src.models import Student
-            student = session.query(Student).filter_by(id=student_id).first()
-            if not student:
+            student_name = student_names.get(student_id)
+            if not student_name:
                 continue
             
             row = QWidget()
@@ -625,7 +649,6 @@ class ExamsDashboard(QWidget):
             row_layout.addWidget(rank)
             
             # Nom
-            student_name = student.full_name
             if len(student_name) > 25:
                 student_name = student_name[:22] + "..."
             
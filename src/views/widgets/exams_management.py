@@ -12,23 +12,25 @@ Description:
 """
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView,
     QPushButton, QLineEdit, QComboBox, QHeaderView, QMessageBox, QDialog,
     QFormLayout, QDateEdit, QTextEdit, QSpinBox, QCheckBox,
     QGroupBox, QFrame, QTimeEdit
 )
 from PySide6.QtCore import Qt, QDate, QTime, Signal
-from PySide6.QtGui import QFont, QColor
+from PySide6.QtGui import QFont
 from datetime import datetime, date
 import os
 import webbrowser
 
-from functools import partial
 from src.controllers.exam_controller import ExamController
 from src.controllers.student_controller import StudentController
 from src.models import ExamType, ExamResult, get_session, Exam
 from src.utils import export_to_csv
 from src.utils.config_manager import get_config_manager
+from src.views.widgets.table_models import (
+    ColumnarTableModel, RowFilterProxyModel, TableColumn, ActionButtonsDelegate, RowAction, CENTER
+)
 
 
 class ExamDialog(QDialog):
@@ -396,9 +398,8 @@ class ExamDialog(QDialog):
             QMessageBox.warning(self, "Erreur", "Veuillez sélectionner un élève")
             return
         
+        session = get_session()
         try:
-            session = get_session()
-            
             if self.exam:
                 # Mise à jour
                 exam = session.query(Exam).filter_by(id=self.exam.id).first()
@@ -478,6 +479,8 @@ class ExamDialog(QDialog):
         except Exception as e:
             session.rollback()
             QMessageBox.critical(self, "Erreur", f"Erreur lors de l'enregistrement: {str(e)}")
+        finally:
+            session.close()
 
 
 class ExamsManagement(QWidget):
@@ -485,6 +488,7 @@ class ExamsManagement(QWidget):
     
     def __init__(self):
         super().__init__()
+        self.batch_worker = None  # Convocations par lots en cours
         self.setup_ui()
         self.load_exams()
     
@@ -603,6 +607,26 @@ class ExamsManagement(QWidget):
         """)
         search_layout.addWidget(export_btn)
         
+        # Convocations par lots (un seul PDF à imprimer)
+        batch_btn = QPushButton("🖨️ Convocations")
+        batch_btn.setToolTip("Convocations des examens sélectionnés, ou de tous les examens affichés")
+        batch_btn.clicked.connect(self.print_convocations_batch)
+        batch_btn.setStyleSheet("""
+            QPushButton {
+                background: #27ae60;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 8px;
+                font-size: 11pt;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background: #229954;
+            }
+        """)
+        search_layout.addWidget(batch_btn)
+        
         # Bouton rafraîchir
         refresh_btn = QPushButton("🔄")
         refresh_btn.clicked.connect(self.load_exams)
@@ -623,24 +647,56 @@ class ExamsManagement(QWidget):
         
         layout.addLayout(search_layout)
         
-        # Tableau
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels([
-            "Date", "Élève", "Type", "Résultat", "Score",
-            "Tentative", "Centre", "Payé", "Convocation", "Actions"
-        ])
+        # Tableau (model/view virtualisé)
+        result_labels = {
+            ExamResult.PASSED: ("✅ Réussi", "#4CAF50"),
+            ExamResult.FAILED: ("❌ Échoué", "#F44336"),
+            ExamResult.PENDING: ("⏳ En Attente", "#FFC107"),
+            ExamResult.ABSENT: ("👻 Absent", "#FF9800")
+        }
+        # Lignes: (id, date, élève, type, résultat, score, tentative, centre, payé, convocation)
+        self.model = ColumnarTableModel([
+            TableColumn("Date", 1, text=lambda d: d.strftime('%d/%m/%Y') if d else "", align=CENTER,
+                        sort_name='date'),
+            TableColumn("Élève", 2, text=lambda name: name or "Inconnu", sort_name='student'),
+            TableColumn("Type", 3, text=lambda t: "📖" if t == ExamType.THEORETICAL else "🚗", align=CENTER,
+                        sort_name='exam_type'),
+            TableColumn("Résultat", 4, text=lambda r: result_labels.get(r, ("?", "#999"))[0], align=CENTER,
+                        color=lambda r: result_labels.get(r, ("?", "#999"))[1], sort_name='result'),
+            TableColumn("Score", 5, align=CENTER),
+            TableColumn("Tentative", 6, text=lambda n: f"#{n}", align=CENTER, sort_name='attempt'),
+            TableColumn("Centre", 7, text=lambda c: c or "-", sort_name='center'),
+            TableColumn("Payé", 8, text=lambda paid: "✅" if paid else "❌", align=CENTER, sort_name='paid'),
+            TableColumn("Convocation", 9, text=lambda n: n or "-", align=CENTER, sort_name='summons'),
+            TableColumn("Actions"),
+        ], self)
+        self.proxy = RowFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.horizontalHeader().setSortIndicator(0, Qt.DescendingOrder)
+        self.table.setSortingEnabled(True)
+        
+        # Actions dessinées dans la cellule (pas de widget par ligne)
+        self.actions_delegate = ActionButtonsDelegate([
+            RowAction('print', "🖨️", "Imprimer Convocation", background="#27ae60"),
+            RowAction('edit', "✏️", "Modifier", background="#2196F3"),
+            RowAction('delete', "🗑️", "Supprimer", background="#F44336"),
+        ], self.table)
+        self.actions_delegate.triggered.connect(self.on_row_action)
+        self.table.setItemDelegateForColumn(9, self.actions_delegate)
         
         # Style du tableau (comme Moniteurs)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background: white;
                 border: 1px solid #dfe6e9;
                 border-radius: 8px;
                 gridline-color: #ecf0f1;
             }
-            QTableWidget::item { padding: 5px; }
-            QTableWidget::item:selected {
+            QTableView::item { padding: 5px; }
+            QTableView::item:selected {
                 background-color: #e3f2fd;
                 color: #2c3e50;
             }
@@ -654,9 +710,10 @@ class ExamsManagement(QWidget):
             }
         """)
         
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.table.setAlternatingRowColors(True)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.table.verticalHeader().setDefaultSectionSize(45)
         self.table.verticalHeader().setVisible(False)
         
@@ -671,8 +728,8 @@ class ExamsManagement(QWidget):
         header.setSectionResizeMode(6, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(7, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(8, QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(9, QHeaderView.ResizeMode.Fixed)
-        header.resizeSection(9, 160)
+        header.setSectionResizeMode(9, QHeaderView.ResizeMode.ResizeToContents)
+        header.setResizeContentsPrecision(100)
         
         layout.addWidget(self.table)
         
@@ -682,168 +739,56 @@ class ExamsManagement(QWidget):
         self.count_label.setStyleSheet("color: #666; padding: 5px;")
         layout.addWidget(self.count_label)
     
+    @staticmethod
+    def exam_row(row) -> tuple:
+        """Ligne de ExamController.list_page -> ligne affichée (score formaté)"""
+        score_text = ""
+        if row.exam_type == ExamType.THEORETICAL and row.theory_score is not None:
+            score_text = f"{row.theory_score}/{row.theory_max_score}"
+        elif row.exam_type == ExamType.PRACTICAL and row.practical_score is not None:
+            score_text = f"{row.practical_score}/100"
+        return (row.id, row.scheduled_date, row.student_name, row.exam_type, row.result, score_text,
+                row.attempt_number, row.exam_center, row.is_paid, row.summons_number)
+    
+    def current_filters(self) -> dict:
+        """Filtres de ExamController.list_page d'après la barre de filtres"""
+        return {
+            'search': self.search_input.text(),  # Nom d'élève ou numéro de convocation
+            'exam_type': self.type_filter.currentData(),
+            'result': self.result_filter.currentData(),
+        }
+    
     def load_exams(self):
-        """Charger tous les examens"""
-        self.all_exams = ExamController.get_all_exams()
-        self.filter_table()
+        """Charger la première page d'examens (filtres conservés, pages suivantes au défilement)"""
+        self.model.set_page_source(ExamController.list_page, self.current_filters(), transform=self.exam_row)
+        self.update_count()
     
     def filter_table(self):
-        """Filtrer et afficher les examens"""
-        search_text = self.search_input.text().lower()
-        type_filter = self.type_filter.currentData()
-        result_filter = self.result_filter.currentData()
-        
-        # Filtrer les examens
-        filtered = self.all_exams
-        
-        if type_filter:
-            filtered = [e for e in filtered if e.exam_type == type_filter]
-        
-        if result_filter:
-            filtered = [e for e in filtered if e.result == result_filter]
-        
-        if search_text:
-            session = get_session()
-            filtered_with_search = []
-            for exam in filtered:
-                student = exam.student
-                if student and search_text in student.full_name.lower():
-                    filtered_with_search.append(exam)
-                elif exam.summons_number and search_text in exam.summons_number.lower():
-                    filtered_with_search.append(exam)
-            filtered = filtered_with_search
-        
-        # Remplir le tableau
-        self.table.setRowCount(len(filtered))
-        
-        session = get_session()
-        for row, exam in enumerate(filtered):
-            student = exam.student
-            
-            # Date
-            date_item = QTableWidgetItem(exam.scheduled_date.strftime('%d/%m/%Y'))
-            date_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 0, date_item)
-            
-            # Élève
-            student_name = student.full_name if student else "Inconnu"
-            self.table.setItem(row, 1, QTableWidgetItem(student_name))
-            
-            # Type
-            type_icon = "📖" if exam.exam_type == ExamType.THEORETICAL else "🚗"
-            type_item = QTableWidgetItem(type_icon)
-            type_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 2, type_item)
-            
-            # Résultat
-            result_map = {
-                ExamResult.PASSED: ("✅ Réussi", QColor("#4CAF50")),
-                ExamResult.FAILED: ("❌ Échoué", QColor("#F44336")),
-                ExamResult.PENDING: ("⏳ En Attente", QColor("#FFC107")),
-                ExamResult.ABSENT: ("👻 Absent", QColor("#FF9800"))
-            }
-            result_text, result_color = result_map.get(exam.result, ("?", QColor("#999")))
-            result_item = QTableWidgetItem(result_text)
-            result_item.setForeground(result_color)
-            result_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 3, result_item)
-            
-            # Score
-            score_text = ""
-            if exam.exam_type == ExamType.THEORETICAL and exam.theory_score is not None:
-                score_text = f"{exam.theory_score}/{exam.theory_max_score}"
-            elif exam.exam_type == ExamType.PRACTICAL and exam.practical_score is not None:
-                score_text = f"{exam.practical_score}/100"
-            
-            score_item = QTableWidgetItem(score_text)
-            score_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 4, score_item)
-            
-            # Tentative
-            attempt_item = QTableWidgetItem(f"#{exam.attempt_number}")
-            attempt_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 5, attempt_item)
-            
-            # Centre
-            self.table.setItem(row, 6, QTableWidgetItem(exam.exam_center or "-"))
-            
-            # Payé
-            paid_item = QTableWidgetItem("✅" if exam.is_paid else "❌")
-            paid_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 7, paid_item)
-            
-            # Convocation
-            summons_item = QTableWidgetItem(exam.summons_number or "-")
-            summons_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 8, summons_item)
-            
-            # Actions
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(5, 2, 5, 2)
-            actions_layout.setSpacing(5)
-            
-            print_btn = QPushButton("🖨️")
-            print_btn.setToolTip("Imprimer Convocation")
-            print_btn.setFixedSize(30, 30)
-            print_btn.setStyleSheet("""
-                QPushButton {
-                    background: #27ae60;
-                    color: white;
-                    border-radius: 5px;
-                    font-size: 12pt;
-                    border: none;
-                }
-                QPushButton:hover {
-                    background: #229954;
-                }
-            """)
-            print_btn.clicked.connect(partial(self.print_convocation, exam))
-            actions_layout.addWidget(print_btn)
-            
-            edit_btn = QPushButton("✏️")
-            edit_btn.setToolTip("Modifier")
-            edit_btn.setFixedSize(30, 30)
-            edit_btn.setStyleSheet("""
-                QPushButton {
-                    background: #2196F3;
-                    color: white;
-                    border-radius: 5px;
-                    font-size: 12pt;
-                    border: none;
-                }
-                QPushButton:hover {
-                    background: #1976D2;
-                }
-            """)
-            edit_btn.clicked.connect(partial(self.edit_exam, exam))
-            actions_layout.addWidget(edit_btn)
-            
-            delete_btn = QPushButton("🗑️")
-            delete_btn.setToolTip("Supprimer")
-            delete_btn.setFixedSize(30, 30)
-            delete_btn.setStyleSheet("""
-                QPushButton {
-                    background: #F44336;
-                    color: white;
-                    border-radius: 5px;
-                    font-size: 12pt;
-                    border: none;
-                }
-                QPushButton:hover {
-                    background: #D32F2F;
-                }
-            """)
-            delete_btn.clicked.connect(partial(self.delete_exam, exam))
-            actions_layout.addWidget(delete_btn)
-            
-            self.table.setCellWidget(row, 9, actions_widget)
-        
-        # Mettre à jour le compteur
-        total = len(self.all_exams)
-        showing = len(filtered)
+        """Filtrer les examens (requête de la première page)"""
+        self.model.set_filters(self.current_filters())
+        self.update_count()
+    
+    def update_count(self):
+        """Mettre à jour le compteur"""
+        showing = self.model.total_count()
+        total = ExamController.list_page(limit=0).total
         self.count_label.setText(f"Affichage de {showing} examen(s) sur {total} au total")
     
+    def on_row_action(self, action: str, exam_id: int):
+        """Bouton d'action d'une ligne du tableau"""
+        exam = ExamController.get_exam_by_id(exam_id)
+        if not exam:
+            QMessageBox.warning(self, "Erreur", "Examen introuvable")
+            self.load_exams()
+            return
+        
+        handlers = {
+            'print': self.print_convocation,
+            'edit': self.edit_exam,
+            'delete': self.delete_exam,
+        }
+        handlers[action](exam)
+    
     def add_exam(self):
         """Ajouter un nouvel examen"""
         dialog = ExamDialog(parent=self)
@@ -866,8 +811,8 @@ class ExamsManagement(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            session = get_session()
             try:
-                session = get_session()
                 e = session.query(Exam).filter_by(id=exam.id).first()
                 if e:
                     session.delete(e)
@@ -877,6 +822,39 @@ class ExamsManagement(QWidget):
             except Exception as ex:
                 session.rollback()
                 QMessageBox.critical(self, "Erreur", f"Erreur: {str(ex)}")
+            finally:
+                session.close()
+    
+    def print_convocations_batch(self):
+        """Générer en lot les convocations des examens sélectionnés (ou affichés) et les fusionner"""
+        if self.batch_worker and self.batch_worker.isRunning():
+            QMessageBox.information(self, "Convocations", "Une génération de convocations est déjà en cours.")
+            return
+        
+        ids = [self.proxy.source_row_id(index) for index in self.table.selectionModel().selectedRows()]
+        id_source = None
+        if len(ids) < 2:
+            count = self.model.total_count()
+            if not count:
+                QMessageBox.warning(self, "Avertissement", "Aucun examen affiché")
+                return
+            reply = QMessageBox.question(
+                self, "Convocations",
+                f"Générer les convocations des {count} examen(s) affichés ?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+            # Tous les examens filtrés (pas seulement les pages chargées), dans l'ordre du tableau
+            filters, sort = self.current_filters(), self.model.sort_name()
+            ids = None
+            id_source = lambda: [
+                row.id for row in ExamController.list_page(filters, sort, limit=None, with_total=False).rows
+            ]
+        
+        from src.views.widgets.document_batch_dialog import start_document_batch
+        self.batch_worker = start_document_batch(self, 'summons', "Convocations", ids=ids, id_source=id_source)
+        self.batch_worker.finished_batch.connect(lambda result: self.load_exams())
     
     def print_convocation(self, exam):
         """Générer et imprimer la convocation PDF"""
@@ -1363,13 +1341,13 @@ class ExamsManagement(QWidget):
     
     def export_exams(self):
         """Exporter les examens en CSV"""
-        if not self.all_exams:
+        exams = ExamController.get_all_exams()
+        if not exams:
             QMessageBox.warning(self, "Avertissement", "Aucun examen à exporter")
             return
         
-        session = get_session()
         data = []
-        for exam in self.all_exams:
+        for exam in exams:
             student = exam.student
             data.append({
                 'Date': exam.scheduled_date.strftime('%d/%m/%Y'),
@@ -13,8 +13,6 @@ from datetime import datetime, timedelta, date
 from typing import Dict, List
 
 from src.controllers.instructor_controller import InstructorController
-from src.controllers.session_controller import SessionController
-from src.models import SessionStatus
 
 
 class InstructorsDashboard(QWidget):
@@ -256,26 +254,22 @@ class InstructorsDashboard(QWidget):
         # Filtrer les actifs
         active_instructors = [i for i in all_instructors if i.is_available]
         
-        # Récupérer sessions pour la période
+        # Sessions de la période agrégées par moniteur (une requête groupée)
         start_date, end_date = self.get_date_range()
-        all_sessions = SessionController.get_sessions_by_date_range(start_date, end_date)
-        sessions = [s for s in all_sessions if s.instructor_id and s.status == SessionStatus.COMPLETED]
+        statistics = InstructorController.get_all_instructor_statistics(start_date, end_date)
         
         # Calculs principaux
         total_active = len(active_instructors)
         
         # Heures enseignées (période)
-        total_hours = sum([
-            (s.end_datetime - s.start_datetime).total_seconds() / 3600
-            for s in sessions
-        ]) if sessions else 0
+        total_hours = sum(stats['total_hours'] for stats in statistics.values())
         
         # Taux moyen de réussite
         success_rates = [i.success_rate for i in all_instructors if i.success_rate > 0]
         avg_success = int(sum(success_rates) / len(success_rates)) if success_rates else 0
         
-        # Sessions totales
-        total_sessions = len(sessions)
+        # Sessions totales (terminées)
+        total_sessions = sum(stats['completed_sessions'] for stats in statistics.values())
         
         # Mettre à jour les cartes
         self.update_card_value(self.card_total, str(total_active))
@@ -284,12 +278,12 @@ class InstructorsDashboard(QWidget):
         self.update_card_value(self.card_sessions, str(total_sessions))
         
         # Charger détails
-        self.load_top_hours(all_instructors, sessions)
+        self.load_top_hours(all_instructors, statistics)
         self.load_availability(all_instructors)
         self.load_top_success(all_instructors)
         self.load_license_types(all_instructors)
     
-    def load_top_hours(self, instructors: List, sessions: List):
+    def load_top_hours(self, instructors: List, statistics: Dict[int, Dict]):
         """Charger top moniteurs par heures"""
         layout = self.top_hours_group.layout()
         
@@ -299,11 +293,11 @@ class InstructorsDashboard(QWidget):
             if child.widget():
                 child.widget().deleteLater()
         
-        # Calculer heures par moniteur (période)
-        instructor_hours = {}
-        for s in sessions:
-            hours = (s.end_datetime - s.start_datetime).total_seconds() / 3600
-            instructor_hours[s.instructor_id] = instructor_hours.get(s.instructor_id, 0) + hours
+        # Heures par moniteur (période)
+        instructor_hours = {
+            inst_id: stats['total_hours']
+            for inst_id, stats in statistics.items() if stats['completed_sessions']
+        }
         
         # Map instructors
         inst_map = {i.id: i for i in instructors}
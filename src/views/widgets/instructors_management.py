@@ -15,7 +15,7 @@ from datetime import datetime, date
 
 from functools import partial
 from src.controllers.instructor_controller import InstructorController
-from src.models import Instructor
+from src.models import Instructor, get_session
 
 
 class AddInstructorDialog(QDialog):
@@ -194,10 +194,8 @@ class AddInstructorDialog(QDialog):
             QMessageBox.warning(self, "Erreur", "Veuillez entrer un numéro de permis")
             return
         
+        session = get_session()
         try:
-            from src.models import get_session
-            session = get_session()
-            
             if self.instructor:
                 # Modification
                 self.instructor.full_name = self.name_input.text().strip()
@@ -211,6 +209,7 @@ class AddInstructorDialog(QDialog):
                 self.instructor.is_available = self.available_check.isChecked()
                 self.instructor.notes = self.notes_input.toPlainText() or None
                 
+                session.merge(self.instructor)
                 session.commit()
                 QMessageBox.information(self, "Succès", "Moniteur modifié avec succès !")
             else:
@@ -237,6 +236,8 @@ class AddInstructorDialog(QDialog):
             
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors de l'enregistrement :\n{str(e)}")
+        finally:
+            session.close()
 
 
 class InstructorsManagement(QWidget):
@@ -16,6 +16,7 @@ from src.controllers.payment_controller import PaymentController
 from src.controllers.student_controller import StudentController
 from src.models import PaymentMethod
 from src.views.widgets.common_widgets import create_center_header_widget
+from src.views.widgets.data_loader import DataLoader
 
 
 class PaymentsDashboard(QWidget):
@@ -24,6 +25,11 @@ class PaymentsDashboard(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_period = "all"  # day, week, month, year, all
+        
+        # Chargement des données hors du thread GUI
+        self.data_loader = DataLoader(self)
+        self.data_loader.loaded.connect(self.on_stats_loaded)
+        
         self.setup_ui()
         self.load_all_stats()
     
@@ -266,9 +272,18 @@ class PaymentsDashboard(QWidget):
             value_label.setText(new_value)
     
     def load_all_stats(self):
-        """Charger toutes les statistiques (EXCLUT paiements annulés)"""
+        """Charger toutes les statistiques en arrière-plan"""
         start_date, end_date = self.get_date_range()
-        
+        self.data_loader.load(self.fetch_stats_data, start_date, end_date)
+    
+    @staticmethod
+    def fetch_stats_data(start_date: date, end_date: date) -> Dict:
+        """
+        Récupérer les données du dashboard (exécuté dans un thread worker)
+        
+        Returns:
+            Dict avec la période, les paiements filtrés et les noms des élèves
+        """
         # Récupérer tous les paiements
         all_payments = PaymentController.get_all_payments()
         
@@ -279,6 +294,21 @@ class PaymentsDashboard(QWidget):
             and not p.is_cancelled  # IMPORTANT: Exclure annulés
         ]
         
+        # Noms des élèves (pour le top payeurs)
+        student_names = {s.id: s.full_name for s in StudentController.get_all_students()}
+        
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'payments': payments,
+            'student_names': student_names,
+        }
+    
+    def on_stats_loaded(self, data: Dict):
+        """Afficher les statistiques chargées (EXCLUT paiements annulés)"""
+        start_date, end_date = data['start_date'], data['end_date']
+        payments = data['payments']
+        
         # Calculs principaux (convertir Decimal en float)
         total_revenue = sum(float(p.amount) for p in payments)
         total_payments = len(payments)
@@ -297,7 +327,7 @@ class PaymentsDashboard(QWidget):
         # Charger détails
         self.load_methods_distribution(payments)
         self.load_categories_distribution(payments)
-        self.load_top_students(payments)
+        self.load_top_students(payments, data['student_names'])
         self.load_extra_stats(payments, start_date, end_date)
     
     def load_methods_distribution(self, payments: List):
@@ -428,7 +458,7 @@ class PaymentsDashboard(QWidget):
             no_data.setStyleSheet("color: #95a5a6; font-style: italic;")
             layout.addWidget(no_data)
     
-    def load_top_students(self, payments: List):
+    def load_top_students(self, payments: List, student_names: Dict[int, str]):
         """Charger top élèves payeurs"""
         layout = self.top_students_group.layout()
         
@@ -443,13 +473,10 @@ class PaymentsDashboard(QWidget):
         for p in payments:
             student_amounts[p.student_id] = student_amounts.get(p.student_id, 0) + float(p.amount)
         
-        # Récupérer infos élèves
-        all_students = {s.id: s for s in StudentController.get_all_students()}
-        
         # Top 5
         for i, (student_id, amount) in enumerate(sorted(student_amounts.items(), key=lambda x: x[1], reverse=True)[:5]):
-            student = all_students.get(student_id)
-            if not student:
+            student_name = student_names.get(student_id)
+            if not student_name:
                 continue
             
             row_widget = QWidget()
@@ -462,7 +489,7 @@ class PaymentsDashboard(QWidget):
             rank.setStyleSheet("color: #f39c12; font-weight: bold;")
             row.addWidget(rank)
             
-            name = QLabel(student.full_name[:22])
+            name = QLabel(student_name[:22])
             name.setStyleSheet("color: #2c3e50; font-size: 11px;")
             row.addWidget(name, stretch=1)
             
@@ -4,19 +4,23 @@ Table, recherche, filtres, ajout, PDF, exports
 """
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView,
     QPushButton, QLineEdit, QComboBox, QHeaderView, QMessageBox, QDialog,
     QFormLayout, QDateEdit, QTextEdit, QDoubleSpinBox, QCheckBox, QFrame,
     QFileDialog
 )
 from PySide6.QtCore import Qt, QDate, Signal
-from PySide6.QtGui import QFont, QColor
+from PySide6.QtGui import QFont
 from datetime import datetime, date
+from pathlib import Path
 
-from functools import partial
 from src.controllers.payment_controller import PaymentController
 from src.controllers.student_controller import StudentController
 from src.models import PaymentMethod, Payment
+from src.views.widgets.table_models import (
+    ColumnarTableModel, RowFilterProxyModel, TableColumn, ActionButtonsDelegate, RowAction,
+    CENTER, RIGHT
+)
 
 
 class AddPaymentDialog(QDialog):
@@ -221,12 +225,13 @@ class AddPaymentDialog(QDialog):
         
         if success:
             # Mettre à jour les champs supplémentaires
-            from src.models import get_session
-            session = get_session()
-            payment.payment_date = payment_date
-            payment.category = category
-            payment.reference_number = reference
-            session.commit()
+            from src.models import session_scope
+            with session_scope() as session:
+                stored = session.query(Payment).filter_by(id=payment.id).first()
+                if stored:
+                    stored.payment_date = payment_date
+                    stored.category = category
+                    stored.reference_number = reference
             
             # Générer PDF si demandé
             if self.generate_pdf_check.isChecked() and payment.receipt_number:
@@ -261,6 +266,7 @@ class PaymentsManagement(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.batch_worker = None  # Reçus par lots en cours
         self.setup_ui()
         self.load_payments()
     
@@ -341,6 +347,25 @@ class PaymentsManagement(QWidget):
         """)
         export_btn.setCursor(Qt.PointingHandCursor)
         
+        # Reçus par lots (un seul PDF à imprimer)
+        receipts_btn = QPushButton("🧾 Reçus par lots")
+        receipts_btn.setToolTip("Reçus des paiements sélectionnés, ou de tous les paiements affichés")
+        receipts_btn.clicked.connect(self.print_receipts_batch)
+        receipts_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #e67e22;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 8px;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #d35400;
+            }
+        """)
+        receipts_btn.setCursor(Qt.PointingHandCursor)
+        
         refresh_btn = QPushButton("🔄 Actualiser")
         refresh_btn.clicked.connect(self.load_payments)
         refresh_btn.setStyleSheet("""
@@ -360,6 +385,7 @@ class PaymentsManagement(QWidget):
         
         header_layout.addWidget(add_btn)
         header_layout.addWidget(export_btn)
+        header_layout.addWidget(receipts_btn)
         header_layout.addWidget(refresh_btn)
         
         layout.addLayout(header_layout)
@@ -666,29 +692,56 @@ class PaymentsManagement(QWidget):
         return toolbar
     
     def create_table(self, layout):
-        """Créer la table des paiements"""
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)
-        self.table.setHorizontalHeaderLabels([
-            "Date", "N° Reçu", "Élève", "Montant", "Méthode",
-            "Catégorie", "Statut", "Validé par", "Actions"
-        ])
+        """Créer la table des paiements (model/view virtualisé)"""
+        self.model = ColumnarTableModel([
+            TableColumn("Date", 1, text=lambda d: d.strftime('%d/%m/%Y') if d else 'N/A', align=CENTER,
+                        sort_name='date'),
+            TableColumn("N° Reçu", 2, text=lambda r: r or 'N/A', align=CENTER, sort_name='receipt'),
+            TableColumn("Élève", 3, text=lambda n: n or 'N/A', sort_name='student'),
+            TableColumn("Montant", 4, text=lambda a: f"{a:,.2f} DH", align=RIGHT,
+                        color=lambda a: "#27ae60", bold=True, sort_name='amount'),
+            TableColumn("Méthode", 5, text=lambda m: m.value.replace('_', ' ').title(), align=CENTER,
+                        sort_name='method'),
+            TableColumn("Catégorie", 6, text=lambda c: (c or 'autre').replace('_', ' ').title(), align=CENTER,
+                        sort_name='category'),
+            TableColumn("Statut", 7, text=lambda v: "✅ Validé" if v else "⏳ En attente", align=CENTER,
+                        color=lambda v: "#27ae60" if v else "#f39c12", sort_name='validated'),
+            TableColumn("Validé par", 8, text=lambda v: v or '-', sort_name='validated_by'),
+            TableColumn("Actions"),
+        ], self)
+        self.proxy = RowFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.horizontalHeader().setSortIndicator(0, Qt.DescendingOrder)
+        self.table.setSortingEnabled(True)
+        
+        # Actions dessinées dans la cellule (pas de widget par ligne)
+        self.actions_delegate = ActionButtonsDelegate([
+            RowAction('view', "👁️", "Voir reçu"),
+            RowAction('edit', "✏️", "Modifier"),
+            RowAction('pdf', "📄", "Générer PDF"),
+            RowAction('delete', "🗑️", "Annuler/Supprimer", background="#e74c3c"),
+        ], self.table)
+        self.actions_delegate.triggered.connect(self.on_row_action)
+        self.table.setItemDelegateForColumn(8, self.actions_delegate)
         
         # Style
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.ExtendedSelection)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: 2px solid #ecf0f1;
                 border-radius: 8px;
                 gridline-color: #ecf0f1;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #d5f4e6;
                 color: #000;
             }
@@ -711,10 +764,11 @@ class PaymentsManagement(QWidget):
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)  # Catégorie
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)  # Statut
         header.setSectionResizeMode(7, QHeaderView.ResizeToContents)  # Validé par
-        header.setSectionResizeMode(8, QHeaderView.Fixed)  # Actions
-        header.resizeSection(8, 160)  # Fixer largeur colonne Actions à 160px
+        header.setSectionResizeMode(8, QHeaderView.ResizeToContents)  # Actions (taille du délégué)
+        header.setResizeContentsPrecision(100)  # Largeurs estimées sur 100 lignes, pas 1000
         
-        # Ajuster hauteur des lignes
+        # Hauteur des lignes fixe : pas de calcul de taille par ligne
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.table.verticalHeader().setDefaultSectionSize(45)
         
         self.table.verticalHeader().setVisible(False)
@@ -749,182 +803,54 @@ class PaymentsManagement(QWidget):
         return footer
     
     def load_payments(self):
-        """Charger tous les paiements"""
-        self.all_payments = PaymentController.get_all_payments()
-        self.display_payments(self.all_payments)
+        """Charger la première page de paiements (pages suivantes au défilement)"""
+        self.model.set_page_source(PaymentController.list_page, self.current_filters())
         self.update_stats()
     
-    def display_payments(self, payments: list):
-        """Afficher les paiements dans la table"""
-        self.table.setRowCount(0)
-        
-        # Récupérer infos élèves
-        all_students = {s.id: s for s in StudentController.get_all_students()}
-        
-        total_amount = 0
-        
-        for payment in payments:
-            # Ne pas afficher les paiements annulés
-            if payment.is_cancelled:
-                continue
-            
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            student = all_students.get(payment.student_id)
-            student_name = student.full_name if student else "N/A"
-            
-            # Date
-            date_item = QTableWidgetItem(payment.payment_date.strftime('%d/%m/%Y') if payment.payment_date else 'N/A')
-            date_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 0, date_item)
-            
-            # Reçu
-            receipt_item = QTableWidgetItem(payment.receipt_number or 'N/A')
-            receipt_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 1, receipt_item)
-            
-            # Élève
-            self.table.setItem(row, 2, QTableWidgetItem(student_name))
-            
-            # Montant (convertir Decimal en float)
-            amount_value = float(payment.amount) if payment.amount else 0.0
-            amount_item = QTableWidgetItem(f"{amount_value:,.2f} DH")
-            amount_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            amount_item.setForeground(QColor("#27ae60"))
-            amount_font = QFont()
-            amount_font.setBold(True)
-            amount_item.setFont(amount_font)
-            self.table.setItem(row, 3, amount_item)
-            total_amount += amount_value
-            
-            # Méthode
-            method_item = QTableWidgetItem(payment.payment_method.value.replace('_', ' ').title())
-            method_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 4, method_item)
-            
-            # Catégorie
-            cat_item = QTableWidgetItem((payment.category or 'autre').replace('_', ' ').title())
-            cat_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 5, cat_item)
-            
-            # Statut
-            if payment.is_validated:
-                status_item = QTableWidgetItem("✅ Validé")
-                status_item.setForeground(QColor("#27ae60"))
-            else:
-                status_item = QTableWidgetItem("⏳ En attente")
-                status_item.setForeground(QColor("#f39c12"))
-            status_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 6, status_item)
-            
-            # Validé par
-            self.table.setItem(row, 7, QTableWidgetItem(payment.validated_by or '-'))
-            
-            # Actions
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(5, 2, 5, 2)
-            actions_layout.setSpacing(5)
-            
-            view_btn = QPushButton("👁️")
-            view_btn.setToolTip("Voir reçu")
-            view_btn.clicked.connect(partial(self.view_receipt, payment))
-            view_btn.setCursor(Qt.PointingHandCursor)
-            
-            edit_btn = QPushButton("✏️")
-            edit_btn.setToolTip("Modifier")
-            edit_btn.clicked.connect(partial(self.edit_payment, payment))
-            edit_btn.setCursor(Qt.PointingHandCursor)
-            
-            pdf_btn = QPushButton("📄")
-            pdf_btn.setToolTip("Générer PDF")
-            pdf_btn.clicked.connect(partial(self.generate_pdf, payment))
-            pdf_btn.setCursor(Qt.PointingHandCursor)
-            
-            delete_btn = QPushButton("🗑️")
-            delete_btn.setToolTip("Annuler/Supprimer")
-            delete_btn.clicked.connect(partial(self.delete_payment, payment))
-            delete_btn.setCursor(Qt.PointingHandCursor)
-            delete_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #e74c3c;
-                    color: white;
-                    border-radius: 3px;
-                    padding: 5px;
-                }
-                QPushButton:hover {
-                    background-color: #c0392b;
-                }
-            """)
-            
-            actions_layout.addWidget(view_btn)
-            actions_layout.addWidget(edit_btn)
-            actions_layout.addWidget(pdf_btn)
-            actions_layout.addWidget(delete_btn)
-            
-            self.table.setCellWidget(row, 8, actions_widget)
-    
     def update_stats(self):
-        """Mettre à jour les statistiques"""
-        if not self.all_payments:
-            return
-        
-        total = len([p for p in self.all_payments if not p.is_cancelled])
-        validated = len([p for p in self.all_payments if p.is_validated and not p.is_cancelled])
-        pending = len([p for p in self.all_payments if not p.is_validated and not p.is_cancelled])
-        total_amount = sum(float(p.amount) for p in self.all_payments if not p.is_cancelled)
+        """Mettre à jour les statistiques (agrégats SQL, hors annulés)"""
+        stats = PaymentController.get_payment_statistics()
+        total = stats.get('total_payments', 0)
+        validated = stats.get('validated_count', 0)
         
         self.total_label.setText(f"Total: {total} paiements")
-        self.sum_label.setText(f"Montant: {total_amount:,.2f} DH")
+        self.sum_label.setText(f"Montant: {stats.get('total_amount', 0.0):,.2f} DH")
         self.validated_label.setText(f"Validés: {validated}")
-        self.pending_label.setText(f"En attente: {pending}")
+        self.pending_label.setText(f"En attente: {total - validated}")
     
-    def filter_payments(self):
-        """Filtrer les paiements selon critères"""
-        search_text = self.search_input.text().lower()
-        method_filter = self.method_filter.currentData()
+    def current_filters(self) -> dict:
+        """Filtres de PaymentController.list_page d'après la barre de filtres"""
         status_filter = self.status_filter.currentData()
-        date_from = self.date_from.date().toPython()
-        date_to = self.date_to.date().toPython()
-        
-        filtered = []
-        all_students = {s.id: s for s in StudentController.get_all_students()}
-        
-        for payment in self.all_payments:
-            # Filtre recherche
-            if search_text:
-                student = all_students.get(payment.student_id)
-                student_name = student.full_name.lower() if student else ''
-                receipt = (payment.receipt_number or '').lower()
-                amount_str = str(payment.amount)
-                
-                if not (search_text in student_name or search_text in receipt or search_text in amount_str):
-                    continue
-            
-            # Filtre méthode
-            if method_filter and payment.payment_method != method_filter:
-                continue
-            
-            # Filtre statut
-            if status_filter:
-                if status_filter == "validated" and not payment.is_validated:
-                    continue
-                if status_filter == "pending" and payment.is_validated:
-                    continue
-                if status_filter == "cancelled" and not payment.is_cancelled:
-                    continue
-            
-            # Filtre date
-            if payment.payment_date:
-                payment_date = payment.payment_date.date() if hasattr(payment.payment_date, 'date') else payment.payment_date
-                if payment_date < date_from or payment_date > date_to:
-                    continue
-            
-            filtered.append(payment)
+        filters = {
+            'search': self.search_input.text(),  # Nom de l'élève ou n° de reçu
+            'method': self.method_filter.currentData(),
+            'date_from': self.date_from.date().toPython(),
+            'date_to': self.date_to.date().toPython(),
+            'cancelled': status_filter == "cancelled",
+        }
+        if status_filter in ("validated", "pending"):
+            filters['validated'] = status_filter == "validated"
+        return filters
+    
+    def filter_payments(self):
+        """Filtrer les paiements selon critères (requête de la première page)"""
+        self.model.set_filters(self.current_filters())
+    
+    def on_row_action(self, action: str, payment_id: int):
+        """Bouton d'action d'une ligne du tableau"""
+        payment = PaymentController.get_payment_by_id(payment_id)
+        if not payment:
+            QMessageBox.warning(self, "Erreur", "Paiement introuvable")
+            self.load_payments()
+            return
         
-        self.display_payments(filtered)
-        self.update_stats()
+        handlers = {
+            'view': self.view_receipt,
+            'edit': self.edit_payment,
+            'pdf': self.generate_pdf,
+            'delete': self.delete_payment,
+        }
+        handlers[action](payment)
     
     def add_payment(self):
         """Ouvrir dialogue ajout paiement"""
@@ -1124,9 +1050,39 @@ class PaymentsManagement(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors de la sauvegarde:\n{str(e)}")
     
+    def print_receipts_batch(self):
+        """Générer en lot les reçus des paiements sélectionnés (ou affichés) et les fusionner"""
+        if self.batch_worker and self.batch_worker.isRunning():
+            QMessageBox.information(self, "Reçus", "Une génération de reçus est déjà en cours.")
+            return
+        
+        ids = [self.proxy.source_row_id(index) for index in self.table.selectionModel().selectedRows()]
+        id_source = None
+        if len(ids) < 2:
+            count = self.model.total_count()
+            if not count:
+                QMessageBox.warning(self, "Erreur", "Aucun paiement affiché")
+                return
+            reply = QMessageBox.question(
+                self, "Reçus",
+                f"Générer les reçus des {count} paiement(s) affichés ?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+            # Tous les paiements filtrés (pas seulement les pages chargées), dans l'ordre du tableau
+            filters, sort = self.current_filters(), self.model.sort_name()
+            ids = None
+            id_source = lambda: [
+                row.id for row in PaymentController.list_page(filters, sort, limit=None, with_total=False).rows
+            ]
+        
+        from src.views.widgets.document_batch_dialog import start_document_batch
+        self.batch_worker = start_document_batch(self, 'receipt', "Reçus", ids=ids, id_source=id_source)
+    
     def export_payments(self):
         """Exporter les paiements en CSV"""
-        if not self.all_payments:
+        if not self.model.total_count():
             QMessageBox.warning(self, "Erreur", "Aucun paiement à exporter")
             return
         
@@ -1146,37 +1102,15 @@ class PaymentsManagement(QWidget):
         )
         
         if filename:
-            try:
-                import csv
-                all_students = {s.id: s for s in StudentController.get_all_students()}
-                
-                with open(filename, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow([
-                        'Date', 'Reçu', 'Élève', 'Montant', 'Méthode',
-                        'Catégorie', 'Statut', 'Validé par', 'Référence'
-                    ])
-                    
-                    for p in self.all_payments:
-                        # Exclure les paiements annulés de l'export
-                        if p.is_cancelled:
-                            continue
-                        student = all_students.get(p.student_id)
-                        writer.writerow([
-                            p.payment_date.strftime('%d/%m/%Y') if p.payment_date else '',
-                            p.receipt_number or '',
-                            student.full_name if student else '',
-                            float(p.amount) if p.amount else 0.0,
-                            p.payment_method.value,
-                            p.category or '',
-                            p.status,
-                            p.validated_by or '',
-                            p.reference_number or ''
-                        ])
-                
-                QMessageBox.information(self, "Succès", f"Paiements exportés vers :\n{filename}")
-            except Exception as e:
-                QMessageBox.critical(self, "Erreur", f"Erreur lors de l'export :\n{str(e)}")
+            # Table lue par lots et écrite au fil de l'eau (paiements annulés exclus)
+            path = Path(filename)
+            success, result = PaymentController.export_to_csv(
+                filename=path.stem, include_cancelled=False, directory=str(path.parent)
+            )
+            if success:
+                QMessageBox.information(self, "Succès", f"Paiements exportés vers :\n{result}")
+            else:
+                QMessageBox.critical(self, "Erreur", f"Erreur lors de l'export :\n{result}")
     
     def view_receipt(self, payment):
         """Afficher le reçu dans une fenêtre avec bouton imprimer"""
@@ -1486,15 +1420,13 @@ class PaymentsManagement(QWidget):
             
             if success:
                 # Mettre à jour champs supplémentaires
-                from src.models import get_session
-                session = get_session()
-                session.expire_all()
-                updated_payment = session.query(Payment).filter_by(id=payment.id).first()
-                if updated_payment:
-                    updated_payment.payment_date = new_date
-                    updated_payment.category = new_category
-                    updated_payment.reference_number = new_reference
-                    session.commit()
+                from src.models import session_scope
+                with session_scope() as session:
+                    updated_payment = session.query(Payment).filter_by(id=payment.id).first()
+                    if updated_payment:
+                        updated_payment.payment_date = new_date
+                        updated_payment.category = new_category
+                        updated_payment.reference_number = new_reference
                 
                 QMessageBox.information(dialog, "Succès", "Paiement modifié avec succès")
                 dialog.accept()
@@ -15,6 +15,7 @@ from src.controllers.session_controller import SessionController
 from src.controllers.instructor_controller import InstructorController
 from src.controllers.vehicle_controller import VehicleController
 from src.models import SessionStatus, SessionType
+from src.views.widgets.data_loader import DataLoader
 
 
 class PlanningStatsWidget(QWidget):
@@ -23,6 +24,11 @@ class PlanningStatsWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_period = "week"
+        
+        # Chargement des données hors du thread GUI
+        self.data_loader = DataLoader(self)
+        self.data_loader.loaded.connect(self.on_stats_loaded)
+        
         self.setup_ui()
         # Charger APRÈS que l'UI soit complète
         self.load_all_stats()
@@ -320,10 +326,32 @@ class PlanningStatsWidget(QWidget):
             value_label.repaint()
     
     def load_all_stats(self):
-        """Charger TOUTES les statistiques"""
+        """Charger TOUTES les statistiques en arrière-plan"""
         start_date, end_date = self.get_date_range()
+        self.data_loader.load(self.fetch_stats_data, start_date, end_date)
+    
+    @staticmethod
+    def fetch_stats_data(start_date, end_date):
+        """
+        Récupérer les données du planning (exécuté dans un thread worker)
+        
+        Returns:
+            Dict avec la période, les sessions et les noms moniteurs/véhicules
+        """
         sessions = SessionController.get_sessions_by_date_range(start_date, end_date)
-        sessions = sessions if sessions else []
+        
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'sessions': sessions if sessions else [],
+            'instructor_names': {i.id: i.full_name for i in InstructorController.get_all_instructors()},
+            'vehicle_names': {v.id: f"{v.make} {v.model}" for v in VehicleController.get_all_vehicles()},
+        }
+    
+    def on_stats_loaded(self, data):
+        """Afficher les statistiques chargées"""
+        start_date, end_date = data['start_date'], data['end_date']
+        sessions = data['sessions']
         
         # Calculs de base
         total = len(sessions)
@@ -354,12 +382,12 @@ class PlanningStatsWidget(QWidget):
         self.update_card_value(self.card_utilization, f"{utilization}%")
         
         # Charger sections du bas
-        self.load_instructors(sessions)
+        self.load_instructors(sessions, data['instructor_names'])
         self.load_types(sessions)
-        self.load_vehicles(sessions)
+        self.load_vehicles(sessions, data['vehicle_names'])
         self.load_performance(sessions, start_date, end_date)
     
-    def load_instructors(self, sessions):
+    def load_instructors(self, sessions, instructor_names):
         """Charger top moniteurs"""
         # Nettoyer
         while self.instructors_layout.count():
@@ -376,11 +404,10 @@ class PlanningStatsWidget(QWidget):
         
         # Top 5
         sorted_inst = sorted(instructor_hours.items(), key=lambda x: x[1], reverse=True)[:5]
-        all_inst = {i.id: i for i in InstructorController.get_all_instructors()}
         
         for i, (inst_id, hours) in enumerate(sorted_inst):
-            inst = all_inst.get(inst_id)
-            if not inst:
+            inst_name = instructor_names.get(inst_id)
+            if not inst_name:
                 continue
             
             # Créer un conteneur pour éviter le chevauchement
@@ -394,7 +421,7 @@ class PlanningStatsWidget(QWidget):
             rank.setStyleSheet("color: #f39c12; font-weight: bold;")
             row.addWidget(rank)
             
-            name = QLabel(inst.full_name[:22])
+            name = QLabel(inst_name[:22])
             name.setWordWrap(False)
             name.setStyleSheet("color: #2c3e50; font-size: 11px;")
             row.addWidget(name, stretch=1)
@@ -466,7 +493,7 @@ class PlanningStatsWidget(QWidget):
             no_data.setStyleSheet("color: #95a5a6; font-style: italic;")
             self.types_layout.addWidget(no_data)
     
-    def load_vehicles(self, sessions):
+    def load_vehicles(self, sessions, vehicle_names):
         """Charger top véhicules"""
         # Nettoyer
         while self.vehicles_layout.count():
@@ -483,11 +510,10 @@ class PlanningStatsWidget(QWidget):
         
         # Top 5
         sorted_veh = sorted(vehicle_hours.items(), key=lambda x: x[1], reverse=True)[:5]
-        all_veh = {v.id: v for v in VehicleController.get_all_vehicles()}
         
         for i, (veh_id, hours) in enumerate(sorted_veh):
-            veh = all_veh.get(veh_id)
-            if not veh:
+            vehicle_name = vehicle_names.get(veh_id)
+            if not vehicle_name:
                 continue
             
             # Créer un conteneur pour éviter le chevauchement
@@ -502,7 +528,6 @@ class PlanningStatsWidget(QWidget):
             row.addWidget(rank)
             
             # Limiter longueur du nom
-            vehicle_name = f"{veh.make} {veh.model}"
             if len(vehicle_name) > 18:
                 vehicle_name = vehicle_name[:18] + "..."
             
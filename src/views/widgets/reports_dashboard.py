@@ -25,13 +25,13 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
 
-from src.controllers.student_controller import StudentController
-from src.controllers.session_controller import SessionController
-from src.controllers.payment_controller import PaymentController
-from src.controllers.exam_controller import ExamController
 from src.controllers.instructor_controller import InstructorController
 from src.controllers.vehicle_controller import VehicleController
-from src.models import StudentStatus, SessionStatus, ExamResult, ExamType
+from src.models import (
+    StudentStatus, SessionStatus, ExamResult, ExamType, PaymentMethod,
+    session_status_column, revenue_column, exams_column
+)
+from src.views.widgets.data_loader import DataLoader
 
 
 class MplCanvas(FigureCanvasQTAgg):
@@ -50,6 +50,11 @@ class ReportsDashboard(QWidget):
     def __init__(self):
         super().__init__()
         self.current_period = 'month'  # Par défaut: ce mois
+        
+        # Chargement des données hors du thread GUI
+        self.data_loader = DataLoader(self)
+        self.data_loader.loaded.connect(self.on_reports_loaded)
+        
         self.setup_ui()
         self.load_reports()
     
@@ -363,66 +368,140 @@ class ReportsDashboard(QWidget):
         return today, today
     
     def load_reports(self):
-        """Charger tous les rapports et graphiques"""
-        # Nettoyer KPIs
-        while self.kpis_layout.count():
-            item = self.kpis_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        # Charger les données
+        """Charger tous les rapports et graphiques en arrière-plan"""
         start_date, end_date = self.get_date_range()
+        self.data_loader.load(self.fetch_report_data, start_date, end_date)
+    
+    @staticmethod
+    def fetch_report_data(start_date, end_date):
+        """
+        Calculer les données des rapports (exécuté dans un thread worker)
         
-        students = StudentController.get_all_students()
-        sessions = SessionController.get_all_sessions()
+        Returns:
+            Dict de valeurs simples (compteurs, séries) prêtes pour le rendu
+        """
+        from sqlalchemy import func
+        from src.models import Student, session_scope, rollup_rows, rollup_totals
         
-        # Filtrer sessions par période
-        sessions_period = [
-            s for s in sessions
-            if start_date <= s.start_datetime.date() <= end_date
+        today = date.today()
+        first_month = date(today.year, today.month, 1)
+        for _ in range(5):
+            first_month = (first_month - timedelta(days=1)).replace(day=1)
+        
+        with session_scope() as session:
+            # Répartition des élèves par statut (GROUP BY)
+            status_counts = {
+                status.value: count
+                for status, count in session.query(Student.status, func.count(Student.id)).group_by(Student.status)
+            }
+            
+            # Séances, revenus et examens : agrégats journaliers (daily_rollups)
+            totals = rollup_totals(session, start_date, end_date)
+            recent_rows = rollup_rows(session, min(first_month, today - timedelta(days=6)), today)
+        
+        # Séances de la période
+        total_sessions = sum(totals[session_status_column(status)] for status in SessionStatus)
+        completed_sessions = totals[session_status_column(SessionStatus.COMPLETED)]
+        
+        # Revenus période (paiements non annulés)
+        total_revenue = sum(totals[revenue_column(method)] for method in PaymentMethod) / 100
+        
+        # Examens de la période, par résultat (tous types confondus)
+        result_counts = {
+            result.value: sum(totals[exams_column(exam_type, result)] for exam_type in ExamType)
+            for result in ExamResult
+        }
+        
+        sessions_by_day = defaultdict(int)
+        revenue_by_month = defaultdict(int)
+        for row in recent_rows:
+            sessions_by_day[row.day] += sum(row._mapping[session_status_column(status)] for status in SessionStatus)
+            revenue_by_month[(row.day.year, row.day.month)] += sum(
+                row._mapping[revenue_column(method)] for method in PaymentMethod
+            )
+        
+        # Activité des 7 derniers jours
+        session_days = []
+        session_counts = []
+        for i in range(7):
+            day = today - timedelta(days=6 - i)
+            session_days.append(day.strftime('%d/%m'))
+            session_counts.append(sessions_by_day[day])
+        
+        # Revenus des 6 derniers mois
+        revenue_months = []
+        revenue_values = []
+        month = first_month
+        for _ in range(6):
+            revenue_months.append(month.strftime('%m/%Y'))
+            revenue_values.append(revenue_by_month[(month.year, month.month)] / 100)  # float pour matplotlib
+            month = (month + timedelta(days=31)).replace(day=1)
+        
+        # Top 5 moniteurs (heures enseignées) et véhicules (heures d'utilisation)
+        instructors = InstructorController.get_all_instructors()
+        top_instructors = [
+            (i.full_name, i.total_hours_taught or 0)
+            for i in sorted(instructors, key=lambda x: x.total_hours_taught or 0, reverse=True)[:5]
+        ]
+        vehicles = VehicleController.get_all_vehicles()
+        top_vehicles = [
+            (f"{v.plate_number}\n{v.make}", v.total_hours_used or 0)
+            for v in sorted(vehicles, key=lambda x: x.total_hours_used or 0, reverse=True)[:5]
         ]
         
-        # KPIs
-        total_students = len(students)
-        active_students = len([s for s in students if s.status == StudentStatus.ACTIVE])
-        total_sessions = len(sessions_period)
-        completed_sessions = len([s for s in sessions_period if s.status == SessionStatus.COMPLETED])
+        passed_exams = result_counts.get(ExamResult.PASSED.value, 0)
+        
+        return {
+            'total_students': sum(status_counts.values()),
+            'active_students': status_counts.get(StudentStatus.ACTIVE.value, 0),
+            'student_status_counts': status_counts,
+            'total_sessions': total_sessions,
+            'completed_sessions': completed_sessions,
+            'total_revenue': total_revenue,
+            'passed_exams': passed_exams,
+            'completed_exams': passed_exams + result_counts.get(ExamResult.FAILED.value, 0),
+            'exam_result_counts': {result: count for result, count in result_counts.items() if count},
+            'session_days': session_days,
+            'session_counts': session_counts,
+            'revenue_months': revenue_months,
+            'revenue_values': revenue_values,
+            'top_instructors': top_instructors,
+            'top_vehicles': top_vehicles,
+        }
+    
+    def on_reports_loaded(self, data):
+        """Afficher les rapports à partir des données chargées"""
+        # Nettoyer KPIs
+        while self.kpis_layout.count():
+            item = self.kpis_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
         
         # Créer les KPIs
         self.kpis_layout.addWidget(
             self.create_kpi_card(
                 "Élèves Actifs",
-                active_students,
+                data['active_students'],
                 "👥",
                 "#2196F3",
-                f"sur {total_students} total"
+                f"sur {data['total_students']} total"
             )
         )
         
         self.kpis_layout.addWidget(
             self.create_kpi_card(
                 "Sessions Terminées",
-                completed_sessions,
+                data['completed_sessions'],
                 "✅",
                 "#4CAF50",
-                f"sur {total_sessions} total"
+                f"sur {data['total_sessions']} total"
             )
         )
         
-        # Revenus période
-        from src.models import Payment, get_session
-        session_db = get_session()
-        payments = session_db.query(Payment).all()
-        payments_period = [
-            p for p in payments
-            if p.payment_date and start_date <= p.payment_date <= end_date
-        ]
-        total_revenue = sum(p.amount for p in payments_period)
-        
         self.kpis_layout.addWidget(
             self.create_kpi_card(
                 "Revenus Période",
-                f"{total_revenue:,.0f}",
+                f"{data['total_revenue']:,.0f}",
                 "💰",
                 "#FF9800",
                 "DH"
@@ -430,13 +509,8 @@ class ReportsDashboard(QWidget):
         )
         
         # Taux de réussite examens
-        exams = ExamController.get_all_exams()
-        exams_period = [
-            e for e in exams
-            if start_date <= e.scheduled_date <= end_date
-        ]
-        passed_exams = len([e for e in exams_period if e.result == ExamResult.PASSED])
-        completed_exams = len([e for e in exams_period if e.result in [ExamResult.PASSED, ExamResult.FAILED]])
+        passed_exams = data['passed_exams']
+        completed_exams = data['completed_exams']
         success_rate = (passed_exams / completed_exams * 100) if completed_exams > 0 else 0
         
         self.kpis_layout.addWidget(
@@ -450,28 +524,24 @@ class ReportsDashboard(QWidget):
         )
         
         # Charger les graphiques
-        self.load_students_chart()
-        self.load_sessions_chart()
-        self.load_revenue_chart()
-        self.load_exams_chart()
-        self.load_instructors_chart()
-        self.load_vehicles_chart()
+        self.load_students_chart(data['student_status_counts'])
+        self.load_sessions_chart(data['session_days'], data['session_counts'])
+        self.load_revenue_chart(data['revenue_months'], data['revenue_values'])
+        self.load_exams_chart(data['exam_result_counts'])
+        self.load_instructors_chart(data['top_instructors'])
+        self.load_vehicles_chart(data['top_vehicles'])
     
-    def load_students_chart(self):
-        """Graphique: Distribution élèves par statut"""
-        # Nettoyer
-        for i in reversed(range(self.students_chart_frame.chart_layout.count())):
-            if i > 1:  # Garder titre et séparateur
-                widget = self.students_chart_frame.chart_layout.itemAt(i).widget()
+    def clear_chart_frame(self, chart_frame):
+        """Supprimer le graphique d'un cadre (garder titre et séparateur)"""
+        for i in reversed(range(chart_frame.chart_layout.count())):
+            if i > 1:
+                widget = chart_frame.chart_layout.itemAt(i).widget()
                 if widget:
                     widget.deleteLater()
-        
-        students = StudentController.get_all_students()
-        
-        # Compter par statut
-        status_counts = defaultdict(int)
-        for student in students:
-            status_counts[student.status.value] += 1
+    
+    def load_students_chart(self, status_counts):
+        """Graphique: Distribution élèves par statut"""
+        self.clear_chart_frame(self.students_chart_frame)
         
         if not status_counts:
             return
@@ -488,25 +558,9 @@ class ReportsDashboard(QWidget):
         
         self.students_chart_frame.chart_layout.addWidget(canvas)
     
-    def load_sessions_chart(self):
+    def load_sessions_chart(self, days, counts):
         """Graphique: Évolution sessions 7 derniers jours"""
-        # Nettoyer
-        for i in reversed(range(self.sessions_chart_frame.chart_layout.count())):
-            if i > 1:
-                widget = self.sessions_chart_frame.chart_layout.itemAt(i).widget()
-                if widget:
-                    widget.deleteLater()
-        
-        # Données 7 jours
-        days = []
-        counts = []
-        today = date.today()
-        
-        for i in range(7):
-            day = today - timedelta(days=6 - i)
-            sessions = SessionController.get_sessions_by_date_range(day, day)
-            days.append(day.strftime('%d/%m'))
-            counts.append(len(sessions))
+        self.clear_chart_frame(self.sessions_chart_frame)
         
         # Créer graphique
         canvas = MplCanvas(self, width=5, height=3.5)
@@ -520,60 +574,15 @@ class ReportsDashboard(QWidget):
         
         self.sessions_chart_frame.chart_layout.addWidget(canvas)
     
-    def load_revenue_chart(self):
+    def load_revenue_chart(self, months, revenues):
         """Graphique: Évolution revenus 6 derniers mois"""
-        # Nettoyer
-        for i in reversed(range(self.revenue_chart_frame.chart_layout.count())):
-            if i > 1:
-                widget = self.revenue_chart_frame.chart_layout.itemAt(i).widget()
-                if widget:
-                    widget.deleteLater()
-        
-        # Données 6 mois
-        months = []
-        revenues = []
-        today = date.today()
-        
-        from src.models import Payment, get_session
-        session_db = get_session()
-        
-        for i in range(6):
-            # Calculer le mois
-            month_offset = 5 - i
-            target_month = today.month - month_offset
-            target_year = today.year
-            
-            while target_month < 1:
-                target_month += 12
-                target_year -= 1
-            
-            # Début et fin du mois
-            start = date(target_year, target_month, 1)
-            if target_month == 12:
-                end = date(target_year, 12, 31)
-            else:
-                next_month = date(target_year, target_month + 1, 1)
-                end = next_month - timedelta(days=1)
-            
-            # Calculer revenus
-            payments = session_db.query(Payment).filter(
-                Payment.payment_date >= start,
-                Payment.payment_date <= end
-            ).all()
-            
-            total = sum(p.amount for p in payments)
-            
-            months.append(start.strftime('%m/%Y'))
-            revenues.append(float(total))  # Convertir en float pour matplotlib
+        self.clear_chart_frame(self.revenue_chart_frame)
         
         # Créer graphique
         canvas = MplCanvas(self, width=5, height=3.5)
         
-        # Convertir revenues en list de floats pour éviter l'erreur matplotlib
-        revenues_float = [float(r) for r in revenues]
-        
-        canvas.axes.plot(months, revenues_float, marker='o', color='#FF9800', linewidth=2, markersize=6)
-        canvas.axes.fill_between(range(len(months)), revenues_float, alpha=0.3, color='#FF9800')
+        canvas.axes.plot(months, revenues, marker='o', color='#FF9800', linewidth=2, markersize=6)
+        canvas.axes.fill_between(range(len(months)), revenues, alpha=0.3, color='#FF9800')
         canvas.axes.set_xlabel('Mois', fontsize=9)
         canvas.axes.set_ylabel('Revenus (DH)', fontsize=9)
         canvas.axes.set_title('Évolution mensuelle', fontsize=10, pad=10)
@@ -582,23 +591,9 @@ class ReportsDashboard(QWidget):
         
         self.revenue_chart_frame.chart_layout.addWidget(canvas)
     
-    def load_exams_chart(self):
+    def load_exams_chart(self, result_counts):
         """Graphique: Résultats examens"""
-        # Nettoyer
-        for i in reversed(range(self.exams_chart_frame.chart_layout.count())):
-            if i > 1:
-                widget = self.exams_chart_frame.chart_layout.itemAt(i).widget()
-                if widget:
-                    widget.deleteLater()
-        
-        start_date, end_date = self.get_date_range()
-        exams = ExamController.get_all_exams()
-        exams_period = [e for e in exams if start_date <= e.scheduled_date <= end_date]
-        
-        # Compter par résultat
-        result_counts = defaultdict(int)
-        for exam in exams_period:
-            result_counts[exam.result.value] += 1
+        self.clear_chart_frame(self.exams_chart_frame)
         
         if not result_counts:
             return
@@ -626,28 +621,18 @@ class ReportsDashboard(QWidget):
         
         self.exams_chart_frame.chart_layout.addWidget(canvas)
     
-    def load_instructors_chart(self):
+    def load_instructors_chart(self, top_instructors):
         """Graphique: Top 5 moniteurs"""
-        # Nettoyer
-        for i in reversed(range(self.instructors_chart_frame.chart_layout.count())):
-            if i > 1:
-                widget = self.instructors_chart_frame.chart_layout.itemAt(i).widget()
-                if widget:
-                    widget.deleteLater()
-        
-        instructors = InstructorController.get_all_instructors()
+        self.clear_chart_frame(self.instructors_chart_frame)
         
-        # Trier par heures
-        top_5 = sorted(instructors, key=lambda x: x.total_hours_taught or 0, reverse=True)[:5]
-        
-        if not top_5:
+        if not top_instructors:
             return
         
         # Créer graphique
         canvas = MplCanvas(self, width=5, height=3.5)
         
-        names = [i.full_name[:15] + '...' if len(i.full_name) > 15 else i.full_name for i in top_5]
-        hours = [i.total_hours_taught or 0 for i in top_5]
+        names = [name[:15] + '...' if len(name) > 15 else name for name, _ in top_instructors]
+        hours = [hours for _, hours in top_instructors]
         
         canvas.axes.barh(names, hours, color='#4CAF50', alpha=0.7)
         canvas.axes.set_xlabel('Heures enseignées', fontsize=9)
@@ -657,28 +642,18 @@ class ReportsDashboard(QWidget):
         
         self.instructors_chart_frame.chart_layout.addWidget(canvas)
     
-    def load_vehicles_chart(self):
+    def load_vehicles_chart(self, top_vehicles):
         """Graphique: Top 5 véhicules"""
-        # Nettoyer
-        for i in reversed(range(self.vehicles_chart_frame.chart_layout.count())):
-            if i > 1:
-                widget = self.vehicles_chart_frame.chart_layout.itemAt(i).widget()
-                if widget:
-                    widget.deleteLater()
-        
-        vehicles = VehicleController.get_all_vehicles()
-        
-        # Trier par utilisation
-        top_5 = sorted(vehicles, key=lambda x: x.total_hours_used or 0, reverse=True)[:5]
+        self.clear_chart_frame(self.vehicles_chart_frame)
         
-        if not top_5:
+        if not top_vehicles:
             return
         
         # Créer graphique
         canvas = MplCanvas(self, width=5, height=3.5)
         
-        names = [f"{v.plate_number}\n{v.make}" for v in top_5]
-        hours = [v.total_hours_used or 0 for v in top_5]
+        names = [label for label, _ in top_vehicles]
+        hours = [hours for _, hours in top_vehicles]
         
         canvas.axes.barh(names, hours, color='#2196F3', alpha=0.7)
         canvas.axes.set_xlabel('Heures d\'utilisation', fontsize=9)
@@ -363,10 +363,10 @@ class ReportsSimpleWidget(QWidget):
         active = len([s for s in students if s.status == StudentStatus.ACTIVE])
         completed = len([s for s in sessions if s.status == SessionStatus.COMPLETED])
         
-        from src.models import Payment, get_session
-        db = get_session()
-        payments = [p for p in db.query(Payment).all() if p.payment_date and start_date <= p.payment_date <= end_date]
-        revenue = sum(p.amount for p in payments)
+        from src.models import Payment, session_scope
+        with session_scope() as db:
+            payments = [p for p in db.query(Payment).all() if p.payment_date and start_date <= p.payment_date <= end_date]
+            revenue = sum(p.amount for p in payments)
         
         exams = [e for e in ExamController.get_all_exams() if start_date <= e.scheduled_date <= end_date]
         passed = len([e for e in exams if e.result == ExamResult.PASSED])
@@ -430,31 +430,31 @@ class ReportsSimpleWidget(QWidget):
             if item.widget():
                 item.widget().deleteLater()
         
-        from src.models import Payment, get_session
-        db = get_session()
+        from src.models import Payment, session_scope
         today = date.today()
         
-        for i in range(6):
-            month_offset = 5 - i
-            target_month = today.month - month_offset
-            target_year = today.year
-            while target_month < 1:
-                target_month += 12
-                target_year -= 1
-            
-            start = date(target_year, target_month, 1)
-            if target_month == 12:
-                end = date(target_year, 12, 31)
-            else:
-                end = date(target_year, target_month + 1, 1) - timedelta(days=1)
-            
-            payments = db.query(Payment).filter(Payment.payment_date >= start, Payment.payment_date <= end).all()
-            total = sum(p.amount for p in payments)
-            
-            label = QLabel(f"• {start.strftime('%m/%Y')}: {total:,.0f} DH")
-            label.setFont(QFont("Segoe UI", 10))
-            label.setStyleSheet("color: #333; border: none; padding: 5px;")
-            self.revenue_frame.content_layout.addWidget(label)
+        with session_scope() as db:
+            for i in range(6):
+                month_offset = 5 - i
+                target_month = today.month - month_offset
+                target_year = today.year
+                while target_month < 1:
+                    target_month += 12
+                    target_year -= 1
+                
+                start = date(target_year, target_month, 1)
+                if target_month == 12:
+                    end = date(target_year, 12, 31)
+                else:
+                    end = date(target_year, target_month + 1, 1) - timedelta(days=1)
+                
+                payments = db.query(Payment).filter(Payment.payment_date >= start, Payment.payment_date <= end).all()
+                total = sum(p.amount for p in payments)
+                
+                label = QLabel(f"• {start.strftime('%m/%Y')}: {total:,.0f} DH")
+                label.setFont(QFont("Segoe UI", 10))
+                label.setStyleSheet("color: #333; border: none; padding: 5px;")
+                self.revenue_frame.content_layout.addWidget(label)
         
         self.revenue_frame.content_layout.addStretch()
     
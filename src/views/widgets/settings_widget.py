@@ -18,9 +18,34 @@ from pathlib import Path
 from datetime import datetime
 
 from src.utils.auth import has_permission
+from src.utils.backup import BackupManager, RETENTION_DEFAULTS
 from .user_management import UserManagementWidget
 
 
+class BackupWorker(QThread):
+    """Sauvegarde en ligne dans un thread (l'interface reste réactive)"""
+    progress = Signal(int, int)  # pages copiées, total
+    finished_backup = Signal(bool, str)  # succès, chemin ou erreur
+    
+    def __init__(self, backup_name=None, incremental=True, retention=None, parent=None):
+        super().__init__(parent)
+        self.backup_name = backup_name
+        self.incremental = incremental
+        self.retention = retention  # Rétention GFS appliquée après la sauvegarde
+    
+    def run(self):
+        from src.config import DATABASE_PATH
+        from src.utils.config_manager import get_config_manager
+        
+        manager = BackupManager(str(DATABASE_PATH), get_config_manager().get_backup_path())
+        success, result = manager.create_backup(
+            self.backup_name, incremental=self.incremental, progress=self.progress.emit
+        )
+        if success and self.retention:
+            manager.apply_retention(**self.retention, label=self.backup_name)
+        self.finished_backup.emit(success, result)
+
+
 class SettingsWidget(QWidget):
     """Widget principal des paramètres avec onglets"""
     
@@ -31,6 +56,7 @@ class SettingsWidget(QWidget):
         self.config_path = Path("config.json")
         self.config = self.load_config()
         self.backup_timer = None
+        self.backup_worker = None
         self.init_ui()
         self.init_auto_backup()
         
@@ -476,12 +502,53 @@ class SettingsWidget(QWidget):
         self.input_backup_interval.setEnabled(self.check_backup_interval.isChecked())
         self.input_backup_interval.setStyleSheet(input_style)
         
+        # Rétention GFS des sauvegardes automatiques (série auto_backup)
+        retention = {**RETENTION_DEFAULTS, **self.config.get('database', {}).get('retention', {})}
+        retention_layout = QHBoxLayout()
+        self.input_retention_hourly = QSpinBox()
+        self.input_retention_hourly.setRange(0, 168)
+        self.input_retention_hourly.setSuffix(" heures")
+        self.input_retention_hourly.setValue(retention['hourly'])
+        self.input_retention_daily = QSpinBox()
+        self.input_retention_daily.setRange(1, 365)
+        self.input_retention_daily.setSuffix(" jours")
+        self.input_retention_daily.setValue(retention['daily'])
+        self.input_retention_weekly = QSpinBox()
+        self.input_retention_weekly.setRange(0, 104)
+        self.input_retention_weekly.setSuffix(" semaines")
+        self.input_retention_weekly.setValue(retention['weekly'])
+        self.input_retention_monthly = QSpinBox()
+        self.input_retention_monthly.setRange(0, 120)
+        self.input_retention_monthly.setSuffix(" mois")
+        self.input_retention_monthly.setValue(retention['monthly'])
+        for spin in (self.input_retention_hourly, self.input_retention_daily, self.input_retention_weekly, self.input_retention_monthly):
+            spin.setStyleSheet(input_style)
+            retention_layout.addWidget(spin)
+        
         form_backup.addRow("", self.check_backup_start)
         form_backup.addRow("", self.check_backup_interval)
         form_backup.addRow("Intervalle:", self.input_backup_interval)
+        form_backup.addRow("Conserver:", retention_layout)
         
         layout.addWidget(group_backup)
         
+        # Groupe: Sauvegardes existantes (lues dans le catalogue)
+        group_list = QGroupBox("🗂️ Sauvegardes")
+        group_list.setStyleSheet(group_db.styleSheet())
+        list_layout = QVBoxLayout(group_list)
+        list_layout.setContentsMargins(15, 20, 15, 15)
+        
+        self.backups_table = QTableWidget(0, 6)
+        self.backups_table.setHorizontalHeaderLabels(["Date", "Type", "Taille", "Lignes", "Schéma", "Empreinte"])
+        self.backups_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.backups_table.verticalHeader().setVisible(False)
+        self.backups_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.backups_table.setMinimumHeight(180)
+        list_layout.addWidget(self.backups_table)
+        self.refresh_backup_list()
+        
+        layout.addWidget(group_list)
+        
         # Info box
         info = QLabel("💡 Les backups sont sauvegardés dans le dossier 'backups/' avec horodatage automatique.")
         info.setStyleSheet("""
@@ -803,27 +870,52 @@ class SettingsWidget(QWidget):
         self.backup_timer.timeout.connect(self.silent_backup)
         self.backup_timer.start(interval_minutes * 60 * 1000)  # Convertir en millisecondes
     
+    def refresh_backup_list(self):
+        """Afficher les sauvegardes du catalogue (sans parcourir le répertoire)"""
+        from src.config import DATABASE_PATH
+        from src.utils.config_manager import get_config_manager
+        
+        kinds = {'manifest': "Incrémentale", 'zip': "ZIP", 'db': "Copie"}
+        backups = BackupManager(str(DATABASE_PATH), get_config_manager().get_backup_path()).list_backups()
+        self.backups_table.setRowCount(len(backups))
+        for row, backup in enumerate(backups):
+            values = [
+                backup['created'].strftime("%d/%m/%Y %H:%M"),
+                kinds.get(backup['kind'], backup['kind']),
+                f"{backup['size_mb']:.2f} Mo",
+                f"{backup['total_rows']:,}".replace(',', ' ') if backup.get('row_counts') else "—",
+                backup.get('schema_version') or "—",
+                (backup.get('db_sha256') or "—")[:12],
+            ]
+            for column, value in enumerate(values):
+                self.backups_table.setItem(row, column, QTableWidgetItem(value))
+    
+    def _retention_settings(self):
+        return {
+            'hourly': self.input_retention_hourly.value(),
+            'daily': self.input_retention_daily.value(),
+            'weekly': self.input_retention_weekly.value(),
+            'monthly': self.input_retention_monthly.value(),
+        }
+    
     def silent_backup(self):
-        """Crée un backup silencieux (sans messages)"""
-        try:
-            from src.utils.config_manager import get_config_manager
-            config_mgr = get_config_manager()
-            
-            from src.config import DATABASE_PATH
-            db_path = Path(DATABASE_PATH)
-            if not db_path.exists():
-                return
-            
-            backup_dir = Path(config_mgr.get_backup_path())
-            backup_dir.mkdir(exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = backup_dir / f"auto_backup_{timestamp}.db"
-            
-            shutil.copy(db_path, backup_path)
-            print(f"✅ Backup automatique créé: {backup_path}")
-        except Exception as e:
-            print(f"❌ Erreur backup automatique: {e}")
+        """Crée un backup silencieux (sans messages), incrémental et en arrière-plan"""
+        from src.config import DATABASE_PATH
+        if not Path(DATABASE_PATH).exists():
+            return
+        if self.backup_worker and self.backup_worker.isRunning():
+            return  # Sauvegarde précédente encore en cours
+        
+        self.backup_worker = BackupWorker(
+            "auto_backup", incremental=True, retention=self._retention_settings(), parent=self
+        )
+        self.backup_worker.finished_backup.connect(
+            lambda success, result: print(
+                f"✅ Backup automatique créé: {result}" if success else f"❌ Erreur backup automatique: {result}"
+            )
+        )
+        self.backup_worker.finished_backup.connect(self.refresh_backup_list)
+        self.backup_worker.start()
     
     def save_all_settings(self):
         """Sauvegarde tous les paramètres"""
@@ -851,6 +943,7 @@ class SettingsWidget(QWidget):
             self.config['database']['backup_on_start'] = self.check_backup_start.isChecked()
             self.config['database']['auto_backup_enabled'] = self.check_backup_interval.isChecked()
             self.config['database']['auto_backup_interval'] = self.input_backup_interval.value()
+            self.config['database']['retention'] = self._retention_settings()
             
             # Sauvegarder
             success = self.save_config()
@@ -867,30 +960,37 @@ class SettingsWidget(QWidget):
     
     def create_backup(self):
         """Crée une sauvegarde de la base de données"""
-        try:
-            from src.utils.config_manager import get_config_manager
-            config_mgr = get_config_manager()
-            
-            from src.config import DATABASE_PATH
-            db_path = Path(DATABASE_PATH)
-            if not db_path.exists():
-                QMessageBox.warning(self, "Attention", "❌ Base de données introuvable!")
-                return
-            
-            backup_dir = Path(config_mgr.get_backup_path())
-            backup_dir.mkdir(exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = backup_dir / f"backup_{timestamp}.db"
-            
-            shutil.copy(db_path, backup_path)
-            
-            QMessageBox.information(self, "Succès", f"✅ Sauvegarde créée:\n{backup_path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", f"❌ Erreur lors de la sauvegarde: {e}")
+        from src.config import DATABASE_PATH
+        if not Path(DATABASE_PATH).exists():
+            QMessageBox.warning(self, "Attention", "❌ Base de données introuvable!")
+            return
+        if self.backup_worker and self.backup_worker.isRunning():
+            QMessageBox.information(self, "Sauvegarde", "Une sauvegarde est déjà en cours.")
+            return
+        
+        dialog = QProgressDialog("Sauvegarde en cours...", None, 0, 100, self)
+        dialog.setWindowTitle("Sauvegarde")
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(500)
+        
+        def on_progress(done, total):
+            dialog.setValue(int(done * 100 / total) if total else 100)
+        
+        def on_finished(success, result):
+            dialog.close()
+            self.refresh_backup_list()
+            if success:
+                QMessageBox.information(self, "Succès", f"✅ Sauvegarde créée:\n{result}")
+            else:
+                QMessageBox.critical(self, "Erreur", f"❌ Erreur lors de la sauvegarde: {result}")
+        
+        self.backup_worker = BackupWorker("backup", incremental=True, parent=self)
+        self.backup_worker.progress.connect(on_progress)
+        self.backup_worker.finished_backup.connect(on_finished)
+        self.backup_worker.start()
     
     def restore_backup(self):
-        """Restaure une sauvegarde"""
+        """Restaure une sauvegarde (intégrité vérifiée avant remplacement)"""
         from src.utils.config_manager import get_config_manager
         config_mgr = get_config_manager()
         
@@ -898,7 +998,7 @@ class SettingsWidget(QWidget):
             self,
             "Choisir une sauvegarde à restaurer",
             config_mgr.get_backup_path(),
-            "Base de données (*.db)"
+            "Sauvegardes (*.manifest *.zip *.db)"
         )
         
         if file_path:
@@ -910,18 +1010,24 @@ class SettingsWidget(QWidget):
             )
             
             if reply == QMessageBox.Yes:
+                from src.config import DATABASE_PATH
+                manager = BackupManager(str(DATABASE_PATH), config_mgr.get_backup_path())
+                
+                QApplication.setOverrideCursor(Qt.WaitCursor)
                 try:
-                    from src.config import DATABASE_PATH
-                    db_path = Path(DATABASE_PATH)
-                    shutil.copy(file_path, db_path)
-                    
+                    success, message = manager.restore_backup(file_path)
+                finally:
+                    QApplication.restoreOverrideCursor()
+                self.refresh_backup_list()
+                
+                if success:
                     QMessageBox.information(
                         self,
                         "Succès",
                         "✅ Restauration effectuée avec succès!\n\n⚠️ Veuillez redémarrer l'application."
                     )
-                except Exception as e:
-                    QMessageBox.critical(self, "Erreur", f"❌ Erreur lors de la restauration: {e}")
+                else:
+                    QMessageBox.critical(self, "Erreur", f"❌ Erreur lors de la restauration: {message}")
     
     def open_backup_folder(self):
         """Ouvre le dossier des sauvegardes"""
@@ -941,7 +1047,7 @@ class SettingsWidget(QWidget):
     def export_all_data(self):
         """Exporte toutes les données en CSV"""
         try:
-            from src.models import get_session, Student, Instructor, Vehicle, Session, Payment, Exam
+            from src.models import session_scope, Student, Instructor, Vehicle, Session, Payment, Exam
             from src.utils.export import ExportManager
             
             reply = QMessageBox.question(
@@ -961,7 +1067,6 @@ class SettingsWidget(QWidget):
                 export_dir.mkdir(parents=True, exist_ok=True)
                 
                 exporter = ExportManager()
-                session = get_session()
                 
                 # Export de chaque entité
                 entities = [
@@ -974,12 +1079,13 @@ class SettingsWidget(QWidget):
                 ]
                 
                 exported_files = []
-                for name, model in entities:
-                    data = session.query(model).all()
-                    if data:
-                        success, filepath = exporter.export_to_csv(data, name)
-                        if success:
-                            exported_files.append(name)
+                with session_scope() as session:
+                    for name, model in entities:
+                        data = session.query(model).all()
+                        if data:
+                            success, filepath = exporter.export_to_csv(data, name)
+                            if success:
+                                exported_files.append(name)
                 
                 QMessageBox.information(
                     self,
@@ -1001,9 +1107,9 @@ class SettingsWidget(QWidget):
         )
         
         if reply == QMessageBox.Yes:
+            from src.models import get_session
+            session = get_session()
             try:
-                from src.models import get_session
-                
                 # Afficher progression
                 progress = QMessageBox(self)
                 progress.setWindowTitle("Optimisation en cours...")
@@ -1013,7 +1119,6 @@ class SettingsWidget(QWidget):
                 QApplication.processEvents()
                 
                 # Exécuter VACUUM et ANALYZE
-                session = get_session()
                 engine = session.get_bind()
                 
                 # VACUUM pour compacter et défragmenter
@@ -1038,6 +1143,8 @@ class SettingsWidget(QWidget):
                     "❌ Erreur",
                     f"Erreur lors de l'optimisation:\n{str(e)}"
                 )
+            finally:
+                session.close()
     
     def sync_all_statuses(self):
         """Synchroniser tous les statuts de l'application"""
@@ -49,18 +49,12 @@ class StudentDetailViewDialog(QDialog):
             from src.models import get_session, Student
             from decimal import Decimal
             
-            # Get current session and commit any pending changes
+            # Fresh session: the query hits the database, not a cached object
             session = get_session()
             try:
-                session.commit()  # Commit any pending changes first
-            except:
-                session.rollback()
-            
-            # Expire all and force fresh query
-            session.expire_all()
-            
-            # Query directly - this will hit the database, not cache
-            self.student = session.query(Student).filter(Student.id == student.id).first()
+                self.student = session.query(Student).filter(Student.id == student.id).first()
+            finally:
+                session.close()
             
             if self.student:
                 # Force recalculate balance from DB values to ensure accuracy
@@ -3,15 +3,13 @@ Widget de gestion des élèves avec fonctionnalités complètes
 """
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView,
     QPushButton, QLineEdit, QComboBox, QHeaderView, QMessageBox, QDialog,
     QFormLayout, QDateEdit, QTextEdit, QSpinBox, QDoubleSpinBox, QGroupBox,
     QTabWidget, QListWidget, QFileDialog
 )
 from PySide6.QtCore import Qt, QDate
-from PySide6.QtGui import QFont, QColor
 from datetime import datetime
-from functools import partial
 
 from src.controllers.student_controller import StudentController
 from src.controllers.payment_controller import PaymentController
@@ -20,6 +18,9 @@ from src.models import StudentStatus
 from src.utils import export_to_csv, get_pdf_generator
 from src.views.widgets.student_detail_view import StudentDetailViewDialog
 from src.views.widgets.csv_import_dialog import CSVImportDialog
+from src.views.widgets.table_models import (
+    ColumnarTableModel, RowFilterProxyModel, TableColumn, ActionButtonsDelegate, RowAction
+)
 
 # Types de permis disponibles
 LICENSE_TYPES = ['A', 'B', 'C', 'D', 'E']
@@ -262,8 +263,6 @@ class StudentsEnhancedWidget(QWidget):
     def __init__(self, user):
         super().__init__()
         self.user = user
-        self.students = []
-        self.filtered_students = []
         self.setup_ui()
         self.load_students()
     
@@ -456,35 +455,80 @@ class StudentsEnhancedWidget(QWidget):
         layout.addLayout(stats_layout)
     
     def create_table(self, layout):
-        """Créer le tableau"""
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Nom Complet", "CIN", "Téléphone", "Permis",
-            "Statut", "Heures", "Prochaine Séance", "Solde (DH)", "Actions"
-        ])
+        """Créer le tableau (model/view virtualisé)"""
+        status_icons = {
+            StudentStatus.ACTIVE: "🟢",
+            StudentStatus.PENDING: "🟡",
+            StudentStatus.SUSPENDED: "🔴",
+            StudentStatus.GRADUATED: "🎓",
+            StudentStatus.ABANDONED: "⚫"
+        }
+        status_colors = {
+            StudentStatus.ACTIVE: "#27ae60",
+            StudentStatus.PENDING: "#f39c12",
+            StudentStatus.SUSPENDED: "#e74c3c",
+            StudentStatus.GRADUATED: "#3498db",
+            StudentStatus.ABANDONED: "#95a5a6"
+        }
+        
+        # Lignes: (id, nom, CIN, téléphone, permis, statut, (heures faites, prévues), solde)
+        self.model = ColumnarTableModel([
+            TableColumn("ID", 0, sort_name='id'),
+            TableColumn("Nom Complet", 1, sort_name='name'),
+            TableColumn("CIN", 2, sort_name='cin'),
+            TableColumn("Téléphone", 3, sort_name='phone'),
+            TableColumn("Permis", 4, text=lambda lic: str(lic) if lic else "N/A", sort_name='license_type'),
+            TableColumn("Statut", 5,
+                        text=lambda st: f"{status_icons.get(st, '❓')} {st.value.capitalize()}" if st else "N/A",
+                        color=lambda st: status_colors.get(st, "#2c3e50"), bold=True, sort_name='status'),
+            TableColumn("Heures", 6, text=lambda hours: f"{hours[0]}/{hours[1]}", sort_name='hours'),
+            # Prochaine séance : pas encore calculée (placeholder)
+            TableColumn("Prochaine Séance", 0, text=lambda _: "—", color=lambda _: "#7f8c8d"),
+            TableColumn("Solde (DH)", 7, text=lambda b: "0.00" if b == 0 else f"{b:+,.2f}",
+                        color=lambda b: "#e74c3c" if b < 0 else "#27ae60", bold=True, sort_name='balance'),
+            TableColumn("Actions"),
+        ], self)
+        self.proxy = RowFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.horizontalHeader().setSortIndicator(0, Qt.DescendingOrder)
+        self.table.setSortingEnabled(True)
+        
+        # Actions dessinées dans la cellule (pas de widget par ligne)
+        self.actions_delegate = ActionButtonsDelegate([
+            RowAction('view', "👁️", "Voir détails"),
+            RowAction('edit', "✏️", "Modifier"),
+            RowAction('contract', "📄", "Générer contrat"),
+            RowAction('delete', "🗑️", "Supprimer", background="#e74c3c"),
+        ], self.table)
+        self.actions_delegate.triggered.connect(self.on_row_action)
+        self.table.setItemDelegateForColumn(9, self.actions_delegate)
         
         # Configuration
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.horizontalHeader().setStretchLastSection(False)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(9, QHeaderView.ResizeToContents)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.table.verticalHeader().setVisible(False)
         self.table.setMinimumHeight(400)
         
         # Style
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: 2px solid #ecf0f1;
                 border-radius: 8px;
                 gridline-color: #ecf0f1;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3498db;
                 color: white;
             }
@@ -500,169 +544,50 @@ class StudentsEnhancedWidget(QWidget):
         layout.addWidget(self.table)
     
     def load_students(self):
-        """Charger tous les élèves"""
-        self.students = StudentController.get_all_students()
-        self.filtered_students = self.students.copy()
+        """Charger la première page d'élèves (filtres conservés, pages suivantes au défilement)"""
+        self.model.set_page_source(
+            StudentController.list_page, self.current_filters(),
+            transform=lambda r: (r.id, r.full_name, r.cin, r.phone, r.license_type, r.status,
+                                 (r.hours_completed or 0, r.hours_planned or 0), float(r.balance or 0))
+        )
         self.update_stats()
-        self.populate_table()
+    
+    def current_filters(self) -> dict:
+        """Filtres de StudentController.list_page d'après la barre de filtres"""
+        return {
+            'search': self.header_search.text(),  # Nom, CIN ou téléphone
+            'status': self.status_filter.currentData(),
+            'license_type': self.license_filter.currentData(),
+        }
     
     def apply_filters(self):
-        """Appliquer les filtres"""
-        search_text = self.header_search.text().lower()
-        status_filter = self.status_filter.currentData()
-        license_filter = self.license_filter.currentData()
-        
-        self.filtered_students = []
-        
-        for student in self.students:
-            # Filtre texte
-            if search_text:
-                if not (search_text in student.full_name.lower() or
-                       (student.cin and search_text in student.cin.lower()) or
-                       (student.phone and search_text in student.phone)):
-                    continue
-            
-            # Filtre statut
-            if status_filter and student.status != status_filter:
-                continue
-            
-            # Filtre permis
-            if license_filter and student.license_type != license_filter:
-                continue
-            
-            self.filtered_students.append(student)
-        
-        self.populate_table()
+        """Appliquer les filtres (requête de la première page)"""
+        self.model.set_filters(self.current_filters())
     
     def update_stats(self):
-        """Mettre à jour les statistiques"""
-        total = len(self.students)
-        active = len([s for s in self.students if s.status == StudentStatus.ACTIVE])
-        debt = len([s for s in self.students if s.balance < 0])
-        graduated = len([s for s in self.students if s.status == StudentStatus.GRADUATED])
-        
-        self.total_label.setText(f"Total: {total}")
-        self.active_label.setText(f"Actifs: {active}")
-        self.debt_label.setText(f"Dettes: {debt}")
-        self.graduated_label.setText(f"Diplômés: {graduated}")
+        """Mettre à jour les statistiques (agrégats SQL)"""
+        counts = StudentController.get_summary_counts()
+        
+        self.total_label.setText(f"Total: {counts['total']}")
+        self.active_label.setText(f"Actifs: {counts['active']}")
+        self.debt_label.setText(f"Dettes: {counts['debt']}")
+        self.graduated_label.setText(f"Diplômés: {counts['graduated']}")
     
-    def populate_table(self):
-        """Remplir le tableau"""
-        self.table.setRowCount(0)
+    def on_row_action(self, action: str, student_id: int):
+        """Bouton d'action d'une ligne du tableau"""
+        student = StudentController.get_student_by_id(student_id)
+        if not student:
+            QMessageBox.warning(self, "Erreur", "Élève introuvable")
+            self.load_students()
+            return
         
-        for row, student in enumerate(self.filtered_students):
-            self.table.insertRow(row)
-            
-            # ID
-            self.table.setItem(row, 0, QTableWidgetItem(str(student.id)))
-            
-            # Nom
-            self.table.setItem(row, 1, QTableWidgetItem(student.full_name))
-            
-            # CIN
-            self.table.setItem(row, 2, QTableWidgetItem(student.cin or ""))
-            
-            # Téléphone
-            self.table.setItem(row, 3, QTableWidgetItem(student.phone or ""))
-            
-            # Permis
-            license_val = student.license_type if student.license_type else "N/A"
-            self.table.setItem(row, 4, QTableWidgetItem(str(license_val)))
-            
-            # Statut avec badges colorés
-            status_icons = {
-                StudentStatus.ACTIVE: "🟢",
-                StudentStatus.PENDING: "🟡",
-                StudentStatus.SUSPENDED: "🔴",
-                StudentStatus.GRADUATED: "🎓",
-                StudentStatus.ABANDONED: "⚫"
-            }
-            status_colors = {
-                StudentStatus.ACTIVE: "#27ae60",
-                StudentStatus.PENDING: "#f39c12",
-                StudentStatus.SUSPENDED: "#e74c3c",
-                StudentStatus.GRADUATED: "#3498db",
-                StudentStatus.ABANDONED: "#95a5a6"
-            }
-            status_icon = status_icons.get(student.status, "❓")
-            status_text = f"{status_icon} {student.status.value.capitalize()}" if student.status else "N/A"
-            status_item = QTableWidgetItem(status_text)
-            status_item.setForeground(QColor(status_colors.get(student.status, "#2c3e50")))
-            font = QFont()
-            font.setBold(True)
-            status_item.setFont(font)
-            self.table.setItem(row, 5, status_item)
-            
-            # Heures
-            hours_text = f"{student.hours_completed}/{student.hours_planned}"
-            self.table.setItem(row, 6, QTableWidgetItem(hours_text))
-            
-            # Prochaine séance (à implémenter - pour l'instant placeholder)
-            try:
-                from datetime import datetime, timedelta
-                # TODO: Récupérer vraiment la prochaine séance depuis la DB
-                next_session_text = "—"  # Placeholder
-                next_session_item = QTableWidgetItem(next_session_text)
-                next_session_item.setForeground(QColor("#7f8c8d"))
-                self.table.setItem(row, 7, next_session_item)
-            except:
-                self.table.setItem(row, 7, QTableWidgetItem("—"))
-            
-            # Solde (Balance = total_paid - total_due, negative = dette)
-            # Simple display: just +/- amount, no text
-            if student.balance == 0:
-                balance_text = "0.00"
-            else:
-                balance_text = f"{student.balance:+,.2f}"
-            balance_item = QTableWidgetItem(balance_text)
-            balance_item.setForeground(QColor("#e74c3c") if student.balance < 0 else QColor("#27ae60"))
-            font = QFont()
-            font.setBold(True)
-            balance_item.setFont(font)
-            self.table.setItem(row, 8, balance_item)
-            
-            # Actions
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(5, 0, 5, 0)
-            
-            view_btn = QPushButton("👁️")
-            view_btn.setToolTip("Voir détails")
-            view_btn.clicked.connect(partial(self.view_student, student))
-            view_btn.setCursor(Qt.PointingHandCursor)
-            
-            edit_btn = QPushButton("✏️")
-            edit_btn.setToolTip("Modifier")
-            edit_btn.clicked.connect(partial(self.edit_student, student))
-            edit_btn.setCursor(Qt.PointingHandCursor)
-            
-            contract_btn = QPushButton("📄")
-            contract_btn.setToolTip("Générer contrat")
-            contract_btn.clicked.connect(partial(self.generate_contract, student))
-            contract_btn.setCursor(Qt.PointingHandCursor)
-            
-            delete_btn = QPushButton("🗑️")
-            delete_btn.setToolTip("Supprimer")
-            delete_btn.clicked.connect(partial(self.delete_student, student))
-            delete_btn.setCursor(Qt.PointingHandCursor)
-            delete_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #e74c3c;
-                    color: white;
-                    border-radius: 3px;
-                    padding: 5px;
-                }
-                QPushButton:hover {
-                    background-color: #c0392b;
-                }
-            """)
-            
-            actions_layout.addWidget(view_btn)
-            actions_layout.addWidget(edit_btn)
-            actions_layout.addWidget(contract_btn)
-            actions_layout.addWidget(delete_btn)
-            
-            self.table.setCellWidget(row, 9, actions_widget)
+        handlers = {
+            'view': self.view_student,
+            'edit': self.edit_student,
+            'contract': self.generate_contract,
+            'delete': self.delete_student,
+        }
+        handlers[action](student)
     
     def add_student(self):
         """Ajouter un élève avec le formulaire simplifié"""
@@ -687,16 +612,7 @@ class StudentsEnhancedWidget(QWidget):
         try:
             pdf_gen = get_pdf_generator()
             
-            student_data = {
-                'full_name': student.full_name,
-                'cin': student.cin,
-                'date_of_birth': student.date_of_birth.strftime('%d/%m/%Y') if student.date_of_birth else 'N/A',
-                'phone': student.phone,
-                'address': student.address or 'N/A',
-                'license_type': student.license_type if student.license_type else 'B',
-                'hours_planned': student.hours_planned or 20,
-                'total_due': student.total_due or 0
-            }
+            student_data = StudentController.contract_data(student)
             
             success, result = pdf_gen.generate_contract(student_data)
             
@@ -734,8 +650,14 @@ class StudentsEnhancedWidget(QWidget):
                 # Extract just the filename without extension
                 basename = Path(filename).stem
                 logger.info(f"Students export: Extracted basename={basename}")
-                logger.info(f"Students export: Calling export_to_csv with {len(self.filtered_students)} students")
-                success, result = export_to_csv(self.filtered_students, basename)
+                # Élèves affichés (filtres du tableau), dans l'ordre du tableau
+                ids = [row.id for row in StudentController.list_page(
+                    self.current_filters(), self.model.sort_name(), limit=None, with_total=False
+                ).rows]
+                students_by_id = {s.id: s for s in StudentController.get_all_students()}
+                students = [students_by_id[sid] for sid in ids if sid in students_by_id]
+                logger.info(f"Students export: Calling export_to_csv with {len(students)} students")
+                success, result = export_to_csv(students, basename)
                 
                 if success:
                     QMessageBox.information(self, "Succès", f"Export réussi: {result}")
@@ -0,0 +1,575 @@
+"""
+Modèles de tableau virtualisés (model/view) pour les grandes listes
+
+Remplace les QTableWidget remplis cellule par cellule : les lignes sont
+gardées dans un cache colonne par colonne (une liste Python par champ) et
+le texte, les couleurs et l'alignement sont calculés à la demande par
+data(), uniquement pour les cellules visibles.
+
+- ColumnarTableModel : cache des lignes, exposées par pages (fetchMore) ;
+  en mode paginé (set_page_source), les pages, le tri et les filtres sont
+  demandés à la base via le list_page d'un contrôleur
+- RowFilterProxyModel : recherche texte et filtres par champ (masque
+  calculé une fois par changement de filtre), tri délégué au cache
+- ActionButtonsDelegate : boutons d'actions dessinés dans la cellule, sans
+  widget par ligne
+
+Usage:
+    model = ColumnarTableModel([
+        TableColumn("Date", 1, text=format_date, align=CENTER),
+        TableColumn("Élève", 2),
+        TableColumn("Actions"),
+    ])
+    proxy = RowFilterProxyModel()
+    proxy.setSourceModel(model)
+    view.setModel(proxy)
+    model.set_page_source(PaymentController.list_page, {'cancelled': False})
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import (
+    Qt, QAbstractTableModel, QEvent, QModelIndex, QRect, QSize, QSortFilterProxyModel, Signal
+)
+from PySide6.QtGui import QColor, QFont, QPainter
+from PySide6.QtWidgets import QStyle, QStyledItemDelegate, QToolTip
+
+CENTER = Qt.AlignCenter
+RIGHT = Qt.AlignRight | Qt.AlignVCenter
+
+ROW_ID_ROLE = Qt.UserRole + 1  # ID de l'enregistrement (champ 0 de chaque ligne)
+
+# Rôles en entiers : data() est appelée des milliers de fois par rendu et la
+# comparaison d'un int avec une énumération Qt coûte ~100x plus cher
+_DISPLAY_ROLE = Qt.DisplayRole.value
+_ALIGNMENT_ROLE = Qt.TextAlignmentRole.value
+_FOREGROUND_ROLE = Qt.ForegroundRole.value
+_FONT_ROLE = Qt.FontRole.value
+
+
+def _default_text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+@dataclass
+class TableColumn:
+    """
+    Colonne affichée
+    
+    Attributes:
+        title: Titre de l'en-tête
+        field: Index du champ dans les tuples de lignes (None: colonne sans
+               donnée, ex: actions)
+        text: valeur -> texte affiché
+        align: Alignement du texte
+        color: valeur -> couleur du texte (code hexadécimal) ou None
+        bold: Texte en gras
+        sort_key: valeur -> clé de tri (par défaut la valeur elle-même)
+        sort_name: Nom du tri côté base (mode paginé, None: non triable)
+    """
+    title: str
+    field: Optional[int] = None
+    text: Callable[[Any], str] = _default_text
+    align: Optional[Qt.AlignmentFlag] = None
+    color: Optional[Callable[[Any], Optional[str]]] = None
+    bold: bool = False
+    sort_key: Optional[Callable[[Any], Any]] = None
+    sort_name: Optional[str] = None
+
+
+class ColumnarTableModel(QAbstractTableModel):
+    """Modèle en lecture seule sur un cache de lignes stocké par colonnes"""
+    
+    PAGE_SIZE = 500
+    
+    def __init__(self, columns: List[TableColumn], parent=None):
+        super().__init__(parent)
+        self._columns = columns
+        self._alignments = [column.align.value if column.align is not None else None for column in columns]
+        self._fields: List[list] = []  # une liste de valeurs par champ
+        self._count = 0  # lignes en cache
+        self._loaded = 0  # lignes exposées à la vue
+        self._version = 0  # incrémentée à chaque rechargement ou tri
+        self._sort: Optional[Tuple[int, Qt.SortOrder]] = None  # (colonne, ordre)
+        self._search_cache: Dict[Tuple[int, ...], List[str]] = {}
+        self._colors: Dict[str, QColor] = {}
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+        
+        # Mode paginé (set_page_source)
+        self._fetch: Optional[Callable[..., Any]] = None
+        self._transform: Optional[Callable[[Any], tuple]] = None
+        self._filters: Dict[str, Any] = {}
+        self._total = 0  # lignes correspondant aux filtres, en base
+        self._cursor = None  # curseur (date, id) de la dernière ligne reçue
+        self._has_more = False
+    
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+    
+    def set_rows(self, rows: Sequence[tuple]):
+        """
+        Remplacer le contenu (un seul reset, aucune cellule créée)
+        
+        Args:
+            rows: Tuples de même longueur, le champ 0 étant l'ID
+        """
+        self.beginResetModel()
+        self._fields = [list(values) for values in zip(*rows)]
+        self._count = len(rows)
+        self._loaded = min(self.PAGE_SIZE, self._count)
+        self._version += 1
+        self._search_cache.clear()
+        
+        # Conserver le tri choisi par l'utilisateur après un rechargement
+        ordering = self._ordering()
+        if ordering is not None:
+            self._apply_ordering(ordering)
+        self.endResetModel()
+    
+    def set_page_source(self, fetch: Callable[..., Any], filters: Optional[Dict[str, Any]] = None,
+                        transform: Optional[Callable[[Any], tuple]] = None):
+        """
+        Passer en mode paginé : lignes, tri et filtres gérés par la base
+        
+        Args:
+            fetch: list_page d'un contrôleur
+                   (filters, sort, offset, limit, after, with_total) -> Page
+            filters: Filtres de list_page
+            transform: Ligne reçue -> tuple affiché (par défaut la ligne)
+        """
+        self._fetch = fetch
+        self._transform = transform
+        self._filters = dict(filters or {})
+        self.reload()
+    
+    def set_filters(self, filters: Dict[str, Any]):
+        """Remplacer les filtres (mode paginé) et recharger la première page"""
+        self._filters = dict(filters)
+        self.reload()
+    
+    def reload(self):
+        """Recharger la première page (mode paginé)"""
+        if self._fetch is None:
+            return
+        page = self._fetch(self._filters, self.sort_name(), 0, self.PAGE_SIZE)
+        rows = self._page_rows(page)
+        
+        self.beginResetModel()
+        self._fields = [list(values) for values in zip(*rows)]
+        self._count = self._loaded = len(rows)
+        self._total = page.total
+        self._cursor = page.next_cursor
+        self._has_more = page.has_more
+        self._version += 1
+        self._search_cache.clear()
+        self.endResetModel()
+    
+    def _page_rows(self, page) -> list:
+        if self._transform is None:
+            return page.rows
+        return [self._transform(row) for row in page.rows]
+    
+    def sort_name(self) -> Optional[str]:
+        """Tri list_page du tri courant ('-nom' pour décroissant, None: défaut)"""
+        if self._sort is None:
+            return None
+        column, order = self._sort
+        name = self._columns[column].sort_name
+        if name is None:
+            return None
+        return name if order == Qt.AscendingOrder else f"-{name}"
+    
+    def _fetch_next_page(self):
+        """Ajouter la page suivante : par clé (tri par date) ou par décalage"""
+        sort = self.sort_name()
+        if self._cursor is not None:
+            page = self._fetch(self._filters, sort, self._count, self.PAGE_SIZE,
+                               after=self._cursor, with_total=False)
+        else:
+            page = self._fetch(self._filters, sort, self._count, self.PAGE_SIZE, with_total=False)
+        rows = self._page_rows(page)
+        self._cursor = page.next_cursor
+        self._has_more = page.has_more and self._count + len(rows) < self._total
+        if not rows:
+            self._has_more = False
+            return
+        
+        self.beginInsertRows(QModelIndex(), self._count, self._count + len(rows) - 1)
+        if not self._fields:
+            self._fields = [[] for _ in rows[0]]
+        for values, new_values in zip(self._fields, zip(*rows)):
+            values.extend(new_values)
+        self._count = self._loaded = self._count + len(rows)
+        self._version += 1
+        self._search_cache.clear()
+        self.endInsertRows()
+    
+    @property
+    def version(self) -> int:
+        return self._version
+    
+    def total_count(self) -> int:
+        """Nombre de lignes en cache (exposées ou non) ; en mode paginé, en base"""
+        return self._total if self._fetch is not None else self._count
+    
+    def field_values(self, field: int) -> list:
+        """Valeurs d'un champ pour toutes les lignes en cache"""
+        return self._fields[field] if self._fields else []
+    
+    def value(self, row: int, field: int) -> Any:
+        return self._fields[field][row]
+    
+    def row_id(self, row: int) -> Optional[int]:
+        """ID de l'enregistrement d'une ligne"""
+        if 0 <= row < self._count:
+            return self._fields[0][row]
+        return None
+    
+    def search_texts(self, fields: Tuple[int, ...]) -> List[str]:
+        """Texte de recherche (minuscules) par ligne, calculé une fois par version"""
+        texts = self._search_cache.get(fields)
+        if texts is None:
+            columns = [self.field_values(field) for field in fields]
+            texts = [
+                " ".join("" if value is None else str(value) for value in values).lower()
+                for values in zip(*columns)
+            ]
+            self._search_cache[fields] = texts
+        return texts
+    
+    # ------------------------------------------------------------------
+    # Pagination
+    # ------------------------------------------------------------------
+    
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        if self._fetch is not None:
+            return self._has_more
+        return self._loaded < self._count
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        if self._fetch is not None:
+            self._fetch_next_page()
+            return
+        count = min(self.PAGE_SIZE, self._count - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+    
+    def fetch_all(self):
+        """Exposer toutes les lignes en cache (filtre actif)"""
+        if self._loaded < self._count:
+            self.beginInsertRows(QModelIndex(), self._loaded, self._count - 1)
+            self._loaded = self._count
+            self.endInsertRows()
+    
+    # ------------------------------------------------------------------
+    # QAbstractTableModel
+    # ------------------------------------------------------------------
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._loaded
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._columns)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._columns[section].title
+        return None
+    
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = self._columns[index.column()]
+        
+        if role == _DISPLAY_ROLE:
+            if column.field is None:
+                return None
+            return column.text(self._fields[column.field][index.row()])
+        if role == _ALIGNMENT_ROLE:
+            return self._alignments[index.column()]
+        if role == _FOREGROUND_ROLE:
+            if column.color is None or column.field is None:
+                return None
+            return self._color(column.color(self._fields[column.field][index.row()]))
+        if role == _FONT_ROLE:
+            return self._bold_font if column.bold else None
+        if role == ROW_ID_ROLE:
+            return self._fields[0][index.row()]
+        return None
+    
+    def _color(self, name: Optional[str]) -> Optional[QColor]:
+        if name is None:
+            return None
+        color = self._colors.get(name)
+        if color is None:
+            color = self._colors[name] = QColor(name)
+        return color
+    
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        """Trier tout le cache (pas seulement les lignes exposées) ; en mode paginé, en base"""
+        if self._columns[column].field is None:
+            return
+        if self._fetch is not None:
+            if self._columns[column].sort_name is None:
+                return
+            self._sort = (column, order)
+            self.reload()
+            return
+        self._sort = (column, order)
+        ordering = self._ordering()
+        if ordering is None:
+            return
+        
+        self.layoutAboutToBeChanged.emit()
+        new_rows = [0] * self._count
+        for new_row, old_row in enumerate(ordering):
+            new_rows[old_row] = new_row
+        self._apply_ordering(ordering)
+        
+        old_indexes = self.persistentIndexList()
+        new_indexes = []
+        for old in old_indexes:
+            row = new_rows[old.row()]
+            new_indexes.append(self.index(row, old.column()) if row < self._loaded else QModelIndex())
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+    
+    def _ordering(self) -> Optional[List[int]]:
+        """Ordre des lignes pour le tri courant (None: rien à trier)"""
+        if self._sort is None or self._count < 2:
+            return None
+        column, order = self._sort
+        spec = self._columns[column]
+        values = self._fields[spec.field]
+        key = spec.sort_key or (lambda value: value)
+        descending = order != Qt.AscendingOrder
+        
+        def row_key(row):
+            value = values[row]
+            # Les valeurs vides en dernier, quel que soit l'ordre
+            if value is None:
+                return (not descending, None)
+            return (descending, key(value))
+        
+        try:
+            return sorted(range(self._count), key=row_key, reverse=descending)
+        except TypeError:
+            return sorted(range(self._count), key=lambda row: str(row_key(row)[1]), reverse=descending)
+    
+    def _apply_ordering(self, ordering: List[int]):
+        self._fields = [[field[row] for row in ordering] for field in self._fields]
+        self._version += 1
+        self._search_cache.clear()
+
+
+class RowFilterProxyModel(QSortFilterProxyModel):
+    """
+    Filtres du tableau (recherche texte + filtres par champ)
+    
+    Le masque des lignes acceptées est calculé en une passe sur les colonnes
+    du cache à chaque changement de filtre ou de données ; filterAcceptsRow
+    ne fait qu'une lecture dans ce masque.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._search = ""
+        self._search_fields: Tuple[int, ...] = ()
+        self._field_filters: Dict[str, Tuple[int, Callable[[Any], bool]]] = {}
+        self._mask: Optional[List[bool]] = None
+        self._mask_version = -1
+    
+    def setSourceModel(self, model: ColumnarTableModel):
+        super().setSourceModel(model)
+        model.modelReset.connect(self._on_source_reset)
+    
+    def _on_source_reset(self):
+        if self.is_filtered():
+            self.sourceModel().fetch_all()
+    
+    def set_search(self, text: str, fields: Sequence[int]):
+        """Recherche (insensible à la casse) dans les champs donnés"""
+        self._search = (text or "").strip().lower()
+        self._search_fields = tuple(fields)
+        self._refilter()
+    
+    def set_field_filter(self, name: str, field: int, accept: Optional[Callable[[Any], bool]]):
+        """
+        Ajouter / remplacer (accept) ou retirer (None) un filtre sur un champ
+        
+        Args:
+            name: Nom du filtre
+            field: Index du champ dans les lignes
+            accept: valeur -> bool
+        """
+        if accept is None:
+            self._field_filters.pop(name, None)
+        else:
+            self._field_filters[name] = (field, accept)
+        self._refilter()
+    
+    def set_field_filters(self, filters: Dict[str, Tuple[int, Optional[Callable[[Any], bool]]]]):
+        """Changer plusieurs filtres en un seul recalcul"""
+        for name, (field, accept) in filters.items():
+            if accept is None:
+                self._field_filters.pop(name, None)
+            else:
+                self._field_filters[name] = (field, accept)
+        self._refilter()
+    
+    def is_filtered(self) -> bool:
+        return bool(self._search or self._field_filters)
+    
+    def accepted_count(self) -> int:
+        """Nombre de lignes du cache acceptées par les filtres"""
+        model = self.sourceModel()
+        if model is None:
+            return 0
+        mask = self._current_mask()
+        return model.total_count() if mask is None else sum(mask)
+    
+    def accepted_ids(self) -> List[int]:
+        """IDs des lignes du cache acceptées par les filtres, dans l'ordre du tableau"""
+        model = self.sourceModel()
+        if model is None:
+            return []
+        ids = model.field_values(0)
+        mask = self._current_mask()
+        return list(ids) if mask is None else [row_id for row_id, keep in zip(ids, mask) if keep]
+    
+    def source_row_id(self, proxy_index: QModelIndex) -> Optional[int]:
+        """ID de l'enregistrement d'un index de la vue"""
+        if not proxy_index.isValid():
+            return None
+        return self.sourceModel().row_id(self.mapToSource(proxy_index).row())
+    
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        # Tri de tout le cache par le modèle source : un tri du proxy ne
+        # porterait que sur les lignes déjà exposées
+        model = self.sourceModel()
+        if model is not None:
+            model.sort(column, order)
+    
+    def _refilter(self):
+        self._mask_version = -1
+        model = self.sourceModel()
+        if model is not None and self.is_filtered():
+            model.fetch_all()
+        self.invalidateFilter()
+    
+    def _current_mask(self) -> Optional[List[bool]]:
+        model = self.sourceModel()
+        if not self.is_filtered():
+            return None
+        if self._mask_version != model.version:
+            self._mask = self._compute_mask(model)
+            self._mask_version = model.version
+        return self._mask
+    
+    def _compute_mask(self, model: ColumnarTableModel) -> List[bool]:
+        mask = [True] * model.total_count()
+        for field, accept in self._field_filters.values():
+            mask = [keep and accept(value) for keep, value in zip(mask, model.field_values(field))]
+        if self._search:
+            needle = self._search
+            texts = model.search_texts(self._search_fields)
+            mask = [keep and needle in text for keep, text in zip(mask, texts)]
+        return mask
+    
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        mask = self._current_mask()
+        return mask is None or mask[source_row]
+
+
+@dataclass
+class RowAction:
+    """Bouton d'action d'une ligne"""
+    name: str
+    icon: str
+    tooltip: str
+    background: Optional[str] = None
+
+
+class ActionButtonsDelegate(QStyledItemDelegate):
+    """
+    Boutons d'actions dessinés dans une cellule (aucun widget par ligne)
+    
+    Signal triggered(nom de l'action, ID de l'enregistrement)
+    """
+    
+    triggered = Signal(str, int)
+    
+    def __init__(self, actions: List[RowAction], parent=None):
+        super().__init__(parent)
+        self._actions = actions
+        self._backgrounds = {
+            action.name: QColor(action.background or "#ecf0f1") for action in actions
+        }
+    
+    BUTTON_SIZE = 32
+    SPACING = 5
+    
+    def sizeHint(self, option, index) -> QSize:
+        count = len(self._actions)
+        return QSize(count * self.BUTTON_SIZE + (count + 1) * self.SPACING, self.BUTTON_SIZE)
+    
+    def _button_rects(self, rect: QRect) -> List[QRect]:
+        count = len(self._actions)
+        spacing = self.SPACING
+        size = min(rect.height() - 10, self.BUTTON_SIZE, (rect.width() - spacing * (count + 1)) // count)
+        total = count * size + (count - 1) * spacing
+        left = rect.left() + (rect.width() - total) // 2
+        top = rect.top() + (rect.height() - size) // 2
+        return [QRect(left + i * (size + spacing), top, size, size) for i in range(count)]
+    
+    def _action_at(self, rect: QRect, pos) -> Optional[RowAction]:
+        for action, button in zip(self._actions, self._button_rects(rect)):
+            if button.contains(pos):
+                return action
+        return None
+    
+    def paint(self, painter: QPainter, option, index):
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        for action, button in zip(self._actions, self._button_rects(option.rect)):
+            painter.setBrush(self._backgrounds[action.name])
+            painter.drawRoundedRect(button, 4, 4)
+            painter.setPen(QColor("white") if action.background else QColor("#2c3e50"))
+            painter.drawText(button, Qt.AlignCenter, action.icon)
+            painter.setPen(Qt.NoPen)
+        painter.restore()
+    
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            action = self._action_at(option.rect, event.position().toPoint())
+            row_id = index.data(ROW_ID_ROLE)
+            if action is not None and row_id is not None:
+                self.triggered.emit(action.name, row_id)
+                return True
+        return super().editorEvent(event, model, option, index)
+    
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QEvent.ToolTip:
+            action = self._action_at(option.rect, event.pos())
+            if action is not None:
+                QToolTip.showText(event.globalPos(), action.tooltip, view)
+                return True
+        return super().helpEvent(event, view, option, index)
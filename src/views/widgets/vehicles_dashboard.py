@@ -290,14 +290,17 @@ class VehiclesDashboard(QWidget):
             )
         )
         
+        # Heures et sessions par véhicule (une requête groupée)
+        statistics = VehicleController.get_all_vehicle_statistics()
+        
         # Charger les autres sections
-        self.load_top_vehicles(vehicles)
+        self.load_top_vehicles(vehicles, statistics)
         self.load_status_distribution(vehicles)
         self.load_license_distribution(vehicles)
         self.load_alerts(all_vehicles)
-        self.load_usage_stats(vehicles)
+        self.load_usage_stats(vehicles, statistics)
     
-    def load_top_vehicles(self, vehicles):
+    def load_top_vehicles(self, vehicles, statistics):
         """Charger le top 5 des véhicules"""
         # Nettoyer
         while self.top_vehicles_layout.count():
@@ -308,7 +311,7 @@ class VehiclesDashboard(QWidget):
         # Trier par heures d'utilisation
         sorted_vehicles = sorted(
             vehicles,
-            key=lambda v: v.total_hours_used or 0,
+            key=lambda v: statistics.get(v.id, {}).get('total_hours', 0),
             reverse=True
         )[:5]
         
@@ -346,7 +349,7 @@ class VehiclesDashboard(QWidget):
             row_layout.addWidget(name, 1)
             
             # Heures
-            hours = QLabel(f"{vehicle.total_hours_used or 0:.1f}h")
+            hours = QLabel(f"{statistics.get(vehicle.id, {}).get('total_hours', 0):.1f}h")
             hours.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
             hours.setStyleSheet("color: #4CAF50; border: none;")
             hours.setAlignment(Qt.AlignmentFlag.AlignRight)
@@ -588,7 +591,7 @@ class VehiclesDashboard(QWidget):
         
         self.alerts_layout.addStretch()
     
-    def load_usage_stats(self, vehicles):
+    def load_usage_stats(self, vehicles, statistics):
         """Charger les statistiques d'utilisation"""
         # Nettoyer
         while self.usage_layout.count():
@@ -605,8 +608,9 @@ class VehiclesDashboard(QWidget):
             return
         
         # Calculer les statistiques
-        total_hours = sum(v.total_hours_used or 0 for v in vehicles)
-        total_sessions = sum(v.total_sessions or 0 for v in vehicles)
+        vehicle_stats = [statistics.get(v.id, {}) for v in vehicles]
+        total_hours = sum(stats.get('total_hours', 0) for stats in vehicle_stats)
+        total_sessions = sum(stats.get('completed_sessions', 0) for stats in vehicle_stats)
         total_mileage = sum(v.current_mileage or 0 for v in vehicles)
         
         avg_hours_per_vehicle = total_hours / len(vehicles) if vehicles else 0
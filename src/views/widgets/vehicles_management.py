@@ -362,9 +362,8 @@ class VehicleDialog(QDialog):
             QMessageBox.warning(self, "Erreur", "Le modèle est obligatoire")
             return
         
+        session = get_session()
         try:
-            session = get_session()
-            
             if self.vehicle:
                 # Mise à jour
                 vehicle = session.query(Vehicle).filter_by(id=self.vehicle.id).first()
@@ -420,6 +419,8 @@ class VehicleDialog(QDialog):
         except Exception as e:
             session.rollback()
             QMessageBox.critical(self, "Erreur", f"Erreur lors de l'enregistrement: {str(e)}")
+        finally:
+            session.close()
 
 
 class VehiclesManagement(QWidget):
@@ -768,8 +769,8 @@ class VehiclesManagement(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            session = get_session()
             try:
-                session = get_session()
                 v = session.query(Vehicle).filter_by(id=vehicle.id).first()
                 if v:
                     session.delete(v)
@@ -779,6 +780,8 @@ class VehiclesManagement(QWidget):
             except Exception as e:
                 session.rollback()
                 QMessageBox.critical(self, "Erreur", f"Erreur: {str(e)}")
+            finally:
+                session.close()
     
     def export_vehicles(self):
         """Exporter les véhicules en CSV"""
@@ -0,0 +1,24 @@
+"""
+Fixtures communes des tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Permettre l'import de src et migrations depuis la racine du projet
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.models import init_db  # noqa: E402
+from src.models.base import close_db  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Base SQLite temporaire initialisée (tables, index, triggers)"""
+    path = tmp_path / "test.db"
+    init_db(str(path))
+    yield path
+    close_db()
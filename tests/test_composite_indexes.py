@@ -0,0 +1,81 @@
+"""
+Index composites (migrations/add_composite_indexes.py) : chaque requête
+fréquente doit être servie par son index d'après EXPLAIN QUERY PLAN.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from migrations import add_composite_indexes as migration
+from src.models import (
+    Exam, ExamResult, ExamType, Instructor, Payment, Session, SessionStatus, Student, Vehicle,
+    get_engine, session_scope
+)
+
+INDEX_NAMES = [name for names in migration.COMPOSITE_INDEXES.values() for name in names]
+
+
+@pytest.fixture
+def populated(database):
+    """Base avec un historique (statistiques ANALYZE représentatives)"""
+    with session_scope() as session:
+        students = [
+            Student(f"Élève {i}", f"BK{i:06d}", date(2000, 1, 1), f"06{i:08d}") for i in range(20)
+        ]
+        instructors = [Instructor(f"Moniteur {i}", f"MN{i:06d}", f"07{i:08d}", f"LIC{i}") for i in range(3)]
+        vehicles = [Vehicle(f"AA-{i:03d}-BB", "Renault", "Clio") for i in range(3)]
+        session.add_all(students + instructors + vehicles)
+        session.flush()
+        
+        start = datetime(2024, 1, 1, 8)
+        for i in range(300):
+            session.add(Session(
+                students[i % 20].id, start + timedelta(hours=i), 60,
+                instructor_id=instructors[i % 3].id, vehicle_id=vehicles[i % 3].id,
+                status=SessionStatus.CANCELLED if i % 10 == 0 else SessionStatus.SCHEDULED
+            ))
+            session.add(Payment(
+                students[i % 20].id, 100, payment_date=date(2024, 1, 1) + timedelta(days=i % 60),
+                is_cancelled=i % 25 == 0
+            ))
+        for i, student in enumerate(students):
+            session.add(Exam(
+                student.id, ExamType.PRACTICAL, date(2024, 1, 1) + timedelta(days=i),
+                result=ExamResult.PASSED if i % 2 else ExamResult.FAILED
+            ))
+    return database
+
+
+@pytest.mark.parametrize('index_name', INDEX_NAMES)
+def test_query_plan_uses_index(database, index_name):
+    assert migration.check_query_plans(get_engine())[index_name]
+
+
+@pytest.mark.parametrize('index_name', INDEX_NAMES)
+def test_query_plan_uses_index_with_history(populated, index_name):
+    assert migration.check_query_plans(get_engine())[index_name]
+
+
+def test_missing_indexes_are_created(database):
+    engine = get_engine()
+    with engine.begin() as connection:
+        for name in INDEX_NAMES:
+            connection.exec_driver_sql(f"DROP INDEX {name}")
+    
+    assert sorted(migration.create_composite_indexes(engine)) == sorted(INDEX_NAMES)
+    assert migration.create_composite_indexes(engine) == []
+    assert all(migration.check_query_plans(engine).values())
+
+
+def test_run_migration_succeeds(database):
+    assert migration.run_migration() is True
+
+
+def test_run_migration_fails_when_index_unused(database, monkeypatch, capsys):
+    plans = {name: True for name in INDEX_NAMES}
+    plans['ix_payments_cancelled_date'] = False
+    monkeypatch.setattr(migration, 'check_query_plans', lambda engine: plans)
+    
+    assert migration.run_migration() is False
+    assert "succès" not in capsys.readouterr().out
@@ -0,0 +1,166 @@
+"""
+Envoi groupé des emails (NotificationDispatcher) sur un serveur SMTP local
+(aiosmtpd) : réutilisation des connexions, débit, enregistrement des statuts
+par lots, reconnexion après fermeture par le serveur.
+"""
+
+import json
+import socket
+import threading
+import time
+
+import pytest
+from sqlalchemy import func
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller  # noqa: E402
+
+from src.controllers.notification_controller import NotificationController  # noqa: E402
+from src.models import (  # noqa: E402
+    Notification, NotificationCategory, NotificationStatus, NotificationType, get_session, session_scope
+)
+from src.utils.notification_dispatcher import DispatchJob, NotificationDispatcher  # noqa: E402
+from src.utils.notifications import NotificationManager  # noqa: E402
+
+IDLE_TIMEOUT = 0.5  # Inactivité (s) après laquelle le serveur ferme la connexion
+
+
+class RecordingHandler:
+    """Serveur SMTP de test : messages reçus par connexion (adresse du client)"""
+    
+    def __init__(self):
+        self.messages = {}  # peer -> nombre de messages
+        self.lock = threading.Lock()
+    
+    @property
+    def received(self) -> int:
+        return sum(self.messages.values())
+    
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            self.messages[session.peer] = self.messages.get(session.peer, 0) + 1
+        return '250 Message accepted for delivery'
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port(), timeout=IDLE_TIMEOUT)
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+@pytest.fixture
+def make_manager(smtp_server, tmp_path):
+    """NotificationManager dirigé vers le serveur de test (section dispatch ajustable)"""
+    def make(**dispatch) -> NotificationManager:
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps({"notifications": {
+            "email": {
+                "enabled": True, "smtp_host": smtp_server.hostname, "smtp_port": smtp_server.port,
+                "smtp_user": "", "use_tls": False, "from_email": "ecole@example.com"
+            },
+            "dispatch": {"email_per_second": 0, **dispatch}
+        }}), encoding='utf-8')
+        return NotificationManager(str(path))
+    return make
+
+
+def _jobs(count: int):
+    return [
+        DispatchJob(i, "email", f"eleve{i}@example.com", f"Rappel {i}", "Rappel de Session de Conduite")
+        for i in range(count)
+    ]
+
+
+def test_one_connection_per_worker(smtp_server, make_manager):
+    dispatcher = NotificationDispatcher(make_manager(email_workers=3))
+    
+    results = list(dispatcher.dispatch(_jobs(60)))
+    
+    assert sorted(notification_id for notification_id, _, _ in results) == list(range(60))
+    assert all(success for _, success, _ in results)
+    messages = smtp_server.handler.messages
+    assert smtp_server.handler.received == 60
+    assert 1 <= len(messages) <= 3
+    assert all(count > 1 for count in messages.values())
+
+
+def test_rate_limit(smtp_server, make_manager):
+    dispatcher = NotificationDispatcher(make_manager(email_workers=4, email_per_second=20))
+    
+    start = time.monotonic()
+    results = list(dispatcher.dispatch(_jobs(30)))
+    elapsed = time.monotonic() - start
+    
+    assert all(success for _, success, _ in results)
+    # Seau de 20 jetons : les 10 envois suivants attendent 1/20 s chacun
+    assert elapsed >= (30 - 20) / 20 * 0.9
+
+
+def test_reconnect_after_server_disconnect(smtp_server, make_manager):
+    manager = make_manager(email_workers=1)
+    opened = []
+    open_smtp = manager.open_smtp
+    manager.open_smtp = lambda: opened.append(1) or open_smtp()
+    
+    def jobs():
+        first, second = _jobs(2)
+        yield first
+        time.sleep(IDLE_TIMEOUT * 3)  # Le serveur ferme la connexion inactive
+        yield second
+    
+    results = list(NotificationDispatcher(manager).dispatch(jobs()))
+    
+    assert [success for _, success, _ in results] == [True, True]
+    assert len(opened) == 2
+    assert smtp_server.handler.received == 2
+    assert len(smtp_server.handler.messages) == 2
+
+
+def test_statuses_recorded_in_batches(database, smtp_server, make_manager, monkeypatch):
+    count, batch_size = 45, 10
+    with session_scope() as session:
+        session.add_all([
+            Notification(
+                notification_type=NotificationType.EMAIL,
+                category=NotificationCategory.SESSION_REMINDER,
+                recipient_email=f"eleve{i}@example.com" if i % 15 else None,  # 3 sans adresse
+                subject="Rappel de Session de Conduite",
+                message=f"Rappel {i}"
+            )
+            for i in range(count)
+        ])
+    
+    batches = []
+    record_dispatch = NotificationController._record_dispatch
+    
+    def recording(session, sent, failed, results):
+        if sent or failed:
+            batches.append(len(sent) + len(failed))
+        record_dispatch(session, sent, failed, results)
+    
+    monkeypatch.setattr(NotificationController, '_record_dispatch', staticmethod(recording))
+    controller = NotificationController()
+    controller.notification_manager = make_manager(email_workers=4, commit_batch_size=batch_size)
+    
+    results = controller.process_pending_notifications()
+    
+    assert results == {'total': count, 'success': count - 3, 'failed': 3}
+    assert batches == [batch_size] * 4 + [count - 4 * batch_size]
+    assert smtp_server.handler.received == count - 3
+    session = get_session()
+    try:
+        statuses = dict(
+            session.query(Notification.status, func.count()).group_by(Notification.status).all()
+        )
+    finally:
+        session.close()
+    assert statuses == {NotificationStatus.DELIVERED: count - 3, NotificationStatus.FAILED: 3}